@@ -1,18 +1,27 @@
 from fastapi import Depends, Request, HTTPException
-from sqlalchemy.orm import Session
-from app.database import get_db
-from app.models.user import User, Rol, user_project
+from app.models.user import User, Rol
 from app.models.counterpart_session import CounterpartSession
 from app.auth.permissions import Permiso, PERMISOS_POR_ROL
-from datetime import datetime
+from app.auth.principal_cache import load_user, load_counterpart_session, record_counterpart_activity
+from app.auth.session_events import publish_expiry
 
 
-def get_current_user(request: Request, db: Session = Depends(get_db)) -> User:
+def _resolve_user(request: Request) -> User | None:
+    """Usuario ya resuelto por AuthMiddleware, o desde la cache de principales."""
     user_id = request.session.get("user_id")
     if not user_id:
+        return None
+    user = getattr(request.state, "user", None)
+    if user is not None and user.id == user_id:
+        return user
+    return load_user(user_id)
+
+
+def get_current_user(request: Request) -> User:
+    if not request.session.get("user_id"):
         raise HTTPException(status_code=401, detail="No autenticado")
 
-    user = db.query(User).filter(User.id == user_id).first()
+    user = _resolve_user(request)
     if not user:
         raise HTTPException(status_code=401, detail="Usuario no encontrado")
 
@@ -25,11 +34,8 @@ def get_current_user(request: Request, db: Session = Depends(get_db)) -> User:
     return user
 
 
-def get_current_user_optional(request: Request, db: Session = Depends(get_db)) -> User | None:
-    user_id = request.session.get("user_id")
-    if not user_id:
-        return None
-    user = db.query(User).filter(User.id == user_id).first()
+def get_current_user_optional(request: Request) -> User | None:
+    user = _resolve_user(request)
     if not user or not user.activo:
         return None
     return user
@@ -45,12 +51,11 @@ def require_permission(permiso: Permiso):
     return _check
 
 
-def check_project_access(request: Request, project_id: int, db: Session = Depends(get_db)):
-    user_id = request.session.get("user_id")
-    if not user_id:
+def check_project_access(request: Request, project_id: int):
+    if not request.session.get("user_id"):
         raise HTTPException(status_code=401, detail="No autenticado")
 
-    user = db.query(User).filter(User.id == user_id).first()
+    user = _resolve_user(request)
     if not user or not user.activo or not user.rol:
         raise HTTPException(status_code=403, detail="Sin acceso")
 
@@ -58,34 +63,40 @@ def check_project_access(request: Request, project_id: int, db: Session = Depend
     if user.rol in (Rol.director, Rol.coordinador, Rol.tecnico_sede):
         return user
 
-    # Gestor pais: only assigned projects
+    # Gestor pais: only assigned projects (preloaded with the cached principal)
     if user.rol == Rol.gestor_pais:
-        assigned = db.execute(
-            user_project.select().where(
-                user_project.c.user_id == user.id,
-                user_project.c.project_id == project_id,
-            )
-        ).first()
-        if not assigned:
+        if project_id not in {p.id for p in user.assigned_projects}:
             raise HTTPException(status_code=403, detail="No tienes acceso a este proyecto")
 
     return user
 
 
-def get_current_counterpart(request: Request, db: Session = Depends(get_db)) -> CounterpartSession:
+def get_counterpart_session(request: Request) -> CounterpartSession:
+    """Sesion de contraparte valida, sin registrar actividad.
+
+    Para lo que no cuenta como uso del portal (el contador de sesion, el
+    canal de eventos): no renueva el tiempo de inactividad ni escribe en BD.
+    """
     token = request.cookies.get("counterpart_token")
     if not token:
         raise HTTPException(status_code=401, detail="Sesion de contraparte no encontrada")
 
-    session = db.query(CounterpartSession).filter(
-        CounterpartSession.session_token == token
-    ).first()
+    session = getattr(request.state, "counterpart_session", None)
+    if session is None or session.session_token != token:
+        session = load_counterpart_session(token)
 
     if not session or not session.is_valid:
         raise HTTPException(status_code=401, detail="Sesion expirada o invalida")
+    return session
+
+
+def get_current_counterpart(request: Request) -> CounterpartSession:
+    session = get_counterpart_session(request)
 
-    # Update last activity
-    session.last_activity = datetime.utcnow()
-    db.commit()
+    # Actividad solo en memoria (tambien en la copia cacheada, para que
+    # is_valid sea exacto); app.auth.session_activity la escribe en bloque
+    record_counterpart_activity(session)
+    # Las demas pestanas del portal ajustan su cuenta atras
+    publish_expiry(session)
 
     return session
@@ -1,72 +1,80 @@
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.responses import RedirectResponse
-from fastapi import Request
-from app.database import SessionLocal
-from app.models.user import User
-from app.models.counterpart_session import CounterpartSession
+from starlette.requests import Request
+from starlette.responses import JSONResponse, RedirectResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+from app.auth.principal_cache import load_user, load_counterpart_session
 
 
-class AuthMiddleware(BaseHTTPMiddleware):
+class AuthMiddleware:
+    """Pure ASGI auth gate.
+
+    Unlike ``BaseHTTPMiddleware`` it does not wrap the downstream response in
+    an extra task and memory stream, so ``FileResponse`` downloads and other
+    streamed bodies go straight to the server.
+    """
+
     RUTAS_PUBLICAS = {"/login", "/auth/login-entra", "/auth/callback", "/contraparte/login", "/health", "/dev-login", "/pendiente", "/unauthorized"}
     PREFIJOS_PUBLICOS = ["/static", "/docs", "/openapi.json", "/redoc", "/dev-login/"]
 
-    async def dispatch(self, request: Request, call_next):
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request = Request(scope)
+        response = self.check(request)
+        if response is not None:
+            await response(scope, receive, send)
+            return
+
+        await self.app(scope, receive, send)
+
+    def check(self, request: Request):
+        """Devuelve la respuesta de rechazo, o None si la peticion puede seguir."""
         path = request.url.path
 
         # Skip public routes
         if path in self.RUTAS_PUBLICAS:
-            return await call_next(request)
+            return None
 
         for prefix in self.PREFIJOS_PUBLICOS:
             if path.startswith(prefix):
-                return await call_next(request)
+                return None
 
         # Counterpart routes
         if path.startswith("/contraparte/"):
             if path == "/contraparte/logout":
-                return await call_next(request)
+                return None
 
             token = request.cookies.get("counterpart_token")
             if not token:
                 return RedirectResponse(url="/contraparte/login", status_code=302)
 
-            db = SessionLocal()
-            try:
-                session = db.query(CounterpartSession).filter(
-                    CounterpartSession.session_token == token
-                ).first()
-                if not session or not session.is_valid:
-                    return RedirectResponse(url="/contraparte/login", status_code=302)
-                request.state.counterpart_session = session
-            finally:
-                db.close()
-
-            return await call_next(request)
+            session = load_counterpart_session(token)
+            if not session or not session.is_valid:
+                return RedirectResponse(url="/contraparte/login", status_code=302)
+            request.state.counterpart_session = session
+            return None
 
         # Internal routes - check session
-        user_id = request.session.get("user_id") if hasattr(request, "session") else None
+        user_id = request.session.get("user_id") if "session" in request.scope else None
         if not user_id:
             # API routes return 401
             if path.startswith("/api/"):
-                from starlette.responses import JSONResponse
                 return JSONResponse({"detail": "No autenticado"}, status_code=401)
             return RedirectResponse(url="/login", status_code=302)
 
-        db = SessionLocal()
-        try:
-            user = db.query(User).filter(User.id == user_id).first()
-            if not user or not user.activo:
-                request.session.clear()
-                if path.startswith("/api/"):
-                    from starlette.responses import JSONResponse
-                    return JSONResponse({"detail": "No autenticado"}, status_code=401)
-                return RedirectResponse(url="/login", status_code=302)
-
-            if not user.rol and path not in ("/pendiente",):
-                return RedirectResponse(url="/pendiente", status_code=302)
+        user = load_user(user_id)
+        if not user or not user.activo:
+            request.session.clear()
+            if path.startswith("/api/"):
+                return JSONResponse({"detail": "No autenticado"}, status_code=401)
+            return RedirectResponse(url="/login", status_code=302)
 
-            request.state.user = user
-        finally:
-            db.close()
+        if not user.rol and path not in ("/pendiente",):
+            return RedirectResponse(url="/pendiente", status_code=302)
 
-        return await call_next(request)
+        request.state.user = user
+        return None
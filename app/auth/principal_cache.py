@@ -0,0 +1,157 @@
+"""Per-process TTL cache of authenticated principals.
+
+The middleware resolves the internal user (by session ``user_id``) or the
+counterpart session (by cookie token) once and stores a detached ORM object
+here, so htmx partials and dependencies do not hit the database on every
+request. Entries expire after ``auth_cache_ttl_seconds`` and are invalidated
+explicitly when a user is deactivated, changes role or a counterpart session
+is closed.
+
+Counterpart activity is also kept here: ``record_counterpart_activity`` only
+updates memory, and ``app.auth.session_activity`` writes the pending
+timestamps to the database in bulk. Sessions loaded from the database get
+the pending timestamp applied, so ``is_valid`` never sees a stale value.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from sqlalchemy.orm import selectinload
+from app.config import get_settings
+from app.database import SessionLocal
+from app.models.user import User
+from app.models.counterpart_session import CounterpartSession
+
+settings = get_settings()
+
+
+class PrincipalCache:
+    def __init__(self, ttl_seconds: float, max_entries: int = 2048):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[float, object]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value) -> None:
+        if self.ttl_seconds <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class ActivityTracker:
+    """Latest unsaved ``last_activity`` per counterpart session id."""
+
+    def __init__(self):
+        self._pending: dict[str, datetime] = {}
+        self._lock = threading.Lock()
+
+    def touch(self, session_id: str, when: datetime) -> None:
+        with self._lock:
+            self._pending[session_id] = when
+
+    def get(self, session_id: str) -> datetime | None:
+        with self._lock:
+            return self._pending.get(session_id)
+
+    def drain(self) -> dict[str, datetime]:
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        return pending
+
+    def restore(self, pending: dict[str, datetime]) -> None:
+        """Puts back a drained batch that could not be written."""
+        with self._lock:
+            for session_id, when in pending.items():
+                current = self._pending.get(session_id)
+                if current is None or current < when:
+                    self._pending[session_id] = when
+
+
+user_cache = PrincipalCache(settings.auth_cache_ttl_seconds)
+counterpart_cache = PrincipalCache(settings.auth_cache_ttl_seconds)
+counterpart_activity = ActivityTracker()
+
+
+def load_user(user_id: str) -> User | None:
+    """Devuelve el usuario (desacoplado de la sesion) desde cache o BD."""
+    user = user_cache.get(user_id)
+    if user is not None:
+        return user
+
+    db = SessionLocal()
+    try:
+        user = db.query(User).options(
+            selectinload(User.assigned_projects)
+        ).filter(User.id == user_id).first()
+        if user:
+            db.expunge_all()
+    finally:
+        db.close()
+
+    if user:
+        user_cache.set(user_id, user)
+    return user
+
+
+def load_counterpart_session(token: str) -> CounterpartSession | None:
+    """Devuelve la sesion de contraparte (desacoplada) desde cache o BD."""
+    session = counterpart_cache.get(token)
+    if session is not None:
+        return session
+
+    db = SessionLocal()
+    try:
+        session = db.query(CounterpartSession).filter(
+            CounterpartSession.session_token == token
+        ).first()
+        if session:
+            db.expunge(session)
+    finally:
+        db.close()
+
+    if session:
+        pending = counterpart_activity.get(session.id)
+        if pending and pending > session.last_activity:
+            session.last_activity = pending
+        counterpart_cache.set(token, session)
+    return session
+
+
+def record_counterpart_activity(session: CounterpartSession) -> None:
+    """Marks activity on the (cached) session; written later in bulk."""
+    now = datetime.utcnow()
+    session.last_activity = now
+    counterpart_activity.touch(session.id, now)
+
+
+def invalidate_user(user_id: str) -> None:
+    user_cache.invalidate(user_id)
+
+
+def invalidate_counterpart(token: str) -> None:
+    counterpart_cache.invalidate(token)
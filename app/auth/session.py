@@ -1,6 +1,6 @@
 from datetime import datetime, timedelta
 from uuid import uuid4
-from fastapi import Request, Response
+from fastapi import BackgroundTasks, Request, Response
 from sqlalchemy.orm import Session
 from app.models.user import User
 from app.models.counterpart_session import CounterpartSession
@@ -17,7 +17,7 @@ def destroy_internal_session(request: Request):
 
 def create_counterpart_session(
     db: Session, project_id: int, ip_address: str | None, user_agent: str | None,
-    language: str = "es",
+    language: str = "es", background_tasks: BackgroundTasks | None = None,
 ) -> CounterpartSession:
     token = str(uuid4())
     session = CounterpartSession(
@@ -30,6 +30,15 @@ def create_counterpart_session(
     db.add(session)
     db.commit()
     db.refresh(session)
+
+    # Traducciones que aun falten para el idioma de la sesion, antes de que
+    # la contraparte abra las pestanas del portal
+    if language != "es":
+        from app.services.translation_queue_service import prewarm_project_translations
+        if background_tasks is not None:
+            background_tasks.add_task(prewarm_project_translations, project_id, (language,))
+        else:
+            prewarm_project_translations(project_id, (language,))
     return session
 
 
@@ -0,0 +1,128 @@
+"""Actividad y limpieza de las sesiones de contraparte en segundo plano.
+
+Cada peticion del portal solo anota la actividad en memoria
+(principal_cache.record_counterpart_activity). Un hilo la escribe en BD en
+un unico UPDATE por lote cada `counterpart_activity_flush_seconds`, en lugar
+de un commit por peticion, y cada `counterpart_sweep_minutes` borra las
+sesiones cerradas o caducadas.
+
+Mientras no se escribe, la copia cacheada y load_counterpart_session ya
+llevan la actividad pendiente, asi que is_valid no cambia. Con varios
+procesos, otro worker puede ver last_activity con hasta un intervalo de
+retraso.
+"""
+import logging
+import threading
+from datetime import datetime
+
+from sqlalchemy import bindparam, delete, or_, select, update
+
+from app.auth.principal_cache import counterpart_activity, invalidate_counterpart
+from app.auth.session_events import publish_expired
+from app.config import get_settings
+from app.database import SessionLocal
+from app.models.counterpart_session import CounterpartSession, INACTIVITY_TIMEOUT
+
+logger = logging.getLogger(__name__)
+
+DELETE_CHUNK_ROWS = 500
+
+
+def flush_activity() -> int:
+    """Escribe la actividad pendiente. Devuelve cuantas sesiones actualiza."""
+    pending = counterpart_activity.drain()
+    if not pending:
+        return 0
+
+    table = CounterpartSession.__table__
+    stmt = (
+        update(table)
+        .where(table.c.id == bindparam("session_id"), table.c.last_activity < bindparam("ts"))
+        .values(last_activity=bindparam("ts"))
+    )
+    db = SessionLocal()
+    try:
+        db.execute(stmt, [{"session_id": sid, "ts": ts} for sid, ts in pending.items()])
+        db.commit()
+    except Exception:
+        db.rollback()
+        counterpart_activity.restore(pending)
+        raise
+    finally:
+        db.close()
+    return len(pending)
+
+
+def sweep_expired_sessions() -> int:
+    """Borra las sesiones cerradas o caducadas. Devuelve cuantas."""
+    flush_activity()
+    now = datetime.utcnow()
+    db = SessionLocal()
+    try:
+        rows = db.execute(
+            select(CounterpartSession.id, CounterpartSession.session_token).where(
+                or_(
+                    CounterpartSession.activo.is_(False),
+                    CounterpartSession.expires_at < now,
+                    CounterpartSession.last_activity < now - INACTIVITY_TIMEOUT,
+                )
+            )
+        ).all()
+        # Actividad llegada despues del flush: esa sesion sigue viva
+        expired = [row for row in rows if counterpart_activity.get(row.id) is None]
+        ids = [row.id for row in expired]
+        for i in range(0, len(ids), DELETE_CHUNK_ROWS):
+            db.execute(
+                delete(CounterpartSession).where(CounterpartSession.id.in_(ids[i:i + DELETE_CHUNK_ROWS]))
+            )
+        db.commit()
+    finally:
+        db.close()
+
+    for row in expired:
+        invalidate_counterpart(row.session_token)
+        publish_expired(row.id)
+    if expired:
+        logger.info("Borradas %d sesiones de contraparte caducadas", len(expired))
+    return len(expired)
+
+
+# ---- Hilo de mantenimiento ----
+
+_thread: threading.Thread | None = None
+_stop = threading.Event()
+
+
+def _maintenance_loop() -> None:
+    settings = get_settings()
+    last_sweep = datetime.min
+    while not _stop.wait(settings.counterpart_activity_flush_seconds):
+        try:
+            flush_activity()
+            if (datetime.utcnow() - last_sweep).total_seconds() >= settings.counterpart_sweep_minutes * 60:
+                sweep_expired_sessions()
+                last_sweep = datetime.utcnow()
+        except Exception:
+            logger.exception("Error en el mantenimiento de sesiones de contraparte")
+
+
+def start_session_maintenance() -> None:
+    global _thread
+    if _thread is not None:
+        return
+    _stop.clear()
+    _thread = threading.Thread(target=_maintenance_loop, name="counterpart-sessions", daemon=True)
+    _thread.start()
+
+
+def stop_session_maintenance() -> None:
+    """Para el hilo y escribe la actividad que quede pendiente."""
+    global _thread
+    _stop.set()
+    if _thread is not None:
+        _thread.join(timeout=10)
+        _thread = None
+    try:
+        flush_activity()
+    except Exception:
+        logger.exception("No se pudo guardar la actividad pendiente de las contrapartes")
@@ -0,0 +1,136 @@
+"""Canal de eventos (SSE) de las sesiones de contraparte.
+
+El portal recibe el tiempo restante de la sesion una sola vez, al cargar la
+pagina, y lo cuenta atras en el navegador. Lo que el cliente no puede saber
+por si mismo (actividad desde otra pestana, cierre de sesion, caducidad
+decidida por el servidor) le llega por /contraparte/session/events.
+
+Cada conexion abierta es una cola en memoria: mientras no hay eventos solo
+se envia un comentario de keep-alive, sin tocar la BD ni renovar la sesion.
+El broker es por proceso; con varios workers, un evento publicado en otro
+proceso no llega, pero el stream vuelve a leer la sesion de la BD al llegar
+su fecha de caducidad y corrige el contador entonces.
+"""
+import asyncio
+import json
+import threading
+from dataclasses import dataclass
+
+from starlette.concurrency import run_in_threadpool
+
+from app.auth.principal_cache import invalidate_counterpart, load_counterpart_session
+
+# Comentario periodico para que proxies y navegador no cierren la conexion
+HEARTBEAT_SECONDS = 25
+# Vida maxima de un stream: EventSource reconecta solo (sin escribir en la
+# BD) y asi un reinicio de uvicorn no espera a conexiones eternas
+STREAM_MAX_SECONDS = 300
+
+
+@dataclass(frozen=True)
+class SessionEvent:
+    event: str
+    data: dict
+
+    def encode(self) -> str:
+        return f"event: {self.event}\ndata: {json.dumps(self.data)}\n\n"
+
+
+class SessionEventBroker:
+    """Publica eventos a las conexiones SSE abiertas de cada sesion.
+
+    `publish` se puede llamar desde cualquier hilo (las dependencias sincronas
+    corren en el threadpool): la entrega se hace en el bucle de cada cola.
+    """
+
+    def __init__(self):
+        self._subscribers: dict[str, set[tuple[asyncio.AbstractEventLoop, asyncio.Queue]]] = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self, session_id: str) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue()
+        entry = (asyncio.get_running_loop(), queue)
+        with self._lock:
+            self._subscribers.setdefault(session_id, set()).add(entry)
+        return queue
+
+    def unsubscribe(self, session_id: str, queue: asyncio.Queue) -> None:
+        with self._lock:
+            entries = self._subscribers.get(session_id)
+            if not entries:
+                return
+            entries.difference_update({e for e in entries if e[1] is queue})
+            if not entries:
+                del self._subscribers[session_id]
+
+    def publish(self, session_id: str, event: str, **data) -> None:
+        with self._lock:
+            entries = list(self._subscribers.get(session_id, ()))
+        for loop, queue in entries:
+            self._deliver(loop, queue, SessionEvent(event, data))
+
+    def connections(self) -> int:
+        with self._lock:
+            return sum(len(entries) for entries in self._subscribers.values())
+
+    @staticmethod
+    def _deliver(loop: asyncio.AbstractEventLoop, queue: asyncio.Queue, item) -> None:
+        try:
+            loop.call_soon_threadsafe(queue.put_nowait, item)
+        except RuntimeError:
+            pass  # bucle ya cerrado: la conexion ha terminado
+
+
+session_events = SessionEventBroker()
+
+
+def publish_expiry(session) -> None:
+    """Avisa del nuevo tiempo restante de `session` (actividad, extension)."""
+    session_events.publish(session.id, "expiry", remaining=session.segundos_restantes)
+
+
+def publish_expired(session_id: str) -> None:
+    """Avisa de que la sesion ya no es valida (cierre o caducidad)."""
+    session_events.publish(session_id, "expired")
+
+
+def _reload_session(token: str):
+    invalidate_counterpart(token)
+    return load_counterpart_session(token)
+
+
+async def stream_session_events(session):
+    """Generador SSE del portal: tiempo restante, cambios y caducidad.
+
+    Solo consulta la BD cuando llega la caducidad prevista, por si otra
+    pestana (u otro worker) la ha extendido entretanto.
+    """
+    loop = asyncio.get_running_loop()
+    queue = session_events.subscribe(session.id)
+    started = loop.time()
+    remaining = session.segundos_restantes
+    deadline = started + remaining
+    try:
+        yield "retry: 5000\n\n" + SessionEvent("expiry", {"remaining": remaining}).encode()
+        while True:
+            now = loop.time()
+            if now - started >= STREAM_MAX_SECONDS:
+                return
+            timeout = min(HEARTBEAT_SECONDS, deadline - now, started + STREAM_MAX_SECONDS - now)
+            try:
+                item = await asyncio.wait_for(queue.get(), max(0, timeout))
+            except asyncio.TimeoutError:
+                if loop.time() < deadline:
+                    yield ": ping\n\n"
+                    continue
+                current = await run_in_threadpool(_reload_session, session.session_token)
+                if current is None or not current.is_valid:
+                    yield SessionEvent("expired", {}).encode()
+                    return
+                item = SessionEvent("expiry", {"remaining": current.segundos_restantes})
+            yield item.encode()
+            if item.event == "expired":
+                return
+            deadline = loop.time() + max(1, item.data["remaining"])
+    finally:
+        session_events.unsubscribe(session.id, queue)
@@ -6,17 +6,73 @@ class Settings(BaseSettings):
     app_name: str = "CooperApp"
     debug: bool = True
     database_url: str = "sqlite:///./cooperapp.db"
+    # Engine profile (pool + SQLite pragmas applied on every new connection)
+    db_pool_size: int = 10
+    db_max_overflow: int = 10
+    db_pool_timeout: int = 30
+    sqlite_journal_mode: str = "WAL"
+    sqlite_synchronous: str = "NORMAL"
+    sqlite_cache_size: int = -64000  # negative = KiB (64 MB)
+    sqlite_mmap_size: int = 268435456  # 256 MB
+    sqlite_busy_timeout_ms: int = 5000
+    # Off by default: audit_logs and counterpart_sessions keep references to
+    # deleted projects, which SQLite would reject with foreign_keys=ON.
+    sqlite_foreign_keys: bool = False
     app_port: int = 8000
     uploads_path: str = "uploads"
     exports_path: str = "exports"
+    # Hilos del pool que genera informes, packs y Anexo II A en segundo plano
+    report_workers: int = 2
+    # Cada proceso marca sus trabajos en curso cada report_job_heartbeat_seconds;
+    # otro proceso solo reencola un trabajo sin latido en report_job_stale_seconds
+    report_job_heartbeat_seconds: int = 30
+    report_job_stale_seconds: int = 300
+    # Procesos que rellenan en paralelo los PDF del Anexo II A por lotes
+    # (1 = en el propio hilo del trabajo)
+    aacid_batch_workers: int = 4
+    # Procesos que generan en paralelo los libros del pack de justificacion
+    # (como maximo uno por CPU; 1 = en el propio hilo del trabajo)
+    report_pack_workers: int = 4
+    # Aplicar al arrancar las migraciones pendientes; si es False el arranque
+    # falla hasta que se ejecute `python -m app.migrations upgrade`
+    auto_migrate: bool = True
+    # Plantillas: bytecode compilado en disco (vacio = sin cache) y recarga
+    # al cambiar el fichero (None = igual que debug)
+    templates_cache_dir: str = ".jinja_cache"
+    templates_auto_reload: bool | None = None
     entra_tenant_id: str = ""
     entra_client_id: str = ""
     entra_client_secret: str = ""
     app_url: str = "http://localhost:8000"
     session_secret_key: str = "change-me-in-production"
+    auth_cache_ttl_seconds: int = 30
+    # Sesiones de contraparte: cada cuanto se escribe en bloque la actividad
+    # (last_activity) y cada cuanto se borran las caducadas
+    counterpart_activity_flush_seconds: int = 60
+    counterpart_sweep_minutes: int = 15
     acme_email: str = ""
     openrouter_api_key: str = ""
     openrouter_model: str = "google/gemini-3-flash-preview"
+    openrouter_base_url: str = "https://openrouter.ai/api/v1"
+    # Cliente compartido: peticiones simultaneas, ritmo maximo y tamano de
+    # cada prompt (en caracteres del JSON con los textos)
+    openrouter_max_concurrency: int = 4
+    openrouter_requests_per_minute: int = 60
+    openrouter_prompt_max_chars: int = 6000
+    openrouter_timeout_seconds: float = 30.0
+    # LRU por proceso de traducciones del portal de contrapartes
+    translation_cache_size: int = 50000
+    translation_prefetch_ttl_seconds: int = 60
+    # Cola persistente de traducciones: hilos, campos por lote y reintentos
+    # (espera exponencial desde translation_retry_base_seconds)
+    translation_workers: int = 2
+    translation_batch_size: int = 100
+    translation_max_attempts: int = 6
+    translation_retry_base_seconds: int = 30
+    translation_poll_seconds: float = 2.0
+    # Un lote en_proceso de otro proceso vivo solo se reencola si se reclamo
+    # hace mas de esto (un lote tarda como mucho unos minutos)
+    translation_claim_stale_seconds: int = 900
 
     class Config:
         env_file = ".env"
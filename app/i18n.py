@@ -1,3 +1,8 @@
+import re
+import sys
+from functools import lru_cache
+from pathlib import Path
+
 SUPPORTED_LANGUAGES = ("es", "fr", "en")
 
 TRANSLATIONS = {
@@ -20,6 +25,7 @@ TRANSLATIONS = {
         "portal.marco_logico": "Marco Logico",
         "portal.documentos": "Documentos",
         "portal.loading": "Cargando...",
+        "portal.translation_pending": "Traduccion en curso: algunos textos se muestran en espanol.",
         "portal.presupuesto": "Presupuesto",
         "portal.gastos": "Gastos",
         # Expenses
@@ -372,6 +378,7 @@ TRANSLATIONS = {
         "portal.marco_logico": "Cadre Logique",
         "portal.documentos": "Documents",
         "portal.loading": "Chargement...",
+        "portal.translation_pending": "Traduction en cours : certains textes sont affiches en espagnol.",
         "portal.presupuesto": "Budget",
         "portal.gastos": "Depenses",
         # Expenses
@@ -724,6 +731,7 @@ TRANSLATIONS = {
         "portal.marco_logico": "Logical Framework",
         "portal.documentos": "Documents",
         "portal.loading": "Loading...",
+        "portal.translation_pending": "Translation in progress: some texts are shown in Spanish.",
         "portal.presupuesto": "Budget",
         "portal.gastos": "Expenses",
         # Expenses
@@ -1060,6 +1068,28 @@ TRANSLATIONS = {
 }
 
 
+class Catalog(dict):
+    """Catalogo plano de un idioma (clave -> texto), ya combinado con el
+    espanol. Una clave desconocida se devuelve tal cual."""
+
+    def __missing__(self, key: str) -> str:
+        return key
+
+
+def compile_catalogs(translations: dict = TRANSLATIONS) -> dict[str, Catalog]:
+    """Un catalogo por idioma soportado, con las claves que falten tomadas
+    del espanol: t() queda en un solo acceso a diccionario."""
+    base = translations["es"]
+    return {
+        lang: Catalog({**base, **translations.get(lang, {})})
+        for lang in SUPPORTED_LANGUAGES
+    }
+
+
+CATALOGS = compile_catalogs()
+
+
+@lru_cache(maxsize=512)
 def detect_language(accept_language_header: str | None) -> str:
     if not accept_language_header:
         return "es"
@@ -1074,11 +1104,65 @@ def detect_language(accept_language_header: str | None) -> str:
     return "es"
 
 
-def get_translator(lang: str):
-    translations = TRANSLATIONS.get(lang, TRANSLATIONS["es"])
-    fallback = TRANSLATIONS["es"]
+def get_catalog(lang: str) -> Catalog:
+    return CATALOGS.get(lang, CATALOGS["es"])
+
 
+def _make_translator(catalog: Catalog):
+    # Funcion Python y no catalog.__getitem__: Jinja llama mas rapido a una
+    # funcion que a un metodo nativo
     def t(key: str) -> str:
-        return translations.get(key, fallback.get(key, key))
+        return catalog[key]
 
     return t
+
+
+TRANSLATORS = {lang: _make_translator(catalog) for lang, catalog in CATALOGS.items()}
+
+
+def get_translator(lang: str):
+    """t(key) para un idioma: un solo acceso al catalogo precompilado."""
+    return TRANSLATORS.get(lang, TRANSLATORS["es"])
+
+
+# ---- Comprobacion de claves (se ejecuta al construir la imagen) ----
+
+TEMPLATE_KEY_RE = re.compile(r"""\bt\(\s*['"]([\w.]+)['"]\s*\)|['"]([\w.]+)['"]\s*\|\s*t\b""")
+
+
+def template_keys(templates_dir: Path) -> dict[str, set[str]]:
+    """Claves literales usadas en las plantillas: clave -> plantillas."""
+    used: dict[str, set[str]] = {}
+    for path in sorted(templates_dir.rglob("*.html")):
+        for match in TEMPLATE_KEY_RE.finditer(path.read_text(encoding="utf-8")):
+            key = match.group(1) or match.group(2)
+            used.setdefault(key, set()).add(str(path.relative_to(templates_dir)))
+    return used
+
+
+def missing_keys(translations: dict = TRANSLATIONS, templates_dir: Path | None = None) -> dict[str, list[str]]:
+    """Por idioma, las claves que no tiene (y saldrian en espanol o como la
+    propia clave). Incluye las que usan las plantillas y nadie define."""
+    all_keys = set().union(*(translations.get(lang, {}) for lang in SUPPORTED_LANGUAGES))
+    if templates_dir is not None:
+        all_keys |= set(template_keys(templates_dir))
+    return {
+        lang: sorted(all_keys - set(translations.get(lang, {})))
+        for lang in SUPPORTED_LANGUAGES
+    }
+
+
+def main() -> int:
+    templates_dir = Path(__file__).resolve().parent / "templates"
+    missing = missing_keys(templates_dir=templates_dir)
+    used = template_keys(templates_dir)
+    for lang in SUPPORTED_LANGUAGES:
+        print(f"{lang}: {len(CATALOGS[lang])} claves, {len(missing[lang])} sin traducir")
+        for key in missing[lang]:
+            where = ", ".join(sorted(used.get(key, ()))) or "-"
+            print(f"    {key}  ({where})")
+    return 1 if any(missing.values()) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
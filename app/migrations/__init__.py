@@ -0,0 +1,20 @@
+from app.migrations.runner import (
+    MIGRATIONS,
+    Migration,
+    current_version,
+    latest_version,
+    pending_migrations,
+    upgrade,
+    ensure_schema,
+)
+from app.migrations import steps  # noqa: F401  registra los pasos
+
+__all__ = [
+    "MIGRATIONS",
+    "Migration",
+    "current_version",
+    "latest_version",
+    "pending_migrations",
+    "upgrade",
+    "ensure_schema",
+]
@@ -0,0 +1,50 @@
+"""CLI de migraciones.
+
+Uso:
+    python -m app.migrations status
+    python -m app.migrations upgrade [--to N]
+"""
+import argparse
+import logging
+import sys
+
+from app.database import engine
+from app.migrations import MIGRATIONS, current_version, latest_version, upgrade
+from app.migrations.runner import applied_migrations
+
+
+def cmd_status() -> int:
+    applied = {row["version"]: row for row in applied_migrations(engine)}
+    print(f"Version actual: {current_version(engine)} / ultima: {latest_version()}")
+    for m in MIGRATIONS:
+        row = applied.get(m.version)
+        estado = row["applied_at"].strftime("%Y-%m-%d %H:%M") if row else "pendiente"
+        print(f"  {m.version:03d}  {estado:<16}  {m.name}")
+    return 0
+
+
+def cmd_upgrade(target: int | None) -> int:
+    applied = upgrade(engine, target=target)
+    if not applied:
+        print(f"Nada que aplicar (version {current_version(engine)}).")
+    else:
+        print(f"{len(applied)} pasos aplicados; version {current_version(engine)}.")
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.migrations", description="Migraciones de esquema")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("status", help="Muestra la version y los pasos aplicados")
+    up = sub.add_parser("upgrade", help="Aplica los pasos pendientes")
+    up.add_argument("--to", type=int, default=None, help="Detenerse en esta version")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    if args.command == "status":
+        return cmd_status()
+    return cmd_upgrade(args.to)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
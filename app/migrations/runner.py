@@ -0,0 +1,128 @@
+"""Runner de migraciones versionadas.
+
+Cada paso tiene un numero y un nombre; la tabla schema_version guarda los que
+ya se aplicaron. Los pasos son idempotentes (comprueban antes de cambiar), asi
+que una BD creada antes de existir esta tabla simplemente los recorre todos
+desde el 1 sin romper nada.
+"""
+import logging
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable
+
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, func, insert, select
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import IntegrityError, OperationalError
+from sqlalchemy.orm import Session, sessionmaker
+
+logger = logging.getLogger(__name__)
+
+# Fuera de Base.metadata: la gestiona solo el runner
+schema_version_table = Table(
+    "schema_version",
+    MetaData(),
+    Column("version", Integer, primary_key=True),
+    Column("name", String(200), nullable=False),
+    Column("applied_at", DateTime, nullable=False),
+)
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    name: str
+    apply: Callable[[Session], None]
+
+
+MIGRATIONS: list[Migration] = []
+
+
+def migration(version: int, name: str):
+    """Registra un paso. Los numeros deben ser consecutivos y no reutilizarse."""
+
+    def decorator(fn: Callable[[Session], None]) -> Callable[[Session], None]:
+        expected = len(MIGRATIONS) + 1
+        if version != expected:
+            raise RuntimeError(f"Migracion {version} ({name}) fuera de orden: se esperaba la {expected}")
+        MIGRATIONS.append(Migration(version, name, fn))
+        return fn
+
+    return decorator
+
+
+def latest_version() -> int:
+    return MIGRATIONS[-1].version if MIGRATIONS else 0
+
+
+def current_version(engine: Engine) -> int:
+    """Ultima version aplicada (0 si la tabla aun no existe)."""
+    try:
+        with engine.connect() as conn:
+            return conn.execute(select(func.max(schema_version_table.c.version))).scalar() or 0
+    except OperationalError:
+        return 0
+
+
+def applied_migrations(engine: Engine) -> list[dict]:
+    schema_version_table.create(bind=engine, checkfirst=True)
+    with engine.connect() as conn:
+        rows = conn.execute(
+            select(schema_version_table).order_by(schema_version_table.c.version)
+        ).mappings().all()
+    return [dict(r) for r in rows]
+
+
+def pending_migrations(engine: Engine) -> list[Migration]:
+    version = current_version(engine)
+    return [m for m in MIGRATIONS if m.version > version]
+
+
+def upgrade(engine: Engine, target: int | None = None) -> list[Migration]:
+    """Aplica en orden los pasos pendientes (hasta target, si se indica)."""
+    schema_version_table.create(bind=engine, checkfirst=True)
+    session_factory = sessionmaker(bind=engine, autocommit=False, autoflush=False)
+    applied = []
+    for m in pending_migrations(engine):
+        if target is not None and m.version > target:
+            break
+        logger.info("Aplicando migracion %03d: %s", m.version, m.name)
+        db = session_factory()
+        try:
+            m.apply(db)
+            db.commit()
+        finally:
+            db.close()
+        with engine.begin() as conn:
+            try:
+                conn.execute(insert(schema_version_table).values(
+                    version=m.version, name=m.name, applied_at=datetime.utcnow()
+                ))
+            except IntegrityError:
+                # Otro proceso la registro a la vez; el paso es idempotente
+                logger.info("Migracion %03d ya registrada por otro proceso", m.version)
+        applied.append(m)
+    return applied
+
+
+def ensure_schema(engine: Engine, auto_migrate: bool = True) -> int:
+    """Comprobacion de arranque: solo lee el numero de version.
+
+    Si la BD esta al dia no hace nada mas. Si va por detras aplica los pasos
+    pendientes (auto_migrate) o se niega a arrancar indicando el comando.
+    """
+    version = current_version(engine)
+    latest = latest_version()
+    if version >= latest:
+        return version
+    if not auto_migrate:
+        raise RuntimeError(
+            f"Esquema de BD en la version {version}, se necesita la {latest}. "
+            "Ejecuta: python -m app.migrations upgrade"
+        )
+    try:
+        upgrade(engine)
+    except Exception:
+        # Con varios workers arrancando a la vez otro puede haber terminado antes
+        if current_version(engine) < latest:
+            raise
+    return latest
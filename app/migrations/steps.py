@@ -0,0 +1,636 @@
+"""Pasos de migracion, en orden. Nunca renumerar ni editar uno ya publicado:
+los cambios nuevos van en un paso nuevo al final.
+
+Todos son idempotentes: las BD anteriores a schema_version ya tienen parte de
+estos cambios (se aplicaban en cada arranque) y los recorren desde el 1.
+"""
+import logging
+from datetime import datetime
+from decimal import Decimal
+
+from sqlalchemy import (
+    DateTime, Numeric, bindparam, column, func, insert, inspect as sa_inspect, select, table, text,
+    type_coerce, update,
+)
+from sqlalchemy.orm import Session
+
+from app.database import Base
+from app.migrations.runner import migration
+
+logger = logging.getLogger(__name__)
+
+
+def _columns(db: Session, table: str) -> set[str]:
+    return {c["name"] for c in sa_inspect(db.connection()).get_columns(table)}
+
+
+def _add_column(db: Session, table: str, column: str, ddl: str) -> None:
+    if column not in _columns(db, table):
+        db.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {ddl}"))
+
+
+def _create_index(db: Session, name: str, table: str, columns: tuple[str, ...], unique: bool = False) -> None:
+    """CREATE INDEX IF NOT EXISTS con la definicion escrita en el paso, no la
+    del modelo: el modelo cambia con los pasos siguientes y el paso no."""
+    db.execute(text(
+        f"CREATE {'UNIQUE ' if unique else ''}INDEX IF NOT EXISTS {name} ON {table} ({', '.join(columns)})"
+    ))
+
+
+@migration(1, "Esquema inicial (tablas de los modelos)")
+def create_tables(db: Session) -> None:
+    import app.models  # noqa: F401  registra todos los modelos en Base.metadata
+
+    Base.metadata.create_all(bind=db.connection())
+
+
+@migration(2, "counterpart_sessions.language")
+def counterpart_session_language(db: Session) -> None:
+    _add_column(db, "counterpart_sessions", "language", "VARCHAR(5) DEFAULT 'es'")
+
+
+@migration(3, "expenses.funding_source_id")
+def expense_funding_source(db: Session) -> None:
+    _add_column(
+        db, "expenses", "funding_source_id",
+        "INTEGER REFERENCES project_funding_sources(id) ON DELETE SET NULL",
+    )
+
+
+@migration(4, "budget_line_templates.template_version_id")
+def budget_line_template_version(db: Session) -> None:
+    _add_column(
+        db, "budget_line_templates", "template_version_id",
+        "INTEGER REFERENCES budget_template_versions(id) ON DELETE CASCADE",
+    )
+
+
+@migration(5, "projects.template_version_id")
+def project_template_version(db: Session) -> None:
+    _add_column(
+        db, "projects", "template_version_id",
+        "INTEGER REFERENCES budget_template_versions(id) ON DELETE SET NULL",
+    )
+
+
+@migration(6, "funders.color")
+def funder_color(db: Session) -> None:
+    _add_column(db, "funders", "color", "VARCHAR(7)")
+
+
+@migration(7, "Documentos de emision y recepcion en transferencias")
+def transfer_documents(db: Session) -> None:
+    _add_column(db, "transfers", "documento_emision_path", "VARCHAR(500)")
+    _add_column(db, "transfers", "documento_emision_filename", "VARCHAR(255)")
+    _add_column(db, "transfers", "documento_recepcion_path", "VARCHAR(500)")
+    _add_column(db, "transfers", "documento_recepcion_filename", "VARCHAR(255)")
+
+
+@migration(8, "Categorias de documento antiguas a las de fuentes de verificacion")
+def document_categories(db: Session) -> None:
+    old_to_new = {
+        "factura": "fv_eco_factura",
+        "comprobante": "fv_eco_recibo",
+        "fuente_verificacion": "otro",
+        "informe": "otro",
+        "contrato": "fv_eco_contrato",
+        "acta": "fv_tec_acta_entrega",
+        "listado_asistencia": "fv_tec_lista_presencia",
+        "foto": "fv_tec_foto",
+    }
+    for old_val, new_val in old_to_new.items():
+        db.execute(
+            text("UPDATE documents SET categoria = :new_val WHERE categoria = :old_val"),
+            {"old_val": old_val, "new_val": new_val},
+        )
+
+
+# Indices de los modelos cuando se escribio el paso 9: (tabla, columnas, unico).
+# Los nombres siguen la convencion de SQLAlchemy (ix_<tabla>_<columnas>)
+_INDICES_PASO_9: tuple[tuple[str, tuple[str, ...], bool], ...] = (
+    ("funders", ("code",), True),
+    ("funders", ("id",), False),
+    ("ods_objetivos", ("id",), False),
+    ("translation_cache", ("entity_id",), False),
+    ("translation_cache", ("entity_type",), False),
+    ("translation_cache", ("id",), False),
+    ("translation_cache", ("source_hash",), False),
+    ("users", ("email",), True),
+    ("users", ("entra_oid",), True),
+    ("budget_template_versions", ("id",), False),
+    ("budget_line_templates", ("id",), False),
+    ("projects", ("codigo_contable",), True),
+    ("projects", ("estado",), False),
+    ("projects", ("financiador",), False),
+    ("projects", ("funder_id",), False),
+    ("projects", ("id",), False),
+    ("projects", ("pais",), False),
+    ("projects", ("tipo",), False),
+    ("aplazamientos", ("id",), False),
+    ("aplazamientos", ("project_id",), False),
+    ("audit_logs", ("accion",), False),
+    ("audit_logs", ("actor_id",), False),
+    ("audit_logs", ("project_id",), False),
+    ("audit_logs", ("timestamp",), False),
+    ("counterpart_sessions", ("project_id",), False),
+    ("counterpart_sessions", ("session_token",), True),
+    ("documents", ("categoria",), False),
+    ("documents", ("id",), False),
+    ("documents", ("project_id",), False),
+    ("logical_frameworks", ("id",), False),
+    ("logical_frameworks", ("project_id",), True),
+    ("plazos", ("id",), False),
+    ("project_beneficiaries", ("id",), False),
+    ("project_beneficiaries", ("project_id",), True),
+    ("project_budget_lines", ("id",), False),
+    ("project_budget_lines", ("project_id",), False),
+    ("project_funding_sources", ("id",), False),
+    ("project_markers", ("id",), False),
+    ("project_markers", ("project_id",), False),
+    ("project_narratives", ("id",), False),
+    ("project_narratives", ("project_id",), False),
+    ("project_volunteers", ("id",), False),
+    ("project_volunteers", ("project_id",), True),
+    ("reports", ("id",), False),
+    ("reports", ("project_id",), False),
+    ("reports", ("tipo",), False),
+    ("transfers", ("estado",), False),
+    ("transfers", ("id",), False),
+    ("transfers", ("project_id",), False),
+    ("budget_execution_ledger", ("budget_line_id",), False),
+    ("budget_execution_ledger", ("id",), False),
+    ("budget_execution_ledger", ("project_id",), False),
+    ("budget_line_funding", ("id",), False),
+    ("expenses", ("budget_line_id",), False),
+    ("expenses", ("estado",), False),
+    ("expenses", ("fecha_factura",), False),
+    ("expenses", ("funding_source_id",), False),
+    ("expenses", ("id",), False),
+    ("generation_jobs", ("estado",), False),
+    ("generation_jobs", ("project_id",), False),
+    ("specific_objectives", ("framework_id",), False),
+    ("specific_objectives", ("id",), False),
+    ("results", ("id",), False),
+    ("results", ("objective_id",), False),
+    ("activities", ("id",), False),
+    ("activities", ("result_id",), False),
+    ("indicators", ("activity_id",), False),
+    ("indicators", ("framework_id",), False),
+    ("indicators", ("id",), False),
+    ("indicators", ("objective_id",), False),
+    ("indicators", ("result_id",), False),
+    ("indicator_updates", ("id",), False),
+    ("indicator_updates", ("indicator_id",), False),
+    ("verification_sources", ("activity_id",), False),
+    ("verification_sources", ("document_id",), False),
+    ("verification_sources", ("id",), False),
+    ("verification_sources", ("indicator_id",), False),
+)
+# Compuestos, con nombre propio
+_INDICES_COMPUESTOS_PASO_9 = (
+    ("ix_expenses_project_estado", "expenses", ("project_id", "estado")),
+    ("ix_expenses_project_fecha", "expenses", ("project_id", "fecha_factura")),
+)
+
+
+@migration(9, "Indices de los modelos en tablas existentes")
+def model_indexes(db: Session) -> None:
+    tables = set(sa_inspect(db.connection()).get_table_names())
+    indexes = [
+        (f"ix_{table_name}_{'_'.join(columns)}", table_name, columns, unique)
+        for table_name, columns, unique in _INDICES_PASO_9
+    ]
+    indexes += [
+        (name, table_name, columns, False) for name, table_name, columns in _INDICES_COMPUESTOS_PASO_9
+    ]
+    for name, table_name, columns, unique in indexes:
+        # En una BD nueva (paso 1 con el esquema actual) alguna columna ya no existe
+        if table_name in tables and set(columns) <= _columns(db, table_name):
+            _create_index(db, name, table_name, columns, unique)
+
+
+@migration(10, "Datos de referencia (ODS, financiadores y plantillas)")
+def seed_reference_data(db: Session) -> None:
+    # Los datos vienen de las constantes de siempre, pero solo se escriben
+    # las columnas que existian en este paso y sin commit
+    from app.models.project import ODS_NOMBRES
+    from app.services.budget_service import (
+        FUNDERS_DATA, AACID_BUDGET_TEMPLATES, AECID_BUDGET_TEMPLATES,
+        DIPU_BUDGET_TEMPLATES, AYTO_BUDGET_TEMPLATES,
+    )
+
+    ods = table("ods_objetivos", column("id"), column("numero"), column("nombre"))
+    funders = table(
+        "funders",
+        column("id"), column("code"), column("name"),
+        column("max_indirect_percentage", Numeric(5, 2)), column("max_personnel_percentage", Numeric(5, 2)),
+        column("min_amount_for_audit", Numeric(15, 2)), column("created_at", DateTime),
+    )
+    templates = table(
+        "budget_line_templates",
+        column("id"), column("funder_id"), column("code"), column("name"), column("category"),
+        column("is_spain_only"), column("order"),
+    )
+
+    if not db.execute(select(func.count()).select_from(ods)).scalar():
+        db.execute(insert(ods), [{"numero": numero, "nombre": nombre} for numero, nombre in ODS_NOMBRES.items()])
+
+    if not db.execute(select(func.count()).select_from(funders)).scalar():
+        now = datetime.utcnow()
+        db.execute(insert(funders), [
+            {
+                "code": data["code"], "name": data["name"],
+                "max_indirect_percentage": data["max_indirect_percentage"],
+                "max_personnel_percentage": data["max_personnel_percentage"],
+                "min_amount_for_audit": data["min_amount_for_audit"],
+                "created_at": now,
+            }
+            for data in FUNDERS_DATA
+        ])
+
+    for code, template_data in (
+        ("AACID", AACID_BUDGET_TEMPLATES),
+        ("AECID", AECID_BUDGET_TEMPLATES),
+        ("DIPU", DIPU_BUDGET_TEMPLATES),
+        ("AYTO", AYTO_BUDGET_TEMPLATES),
+    ):
+        funder_id = db.execute(select(funders.c.id).where(funders.c.code == code)).scalar()
+        if funder_id is None:
+            continue
+        existing = db.execute(
+            select(func.count()).select_from(templates).where(templates.c.funder_id == funder_id)
+        ).scalar()
+        if existing:
+            continue
+        db.execute(insert(templates), [
+            {
+                "funder_id": funder_id, "code": data["code"], "name": data["name"],
+                "category": data["category"].name, "is_spain_only": data["is_spain_only"], "order": data["order"],
+            }
+            for data in template_data
+        ])
+
+
+@migration(11, "Version 1 de plantilla para financiadores sin versiones")
+def funder_template_versions(db: Session) -> None:
+    funders = table("funders", column("id"), column("name"))
+    versions = table(
+        "budget_template_versions",
+        column("id"), column("funder_id"), column("version"), column("created_at", DateTime), column("is_active"),
+    )
+    templates = table("budget_line_templates", column("funder_id"), column("template_version_id"))
+
+    without_versions = db.execute(
+        select(funders.c.id)
+        .where(funders.c.id.not_in(select(versions.c.funder_id)))
+        .order_by(funders.c.name)
+    ).scalars().all()
+    for funder_id in without_versions:
+        v1_id = db.execute(insert(versions).values(
+            funder_id=funder_id, version=1, created_at=datetime.utcnow(), is_active=True,
+        )).lastrowid
+        db.execute(
+            update(templates)
+            .where(templates.c.funder_id == funder_id, templates.c.template_version_id.is_(None))
+            .values(template_version_id=v1_id)
+        )
+
+
+@migration(12, "template_version_id de proyectos con financiador")
+def project_template_versions(db: Session) -> None:
+    projects = table("projects", column("funder_id"), column("template_version_id"))
+    versions = table("budget_template_versions", column("id"), column("funder_id"), column("version"))
+
+    # La primera version del financiador (NULL si no tiene ninguna)
+    first_version = (
+        select(versions.c.id)
+        .where(versions.c.funder_id == projects.c.funder_id)
+        .order_by(versions.c.version)
+        .limit(1)
+        .scalar_subquery()
+    )
+    db.execute(
+        update(projects)
+        .where(projects.c.funder_id.isnot(None), projects.c.template_version_id.is_(None))
+        .values(template_version_id=first_version)
+    )
+
+
+@migration(13, "Colores de financiadores")
+def funder_colors(db: Session) -> None:
+    funders = table("funders", column("code"), column("color"))
+    colors = {"AACID": "#006633", "AECID": "#C41E3A", "DIPU": "#003366", "AYTO": "#8B1E3F"}
+    for code, color in colors.items():
+        db.execute(
+            update(funders)
+            .where(funders.c.code == code, (funders.c.color.is_(None)) | (funders.c.color == ""))
+            .values(color=color)
+        )
+
+
+@migration(14, "Fuentes de financiacion por defecto y asignacion de gastos")
+def default_funding_sources(db: Session) -> None:
+    # Lo mismo que BudgetService.auto_create_default_sources (que hace
+    # commit), solo con flush y con las columnas de este paso
+    projects = table("projects", column("id"), column("funder_id"), column("financiador"))
+    funders = table("funders", column("id"), column("name"))
+    lines = table("project_budget_lines", column("id"), column("project_id"))
+    expenses = table(
+        "expenses", column("id"), column("project_id"), column("financiado_por"), column("funding_source_id"),
+    )
+    sources = table(
+        "project_funding_sources",
+        column("id"), column("project_id"), column("nombre"), column("tipo"), column("orden"),
+        column("created_at", DateTime),
+    )
+    allocations = table(
+        "budget_line_funding",
+        column("budget_line_id"), column("funding_source_id"), column("aprobado", Numeric(15, 2)),
+    )
+
+    pending = db.execute(
+        select(projects.c.id, func.coalesce(funders.c.name, projects.c.financiador))
+        .outerjoin(funders, funders.c.id == projects.c.funder_id)
+        .where(projects.c.funder_id.isnot(None), projects.c.id.not_in(select(sources.c.project_id)))
+    ).all()
+    for project_id, agency_name in pending:
+        created = [
+            (nombre, db.execute(insert(sources).values(
+                project_id=project_id, nombre=nombre, tipo=tipo, orden=orden, created_at=datetime.utcnow(),
+            )).lastrowid)
+            for nombre, tipo, orden in (
+                (agency_name, "agencia", 1),
+                ("Prodiversa", "prodiversa", 2),
+                ("Contraparte", "contraparte", 3),
+            )
+        ]
+
+        line_ids = db.execute(select(lines.c.id).where(lines.c.project_id == project_id)).scalars().all()
+        if line_ids:
+            db.execute(insert(allocations), [
+                {"budget_line_id": line_id, "funding_source_id": source_id, "aprobado": Decimal("0")}
+                for line_id in line_ids
+                for _, source_id in created
+            ])
+
+        # Asignar los gastos existentes segun su financiado_por
+        source_map = {nombre.lower(): source_id for nombre, source_id in created}
+        assignments = [
+            {"expense_id": expense_id, "source_id": source_map[financiado_por.lower()]}
+            for expense_id, financiado_por in db.execute(
+                select(expenses.c.id, expenses.c.financiado_por).where(
+                    expenses.c.project_id == project_id,
+                    expenses.c.funding_source_id.is_(None),
+                )
+            )
+            if financiado_por and financiado_por.lower() in source_map
+        ]
+        if assignments:
+            db.execute(
+                update(expenses)
+                .where(expenses.c.id == bindparam("expense_id"))
+                .values(funding_source_id=bindparam("source_id")),
+                assignments,
+            )
+
+
+@migration(15, "Libro de ejecucion presupuestaria")
+def execution_ledger(db: Session) -> None:
+    # Mismo calculo que ExecutionLedgerService.initialize_missing, pero sin
+    # commit y solo con las columnas que existian en este paso
+    lines = table(
+        "project_budget_lines",
+        column("id"), column("project_id"),
+        column("ejecutado_espana", Numeric(15, 2)), column("ejecutado_terreno", Numeric(15, 2)),
+    )
+    expenses = table(
+        "expenses",
+        column("id"), column("project_id"), column("budget_line_id"), column("ubicacion"),
+        column("funding_source_id"), column("cantidad_euros", Numeric(12, 2)), column("porcentaje", Numeric(5, 2)),
+        column("estado"),
+    )
+    ledger = table(
+        "budget_execution_ledger",
+        column("project_id"), column("budget_line_id"), column("ubicacion"), column("funding_source_id"),
+        column("es_ajuste"), column("importe", Numeric(18, 6)), column("num_gastos"),
+        column("updated_at", DateTime),
+    )
+
+    project_ids = db.execute(
+        select(lines.c.project_id)
+        .where(lines.c.project_id.not_in(select(ledger.c.project_id).distinct()))
+        .distinct()
+    ).scalars().all()
+    if not project_ids:
+        return
+
+    now = datetime.utcnow()
+    rows = []
+    from_expenses: dict[tuple[int, str], Decimal] = {}
+    for pid, line_id, ubicacion, source_id, importe, count in db.execute(
+        select(
+            expenses.c.project_id, expenses.c.budget_line_id, expenses.c.ubicacion, expenses.c.funding_source_id,
+            # Suma exacta: con Numeric(12, 2) llegaria redondeada a centimos
+            type_coerce(func.sum(expenses.c.cantidad_euros * expenses.c.porcentaje / 100), Numeric(18, 6)),
+            func.count(expenses.c.id),
+        )
+        .where(expenses.c.estado.in_(("validado", "justificado")), expenses.c.project_id.in_(project_ids))
+        .group_by(
+            expenses.c.project_id, expenses.c.budget_line_id, expenses.c.ubicacion, expenses.c.funding_source_id
+        )
+    ):
+        importe = Decimal(importe or 0).quantize(Decimal("0.0001"))
+        rows.append({
+            "project_id": pid, "budget_line_id": line_id, "ubicacion": ubicacion, "funding_source_id": source_id,
+            "es_ajuste": False, "importe": importe, "num_gastos": count, "updated_at": now,
+        })
+        from_expenses[(line_id, ubicacion)] = from_expenses.get((line_id, ubicacion), Decimal("0")) + importe
+
+    # Lo introducido a mano en ejecutado_* por encima de los gastos queda como ajuste
+    for line_id, pid, espana, terreno in db.execute(
+        select(lines.c.id, lines.c.project_id, lines.c.ejecutado_espana, lines.c.ejecutado_terreno)
+        .where(lines.c.project_id.in_(project_ids))
+    ):
+        for ubicacion, ejecutado in (("espana", espana), ("terreno", terreno)):
+            diff = (ejecutado or Decimal("0")) - from_expenses.get((line_id, ubicacion), Decimal("0"))
+            if abs(diff) >= Decimal("0.01"):
+                rows.append({
+                    "project_id": pid, "budget_line_id": line_id, "ubicacion": ubicacion,
+                    "funding_source_id": None, "es_ajuste": True, "importe": diff, "num_gastos": 0,
+                    "updated_at": now,
+                })
+    if rows:
+        db.execute(insert(ledger), rows)
+
+    # ejecutado_* pasa a ser la proyeccion del libro
+    for ubicacion, ejecutado in (("espana", "ejecutado_espana"), ("terreno", "ejecutado_terreno")):
+        total = (
+            select(func.coalesce(func.sum(ledger.c.importe), 0))
+            .where(ledger.c.budget_line_id == lines.c.id, ledger.c.ubicacion == ubicacion)
+            .scalar_subquery()
+        )
+        db.execute(update(lines).where(lines.c.project_id.in_(project_ids)).values({ejecutado: total}))
+
+
+@migration(16, "Cola persistente de traducciones")
+def translation_queue(db: Session) -> None:
+    db.execute(text("""
+        CREATE TABLE IF NOT EXISTS translation_queue (
+            id INTEGER NOT NULL,
+            project_id INTEGER,
+            entity_type VARCHAR(50) NOT NULL,
+            entity_id INTEGER NOT NULL,
+            field_name VARCHAR(100) NOT NULL,
+            language VARCHAR(5) NOT NULL,
+            source_hash VARCHAR(64) NOT NULL,
+            source_text TEXT NOT NULL,
+            estado VARCHAR(10) NOT NULL,
+            intentos INTEGER NOT NULL,
+            next_attempt_at DATETIME NOT NULL,
+            last_error TEXT,
+            claim_token VARCHAR(36),
+            created_at DATETIME NOT NULL,
+            finished_at DATETIME,
+            PRIMARY KEY (id),
+            CONSTRAINT uq_translation_queue_entity_field_lang_hash
+                UNIQUE (entity_type, entity_id, field_name, language, source_hash)
+        )
+    """))
+    _create_index(db, "ix_translation_queue_id", "translation_queue", ("id",))
+    _create_index(db, "ix_translation_queue_estado_next", "translation_queue", ("estado", "next_attempt_at"))
+    _create_index(
+        db, "ix_translation_queue_project_lang", "translation_queue", ("project_id", "language", "estado")
+    )
+
+
+@migration(17, "Memoria de traduccion por contenido (deduplica translation_cache)")
+def translation_memory(db: Session) -> None:
+    conn = db.connection()
+    conn.execute(text("""
+        CREATE TABLE IF NOT EXISTS translation_memory (
+            id INTEGER NOT NULL,
+            source_hash VARCHAR(64) NOT NULL,
+            language VARCHAR(5) NOT NULL,
+            translated_text TEXT NOT NULL,
+            created_at DATETIME NOT NULL,
+            PRIMARY KEY (id),
+            CONSTRAINT uq_translation_memory_hash_lang UNIQUE (source_hash, language)
+        )
+    """))
+    _create_index(db, "ix_translation_memory_id", "translation_memory", ("id",))
+    if "translated_text" not in _columns(db, "translation_cache"):
+        return  # BD creada ya con el esquema nuevo
+
+    rows, text_bytes = conn.execute(text(
+        "SELECT COUNT(*), COALESCE(SUM(LENGTH(CAST(translated_text AS BLOB))), 0) FROM translation_cache"
+    )).one()
+    # Una entrada por texto e idioma; si hubiera varias, gana la mas reciente
+    conn.execute(text("""
+        INSERT OR IGNORE INTO translation_memory (source_hash, language, translated_text, created_at)
+        SELECT source_hash, language, translated_text, updated_at
+        FROM translation_cache
+        ORDER BY updated_at DESC
+    """))
+
+    # SQLite no cambia columnas en sitio: se reconstruye la tabla sin el texto
+    for index in sa_inspect(conn).get_indexes("translation_cache"):
+        conn.execute(text(f"DROP INDEX IF EXISTS {index['name']}"))
+    conn.execute(text("ALTER TABLE translation_cache RENAME TO translation_cache_old"))
+    conn.execute(text("""
+        CREATE TABLE translation_cache (
+            id INTEGER NOT NULL,
+            entity_type VARCHAR(50) NOT NULL,
+            entity_id INTEGER NOT NULL,
+            field_name VARCHAR(100) NOT NULL,
+            language VARCHAR(5) NOT NULL,
+            memory_id INTEGER NOT NULL,
+            created_at DATETIME NOT NULL,
+            updated_at DATETIME NOT NULL,
+            PRIMARY KEY (id),
+            CONSTRAINT uq_translation_entity_field_lang UNIQUE (entity_type, entity_id, field_name, language),
+            FOREIGN KEY(memory_id) REFERENCES translation_memory (id) ON DELETE CASCADE
+        )
+    """))
+    for col_name in ("id", "entity_type", "entity_id", "memory_id"):
+        _create_index(db, f"ix_translation_cache_{col_name}", "translation_cache", (col_name,))
+    conn.execute(text("""
+        INSERT INTO translation_cache
+            (id, entity_type, entity_id, field_name, language, memory_id, created_at, updated_at)
+        SELECT o.id, o.entity_type, o.entity_id, o.field_name, o.language, m.id, o.created_at, o.updated_at
+        FROM translation_cache_old o
+        JOIN translation_memory m ON m.source_hash = o.source_hash AND m.language = o.language
+    """))
+    conn.execute(text("DROP TABLE translation_cache_old"))
+
+    entries, memory_bytes = conn.execute(text(
+        "SELECT COUNT(*), COALESCE(SUM(LENGTH(CAST(translated_text AS BLOB))), 0) FROM translation_memory"
+    )).one()
+    saved = text_bytes - memory_bytes
+    logger.info(
+        "translation_cache: %d traducciones -> %d textos unicos en translation_memory; "
+        "%d bytes de texto ahorrados (%.0f%%). VACUUM devuelve el espacio al disco.",
+        rows, entries, saved, 100 * saved / text_bytes if text_bytes else 0,
+    )
+
+
+@migration(18, "generation_jobs: trabajos sin proyecto y resultado propio (Anexo II A por lotes)")
+def generation_job_batches(db: Session) -> None:
+    conn = db.connection()
+    columns = {c["name"]: c for c in sa_inspect(conn).get_columns("generation_jobs")}
+    if columns["project_id"]["nullable"] and "resultado" in columns:
+        return  # BD creada ya con el esquema nuevo
+
+    # SQLite no permite quitar el NOT NULL de project_id: se reconstruye
+    old_columns = ", ".join(columns)
+    for index in sa_inspect(conn).get_indexes("generation_jobs"):
+        conn.execute(text(f"DROP INDEX IF EXISTS {index['name']}"))
+    conn.execute(text("ALTER TABLE generation_jobs RENAME TO generation_jobs_old"))
+    conn.execute(text("""
+        CREATE TABLE generation_jobs (
+            id VARCHAR(36) NOT NULL,
+            project_id INTEGER,
+            tipo VARCHAR(14) NOT NULL,
+            parametros JSON,
+            estado VARCHAR(10) NOT NULL,
+            progreso INTEGER NOT NULL,
+            mensaje TEXT,
+            report_id INTEGER,
+            nombre_archivo VARCHAR(255),
+            ruta VARCHAR(500),
+            resultado JSON,
+            actor_id VARCHAR(36),
+            actor_email VARCHAR(255),
+            actor_label VARCHAR(255),
+            ip_address VARCHAR(45),
+            created_at DATETIME NOT NULL,
+            started_at DATETIME,
+            finished_at DATETIME,
+            PRIMARY KEY (id),
+            FOREIGN KEY(project_id) REFERENCES projects (id) ON DELETE CASCADE,
+            FOREIGN KEY(report_id) REFERENCES reports (id) ON DELETE SET NULL
+        )
+    """))
+    conn.execute(text(
+        f"INSERT INTO generation_jobs ({old_columns}) SELECT {old_columns} FROM generation_jobs_old"
+    ))
+    conn.execute(text("DROP TABLE generation_jobs_old"))
+    _create_index(db, "ix_generation_jobs_estado", "generation_jobs", ("estado",))
+    _create_index(db, "ix_generation_jobs_project_id", "generation_jobs", ("project_id",))
+
+
+@migration(19, "reports.fingerprint: reutilizar informes generados con los mismos datos")
+def report_fingerprint(db: Session) -> None:
+    _add_column(db, "reports", "fingerprint", "VARCHAR(64)")
+    _create_index(db, "ix_reports_fingerprint", "reports", ("fingerprint",))
+
+
+@migration(20, "generation_jobs: proceso propietario y latido (no reencolar trabajos ajenos)")
+def generation_job_owner(db: Session) -> None:
+    _add_column(db, "generation_jobs", "worker_id", "VARCHAR(64)")
+    _add_column(db, "generation_jobs", "heartbeat_at", "DATETIME")
+
+
+@migration(21, "translation_queue: proceso propietario del lote (no reencolar lotes ajenos)")
+def translation_queue_owner(db: Session) -> None:
+    _add_column(db, "translation_queue", "worker_id", "VARCHAR(64)")
+    _add_column(db, "translation_queue", "claimed_at", "DATETIME")
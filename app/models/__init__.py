@@ -1,6 +1,7 @@
 from app.models.project import Project, Plazo, ODSObjetivo, EstadoProyecto, TipoProyecto, ODS, ODS_NOMBRES
 from app.models.budget import Funder, BudgetLineTemplate, BudgetTemplateVersion, ProjectBudgetLine, CategoriaPartida
 from app.models.expense import Expense, UbicacionGasto, EstadoGasto
+from app.models.execution_ledger import EjecucionPartida
 from app.models.transfer import Transfer, EstadoTransferencia, EntidadBancaria, MonedaLocal, PAIS_MONEDA_MAP
 from app.models.logical_framework import (
     LogicalFramework, SpecificObjective, Result, Activity,
@@ -12,10 +13,12 @@ from app.models.document import (
     CATEGORIA_NOMBRES, CATEGORIA_GRUPOS, TIPO_FUENTE_NOMBRES
 )
 from app.models.report import Report, TipoInforme, TIPO_INFORME_NOMBRES
+from app.models.job import GenerationJob, TipoTrabajo, EstadoTrabajo, TIPO_TRABAJO_NOMBRES
 from app.models.user import User, Rol, user_project
 from app.models.counterpart_session import CounterpartSession
 from app.models.audit_log import AuditLog, ActorType, AccionAuditoria
-from app.models.translation_cache import TranslationCache
+from app.models.translation_cache import TranslationCache, TranslationMemory
+from app.models.translation_queue import TranslationTask, EstadoTraduccion
 from app.models.postponement import Aplazamiento, EstadoAplazamiento
 from app.models.funding import FuenteFinanciacion, AsignacionFinanciador, TipoFuente, TIPO_FUENTE_NOMBRES as TIPO_FUENTE_FINANCIACION_NOMBRES
 
@@ -23,6 +26,7 @@ __all__ = [
     "Project", "Plazo", "ODSObjetivo", "EstadoProyecto", "TipoProyecto", "ODS", "ODS_NOMBRES",
     "Funder", "BudgetLineTemplate", "BudgetTemplateVersion", "ProjectBudgetLine", "CategoriaPartida",
     "Expense", "UbicacionGasto", "EstadoGasto",
+    "EjecucionPartida",
     "Transfer", "EstadoTransferencia", "EntidadBancaria", "MonedaLocal", "PAIS_MONEDA_MAP",
     "LogicalFramework", "SpecificObjective", "Result", "Activity",
     "Indicator", "IndicatorUpdate", "EstadoActividad",
@@ -30,10 +34,12 @@ __all__ = [
     "CategoriaDocumento", "TipoFuenteVerificacion",
     "CATEGORIA_NOMBRES", "CATEGORIA_GRUPOS", "TIPO_FUENTE_NOMBRES",
     "Report", "TipoInforme", "TIPO_INFORME_NOMBRES",
+    "GenerationJob", "TipoTrabajo", "EstadoTrabajo", "TIPO_TRABAJO_NOMBRES",
     "User", "Rol", "user_project",
     "CounterpartSession",
     "AuditLog", "ActorType", "AccionAuditoria",
-    "TranslationCache",
+    "TranslationCache", "TranslationMemory",
+    "TranslationTask", "EstadoTraduccion",
     "Aplazamiento", "EstadoAplazamiento",
     "FuenteFinanciacion", "AsignacionFinanciador", "TipoFuente", "TIPO_FUENTE_FINANCIACION_NOMBRES",
 ]
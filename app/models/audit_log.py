@@ -37,15 +37,15 @@ class AuditLog(Base):
     id: Mapped[str] = mapped_column(String(36), primary_key=True, default=lambda: str(uuid4()))
     timestamp: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, index=True)
     actor_type: Mapped[ActorType] = mapped_column(SQLEnum(ActorType))
-    actor_id: Mapped[str] = mapped_column(String(36))
+    actor_id: Mapped[str] = mapped_column(String(36), index=True)
     actor_email: Mapped[str | None] = mapped_column(String(255), nullable=True)
     actor_label: Mapped[str] = mapped_column(String(255))
-    accion: Mapped[AccionAuditoria] = mapped_column(SQLEnum(AccionAuditoria))
+    accion: Mapped[AccionAuditoria] = mapped_column(SQLEnum(AccionAuditoria), index=True)
     recurso: Mapped[str | None] = mapped_column(String(100), nullable=True)
     recurso_id: Mapped[str | None] = mapped_column(String(100), nullable=True)
     detalle: Mapped[dict | None] = mapped_column(JSON, nullable=True)
     ip_address: Mapped[str | None] = mapped_column(String(45), nullable=True)
-    project_id: Mapped[int | None] = mapped_column(Integer, ForeignKey("projects.id"), nullable=True)
+    project_id: Mapped[int | None] = mapped_column(Integer, ForeignKey("projects.id"), nullable=True, index=True)
 
     @property
     def accion_display(self) -> str:
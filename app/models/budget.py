@@ -95,7 +95,7 @@ class ProjectBudgetLine(Base):
     __tablename__ = "project_budget_lines"
 
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
-    project_id: Mapped[int] = mapped_column(ForeignKey("projects.id", ondelete="CASCADE"))
+    project_id: Mapped[int] = mapped_column(ForeignKey("projects.id", ondelete="CASCADE"), index=True)
     template_id: Mapped[int | None] = mapped_column(
         ForeignKey("budget_line_templates.id", ondelete="SET NULL"), nullable=True
     )
@@ -128,6 +128,9 @@ class ProjectBudgetLine(Base):
     funding_allocations: Mapped[list["AsignacionFinanciador"]] = relationship(
         back_populates="budget_line", cascade="all, delete-orphan"
     )
+    execution_totals: Mapped[list["EjecucionPartida"]] = relationship(
+        back_populates="budget_line", cascade="all, delete-orphan"
+    )
 
     @property
     def disponible_espana(self) -> Decimal:
@@ -168,3 +171,4 @@ class ProjectBudgetLine(Base):
 from app.models.project import Project
 from app.models.expense import Expense
 from app.models.funding import AsignacionFinanciador
+from app.models.execution_ledger import EjecucionPartida
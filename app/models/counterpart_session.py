@@ -4,18 +4,21 @@ from sqlalchemy import String, Boolean, DateTime, Integer, ForeignKey
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.database import Base
 
+SESSION_DURATION = timedelta(hours=8)
+INACTIVITY_TIMEOUT = timedelta(hours=2)
+
 
 class CounterpartSession(Base):
     __tablename__ = "counterpart_sessions"
 
     id: Mapped[str] = mapped_column(String(36), primary_key=True, default=lambda: str(uuid4()))
-    project_id: Mapped[int] = mapped_column(Integer, ForeignKey("projects.id"))
+    project_id: Mapped[int] = mapped_column(Integer, ForeignKey("projects.id"), index=True)
     session_token: Mapped[str] = mapped_column(String(255), unique=True, index=True)
     ip_address: Mapped[str | None] = mapped_column(String(45), nullable=True)
     user_agent: Mapped[str | None] = mapped_column(String(500), nullable=True)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
     expires_at: Mapped[datetime] = mapped_column(
-        DateTime, default=lambda: datetime.utcnow() + timedelta(hours=8)
+        DateTime, default=lambda: datetime.utcnow() + SESSION_DURATION
     )
     last_activity: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
     activo: Mapped[bool] = mapped_column(Boolean, default=True)
@@ -23,21 +26,19 @@ class CounterpartSession(Base):
 
     project = relationship("Project")
 
+    @property
+    def expira_en(self) -> datetime:
+        """Momento en que caduca: fin de la sesion o 2h sin actividad, lo antes."""
+        return min(self.expires_at, self.last_activity + INACTIVITY_TIMEOUT)
+
     @property
     def is_valid(self) -> bool:
-        now = datetime.utcnow()
-        if not self.activo:
-            return False
-        if now > self.expires_at:
-            return False
-        # 2h inactivity timeout
-        if (now - self.last_activity).total_seconds() > 7200:
-            return False
-        return True
+        return self.activo and datetime.utcnow() <= self.expira_en
+
+    @property
+    def segundos_restantes(self) -> int:
+        return max(0, int((self.expira_en - datetime.utcnow()).total_seconds()))
 
     @property
     def tiempo_restante_minutos(self) -> int:
-        now = datetime.utcnow()
-        abs_remaining = (self.expires_at - now).total_seconds() / 60
-        inactivity_remaining = (7200 - (now - self.last_activity).total_seconds()) / 60
-        return max(0, int(min(abs_remaining, inactivity_remaining)))
+        return self.segundos_restantes // 60
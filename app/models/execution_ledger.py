@@ -0,0 +1,53 @@
+from decimal import Decimal
+from datetime import datetime
+from sqlalchemy import Integer, Numeric, Boolean, DateTime, Enum as SQLEnum, ForeignKey, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+from app.database import Base
+from app.models.expense import UbicacionGasto
+
+
+class EjecucionPartida(Base):
+    """Total ejecutado acumulado por partida, ubicacion y fuente de financiacion.
+
+    Se mantiene de forma incremental en cada cambio de estado de un gasto
+    (cuentan los validados y justificados). Las filas con es_ajuste=True
+    recogen los importes ejecutados introducidos a mano en el presupuesto.
+    ProjectBudgetLine.ejecutado_espana/terreno es la suma de estas filas.
+    """
+
+    __tablename__ = "budget_execution_ledger"
+    __table_args__ = (
+        UniqueConstraint(
+            "budget_line_id", "ubicacion", "funding_source_id", "es_ajuste",
+            name="uq_budget_execution_ledger_key",
+        ),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True, index=True)
+    project_id: Mapped[int] = mapped_column(ForeignKey("projects.id", ondelete="CASCADE"), index=True)
+    budget_line_id: Mapped[int] = mapped_column(
+        ForeignKey("project_budget_lines.id", ondelete="CASCADE"), index=True
+    )
+    ubicacion: Mapped[UbicacionGasto] = mapped_column(SQLEnum(UbicacionGasto))
+    funding_source_id: Mapped[int | None] = mapped_column(
+        Integer, ForeignKey("project_funding_sources.id", ondelete="SET NULL"), nullable=True
+    )
+    es_ajuste: Mapped[bool] = mapped_column(Boolean, default=False)
+
+    # Sin redondear a centimos: es la suma exacta de cantidad_imputable
+    importe: Mapped[Decimal] = mapped_column(Numeric(18, 6), default=Decimal("0"))
+    num_gastos: Mapped[int] = mapped_column(Integer, default=0)
+
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime, default=datetime.utcnow, onupdate=datetime.utcnow
+    )
+
+    budget_line: Mapped["ProjectBudgetLine"] = relationship(back_populates="execution_totals")
+
+    def __repr__(self) -> str:
+        origen = "ajuste" if self.es_ajuste else f"fuente {self.funding_source_id}"
+        return f"<EjecucionPartida linea {self.budget_line_id} {self.ubicacion.value} ({origen}): {self.importe}>"
+
+
+# Import at end to avoid circular import
+from app.models.budget import ProjectBudgetLine
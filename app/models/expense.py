@@ -1,7 +1,7 @@
 from enum import Enum
 from decimal import Decimal
 from datetime import date, datetime
-from sqlalchemy import String, Integer, Numeric, Text, Date, DateTime, Enum as SQLEnum, ForeignKey
+from sqlalchemy import String, Integer, Numeric, Text, Date, DateTime, Enum as SQLEnum, ForeignKey, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.database import Base
 
@@ -21,12 +21,20 @@ class EstadoGasto(str, Enum):
 
 class Expense(Base):
     __tablename__ = "expenses"
+    __table_args__ = (
+        # Project expense list (ordered by date) and estado filters
+        Index("ix_expenses_project_fecha", "project_id", "fecha_factura"),
+        Index("ix_expenses_project_estado", "project_id", "estado"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
+    # Indexed through the composite indexes above (leading column)
     project_id: Mapped[int] = mapped_column(ForeignKey("projects.id", ondelete="CASCADE"))
-    budget_line_id: Mapped[int] = mapped_column(ForeignKey("project_budget_lines.id", ondelete="RESTRICT"))
+    budget_line_id: Mapped[int] = mapped_column(
+        ForeignKey("project_budget_lines.id", ondelete="RESTRICT"), index=True
+    )
 
-    fecha_factura: Mapped[date] = mapped_column(Date)
+    fecha_factura: Mapped[date] = mapped_column(Date, index=True)
     concepto: Mapped[str] = mapped_column(String(500))
     expedidor: Mapped[str] = mapped_column(String(200))
     persona: Mapped[str | None] = mapped_column(String(200), nullable=True)
@@ -39,14 +47,14 @@ class Expense(Base):
     porcentaje: Mapped[Decimal] = mapped_column(Numeric(5, 2), default=Decimal("100"))
     financiado_por: Mapped[str] = mapped_column(String(100))
     ubicacion: Mapped[UbicacionGasto] = mapped_column(SQLEnum(UbicacionGasto))
-    estado: Mapped[EstadoGasto] = mapped_column(SQLEnum(EstadoGasto), default=EstadoGasto.borrador)
+    estado: Mapped[EstadoGasto] = mapped_column(SQLEnum(EstadoGasto), default=EstadoGasto.borrador, index=True)
 
     comprobacion: Mapped[str | None] = mapped_column(String(100), nullable=True)
     fecha_revision: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
     observaciones: Mapped[str | None] = mapped_column(Text, nullable=True)
     documento_path: Mapped[str | None] = mapped_column(String(500), nullable=True)
     funding_source_id: Mapped[int | None] = mapped_column(
-        Integer, ForeignKey("project_funding_sources.id", ondelete="SET NULL"), nullable=True
+        Integer, ForeignKey("project_funding_sources.id", ondelete="SET NULL"), nullable=True, index=True
     )
 
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
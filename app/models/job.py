@@ -0,0 +1,107 @@
+from enum import Enum
+from datetime import datetime
+from uuid import uuid4
+from sqlalchemy import String, DateTime, Integer, ForeignKey, JSON, Text, Enum as SQLEnum
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+from app.database import Base
+
+
+class TipoTrabajo(str, Enum):
+    informe = "informe"
+    pack = "pack"
+    anexo_iia = "anexo_iia"
+    anexo_iia_lote = "anexo_iia_lote"
+
+
+class EstadoTrabajo(str, Enum):
+    pendiente = "pendiente"
+    en_proceso = "en_proceso"
+    completado = "completado"
+    error = "error"
+
+
+TIPO_TRABAJO_NOMBRES = {
+    TipoTrabajo.informe: "Informe",
+    TipoTrabajo.pack: "Pack de justificacion (ZIP)",
+    TipoTrabajo.anexo_iia: "Anexo II A (AACID)",
+    TipoTrabajo.anexo_iia_lote: "Anexo II A de una convocatoria (ZIP)",
+}
+
+ESTADOS_ACTIVOS = (EstadoTrabajo.pendiente, EstadoTrabajo.en_proceso)
+
+
+class GenerationJob(Base):
+    """Trabajo de generacion de informes ejecutado en segundo plano."""
+
+    __tablename__ = "generation_jobs"
+
+    id: Mapped[str] = mapped_column(String(36), primary_key=True, default=lambda: str(uuid4()))
+    # Vacio en los trabajos de varios proyectos (Anexo II A por lotes)
+    project_id: Mapped[int | None] = mapped_column(
+        ForeignKey("projects.id", ondelete="CASCADE"), nullable=True, index=True
+    )
+
+    tipo: Mapped[TipoTrabajo] = mapped_column(SQLEnum(TipoTrabajo))
+    parametros: Mapped[dict | None] = mapped_column(JSON, nullable=True)
+    estado: Mapped[EstadoTrabajo] = mapped_column(
+        SQLEnum(EstadoTrabajo), default=EstadoTrabajo.pendiente, index=True
+    )
+    progreso: Mapped[int] = mapped_column(Integer, default=0)  # 0-100
+    mensaje: Mapped[str | None] = mapped_column(Text, nullable=True)
+
+    # Informe resultante (solo cuando el trabajo termina bien)
+    report_id: Mapped[int | None] = mapped_column(
+        ForeignKey("reports.id", ondelete="SET NULL"), nullable=True
+    )
+    # Los trabajos de varios proyectos no crean Report: fichero propio y
+    # resultado por proyecto (validacion, fichero generado)
+    nombre_archivo: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    ruta: Mapped[str | None] = mapped_column(String(500), nullable=True)
+    resultado: Mapped[dict | None] = mapped_column(JSON, nullable=True)
+
+    # Quien lo solicito, para el registro de auditoria al terminar
+    actor_id: Mapped[str | None] = mapped_column(String(36), nullable=True)
+    actor_email: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    actor_label: Mapped[str | None] = mapped_column(String(255), nullable=True)
+    ip_address: Mapped[str | None] = mapped_column(String(45), nullable=True)
+
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    started_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    # Proceso que lo esta ejecutando (host:pid:arranque) y su ultimo latido
+    worker_id: Mapped[str | None] = mapped_column(String(64), nullable=True)
+    heartbeat_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+    finished_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+
+    report: Mapped["Report | None"] = relationship()
+
+    @property
+    def tipo_nombre(self) -> str:
+        if self.tipo == TipoTrabajo.informe and self.parametros and self.parametros.get("tipo"):
+            try:
+                return TIPO_INFORME_NOMBRES[TipoInforme(self.parametros["tipo"])]
+            except (ValueError, KeyError):
+                pass
+        return TIPO_TRABAJO_NOMBRES.get(self.tipo, self.tipo.value)
+
+    @property
+    def activo(self) -> bool:
+        return self.estado in ESTADOS_ACTIVOS
+
+    @property
+    def status_url(self) -> str:
+        return f"/api/jobs/{self.id}"
+
+    @property
+    def download_url(self) -> str | None:
+        if self.report_id is not None:
+            return f"/api/reports/{self.report_id}/download"
+        if self.ruta:
+            return f"/api/jobs/{self.id}/download"
+        return None
+
+    def __repr__(self) -> str:
+        return f"<GenerationJob {self.id}: {self.tipo.value} ({self.estado.value})>"
+
+
+# Import at end to avoid circular import
+from app.models.report import Report, TipoInforme, TIPO_INFORME_NOMBRES
@@ -134,7 +134,7 @@ class Project(Base):
     ods_meta_3: Mapped[str | None] = mapped_column(String(200), nullable=True)
 
     funder_id: Mapped[int | None] = mapped_column(
-        ForeignKey("funders.id", ondelete="SET NULL"), nullable=True
+        ForeignKey("funders.id", ondelete="SET NULL"), nullable=True, index=True
     )
     template_version_id: Mapped[int | None] = mapped_column(
         ForeignKey("budget_template_versions.id", ondelete="SET NULL"), nullable=True
@@ -31,7 +31,7 @@ class Report(Base):
     __tablename__ = "reports"
 
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
-    project_id: Mapped[int] = mapped_column(ForeignKey("projects.id", ondelete="CASCADE"))
+    project_id: Mapped[int] = mapped_column(ForeignKey("projects.id", ondelete="CASCADE"), index=True)
 
     tipo: Mapped[TipoInforme] = mapped_column(SQLEnum(TipoInforme), index=True)
     periodo: Mapped[str | None] = mapped_column(String(50), nullable=True)  # e.g., "2024-01", "Q1-2024"
@@ -42,6 +42,9 @@ class Report(Base):
     generado_por: Mapped[str | None] = mapped_column(String(200), nullable=True)
 
     notas: Mapped[str | None] = mapped_column(Text, nullable=True)
+    # Huella de los datos usados (ReportFingerprintService); varios informes
+    # con la misma huella comparten fichero
+    fingerprint: Mapped[str | None] = mapped_column(String(64), nullable=True, index=True)
 
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
 
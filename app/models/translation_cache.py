@@ -1,10 +1,39 @@
 from datetime import datetime
-from sqlalchemy import String, Text, Integer, DateTime, UniqueConstraint
-from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy import String, Text, Integer, DateTime, ForeignKey, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column, relationship
 from app.database import Base
 
 
+class TranslationMemory(Base):
+    """Memoria de traduccion direccionada por contenido.
+
+    Cada texto original (por su sha256) se guarda traducido una sola vez por
+    idioma, lo use una entidad o cien. Buscar una traduccion es una sola
+    consulta por el indice unico (source_hash, language).
+    """
+
+    __tablename__ = "translation_memory"
+    __table_args__ = (
+        UniqueConstraint("source_hash", "language", name="uq_translation_memory_hash_lang"),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True, index=True)
+    source_hash: Mapped[str] = mapped_column(String(64))
+    language: Mapped[str] = mapped_column(String(5))
+    translated_text: Mapped[str] = mapped_column(Text)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+
+    def __repr__(self) -> str:
+        return f"<TranslationMemory {self.source_hash[:12]} [{self.language}]>"
+
+
 class TranslationCache(Base):
+    """Que traduccion de la memoria corresponde al campo de una entidad.
+
+    La fila solo apunta a la memoria: el source_hash de esa entrada indica
+    de que texto original salio y permite detectar si el campo ha cambiado.
+    """
+
     __tablename__ = "translation_cache"
     __table_args__ = (
         UniqueConstraint(
@@ -18,12 +47,15 @@ class TranslationCache(Base):
     entity_id: Mapped[int] = mapped_column(Integer, index=True)
     field_name: Mapped[str] = mapped_column(String(100))
     language: Mapped[str] = mapped_column(String(5))
-    translated_text: Mapped[str] = mapped_column(Text)
-    source_hash: Mapped[str] = mapped_column(String(64), index=True)
+    memory_id: Mapped[int] = mapped_column(
+        ForeignKey("translation_memory.id", ondelete="CASCADE"), index=True
+    )
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
     updated_at: Mapped[datetime] = mapped_column(
         DateTime, default=datetime.utcnow, onupdate=datetime.utcnow
     )
 
+    memory: Mapped["TranslationMemory"] = relationship()
+
     def __repr__(self) -> str:
         return f"<TranslationCache {self.entity_type}:{self.entity_id}.{self.field_name} [{self.language}]>"
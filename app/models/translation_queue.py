@@ -0,0 +1,62 @@
+from enum import Enum
+from datetime import datetime
+from sqlalchemy import String, Text, Integer, DateTime, Enum as SQLEnum, Index, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column
+from app.database import Base
+
+
+class EstadoTraduccion(str, Enum):
+    pendiente = "pendiente"
+    en_proceso = "en_proceso"
+    completado = "completado"
+    error = "error"  # agotados los reintentos
+
+
+class TranslationTask(Base):
+    """Campo pendiente de traducir a un idioma (cola persistente).
+
+    Una fila por (entidad, campo, idioma, source_hash): volver a pedir la
+    misma traduccion no duplica trabajo. Los fallos se reintentan con espera
+    exponencial hasta translation_max_attempts.
+    """
+
+    __tablename__ = "translation_queue"
+    __table_args__ = (
+        UniqueConstraint(
+            "entity_type", "entity_id", "field_name", "language", "source_hash",
+            name="uq_translation_queue_entity_field_lang_hash",
+        ),
+        Index("ix_translation_queue_estado_next", "estado", "next_attempt_at"),
+        Index("ix_translation_queue_project_lang", "project_id", "language", "estado"),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True, index=True)
+    project_id: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    entity_type: Mapped[str] = mapped_column(String(50))
+    entity_id: Mapped[int] = mapped_column(Integer)
+    field_name: Mapped[str] = mapped_column(String(100))
+    language: Mapped[str] = mapped_column(String(5))
+    source_hash: Mapped[str] = mapped_column(String(64))
+    source_text: Mapped[str] = mapped_column(Text)
+
+    estado: Mapped[EstadoTraduccion] = mapped_column(
+        SQLEnum(EstadoTraduccion), default=EstadoTraduccion.pendiente
+    )
+    intentos: Mapped[int] = mapped_column(Integer, default=0)
+    next_attempt_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    last_error: Mapped[str | None] = mapped_column(Text, nullable=True)
+    # Marca del worker que la reclamo (solo mientras esta en_proceso)
+    claim_token: Mapped[str | None] = mapped_column(String(36), nullable=True)
+    # Proceso que la reclamo y cuando: al arrancar solo se reencolan las de
+    # procesos muertos o reclamadas hace mas de translation_claim_stale_seconds
+    worker_id: Mapped[str | None] = mapped_column(String(64), nullable=True)
+    claimed_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    finished_at: Mapped[datetime | None] = mapped_column(DateTime, nullable=True)
+
+    def __repr__(self) -> str:
+        return (
+            f"<TranslationTask {self.entity_type}:{self.entity_id}.{self.field_name} "
+            f"[{self.language}] {self.estado.value}>"
+        )
@@ -7,8 +7,11 @@ from app.routers.api.logical_framework import router as logical_framework_router
 from app.routers.api.documents import router as documents_router
 from app.routers.api.verification_sources import router as verification_sources_router
 from app.routers.api.reports import router as reports_router
+from app.routers.api.jobs import router as jobs_router
+from app.routers.api.aacid import router as aacid_router
 from app.routers.api.users import router as users_router
 from app.routers.api.audit import router as audit_router
+from app.routers.api.translations import router as translations_router
 
 api_router = APIRouter(prefix="/api")
 api_router.include_router(projects_router, prefix="/projects", tags=["projects"])
@@ -19,5 +22,8 @@ api_router.include_router(logical_framework_router, tags=["logical-framework"])
 api_router.include_router(documents_router, tags=["documents"])
 api_router.include_router(verification_sources_router, tags=["verification-sources"])
 api_router.include_router(reports_router, tags=["reports"])
+api_router.include_router(jobs_router, tags=["jobs"])
+api_router.include_router(aacid_router, tags=["aacid"])
 api_router.include_router(users_router, tags=["users"])
 api_router.include_router(audit_router, tags=["audit"])
+api_router.include_router(translations_router, tags=["translations"])
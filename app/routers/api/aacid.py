@@ -9,8 +9,8 @@ from app.models.user import User
 from app.auth.dependencies import get_current_user, require_permission
 from app.auth.permissions import Permiso
 from app.services.aacid_service import AACIDFormService
-from app.services.audit_service import AuditService
-from app.models.audit_log import ActorType, AccionAuditoria
+from app.services.job_service import JobService
+from app.models.job import TipoTrabajo
 from app.schemas.aacid import (
     ProjectAACIDFieldsUpdate,
     ProjectAACIDFieldsResponse,
@@ -24,7 +24,9 @@ from app.schemas.aacid import (
     MarkerResponse,
     AACIDValidationResult,
     AACIDPreviewResponse,
+    AACIDBatchRequest,
 )
+from app.schemas.job import JobResponse
 
 
 router = APIRouter()
@@ -201,44 +203,59 @@ def preview_form(
         raise HTTPException(status_code=404, detail=str(e))
 
 
-@router.post("/projects/{project_id}/aacid/generate", status_code=201)
+@router.post("/projects/{project_id}/aacid/generate", response_model=JobResponse, status_code=202)
 def generate_form(
     request: Request,
     project_id: int,
     user: User = Depends(require_permission(Permiso.informe_generar)),
     service: AACIDFormService = Depends(get_service),
 ):
+    """Valida el formulario y encola la generacion del PDF. Devuelve el trabajo."""
     try:
         validation = service.validate(project_id)
-        if not validation["valid"]:
-            raise HTTPException(status_code=400, detail=validation)
-
-        report = service.generate_pdf(project_id, generado_por=user.nombre_completo)
-
-        # Audit log
-        audit = AuditService(service.db)
-        audit.log(
-            actor_type=ActorType.internal,
-            actor_id=str(user.id),
-            actor_email=user.email,
-            actor_label=user.nombre_completo,
-            accion=AccionAuditoria.export,
-            recurso="report",
-            recurso_id=str(report.id),
-            detalle={"tipo": "anexo_iia"},
-            ip_address=request.client.host if request.client else None,
-            project_id=project_id,
-        )
-
-        return {
-            "id": report.id,
-            "nombre_archivo": report.nombre_archivo,
-            "ruta": report.ruta,
-            "download_url": f"/api/reports/{report.id}/download",
-        }
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error generando Anexo II A: {str(e)}")
+    if not validation["valid"]:
+        raise HTTPException(status_code=400, detail=validation)
+
+    return JobService(service.db).create_job(
+        project_id=project_id,
+        tipo=TipoTrabajo.anexo_iia,
+        parametros={"generado_por": user.nombre_completo},
+        user=user,
+        ip_address=request.client.host if request.client else None,
+    )
+
+
+@router.post("/aacid/batch", response_model=JobResponse, status_code=202)
+def generate_batch(
+    request: Request,
+    data: AACIDBatchRequest,
+    user: User = Depends(require_permission(Permiso.informe_generar)),
+    service: AACIDFormService = Depends(get_service),
+):
+    """Encola el Anexo II A de una convocatoria (o lista de proyectos) en un ZIP.
+
+    Cada proyecto se valida al generar; los que no pasan la validacion quedan
+    fuera del ZIP y su resultado aparece en `resultado` del trabajo.
+    """
+    if bool(data.convocatoria) == bool(data.project_ids):
+        raise HTTPException(status_code=400, detail="Indica una convocatoria o una lista de proyectos")
+    if data.convocatoria:
+        project_ids = service.get_convocatoria_project_ids(data.convocatoria)
+        if not project_ids:
+            raise HTTPException(status_code=404, detail="No hay proyectos en esa convocatoria")
+    else:
+        project_ids = list(dict.fromkeys(data.project_ids))
+
+    return JobService(service.db).create_job(
+        project_id=None,
+        tipo=TipoTrabajo.anexo_iia_lote,
+        parametros={
+            "project_ids": project_ids,
+            "convocatoria": data.convocatoria,
+            "generado_por": user.nombre_completo,
+        },
+        user=user,
+        ip_address=request.client.host if request.client else None,
+    )
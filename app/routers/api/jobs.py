@@ -0,0 +1,74 @@
+import os
+
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import FileResponse
+from sqlalchemy.orm import Session
+
+from app.database import get_db
+from app.models.user import User
+from app.auth.dependencies import require_permission
+from app.auth.permissions import Permiso
+from app.services.job_service import JobService
+from app.services.audit_service import AuditService
+from app.models.audit_log import ActorType, AccionAuditoria
+from app.schemas.job import JobResponse
+
+
+router = APIRouter()
+
+
+def get_service(db: Session = Depends(get_db)) -> JobService:
+    return JobService(db)
+
+
+@router.get("/jobs/{job_id}", response_model=JobResponse)
+def get_job(
+    job_id: str,
+    user: User = Depends(require_permission(Permiso.informe_generar)),
+    service: JobService = Depends(get_service),
+):
+    """Status and progress of a generation job."""
+    job = service.get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Trabajo no encontrado")
+    return job
+
+
+@router.get("/jobs/{job_id}/download")
+def download_job_file(
+    request: Request,
+    job_id: str,
+    user: User = Depends(require_permission(Permiso.informe_descargar)),
+    service: JobService = Depends(get_service),
+):
+    """Download the file of a job that does not create a report (batch ZIP)."""
+    job = service.get_job(job_id)
+    if not job or not job.ruta:
+        raise HTTPException(status_code=404, detail="Trabajo no encontrado")
+    if not os.path.exists(job.ruta):
+        raise HTTPException(status_code=404, detail="Archivo no encontrado")
+
+    AuditService(service.db).log(
+        actor_type=ActorType.internal,
+        actor_id=str(user.id),
+        actor_email=user.email,
+        actor_label=user.nombre_completo,
+        accion=AccionAuditoria.download,
+        recurso="job",
+        recurso_id=job.id,
+        detalle={"nombre": job.nombre_archivo},
+        ip_address=request.client.host if request.client else None,
+        project_id=job.project_id,
+    )
+    return FileResponse(path=job.ruta, filename=job.nombre_archivo, media_type="application/zip")
+
+
+@router.get("/projects/{project_id}/jobs", response_model=list[JobResponse])
+def list_project_jobs(
+    project_id: int,
+    limit: int = 20,
+    user: User = Depends(require_permission(Permiso.informe_generar)),
+    service: JobService = Depends(get_service),
+):
+    """Most recent generation jobs for a project."""
+    return service.get_project_jobs(project_id, limit=limit)
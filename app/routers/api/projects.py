@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from app.database import get_db
 from app.models.project import EstadoProyecto, TipoProyecto
@@ -73,6 +73,7 @@ def get_project(
 @router.post("", response_model=ProjectResponse, status_code=201)
 def create_project(
     data: ProjectCreate,
+    background_tasks: BackgroundTasks,
     user: User = Depends(require_permission(Permiso.proyecto_crear)),
     service: ProjectService = Depends(get_service),
 ):
@@ -82,13 +83,14 @@ def create_project(
             status_code=400,
             detail=f"Ya existe un proyecto con código contable {data.codigo_contable}",
         )
-    return service.create(data)
+    return service.create(data, background_tasks)
 
 
 @router.put("/{project_id}", response_model=ProjectResponse)
 def update_project(
     project_id: int,
     data: ProjectUpdate,
+    background_tasks: BackgroundTasks,
     user: User = Depends(require_permission(Permiso.proyecto_editar)),
     service: ProjectService = Depends(get_service),
 ):
@@ -101,7 +103,7 @@ def update_project(
                 detail=f"Ya existe un proyecto con código contable {data.codigo_contable}",
             )
 
-    project = service.update(project_id, data)
+    project = service.update(project_id, data, background_tasks)
     if not project:
         raise HTTPException(status_code=404, detail="Proyecto no encontrado")
     return project
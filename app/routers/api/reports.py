@@ -5,19 +5,22 @@ from sqlalchemy.orm import Session
 
 from app.database import get_db
 from app.models.report import TipoInforme
+from app.models.project import Project
+from app.models.job import TipoTrabajo
 from app.models.user import User
 from app.auth.dependencies import get_current_user, require_permission
 from app.auth.permissions import Permiso
 from app.services.report_service import ReportService
+from app.services.job_service import JobService
 from app.services.audit_service import AuditService
 from app.models.audit_log import ActorType, AccionAuditoria
 from app.schemas.report import (
-    ReportResponse,
     ReportListResponse,
     ReportValidationResult,
     ReportGenerateRequest,
     PackGenerateRequest,
 )
+from app.schemas.job import JobResponse
 
 
 router = APIRouter()
@@ -27,6 +30,10 @@ def get_service(db: Session = Depends(get_db)) -> ReportService:
     return ReportService(db)
 
 
+def get_job_service(db: Session = Depends(get_db)) -> JobService:
+    return JobService(db)
+
+
 @router.get("/projects/{project_id}/reports", response_model=ReportListResponse)
 def list_project_reports(
     project_id: int,
@@ -51,83 +58,56 @@ def validate_report_generation(
         raise HTTPException(status_code=404, detail=str(e))
 
 
-@router.post("/projects/{project_id}/reports/generate", response_model=ReportResponse, status_code=201)
+@router.post("/projects/{project_id}/reports/generate", response_model=JobResponse, status_code=202)
 def generate_report(
     request: Request,
     project_id: int,
     data: ReportGenerateRequest,
     user: User = Depends(require_permission(Permiso.informe_generar)),
     service: ReportService = Depends(get_service),
+    job_service: JobService = Depends(get_job_service),
 ):
-    """Generate a single report."""
-    try:
-        report = service.generate_report(
-            project_id=project_id,
-            tipo=data.tipo,
-            periodo=data.periodo,
-            generado_por=data.generado_por,
-        )
-
-        # Audit log
-        audit = AuditService(service.db)
-        audit.log(
-            actor_type=ActorType.internal,
-            actor_id=str(user.id),
-            actor_email=user.email,
-            actor_label=user.nombre_completo,
-            accion=AccionAuditoria.export,
-            recurso="report",
-            recurso_id=str(report.id),
-            detalle={"tipo": data.tipo.value, "periodo": data.periodo},
-            ip_address=request.client.host if request.client else None,
-            project_id=project_id,
-        )
-
-        return report
-    except ValueError as e:
-        raise HTTPException(status_code=404, detail=str(e))
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error generando informe: {str(e)}")
+    """Queue the generation of a single report. Returns the job to poll."""
+    if not service.db.get(Project, project_id):
+        raise HTTPException(status_code=404, detail="Proyecto no encontrado")
+
+    return job_service.create_job(
+        project_id=project_id,
+        tipo=TipoTrabajo.informe,
+        parametros={
+            "tipo": data.tipo.value,
+            "periodo": data.periodo,
+            "generado_por": data.generado_por,
+        },
+        user=user,
+        ip_address=request.client.host if request.client else None,
+    )
 
 
-@router.post("/projects/{project_id}/reports/pack", response_model=ReportResponse, status_code=201)
+@router.post("/projects/{project_id}/reports/pack", response_model=JobResponse, status_code=202)
 def generate_pack(
     request: Request,
     project_id: int,
     data: PackGenerateRequest | None = None,
     user: User = Depends(require_permission(Permiso.informe_generar)),
     service: ReportService = Depends(get_service),
+    job_service: JobService = Depends(get_job_service),
 ):
-    """Generate a ZIP pack with multiple reports."""
-    try:
-        tipos = data.tipos if data else None
-        generado_por = data.generado_por if data else None
-        report = service.generate_pack(
-            project_id=project_id,
-            tipos=tipos,
-            generado_por=generado_por,
-        )
-
-        # Audit log
-        audit = AuditService(service.db)
-        audit.log(
-            actor_type=ActorType.internal,
-            actor_id=str(user.id),
-            actor_email=user.email,
-            actor_label=user.nombre_completo,
-            accion=AccionAuditoria.export,
-            recurso="report_pack",
-            recurso_id=str(report.id),
-            detalle={"tipos": [t.value for t in tipos] if tipos else "all"},
-            ip_address=request.client.host if request.client else None,
-            project_id=project_id,
-        )
-
-        return report
-    except ValueError as e:
-        raise HTTPException(status_code=404, detail=str(e))
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error generando pack: {str(e)}")
+    """Queue the generation of a ZIP pack with multiple reports."""
+    if not service.db.get(Project, project_id):
+        raise HTTPException(status_code=404, detail="Proyecto no encontrado")
+
+    tipos = data.tipos if data else None
+    return job_service.create_job(
+        project_id=project_id,
+        tipo=TipoTrabajo.pack,
+        parametros={
+            "tipos": [t.value for t in tipos] if tipos else None,
+            "generado_por": data.generado_por if data else None,
+        },
+        user=user,
+        ip_address=request.client.host if request.client else None,
+    )
 
 
 @router.get("/reports/{report_id}/download")
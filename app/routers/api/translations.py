@@ -0,0 +1,62 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+from app.database import get_db
+from app.models.user import User
+from app.auth.dependencies import require_permission
+from app.auth.permissions import Permiso
+from app.services.translation_queue_service import TranslationQueueService
+from app.services.translation_service import TranslationService
+
+router = APIRouter()
+
+
+def get_service(db: Session = Depends(get_db)) -> TranslationQueueService:
+    return TranslationQueueService(db)
+
+
+@router.get("/translations/queue")
+def translation_queue_status(
+    failed_limit: int = Query(20, ge=0, le=200),
+    user: User = Depends(require_permission(Permiso.auditoria_ver)),
+    service: TranslationQueueService = Depends(get_service),
+):
+    status = service.get_status()
+    status["fallidas"] = [
+        {
+            "id": task.id,
+            "project_id": task.project_id,
+            "entity_type": task.entity_type,
+            "entity_id": task.entity_id,
+            "field_name": task.field_name,
+            "language": task.language,
+            "intentos": task.intentos,
+            "last_error": task.last_error,
+            "finished_at": task.finished_at.isoformat() if task.finished_at else None,
+        }
+        for task in service.get_failed_tasks(failed_limit)
+    ]
+    return status
+
+
+@router.get("/translations/coverage")
+def translation_coverage(
+    project_id: int | None = Query(None),
+    user: User = Depends(require_permission(Permiso.auditoria_ver)),
+    db: Session = Depends(get_db),
+):
+    """Porcentaje de campos traducidos por proyecto e idioma (por defecto, los
+    proyectos abiertos al portal de contrapartes)."""
+    service = TranslationService(db)
+    if project_id is not None:
+        return [{"project_id": project_id, "idiomas": service.get_project_coverage(project_id)}]
+    return service.get_portal_coverage()
+
+
+@router.post("/translations/coverage/{project_id}/prewarm")
+def translation_prewarm(
+    project_id: int,
+    user: User = Depends(require_permission(Permiso.auditoria_ver)),
+    service: TranslationQueueService = Depends(get_service),
+):
+    """Encola las traducciones que le faltan al proyecto."""
+    return {"encolados": service.prewarm_project(project_id)}
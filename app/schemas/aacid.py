@@ -123,3 +123,9 @@ class AACIDPreviewSection(BaseModel):
 class AACIDPreviewResponse(BaseModel):
     validation: AACIDValidationResult
     sections: list[AACIDPreviewSection]
+
+
+class AACIDBatchRequest(BaseModel):
+    """Anexo II A por lotes: todos los proyectos de una convocatoria o una lista."""
+    convocatoria: str | None = Field(None, max_length=200)
+    project_ids: list[int] | None = None
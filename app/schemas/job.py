@@ -0,0 +1,22 @@
+from datetime import datetime
+from pydantic import BaseModel, ConfigDict
+from app.models.job import TipoTrabajo, EstadoTrabajo
+
+
+class JobResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: str
+    project_id: int | None
+    tipo: TipoTrabajo
+    tipo_nombre: str
+    estado: EstadoTrabajo
+    progreso: int
+    mensaje: str | None
+    report_id: int | None
+    resultado: dict | None = None
+    status_url: str
+    download_url: str | None
+    created_at: datetime
+    started_at: datetime | None
+    finished_at: datetime | None
@@ -1,11 +1,21 @@
 import io
+import json
+import multiprocessing
 import os
+import threading
+import zipfile
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
+from functools import lru_cache
+from typing import Callable, Iterator
 
 from pypdf import PdfReader, PdfWriter
 from pypdf.generic import TextStringObject, NameObject, BooleanObject
 from sqlalchemy import select
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, selectinload
+
+from app.config import get_settings
 
 from app.models.project import Project
 from app.models.logical_framework import LogicalFramework, SpecificObjective, Result, Activity, Indicator
@@ -15,12 +25,131 @@ from app.models.aacid import (
 )
 from app.models.report import Report, TipoInforme
 from app.services.aacid_field_map import FIELD_MAP, NARRATIVE_SECTIONS as FIELD_NARRATIVE_SECTIONS, REQUIRED_NARRATIVE_SECTIONS
+from app.services.excel_generator_service import _atomic_output
+from app.services.report_fingerprint_service import ReportFingerprintService
 
 
 EXPORTS_DIR = "exports"
 PDF_TEMPLATE_PATH = os.path.join("docs", "other", "anexo-aacid.pdf")
 
 
+def _full_field_name(annot) -> str:
+    """Reconstructs the full field name by walking up /Parent chain."""
+    name = str(annot.get("/T", ""))
+    obj = annot
+    while "/Parent" in obj:
+        parent = obj["/Parent"].get_object()
+        parent_name = str(parent.get("/T", ""))
+        if parent_name:
+            name = parent_name + "." + name
+        obj = parent
+    return name
+
+
+class AnexoTemplate:
+    """Plantilla del Anexo II A parseada una vez, con sus campos indexados.
+
+    Guarda las anotaciones en orden y, para cada patron (los de FIELD_MAP al
+    cargar, los de la matriz al usarlos por primera vez), las posiciones de
+    las anotaciones cuyo nombre lo contiene. Rellenar es buscar en ese indice.
+
+    Todos los PDF salen del mismo writer: `fill` escribe los valores, lo
+    serializa y deja las anotaciones como estaban, con un lock para que dos
+    hilos no lo compartan a la vez.
+    """
+
+    def __init__(self, path: str = PDF_TEMPLATE_PATH):
+        reader = PdfReader(path)
+        self._writer = PdfWriter()
+        self._writer.append(reader)
+        if "/AcroForm" in self._writer._root_object:
+            self._writer._root_object["/AcroForm"][
+                NameObject("/NeedAppearances")] = BooleanObject(True)
+
+        self._annots = [
+            annot_ref.get_object()
+            for page in self._writer.pages
+            for annot_ref in (page.get("/Annots") or [])
+        ]
+        self._names = [_full_field_name(annot) for annot in self._annots]
+        self._positions: dict[str, tuple[int, ...]] = {}
+        for pattern in FIELD_MAP:
+            self.positions(pattern)
+        self._lock = threading.Lock()
+
+    def positions(self, pattern: str) -> tuple[int, ...]:
+        """Anotaciones cuyo nombre completo contiene `pattern`."""
+        found = self._positions.get(pattern)
+        if found is None:
+            found = tuple(i for i, name in enumerate(self._names) if pattern in name)
+            self._positions[pattern] = found
+        return found
+
+    def fill(self, values: dict[str, str]) -> bytes:
+        """PDF con `values` ({patron: valor}) rellenos.
+
+        Como antes, cada anotacion toma el primer patron (en el orden de
+        `values`) que contiene su nombre y tiene valor.
+        """
+        assigned: dict[int, str] = {}
+        for pattern, value in values.items():
+            if value:
+                for pos in self.positions(pattern):
+                    assigned.setdefault(pos, value)
+
+        with self._lock:
+            saved = []
+            try:
+                for pos, value in assigned.items():
+                    annot = self._annots[pos]
+                    saved.append((annot, dict.get(annot, "/V"), dict.get(annot, "/AP")))
+                    annot[NameObject("/V")] = TextStringObject(str(value))
+                    if "/AP" in annot:
+                        del annot["/AP"]
+                buffer = io.BytesIO()
+                self._writer.write(buffer)
+            finally:
+                for annot, original_value, appearance in saved:
+                    for key, original in (("/V", original_value), ("/AP", appearance)):
+                        if original is None:
+                            annot.pop(key, None)
+                        else:
+                            dict.__setitem__(annot, NameObject(key), original)
+        return buffer.getvalue()
+
+
+@lru_cache(maxsize=1)
+def get_anexo_template() -> AnexoTemplate:
+    """Plantilla compartida del proceso (se parsea en el primer uso)."""
+    return AnexoTemplate(PDF_TEMPLATE_PATH)
+
+
+def _fill_in_worker(values: dict[str, str]) -> bytes:
+    return get_anexo_template().fill(values)
+
+
+def fill_many(values_list: list[dict[str, str]], workers: int) -> Iterator[bytes]:
+    """Rellena varios formularios y los devuelve en el mismo orden.
+
+    Con workers > 1 (y mas de un nucleo) reparte el trabajo en un pool de
+    procesos (spawn: el proceso padre tiene hilos y conexiones abiertas);
+    cada proceso parsea la plantilla una sola vez, al arrancar.
+    """
+    workers = min(workers, len(values_list), os.cpu_count() or 1)
+    if workers <= 1:
+        template = get_anexo_template()
+        for values in values_list:
+            yield template.fill(values)
+        return
+
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=get_anexo_template,
+    ) as pool:
+        yield from pool.map(_fill_in_worker, values_list)
+
+
 class AACIDFormService:
     def __init__(self, db: Session):
         self.db = db
@@ -195,10 +324,11 @@ class AACIDFormService:
         project = self.db.get(Project, project_id)
         if not project:
             raise ValueError("Proyecto no encontrado")
+        return self._validate_data(project, self.get_narratives_dict(project_id))
 
+    def _validate_data(self, project: Project, narratives: dict[str, str]) -> dict:
         errors = []
         warnings = []
-        narratives = self.get_narratives_dict(project_id)
 
         # Check required narrative sections
         for code in REQUIRED_NARRATIVE_SECTIONS:
@@ -286,46 +416,25 @@ class AACIDFormService:
         if not project:
             raise ValueError("Proyecto no encontrado")
 
+        # Mismos datos que un anexo ya generado: se devuelve ese
+        fingerprints = ReportFingerprintService(self.db)
+        fingerprint = fingerprints.for_report(project_id, TipoInforme.anexo_iia)
+        existing = fingerprints.find_report(project_id, TipoInforme.anexo_iia, fingerprint)
+        if existing:
+            return existing
+
         # Build field values
         values = self._build_field_values(project)
 
-        # Read template and fill
-        reader = PdfReader(PDF_TEMPLATE_PATH)
-        writer = PdfWriter()
-        writer.append(reader)
-
-        # Set NeedAppearances flag
-        if "/AcroForm" in writer._root_object:
-            writer._root_object["/AcroForm"][
-                NameObject("/NeedAppearances")] = BooleanObject(True)
-
-        # Fill fields by walking annotations
-        for page in writer.pages:
-            annots = page.get("/Annots")
-            if not annots:
-                continue
-            for annot_ref in annots:
-                annot = annot_ref.get_object()
-                full_name = self._get_full_field_name(annot)
-
-                for pattern, value in values.items():
-                    if pattern in full_name and value:
-                        annot[NameObject("/V")] = TextStringObject(str(value))
-                        if "/AP" in annot:
-                            del annot["/AP"]
-                        break
-
-        # Write to bytes
-        buffer = io.BytesIO()
-        writer.write(buffer)
-        pdf_bytes = buffer.getvalue()
+        # Template parsed once per process; filling is index lookups
+        pdf_bytes = get_anexo_template().fill(values)
 
         # Save to disk
         project_dir = os.path.join(EXPORTS_DIR, str(project_id))
         os.makedirs(project_dir, exist_ok=True)
 
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"Anexo_IIA_{project.codigo_contable}_{timestamp}.pdf"
+        filename = f"Anexo_IIA_{project.codigo_contable}_{timestamp}_{fingerprint[:12]}.pdf"
         filepath = os.path.join(project_dir, filename)
 
         with open(filepath, "wb") as f:
@@ -339,6 +448,7 @@ class AACIDFormService:
             nombre_archivo=filename,
             ruta=filepath,
             generado_por=generado_por,
+            fingerprint=fingerprint,
         )
         self.db.add(report)
         self.db.commit()
@@ -346,24 +456,148 @@ class AACIDFormService:
 
         return report
 
-    def _get_full_field_name(self, annot) -> str:
-        """Reconstructs the full field name by walking up /Parent chain."""
-        name = str(annot.get("/T", ""))
-        obj = annot
-        while "/Parent" in obj:
-            parent = obj["/Parent"].get_object()
-            parent_name = str(parent.get("/T", ""))
-            if parent_name:
-                name = parent_name + "." + name
-            obj = parent
-        return name
+    # ---- Generacion por lotes (convocatoria) ----
+
+    def get_convocatoria_project_ids(self, convocatoria: str) -> list[int]:
+        query = (
+            select(Project.id)
+            .where(Project.convocatoria == convocatoria)
+            .order_by(Project.codigo_contable)
+        )
+        return list(self.db.execute(query).scalars().all())
+
+    def prepare_batch(self, project_ids: list[int]) -> list[dict]:
+        """Valida y calcula los valores del Anexo II A de varios proyectos.
+
+        Carga proyectos (con su marco logico), narrativas, beneficiarios y
+        voluntarios de todos a la vez: un numero fijo de consultas, no unas
+        cuantas por proyecto. Devuelve, en el orden de project_ids, la
+        validacion de cada uno y sus valores si es valido.
+        """
+        projects = {
+            p.id: p for p in self.db.execute(
+                select(Project)
+                .where(Project.id.in_(project_ids))
+                .options(
+                    selectinload(Project.logical_framework)
+                    .selectinload(LogicalFramework.specific_objectives)
+                    .options(
+                        selectinload(SpecificObjective.indicators),
+                        selectinload(SpecificObjective.results).options(
+                            selectinload(Result.activities),
+                            selectinload(Result.indicators),
+                        ),
+                    )
+                )
+            ).scalars().all()
+        }
+        narratives = defaultdict(dict)
+        for n in self.db.execute(
+            select(ProjectNarrative).where(ProjectNarrative.project_id.in_(project_ids))
+        ).scalars():
+            narratives[n.project_id][n.section_code] = n.content
+        beneficiaries = {
+            b.project_id: b for b in self.db.execute(
+                select(ProjectBeneficiary).where(ProjectBeneficiary.project_id.in_(project_ids))
+            ).scalars()
+        }
+        volunteers = {
+            v.project_id: v for v in self.db.execute(
+                select(ProjectVolunteer).where(ProjectVolunteer.project_id.in_(project_ids))
+            ).scalars()
+        }
+
+        items = []
+        for project_id in project_ids:
+            project = projects.get(project_id)
+            if project is None:
+                items.append({
+                    "project_id": project_id,
+                    "codigo": None,
+                    "validation": {
+                        "valid": False,
+                        "errors": [{"field": "proyecto", "label": "Proyecto", "message": "Proyecto no encontrado"}],
+                        "warnings": [],
+                    },
+                    "values": None,
+                })
+                continue
+            validation = self._validate_data(project, narratives[project_id])
+            items.append({
+                "project_id": project_id,
+                "codigo": project.codigo_contable,
+                "validation": validation,
+                "values": self._field_values(
+                    project, narratives[project_id],
+                    beneficiaries.get(project_id), volunteers.get(project_id),
+                ) if validation["valid"] else None,
+            })
+        return items
+
+    def generate_batch(
+        self,
+        project_ids: list[int],
+        nombre: str = "lote",
+        on_progress: Callable[[int, int], None] | None = None,
+    ) -> dict:
+        """Genera en un ZIP el Anexo II A de los proyectos validos del lote.
+
+        Los PDF se rellenan en paralelo (`aacid_batch_workers` procesos) y se
+        escriben en el ZIP en el orden de project_ids, junto a validacion.json
+        con el resultado de cada proyecto. Si ninguno supera la validacion el
+        ZIP solo contiene validacion.json. Devuelve nombre, ruta y resultado.
+        """
+        items = self.prepare_batch(project_ids)
+        valid = [item for item in items if item["values"] is not None]
+
+        batch_dir = os.path.join(EXPORTS_DIR, "lotes")
+        os.makedirs(batch_dir, exist_ok=True)
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        filename = f"Anexo_IIA_{nombre.replace('/', '-')}_{timestamp}.zip"
+        filepath = os.path.join(batch_dir, filename)
+
+        pdfs = fill_many([item["values"] for item in valid], get_settings().aacid_batch_workers)
+        with _atomic_output(filepath) as f:
+            with zipfile.ZipFile(f, "w", zipfile.ZIP_DEFLATED) as zip_file:
+                for done, (item, pdf_bytes) in enumerate(zip(valid, pdfs), start=1):
+                    item["archivo"] = f"Anexo_IIA_{item['codigo'].replace('/', '-')}.pdf"
+                    zip_file.writestr(item["archivo"], pdf_bytes)
+                    if on_progress:
+                        on_progress(done, len(valid))
+
+                resultado = {
+                    "total": len(items),
+                    "generados": len(valid),
+                    "proyectos": [
+                        {
+                            "project_id": item["project_id"],
+                            "codigo": item["codigo"],
+                            "archivo": item.get("archivo"),
+                            **item["validation"],
+                        }
+                        for item in items
+                    ],
+                }
+                zip_file.writestr("validacion.json", json.dumps(resultado, ensure_ascii=False, indent=2))
+
+        return {"nombre_archivo": filename, "ruta": filepath, "resultado": resultado}
 
     def _build_field_values(self, project: Project) -> dict[str, str]:
         """Builds the {pdf_pattern: value} dict from DB data."""
-        narratives = self.get_narratives_dict(project.id)
-        beneficiaries = self.get_beneficiaries(project.id)
-        volunteers = self.get_volunteers(project.id)
+        return self._field_values(
+            project,
+            self.get_narratives_dict(project.id),
+            self.get_beneficiaries(project.id),
+            self.get_volunteers(project.id),
+        )
 
+    def _field_values(
+        self,
+        project: Project,
+        narratives: dict[str, str],
+        beneficiaries: ProjectBeneficiary | None,
+        volunteers: ProjectVolunteer | None,
+    ) -> dict[str, str]:
         values = {}
 
         for pdf_pattern, config in FIELD_MAP.items():
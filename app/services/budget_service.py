@@ -4,7 +4,7 @@ from sqlalchemy import select, func
 from sqlalchemy.orm import Session, selectinload
 from app.models.budget import Funder, BudgetLineTemplate, BudgetTemplateVersion, ProjectBudgetLine, CategoriaPartida
 from app.models.project import Project, EstadoProyecto
-from app.models.expense import Expense, EstadoGasto
+from app.models.expense import Expense, UbicacionGasto
 from app.models.funding import FuenteFinanciacion, AsignacionFinanciador, TipoFuente
 from app.schemas.budget import (
     ProjectBudgetLineUpdate,
@@ -15,6 +15,7 @@ from app.schemas.budget import (
     BudgetValidationAlert,
 )
 from app.schemas.funding import FundingSummaryRow
+from app.services.execution_ledger_service import ExecutionLedgerService
 
 
 AACID_BUDGET_TEMPLATES = [
@@ -743,6 +744,17 @@ class BudgetService:
             return None
 
         update_data = data.model_dump(exclude_unset=True)
+
+        # Executed amounts are owned by the ledger: manual values become adjustments
+        ledger = ExecutionLedgerService(self.db)
+        for field, ubicacion in (
+            ("ejecutado_espana", UbicacionGasto.espana),
+            ("ejecutado_terreno", UbicacionGasto.terreno),
+        ):
+            value = update_data.pop(field, None)
+            if value is not None:
+                ledger.set_line_executed(line, ubicacion, value)
+
         for field, value in update_data.items():
             setattr(line, field, value)
 
@@ -959,22 +971,8 @@ class BudgetService:
         )
         aprobado_map = {row[0]: row[1] or Decimal("0") for row in aprobado_query}
 
-        # Get total ejecutado per source from expenses (validado + justificado)
-        ejecutado_query = (
-            self.db.execute(
-                select(
-                    Expense.funding_source_id,
-                    func.sum(Expense.cantidad_euros * Expense.porcentaje / 100),
-                )
-                .where(
-                    Expense.project_id == project_id,
-                    Expense.estado.in_([EstadoGasto.validado, EstadoGasto.justificado]),
-                    Expense.funding_source_id.isnot(None),
-                )
-                .group_by(Expense.funding_source_id)
-            ).all()
-        )
-        ejecutado_map = {row[0]: row[1] or Decimal("0") for row in ejecutado_query}
+        # Get total ejecutado per source from the execution ledger
+        ejecutado_map = ExecutionLedgerService(self.db).get_funding_source_totals(project_id)
 
         rows = []
         for source in sources:
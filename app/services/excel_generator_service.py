@@ -1,32 +1,180 @@
+import multiprocessing
 import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 from decimal import Decimal
-from io import BytesIO
+from contextlib import contextmanager
+from copy import copy
+from functools import partial
+from typing import Callable, Iterator
 import zipfile
 
 from openpyxl import Workbook
-from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
-from openpyxl.utils import get_column_letter
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font, PatternFill, Alignment, Border, Side, NamedStyle
+from openpyxl.styles.fonts import DEFAULT_FONT
+from openpyxl.utils import get_column_letter, range_boundaries
 from sqlalchemy.orm import Session
 
+from app.config import get_settings
 from app.models.project import Project
-from app.models.expense import Expense, EstadoGasto, UbicacionGasto
-from app.models.transfer import Transfer
-from app.models.budget import ProjectBudgetLine
+from app.models.expense import EstadoGasto, UbicacionGasto
 from app.models.report import TipoInforme
+from app.services.project_snapshot import ProjectSnapshot, ProjectSnapshotLoader
+
+
+# Shared named styles registered on every generated workbook
+STYLE_TITLE = "cooperapp_title"
+STYLE_LABEL = "cooperapp_label"
+STYLE_CELL = "cooperapp_cell"
+STYLE_LABEL_CELL = "cooperapp_label_cell"
+STYLE_SECTION = "cooperapp_section"
+STYLE_HEADER = "cooperapp_header"
+
+EUR_FORMAT = '#,##0.00 "€"'
+
+PACK_TIPOS_DEFECTO = [
+    TipoInforme.cuenta_justificativa,
+    TipoInforme.ejecucion_presupuestaria,
+    TipoInforme.relacion_transferencias,
+]
+
+
+class _SheetBuffer:
+    """Rows for a write-only worksheet.
+
+    Cells are kept as light ``(value, style, number_format)`` tuples so the
+    column widths can be computed from the values before anything is streamed
+    (write-only sheets need ``column_dimensions`` before the first row).
+    ``flush`` then writes every row once, reusing one style array per
+    (named style, number format) pair instead of per-cell style objects.
+    """
+
+    def __init__(self, ws, min_width: int = 10, max_width: int = 50):
+        self.ws = ws
+        self.min_width = min_width
+        self.max_width = max_width
+        self._rows: dict[int, list] = {}
+        self._merged: list[str] = []
+        self._max_col = 0
+
+    def cell(self, row: int, column: int, value=None, style: str | None = None, number_format: str | None = None):
+        cells = self._rows.setdefault(row, [])
+        if len(cells) < column:
+            cells.extend([None] * (column - len(cells)))
+        cells[column - 1] = (value, style, number_format)
+
+    def row(self, row: int, cells: list[tuple]):
+        """Set a full row from column 1; each item is (value[, style[, number_format]])."""
+        self._rows[row] = [(c[0], c[1] if len(c) > 1 else None, c[2] if len(c) > 2 else None) for c in cells]
+
+    def merge(self, ref: str):
+        self._merged.append(ref)
+        self._max_col = max(self._max_col, range_boundaries(ref)[2])
+
+    def column_widths(self) -> dict[str, int]:
+        """Same rule as the previous auto-fit: longest value + 2, clamped."""
+        lengths: dict[int, int] = {}
+        max_col = self._max_col
+        for cells in self._rows.values():
+            max_col = max(max_col, len(cells))
+            for idx, cell in enumerate(cells, 1):
+                if cell is None or not cell[0]:
+                    continue
+                length = len(str(cell[0]))
+                if length > lengths.get(idx, 0):
+                    lengths[idx] = length
+        return {
+            get_column_letter(idx): min(max(lengths.get(idx, 0) + 2, self.min_width), self.max_width)
+            for idx in range(1, max_col + 1)
+        }
+
+    def flush(self):
+        ws = self.ws
+        for letter, width in self.column_widths().items():
+            ws.column_dimensions[letter].width = width
+        for ref in self._merged:
+            ws.merged_cells.add(ref)
+
+        style_arrays = {}
+        for row_idx in range(1, max(self._rows, default=0) + 1):
+            cells = self._rows.pop(row_idx, None)
+            if not cells:
+                ws.append([])
+                continue
+            out = []
+            for cell in cells:
+                if cell is None:
+                    out.append(None)
+                    continue
+                value, style, number_format = cell
+                if style is None and number_format is None:
+                    out.append(value)
+                    continue
+                key = (style, number_format)
+                written = WriteOnlyCell(ws, value=value)
+                if key not in style_arrays:
+                    if style:
+                        written.style = style
+                    if number_format:
+                        written.number_format = number_format
+                    style_arrays[key] = written._style
+                written._style = copy(style_arrays[key])
+                out.append(written)
+            ws.append(out)
+
+
+def _tagged(filename: str, tag: str | None) -> str:
+    """Insert _tag before the extension of filename."""
+    if not tag:
+        return filename
+    stem, ext = os.path.splitext(filename)
+    return f"{stem}_{tag}{ext}"
+
+
+@contextmanager
+def _atomic_output(path: str):
+    """Open path for binary writing via a temporary file renamed on success,
+    so a failed generation never leaves a truncated export behind."""
+    tmp_path = f"{path}.part"
+    try:
+        with open(tmp_path, "wb") as f:
+            yield f
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+# Snapshot of the project a pack worker process builds workbooks from
+_worker_snapshot: ProjectSnapshot | None = None
+
+
+def _init_pack_worker(snapshot: ProjectSnapshot) -> None:
+    global _worker_snapshot
+    _worker_snapshot = snapshot
+
+
+def _generate_in_worker(tipo: TipoInforme, path: str) -> str:
+    wb, filename = ExcelGeneratorService()._get_generator(tipo)(_worker_snapshot, None)
+    with open(path, "wb") as f:
+        wb.save(f)
+    return filename
+
+
+def _copy_part(path: str, entry) -> None:
+    with open(path, "rb") as part:
+        shutil.copyfileobj(part, entry, 1024 * 1024)
 
 
 class ExcelGeneratorService:
-    def __init__(self, db: Session):
+    def __init__(self, db: Session | None = None):
+        # Without a session only the generators work (pack worker processes)
         self.db = db
 
-    def generate_report(
-        self,
-        project: Project,
-        tipo: TipoInforme,
-        periodo: str | None = None,
-    ) -> tuple[BytesIO, str]:
-        """Generate an Excel report and return the buffer and filename."""
+    def _get_generator(self, tipo: TipoInforme):
         generators = {
             TipoInforme.cuenta_justificativa: self._generate_cuenta_justificativa,
             TipoInforme.ejecucion_presupuestaria: self._generate_ejecucion_presupuestaria,
@@ -39,106 +187,179 @@ class ExcelGeneratorService:
         generator = generators.get(tipo)
         if not generator:
             raise ValueError(f"Tipo de informe no soportado: {tipo}")
+        return generator
 
-        return generator(project, periodo)
+    def generate_report(
+        self,
+        project: Project,
+        tipo: TipoInforme,
+        output_dir: str,
+        periodo: str | None = None,
+        tag: str | None = None,
+    ) -> tuple[str, str]:
+        """Generate an Excel report straight into output_dir and return (path, filename).
+
+        tag, if given, is appended to the filename so that reports built from
+        different data in the same second never share a path."""
+        snapshot = ProjectSnapshotLoader(self.db).load(project.id)
+        wb, filename = self._get_generator(tipo)(snapshot, periodo)
+        filename = _tagged(filename, tag)
+
+        filepath = os.path.join(output_dir, filename)
+        with _atomic_output(filepath) as f:
+            wb.save(f)
+
+        return filepath, filename
 
     def generate_pack(
         self,
         project: Project,
+        output_dir: str,
         tipos: list[TipoInforme] | None = None,
-    ) -> tuple[BytesIO, str]:
-        """Generate a ZIP pack with multiple reports."""
+        on_progress: Callable[[int, int], None] | None = None,
+        workers: int | None = None,
+        tag: str | None = None,
+    ) -> tuple[str, str]:
+        """Generate a ZIP pack with multiple reports, streaming each workbook
+        into its ZIP entry on disk. Returns (path, filename).
+
+        The workbooks are built from one detached snapshot of the project,
+        in a process pool of `workers` (default: report_pack_workers, at most
+        one per CPU). Entries are always written in the order of tipos.
+
+        on_progress(done, total) is called after each workbook; tag is
+        appended to the ZIP filename as in generate_report."""
         if tipos is None:
-            tipos = [
-                TipoInforme.cuenta_justificativa,
-                TipoInforme.ejecucion_presupuestaria,
-                TipoInforme.relacion_transferencias,
-            ]
+            tipos = PACK_TIPOS_DEFECTO
+        if workers is None:
+            workers = min(get_settings().report_pack_workers, os.cpu_count() or 1)
 
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        zip_filename = f"pack_justificacion_{project.codigo_contable}_{timestamp}.zip"
+        snapshot = ProjectSnapshotLoader(self.db).load(project.id)
 
-        zip_buffer = BytesIO()
-        with zipfile.ZipFile(zip_buffer, "w", zipfile.ZIP_DEFLATED) as zip_file:
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        zip_filename = _tagged(f"pack_justificacion_{project.codigo_contable}_{timestamp}.zip", tag)
+        zip_path = os.path.join(output_dir, zip_filename)
+
+        with _atomic_output(zip_path) as f:
+            with zipfile.ZipFile(f, "w", zipfile.ZIP_DEFLATED) as zip_file:
+                workbooks = self._build_workbooks(snapshot, tipos, workers, zip_path)
+                for done, built in enumerate(workbooks, start=1):
+                    if built is not None:
+                        excel_filename, write = built
+                        with zip_file.open(excel_filename, "w", force_zip64=True) as entry:
+                            write(entry)
+                    if on_progress:
+                        on_progress(done, len(tipos))
+
+        return zip_path, zip_filename
+
+    def _build_workbooks(
+        self,
+        snapshot: ProjectSnapshot,
+        tipos: list[TipoInforme],
+        workers: int,
+        work_path: str,
+    ) -> Iterator[tuple[str, Callable] | None]:
+        """Yield (filename, write(fileobj)) for each tipo, in order, or None
+        for a report that failed to generate (it is left out of the pack)."""
+        workers = min(workers, len(tipos))
+        if workers <= 1:
             for tipo in tipos:
                 try:
-                    excel_buffer, excel_filename = self.generate_report(project, tipo)
-                    zip_file.writestr(excel_filename, excel_buffer.getvalue())
+                    wb, filename = self._get_generator(tipo)(snapshot, None)
                 except Exception:
-                    # Skip reports that fail to generate
-                    pass
-
-        zip_buffer.seek(0)
-        return zip_buffer, zip_filename
+                    yield None
+                else:
+                    yield filename, wb.save
+            return
+
+        # Spawn: the parent has threads and open DB connections. Each worker
+        # receives the snapshot once and saves its workbooks to part files
+        part_paths = [f"{work_path}.{i}.part" for i in range(len(tipos))]
+        pool = ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_pack_worker,
+            initargs=(snapshot,),
+        )
+        try:
+            futures = [pool.submit(_generate_in_worker, tipo, path) for tipo, path in zip(tipos, part_paths)]
+            for future, path in zip(futures, part_paths):
+                try:
+                    filename = future.result()
+                except Exception:
+                    yield None
+                else:
+                    yield filename, partial(_copy_part, path)
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
+            for path in part_paths:
+                if os.path.exists(path):
+                    os.remove(path)
 
     # === Common Styles ===
 
-    def _get_header_fill(self, project: Project) -> PatternFill:
+    def _get_header_color(self, project: ProjectSnapshot) -> str:
         """Get the header fill color based on funder."""
         color = "8B1E3F"
-        if project.funder and project.funder.color:
-            color = project.funder.color.lstrip("#")
-        return PatternFill(start_color=color, end_color=color, fill_type="solid")
-
-    def _get_header_font(self) -> Font:
-        """Get the header font style."""
-        return Font(bold=True, color="FFFFFF", size=11)
-
-    def _get_title_font(self) -> Font:
-        """Get the title font style."""
-        return Font(bold=True, size=14)
-
-    def _get_thin_border(self) -> Border:
-        """Get thin border for data cells."""
+        if project.color_financiador:
+            color = project.color_financiador.lstrip("#")
+        return color
+
+    def _new_workbook(self, project: ProjectSnapshot, title: str) -> tuple[Workbook, _SheetBuffer]:
+        """Create a write-only workbook with the shared named styles registered."""
+        wb = Workbook(write_only=True)
+        ws = wb.create_sheet(title)
+
+        color = self._get_header_color(project)
+        header_fill = PatternFill(start_color=color, end_color=color, fill_type="solid")
+        header_font = Font(bold=True, color="FFFFFF", size=11)
         thin = Side(style="thin", color="000000")
-        return Border(left=thin, right=thin, top=thin, bottom=thin)
+        border = Border(left=thin, right=thin, top=thin, bottom=thin)
+
+        for style in (
+            NamedStyle(name=STYLE_TITLE, font=Font(bold=True, size=14)),
+            NamedStyle(name=STYLE_LABEL, font=Font(bold=True)),
+            NamedStyle(name=STYLE_CELL, font=copy(DEFAULT_FONT), border=border),
+            NamedStyle(name=STYLE_LABEL_CELL, font=Font(bold=True), border=border),
+            NamedStyle(name=STYLE_SECTION, font=header_font, fill=header_fill),
+            NamedStyle(
+                name=STYLE_HEADER, font=header_font, fill=header_fill,
+                alignment=Alignment(horizontal="center"), border=border,
+            ),
+        ):
+            wb.add_named_style(style)
 
-    def _add_project_header(self, ws, project: Project, title: str):
+        return wb, _SheetBuffer(ws)
+
+    def _add_project_header(self, sheet: _SheetBuffer, project: ProjectSnapshot, title: str):
         """Add common project header to worksheet."""
         # Title
-        ws["A1"] = title
-        ws["A1"].font = self._get_title_font()
-        ws.merge_cells("A1:G1")
-
-        # Project info
-        ws["A3"] = "Codigo:"
-        ws["B3"] = project.codigo_contable
-        ws["A4"] = "Titulo:"
-        ws["B4"] = project.titulo
-        ws.merge_cells("B4:G4")
-        ws["A5"] = "Financiador:"
-        ws["B5"] = project.financiador
-        ws["D5"] = "Generado:"
-        ws["E5"] = datetime.now().strftime("%d/%m/%Y %H:%M")
-
-        # Bold labels
-        for cell in ["A3", "A4", "A5", "D5"]:
-            ws[cell].font = Font(bold=True)
+        sheet.cell(1, 1, title, STYLE_TITLE)
+        sheet.merge("A1:G1")
+
+        # Project info (bold labels)
+        sheet.cell(3, 1, "Codigo:", STYLE_LABEL)
+        sheet.cell(3, 2, project.codigo_contable)
+        sheet.cell(4, 1, "Titulo:", STYLE_LABEL)
+        sheet.cell(4, 2, project.titulo)
+        sheet.merge("B4:G4")
+        sheet.cell(5, 1, "Financiador:", STYLE_LABEL)
+        sheet.cell(5, 2, project.financiador)
+        sheet.cell(5, 4, "Generado:", STYLE_LABEL)
+        sheet.cell(5, 5, datetime.now().strftime("%d/%m/%Y %H:%M"))
 
         return 7  # Return next available row
 
-    def _auto_column_widths(self, ws, min_width: int = 10, max_width: int = 50):
-        """Auto-adjust column widths based on content."""
-        for column_cells in ws.columns:
-            length = max(
-                len(str(cell.value)) if cell.value else 0
-                for cell in column_cells
-            )
-            adjusted_width = min(max(length + 2, min_width), max_width)
-            column_letter = get_column_letter(column_cells[0].column)
-            ws.column_dimensions[column_letter].width = adjusted_width
-
     # === Report Generators ===
 
     def _generate_cuenta_justificativa(
-        self, project: Project, periodo: str | None = None
-    ) -> tuple[BytesIO, str]:
+        self, project: ProjectSnapshot, periodo: str | None = None
+    ) -> tuple[Workbook, str]:
         """Generate Cuenta Justificativa report - Expense list."""
-        wb = Workbook()
-        ws = wb.active
-        ws.title = "Cuenta Justificativa"
+        wb, sheet = self._new_workbook(project, "Cuenta Justificativa")
 
-        start_row = self._add_project_header(ws, project, "CUENTA JUSTIFICATIVA")
+        start_row = self._add_project_header(sheet, project, "CUENTA JUSTIFICATIVA")
 
         # Column headers
         headers = [
@@ -151,16 +372,8 @@ class ExcelGeneratorService:
             "Ubicacion",
             "Estado",
         ]
-        header_fill = self._get_header_fill(project)
-        header_font = self._get_header_font()
-        border = self._get_thin_border()
-
         for col, header in enumerate(headers, 1):
-            cell = ws.cell(row=start_row, column=col, value=header)
-            cell.fill = header_fill
-            cell.font = header_font
-            cell.alignment = Alignment(horizontal="center")
-            cell.border = border
+            sheet.cell(start_row, col, header, STYLE_HEADER)
 
         # Data rows - only validated/justified expenses
         row = start_row + 1
@@ -171,51 +384,40 @@ class ExcelGeneratorService:
             if expense.estado not in (EstadoGasto.validado, EstadoGasto.justificado):
                 continue
 
-            ws.cell(row=row, column=1, value=expense.fecha_factura.strftime("%d/%m/%Y")).border = border
-            ws.cell(row=row, column=2, value=expense.concepto).border = border
-            ws.cell(row=row, column=3, value=expense.expedidor).border = border
-            ws.cell(row=row, column=4, value=expense.budget_line.name if expense.budget_line else "").border = border
-            ws.cell(row=row, column=5, value=expense.financiado_por).border = border
-
-            importe_cell = ws.cell(row=row, column=6, value=float(expense.cantidad_imputable))
-            importe_cell.number_format = '#,##0.00 "€"'
-            importe_cell.border = border
-
             ubicacion = "España" if expense.ubicacion == UbicacionGasto.espana else "Terreno"
-            ws.cell(row=row, column=7, value=ubicacion).border = border
-            ws.cell(row=row, column=8, value=expense.estado.value.replace("_", " ").title()).border = border
+            sheet.row(row, [
+                (expense.fecha_factura.strftime("%d/%m/%Y"), STYLE_CELL),
+                (expense.concepto, STYLE_CELL),
+                (expense.expedidor, STYLE_CELL),
+                (expense.partida, STYLE_CELL),
+                (expense.financiado_por, STYLE_CELL),
+                (float(expense.cantidad_imputable), STYLE_CELL, EUR_FORMAT),
+                (ubicacion, STYLE_CELL),
+                (expense.estado.value.replace("_", " ").title(), STYLE_CELL),
+            ])
 
             total_importe += expense.cantidad_imputable
             row += 1
 
         # Total row
         row += 1
-        ws.cell(row=row, column=5, value="TOTAL:").font = Font(bold=True)
-        total_cell = ws.cell(row=row, column=6, value=float(total_importe))
-        total_cell.font = Font(bold=True)
-        total_cell.number_format = '#,##0.00 "€"'
+        sheet.cell(row, 5, "TOTAL:", STYLE_LABEL)
+        sheet.cell(row, 6, float(total_importe), STYLE_LABEL, EUR_FORMAT)
 
-        self._auto_column_widths(ws)
-
-        # Save to buffer
-        buffer = BytesIO()
-        wb.save(buffer)
-        buffer.seek(0)
+        sheet.flush()
 
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         filename = f"cuenta_justificativa_{project.codigo_contable}_{timestamp}.xlsx"
 
-        return buffer, filename
+        return wb, filename
 
     def _generate_ejecucion_presupuestaria(
-        self, project: Project, periodo: str | None = None
-    ) -> tuple[BytesIO, str]:
+        self, project: ProjectSnapshot, periodo: str | None = None
+    ) -> tuple[Workbook, str]:
         """Generate Ejecucion Presupuestaria report - Budget execution table."""
-        wb = Workbook()
-        ws = wb.active
-        ws.title = "Ejecucion Presupuestaria"
+        wb, sheet = self._new_workbook(project, "Ejecucion Presupuestaria")
 
-        start_row = self._add_project_header(ws, project, "EJECUCION PRESUPUESTARIA")
+        start_row = self._add_project_header(sheet, project, "EJECUCION PRESUPUESTARIA")
 
         # Column headers
         headers = [
@@ -227,16 +429,8 @@ class ExcelGeneratorService:
             "Diferencia",
             "% Ejecucion",
         ]
-        header_fill = self._get_header_fill(project)
-        header_font = self._get_header_font()
-        border = self._get_thin_border()
-
         for col, header in enumerate(headers, 1):
-            cell = ws.cell(row=start_row, column=col, value=header)
-            cell.fill = header_fill
-            cell.font = header_font
-            cell.alignment = Alignment(horizontal="center")
-            cell.border = border
+            sheet.cell(start_row, col, header, STYLE_HEADER)
 
         # Data rows
         row = start_row + 1
@@ -247,35 +441,20 @@ class ExcelGeneratorService:
             "ejecutado": Decimal("0"),
         }
 
+        # Execution by location, from the ledger
         for budget_line in project.budget_lines:
-            # Calculate execution by location
-            espana = sum(
-                e.cantidad_imputable
-                for e in budget_line.expenses
-                if e.ubicacion == UbicacionGasto.espana
-                and e.estado in (EstadoGasto.validado, EstadoGasto.justificado)
-            )
-            terreno = sum(
-                e.cantidad_imputable
-                for e in budget_line.expenses
-                if e.ubicacion == UbicacionGasto.terreno
-                and e.estado in (EstadoGasto.validado, EstadoGasto.justificado)
-            )
-            ejecutado = espana + terreno
-            aprobado = budget_line.aprobado or Decimal("0")
+            espana = budget_line.ejecutado_espana
+            terreno = budget_line.ejecutado_terreno
+            ejecutado = budget_line.ejecutado
+            aprobado = budget_line.aprobado
             diferencia = aprobado - ejecutado
             porcentaje = (ejecutado / aprobado * 100) if aprobado > 0 else Decimal("0")
 
-            ws.cell(row=row, column=1, value=budget_line.name).border = border
-
-            for col, value in [(2, aprobado), (3, espana), (4, terreno), (5, ejecutado), (6, diferencia)]:
-                cell = ws.cell(row=row, column=col, value=float(value))
-                cell.number_format = '#,##0.00 "€"'
-                cell.border = border
-
-            pct_cell = ws.cell(row=row, column=7, value=float(porcentaje) / 100)
-            pct_cell.number_format = "0.00%"
-            pct_cell.border = border
+            sheet.row(row, [
+                (budget_line.name, STYLE_CELL),
+                *[(float(value), STYLE_CELL, EUR_FORMAT) for value in (aprobado, espana, terreno, ejecutado, diferencia)],
+                (float(porcentaje) / 100, STYLE_CELL, "0.00%"),
+            ])
 
             totals["aprobado"] += aprobado
             totals["espana"] += espana
@@ -285,8 +464,6 @@ class ExcelGeneratorService:
 
         # Total row
         row += 1
-        ws.cell(row=row, column=1, value="TOTAL").font = Font(bold=True)
-
         diferencia_total = totals["aprobado"] - totals["ejecutado"]
         pct_total = (
             totals["ejecutado"] / totals["aprobado"] * 100
@@ -294,41 +471,35 @@ class ExcelGeneratorService:
             else Decimal("0")
         )
 
-        for col, value in [
-            (2, totals["aprobado"]),
-            (3, totals["espana"]),
-            (4, totals["terreno"]),
-            (5, totals["ejecutado"]),
-            (6, diferencia_total),
-        ]:
-            cell = ws.cell(row=row, column=col, value=float(value))
-            cell.font = Font(bold=True)
-            cell.number_format = '#,##0.00 "€"'
-
-        pct_cell = ws.cell(row=row, column=7, value=float(pct_total) / 100)
-        pct_cell.font = Font(bold=True)
-        pct_cell.number_format = "0.00%"
-
-        self._auto_column_widths(ws)
+        sheet.row(row, [
+            ("TOTAL", STYLE_LABEL),
+            *[
+                (float(value), STYLE_LABEL, EUR_FORMAT)
+                for value in (
+                    totals["aprobado"],
+                    totals["espana"],
+                    totals["terreno"],
+                    totals["ejecutado"],
+                    diferencia_total,
+                )
+            ],
+            (float(pct_total) / 100, STYLE_LABEL, "0.00%"),
+        ])
 
-        buffer = BytesIO()
-        wb.save(buffer)
-        buffer.seek(0)
+        sheet.flush()
 
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         filename = f"ejecucion_presupuestaria_{project.codigo_contable}_{timestamp}.xlsx"
 
-        return buffer, filename
+        return wb, filename
 
     def _generate_relacion_transferencias(
-        self, project: Project, periodo: str | None = None
-    ) -> tuple[BytesIO, str]:
+        self, project: ProjectSnapshot, periodo: str | None = None
+    ) -> tuple[Workbook, str]:
         """Generate Relacion de Transferencias report."""
-        wb = Workbook()
-        ws = wb.active
-        ws.title = "Transferencias"
+        wb, sheet = self._new_workbook(project, "Transferencias")
 
-        start_row = self._add_project_header(ws, project, "RELACION DE TRANSFERENCIAS")
+        start_row = self._add_project_header(sheet, project, "RELACION DE TRANSFERENCIAS")
 
         # Column headers
         headers = [
@@ -345,16 +516,8 @@ class ExcelGeneratorService:
             "Cuenta Destino",
             "Estado",
         ]
-        header_fill = self._get_header_fill(project)
-        header_font = self._get_header_font()
-        border = self._get_thin_border()
-
         for col, header in enumerate(headers, 1):
-            cell = ws.cell(row=start_row, column=col, value=header)
-            cell.fill = header_fill
-            cell.font = header_font
-            cell.alignment = Alignment(horizontal="center")
-            cell.border = border
+            sheet.cell(start_row, col, header, STYLE_HEADER)
 
         # Data rows
         row = start_row + 1
@@ -363,51 +526,34 @@ class ExcelGeneratorService:
         total_neto = Decimal("0")
 
         for transfer in project.transfers:
-            ws.cell(row=row, column=1, value=transfer.numero_display).border = border
-
-            # Dates
-            for col, fecha in [
-                (2, transfer.fecha_peticion),
-                (3, transfer.fecha_emision),
-                (4, transfer.fecha_recepcion),
-            ]:
-                cell = ws.cell(
-                    row=row,
-                    column=col,
-                    value=fecha.strftime("%d/%m/%Y") if fecha else "-",
-                )
-                cell.border = border
-
-            # Amounts
-            importe = transfer.importe_euros or Decimal("0")
-            gastos = transfer.gastos_transferencia or Decimal("0")
+            importe = transfer.importe_euros
+            gastos = transfer.gastos_transferencia
             neto = transfer.importe_neto
 
-            for col, value in [(5, importe), (6, gastos), (7, neto)]:
-                cell = ws.cell(row=row, column=col, value=float(value))
-                cell.number_format = '#,##0.00 "€"'
-                cell.border = border
-
             # Exchange rate and local currency
-            tipo_cambio = transfer.tipo_cambio_local or transfer.tipo_cambio_intermedio
-            if tipo_cambio:
-                cell = ws.cell(row=row, column=8, value=float(tipo_cambio))
-                cell.number_format = "0.000000"
+            if transfer.tipo_cambio:
+                tipo_cambio_cell = (float(transfer.tipo_cambio), STYLE_CELL, "0.000000")
             else:
-                ws.cell(row=row, column=8, value="-")
-            ws[f"H{row}"].border = border
-
-            ws.cell(row=row, column=9, value=transfer.moneda_local or "-").border = border
+                tipo_cambio_cell = ("-", STYLE_CELL)
 
             if transfer.importe_moneda_local:
-                cell = ws.cell(row=row, column=10, value=float(transfer.importe_moneda_local))
-                cell.number_format = "#,##0.00"
+                importe_local_cell = (float(transfer.importe_moneda_local), STYLE_CELL, "#,##0.00")
             else:
-                ws.cell(row=row, column=10, value="-")
-            ws[f"J{row}"].border = border
-
-            ws.cell(row=row, column=11, value=transfer.cuenta_destino or "-").border = border
-            ws.cell(row=row, column=12, value=transfer.estado.value.replace("_", " ").title()).border = border
+                importe_local_cell = ("-", STYLE_CELL)
+
+            sheet.row(row, [
+                (transfer.numero_display, STYLE_CELL),
+                *[
+                    (fecha.strftime("%d/%m/%Y") if fecha else "-", STYLE_CELL)
+                    for fecha in (transfer.fecha_peticion, transfer.fecha_emision, transfer.fecha_recepcion)
+                ],
+                *[(float(value), STYLE_CELL, EUR_FORMAT) for value in (importe, gastos, neto)],
+                tipo_cambio_cell,
+                (transfer.moneda_local or "-", STYLE_CELL),
+                importe_local_cell,
+                (transfer.cuenta_destino or "-", STYLE_CELL),
+                (transfer.estado.value.replace("_", " ").title(), STYLE_CELL),
+            ])
 
             total_importe += importe
             total_gastos += gastos
@@ -416,46 +562,34 @@ class ExcelGeneratorService:
 
         # Total row
         row += 1
-        ws.cell(row=row, column=4, value="TOTALES:").font = Font(bold=True)
-
+        sheet.cell(row, 4, "TOTALES:", STYLE_LABEL)
         for col, value in [(5, total_importe), (6, total_gastos), (7, total_neto)]:
-            cell = ws.cell(row=row, column=col, value=float(value))
-            cell.font = Font(bold=True)
-            cell.number_format = '#,##0.00 "€"'
+            sheet.cell(row, col, float(value), STYLE_LABEL, EUR_FORMAT)
 
-        self._auto_column_widths(ws)
-
-        buffer = BytesIO()
-        wb.save(buffer)
-        buffer.seek(0)
+        sheet.flush()
 
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         filename = f"relacion_transferencias_{project.codigo_contable}_{timestamp}.xlsx"
 
-        return buffer, filename
+        return wb, filename
 
     def _generate_ficha_proyecto(
-        self, project: Project, periodo: str | None = None
-    ) -> tuple[BytesIO, str]:
+        self, project: ProjectSnapshot, periodo: str | None = None
+    ) -> tuple[Workbook, str]:
         """Generate Ficha del Proyecto - Executive summary."""
-        wb = Workbook()
-        ws = wb.active
-        ws.title = "Ficha Proyecto"
-
-        header_fill = self._get_header_fill(project)
-        header_font = self._get_header_font()
+        wb, sheet = self._new_workbook(project, "Ficha Proyecto")
 
         # Title
-        ws["A1"] = "FICHA DEL PROYECTO"
-        ws["A1"].font = self._get_title_font()
-        ws.merge_cells("A1:D1")
+        sheet.cell(1, 1, "FICHA DEL PROYECTO", STYLE_TITLE)
+        sheet.merge("A1:D1")
+
+        def section(row: int, title: str):
+            sheet.cell(row, 1, title, STYLE_SECTION)
+            sheet.merge(f"A{row}:D{row}")
 
         # Section: Identification
         row = 3
-        ws.cell(row=row, column=1, value="IDENTIFICACION").font = Font(bold=True)
-        ws.cell(row=row, column=1).fill = header_fill
-        ws.cell(row=row, column=1).font = header_font
-        ws.merge_cells(f"A{row}:D{row}")
+        section(row, "IDENTIFICACION")
 
         info = [
             ("Codigo Contable", project.codigo_contable),
@@ -470,15 +604,11 @@ class ExcelGeneratorService:
 
         for label, value in info:
             row += 1
-            ws.cell(row=row, column=1, value=label).font = Font(bold=True)
-            ws.cell(row=row, column=2, value=value)
+            sheet.row(row, [(label, STYLE_LABEL), (value,)])
 
         # Section: Dates
         row += 2
-        ws.cell(row=row, column=1, value="CRONOGRAMA").font = Font(bold=True)
-        ws.cell(row=row, column=1).fill = header_fill
-        ws.cell(row=row, column=1).font = header_font
-        ws.merge_cells(f"A{row}:D{row}")
+        section(row, "CRONOGRAMA")
 
         dates = [
             ("Fecha Inicio", project.fecha_inicio.strftime("%d/%m/%Y")),
@@ -494,216 +624,143 @@ class ExcelGeneratorService:
 
         for label, value in dates:
             row += 1
-            ws.cell(row=row, column=1, value=label).font = Font(bold=True)
-            ws.cell(row=row, column=2, value=value)
+            sheet.row(row, [(label, STYLE_LABEL), (value,)])
 
         # Section: Financial
         row += 2
-        ws.cell(row=row, column=1, value="FINANCIACION").font = Font(bold=True)
-        ws.cell(row=row, column=1).fill = header_fill
-        ws.cell(row=row, column=1).font = header_font
-        ws.merge_cells(f"A{row}:D{row}")
+        section(row, "FINANCIACION")
 
         # Calculate totals
-        total_aprobado = sum(bl.aprobado or Decimal("0") for bl in project.budget_lines)
-        total_ejecutado = sum(
-            e.cantidad_imputable
-            for e in project.expenses
-            if e.estado in (EstadoGasto.validado, EstadoGasto.justificado)
-        )
+        total_aprobado = sum(bl.aprobado for bl in project.budget_lines)
+        total_ejecutado = project.total_ejecutado_espana + project.total_ejecutado_terreno
         total_transferido = sum(
             t.importe_euros for t in project.transfers if t.estado.value in ("recibida", "cerrada")
         )
 
-        row += 1
-        ws.cell(row=row, column=1, value="Subvencion").font = Font(bold=True)
-        cell = ws.cell(row=row, column=2, value=float(project.subvencion))
-        cell.number_format = '#,##0.00 "€"'
-
-        row += 1
-        ws.cell(row=row, column=1, value="Presupuesto Aprobado").font = Font(bold=True)
-        cell = ws.cell(row=row, column=2, value=float(total_aprobado))
-        cell.number_format = '#,##0.00 "€"'
-
-        row += 1
-        ws.cell(row=row, column=1, value="Total Ejecutado").font = Font(bold=True)
-        cell = ws.cell(row=row, column=2, value=float(total_ejecutado))
-        cell.number_format = '#,##0.00 "€"'
-
-        row += 1
-        ws.cell(row=row, column=1, value="Total Transferido").font = Font(bold=True)
-        cell = ws.cell(row=row, column=2, value=float(total_transferido))
-        cell.number_format = '#,##0.00 "€"'
+        for label, value in [
+            ("Subvencion", project.subvencion),
+            ("Presupuesto Aprobado", total_aprobado),
+            ("Total Ejecutado", total_ejecutado),
+            ("Total Transferido", total_transferido),
+        ]:
+            row += 1
+            sheet.row(row, [(label, STYLE_LABEL), (float(value), None, EUR_FORMAT)])
 
         if total_aprobado > 0:
             row += 1
-            ws.cell(row=row, column=1, value="% Ejecucion").font = Font(bold=True)
             pct = float(total_ejecutado / total_aprobado)
-            cell = ws.cell(row=row, column=2, value=pct)
-            cell.number_format = "0.00%"
+            sheet.row(row, [("% Ejecucion", STYLE_LABEL), (pct, None, "0.00%")])
 
         # Section: ODS
-        if project.ods_objetivos:
+        if project.ods:
             row += 2
-            ws.cell(row=row, column=1, value="ODS").font = Font(bold=True)
-            ws.cell(row=row, column=1).fill = header_fill
-            ws.cell(row=row, column=1).font = header_font
-            ws.merge_cells(f"A{row}:D{row}")
+            section(row, "ODS")
 
-            for ods in project.ods_objetivos:
+            for ods in project.ods:
                 row += 1
-                ws.cell(row=row, column=1, value=f"ODS {ods.numero}")
-                ws.cell(row=row, column=2, value=ods.nombre)
+                sheet.row(row, [(f"ODS {ods.numero}",), (ods.nombre,)])
 
         # Section: Metadata
         row += 2
-        ws.cell(row=row, column=1, value="METADATOS").font = Font(bold=True)
-        ws.cell(row=row, column=1).fill = header_fill
-        ws.cell(row=row, column=1).font = header_font
-        ws.merge_cells(f"A{row}:D{row}")
+        section(row, "METADATOS")
 
         row += 1
-        ws.cell(row=row, column=1, value="Generado").font = Font(bold=True)
-        ws.cell(row=row, column=2, value=datetime.now().strftime("%d/%m/%Y %H:%M"))
-
-        self._auto_column_widths(ws)
+        sheet.row(row, [("Generado", STYLE_LABEL), (datetime.now().strftime("%d/%m/%Y %H:%M"),)])
 
-        buffer = BytesIO()
-        wb.save(buffer)
-        buffer.seek(0)
+        sheet.flush()
 
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         filename = f"ficha_proyecto_{project.codigo_contable}_{timestamp}.xlsx"
 
-        return buffer, filename
+        return wb, filename
 
     def _generate_informe_tecnico(
-        self, project: Project, periodo: str | None = None
-    ) -> tuple[BytesIO, str]:
+        self, project: ProjectSnapshot, periodo: str | None = None
+    ) -> tuple[Workbook, str]:
         """Generate Informe Tecnico Mensual."""
-        wb = Workbook()
-        ws = wb.active
-        ws.title = "Informe Tecnico"
-
-        header_fill = self._get_header_fill(project)
-        header_font = self._get_header_font()
+        wb, sheet = self._new_workbook(project, "Informe Tecnico")
 
-        start_row = self._add_project_header(ws, project, "INFORME TECNICO MENSUAL")
+        start_row = self._add_project_header(sheet, project, "INFORME TECNICO MENSUAL")
         if periodo:
-            ws.cell(row=start_row - 1, column=1, value=f"Periodo: {periodo}").font = Font(bold=True)
+            sheet.cell(start_row - 1, 1, f"Periodo: {periodo}", STYLE_LABEL)
 
         row = start_row + 1
 
         # Activities section
-        ws.cell(row=row, column=1, value="ACTIVIDADES REALIZADAS").fill = header_fill
-        ws.cell(row=row, column=1).font = header_font
-        ws.merge_cells(f"A{row}:G{row}")
+        sheet.cell(row, 1, "ACTIVIDADES REALIZADAS", STYLE_SECTION)
+        sheet.merge(f"A{row}:G{row}")
 
         row += 1
-        headers = ["Resultado", "Actividad", "Estado", "% Avance", "Observaciones"]
-        border = self._get_thin_border()
-
-        for col, header in enumerate(headers, 1):
-            cell = ws.cell(row=row, column=col, value=header)
-            cell.font = Font(bold=True)
-            cell.border = border
+        headers = ["Resultado", "Actividad", "Estado", "Inicio", "Fin"]
+        sheet.row(row, [(header, STYLE_LABEL_CELL) for header in headers])
 
         row += 1
-        if project.logical_framework:
-            for so in project.logical_framework.specific_objectives:
-                for result in so.results:
-                    for activity in result.activities:
-                        ws.cell(row=row, column=1, value=result.codigo).border = border
-                        ws.cell(row=row, column=2, value=activity.descripcion).border = border
-                        ws.cell(row=row, column=3, value=activity.estado.value.replace("_", " ").title()).border = border
-
-                        pct_cell = ws.cell(row=row, column=4, value=float(activity.porcentaje_avance or 0) / 100)
-                        pct_cell.number_format = "0%"
-                        pct_cell.border = border
-
-                        ws.cell(row=row, column=5, value=activity.observaciones or "").border = border
-                        row += 1
+        for result in project.results:
+            for activity in result.activities:
+                sheet.row(row, [
+                    (result.numero, STYLE_CELL),
+                    (f"{activity.numero} {activity.descripcion}", STYLE_CELL),
+                    (activity.estado.value.replace("_", " ").title(), STYLE_CELL),
+                    *[
+                        (fecha.strftime("%d/%m/%Y") if fecha else "-", STYLE_CELL)
+                        for fecha in (activity.fecha_inicio, activity.fecha_fin)
+                    ],
+                ])
+                row += 1
 
         # Indicators section
         row += 2
-        ws.cell(row=row, column=1, value="INDICADORES").fill = header_fill
-        ws.cell(row=row, column=1).font = header_font
-        ws.merge_cells(f"A{row}:G{row}")
+        sheet.cell(row, 1, "INDICADORES", STYLE_SECTION)
+        sheet.merge(f"A{row}:G{row}")
 
         row += 1
         headers = ["Indicador", "Meta", "Logrado", "% Cumplimiento", "Fuente"]
-        for col, header in enumerate(headers, 1):
-            cell = ws.cell(row=row, column=col, value=header)
-            cell.font = Font(bold=True)
-            cell.border = border
+        sheet.row(row, [(header, STYLE_LABEL_CELL) for header in headers])
 
         row += 1
-        if project.logical_framework:
-            for so in project.logical_framework.specific_objectives:
-                for result in so.results:
-                    for indicator in result.indicators:
-                        ws.cell(row=row, column=1, value=indicator.descripcion).border = border
-                        ws.cell(row=row, column=2, value=float(indicator.meta or 0)).border = border
-                        ws.cell(row=row, column=3, value=float(indicator.logrado or 0)).border = border
-
-                        if indicator.meta and indicator.meta > 0:
-                            pct = float(indicator.logrado or 0) / float(indicator.meta)
-                            pct_cell = ws.cell(row=row, column=4, value=pct)
-                            pct_cell.number_format = "0%"
-                        else:
-                            ws.cell(row=row, column=4, value="-")
-                        ws[f"D{row}"].border = border
-
-                        ws.cell(row=row, column=5, value=indicator.fuente_verificacion or "").border = border
-                        row += 1
-
-        self._auto_column_widths(ws)
-
-        buffer = BytesIO()
-        wb.save(buffer)
-        buffer.seek(0)
+        for result in project.results:
+            for indicator in result.indicators:
+                # Metas y valores son texto libre; el porcentaje ya viene calculado
+                if indicator.porcentaje_cumplimiento is not None:
+                    pct_cell = (float(indicator.porcentaje_cumplimiento) / 100, STYLE_CELL, "0%")
+                else:
+                    pct_cell = ("-", STYLE_CELL)
+
+                sheet.row(row, [
+                    (f"{indicator.codigo} {indicator.descripcion}", STYLE_CELL),
+                    (indicator.valor_meta or "-", STYLE_CELL),
+                    (indicator.valor_actual or "-", STYLE_CELL),
+                    pct_cell,
+                    (indicator.fuente_verificacion or "", STYLE_CELL),
+                ])
+                row += 1
+
+        sheet.flush()
 
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         periodo_suffix = f"_{periodo}" if periodo else ""
         filename = f"informe_tecnico_{project.codigo_contable}{periodo_suffix}_{timestamp}.xlsx"
 
-        return buffer, filename
+        return wb, filename
 
     def _generate_informe_economico(
-        self, project: Project, periodo: str | None = None
-    ) -> tuple[BytesIO, str]:
+        self, project: ProjectSnapshot, periodo: str | None = None
+    ) -> tuple[Workbook, str]:
         """Generate Informe Economico."""
-        wb = Workbook()
-        ws = wb.active
-        ws.title = "Informe Economico"
-
-        start_row = self._add_project_header(ws, project, "INFORME ECONOMICO")
+        wb, sheet = self._new_workbook(project, "Informe Economico")
 
-        header_fill = self._get_header_fill(project)
-        header_font = self._get_header_font()
-        border = self._get_thin_border()
+        start_row = self._add_project_header(sheet, project, "INFORME ECONOMICO")
 
         row = start_row
 
         # Summary section
-        ws.cell(row=row, column=1, value="RESUMEN FINANCIERO").fill = header_fill
-        ws.cell(row=row, column=1).font = header_font
-        ws.merge_cells(f"A{row}:D{row}")
+        sheet.cell(row, 1, "RESUMEN FINANCIERO", STYLE_SECTION)
+        sheet.merge(f"A{row}:D{row}")
 
         # Calculate totals
-        total_aprobado = sum(bl.aprobado or Decimal("0") for bl in project.budget_lines)
-        total_ejecutado_espana = sum(
-            e.cantidad_imputable
-            for e in project.expenses
-            if e.ubicacion == UbicacionGasto.espana
-            and e.estado in (EstadoGasto.validado, EstadoGasto.justificado)
-        )
-        total_ejecutado_terreno = sum(
-            e.cantidad_imputable
-            for e in project.expenses
-            if e.ubicacion == UbicacionGasto.terreno
-            and e.estado in (EstadoGasto.validado, EstadoGasto.justificado)
-        )
+        total_aprobado = sum(bl.aprobado for bl in project.budget_lines)
+        total_ejecutado_espana = project.total_ejecutado_espana
+        total_ejecutado_terreno = project.total_ejecutado_terreno
         total_ejecutado = total_ejecutado_espana + total_ejecutado_terreno
         total_transferido = sum(t.importe_euros for t in project.transfers)
         total_recibido = sum(
@@ -722,78 +779,54 @@ class ExcelGeneratorService:
 
         for label, value in summary:
             row += 1
-            ws.cell(row=row, column=1, value=label).font = Font(bold=True)
-            cell = ws.cell(row=row, column=2, value=float(value))
-            cell.number_format = '#,##0.00 "€"'
+            sheet.row(row, [(label, STYLE_LABEL), (float(value), None, EUR_FORMAT)])
 
         # Execution by budget line
         row += 2
-        ws.cell(row=row, column=1, value="EJECUCION POR PARTIDA").fill = header_fill
-        ws.cell(row=row, column=1).font = header_font
-        ws.merge_cells(f"A{row}:D{row}")
+        sheet.cell(row, 1, "EJECUCION POR PARTIDA", STYLE_SECTION)
+        sheet.merge(f"A{row}:D{row}")
 
         row += 1
         headers = ["Partida", "Aprobado", "Ejecutado", "Disponible", "% Ejec."]
-        for col, header in enumerate(headers, 1):
-            cell = ws.cell(row=row, column=col, value=header)
-            cell.font = Font(bold=True)
-            cell.border = border
+        sheet.row(row, [(header, STYLE_LABEL_CELL) for header in headers])
 
         row += 1
         for bl in project.budget_lines:
-            aprobado = bl.aprobado or Decimal("0")
-            ejecutado = sum(
-                e.cantidad_imputable
-                for e in bl.expenses
-                if e.estado in (EstadoGasto.validado, EstadoGasto.justificado)
-            )
+            aprobado = bl.aprobado
+            ejecutado = bl.ejecutado
             disponible = aprobado - ejecutado
-
-            ws.cell(row=row, column=1, value=bl.name).border = border
-
-            for col, value in [(2, aprobado), (3, ejecutado), (4, disponible)]:
-                cell = ws.cell(row=row, column=col, value=float(value))
-                cell.number_format = '#,##0.00 "€"'
-                cell.border = border
-
             pct = float(ejecutado / aprobado) if aprobado > 0 else 0
-            pct_cell = ws.cell(row=row, column=5, value=pct)
-            pct_cell.number_format = "0%"
-            pct_cell.border = border
 
+            sheet.row(row, [
+                (bl.name, STYLE_CELL),
+                *[(float(value), STYLE_CELL, EUR_FORMAT) for value in (aprobado, ejecutado, disponible)],
+                (pct, STYLE_CELL, "0%"),
+            ])
             row += 1
 
         # Recent expenses
         row += 2
-        ws.cell(row=row, column=1, value="ULTIMOS GASTOS REGISTRADOS").fill = header_fill
-        ws.cell(row=row, column=1).font = header_font
-        ws.merge_cells(f"A{row}:D{row}")
+        sheet.cell(row, 1, "ULTIMOS GASTOS REGISTRADOS", STYLE_SECTION)
+        sheet.merge(f"A{row}:D{row}")
 
         row += 1
         headers = ["Fecha", "Concepto", "Importe", "Estado"]
-        for col, header in enumerate(headers, 1):
-            cell = ws.cell(row=row, column=col, value=header)
-            cell.font = Font(bold=True)
-            cell.border = border
+        sheet.row(row, [(header, STYLE_LABEL_CELL) for header in headers])
 
         row += 1
         recent_expenses = sorted(project.expenses, key=lambda e: e.fecha_factura, reverse=True)[:10]
         for expense in recent_expenses:
-            ws.cell(row=row, column=1, value=expense.fecha_factura.strftime("%d/%m/%Y")).border = border
-            ws.cell(row=row, column=2, value=expense.concepto[:50]).border = border
-            cell = ws.cell(row=row, column=3, value=float(expense.cantidad_imputable))
-            cell.number_format = '#,##0.00 "€"'
-            cell.border = border
-            ws.cell(row=row, column=4, value=expense.estado.value.replace("_", " ").title()).border = border
+            sheet.row(row, [
+                (expense.fecha_factura.strftime("%d/%m/%Y"), STYLE_CELL),
+                (expense.concepto[:50], STYLE_CELL),
+                (float(expense.cantidad_imputable), STYLE_CELL, EUR_FORMAT),
+                (expense.estado.value.replace("_", " ").title(), STYLE_CELL),
+            ])
             row += 1
 
-        self._auto_column_widths(ws)
-
-        buffer = BytesIO()
-        wb.save(buffer)
-        buffer.seek(0)
+        sheet.flush()
 
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         filename = f"informe_economico_{project.codigo_contable}_{timestamp}.xlsx"
 
-        return buffer, filename
+        return wb, filename
@@ -0,0 +1,362 @@
+"""Libro de ejecucion presupuestaria.
+
+Guarda los totales ejecutados por partida, ubicacion y fuente de financiacion
+(tabla budget_execution_ledger) y los actualiza en la misma transaccion que
+cada cambio de estado de un gasto. Los informes y resumenes leen de aqui en
+lugar de recorrer los gastos; ProjectBudgetLine.ejecutado_espana/terreno se
+mantiene como proyeccion del libro.
+"""
+from decimal import Decimal
+from sqlalchemy import select, func, delete, type_coerce, Numeric
+from sqlalchemy.orm import Session
+
+from app.models.expense import Expense, EstadoGasto, UbicacionGasto
+from app.models.budget import ProjectBudgetLine
+from app.models.execution_ledger import EjecucionPartida
+
+
+# Estados que cuentan como ejecutado
+EXECUTED_STATES = (EstadoGasto.validado, EstadoGasto.justificado)
+
+# Diferencia maxima admitida al conciliar (redondeo a centimos)
+TOLERANCE = Decimal("0.01")
+
+# cantidad_euros (2 dec.) x porcentaje (2 dec.) / 100: precision exacta de cantidad_imputable
+IMPORTE_EXP = Decimal("0.0001")
+
+
+class ExecutionLedgerService:
+    def __init__(self, db: Session):
+        self.db = db
+
+    # ---- Actualizacion incremental (sin commit: va en la transaccion del llamador) ----
+
+    def record_state_change(self, expense: Expense, previous_estado: EstadoGasto) -> None:
+        """Registra el paso de un gasto de previous_estado a expense.estado."""
+        was_executed = previous_estado in EXECUTED_STATES
+        is_executed = expense.estado in EXECUTED_STATES
+        if was_executed and not is_executed:
+            self._apply(expense, -1)
+        elif is_executed and not was_executed:
+            self._apply(expense, 1)
+
+    def record_removal(self, expense: Expense) -> None:
+        """Descuenta un gasto que se va a borrar."""
+        if expense.estado in EXECUTED_STATES:
+            self._apply(expense, -1)
+
+    def set_line_executed(
+        self, line: ProjectBudgetLine, ubicacion: UbicacionGasto, importe: Decimal
+    ) -> None:
+        """Fija a mano el ejecutado de una partida en una ubicacion.
+
+        La diferencia con lo que aportan los gastos queda como fila de ajuste."""
+        from_expenses = self.db.execute(
+            select(func.coalesce(func.sum(EjecucionPartida.importe), 0))
+            .where(
+                EjecucionPartida.budget_line_id == line.id,
+                EjecucionPartida.ubicacion == ubicacion,
+                EjecucionPartida.es_ajuste.is_(False),
+            )
+        ).scalar()
+        row = self._get_row(line.project_id, line.id, ubicacion, None, es_ajuste=True)
+        row.importe = Decimal(importe) - Decimal(from_expenses)
+        self._sync_line(line, ubicacion)
+
+    def _apply(self, expense: Expense, sign: int) -> None:
+        row = self._get_row(
+            expense.project_id, expense.budget_line_id, expense.ubicacion, expense.funding_source_id
+        )
+        row.importe = (row.importe or Decimal("0")) + sign * expense.cantidad_imputable
+        row.num_gastos = (row.num_gastos or 0) + sign
+
+        line = self.db.get(ProjectBudgetLine, expense.budget_line_id)
+        if line:
+            self._sync_line(line, expense.ubicacion)
+
+    def _get_row(
+        self,
+        project_id: int,
+        budget_line_id: int,
+        ubicacion: UbicacionGasto,
+        funding_source_id: int | None,
+        es_ajuste: bool = False,
+    ) -> EjecucionPartida:
+        query = select(EjecucionPartida).where(
+            EjecucionPartida.budget_line_id == budget_line_id,
+            EjecucionPartida.ubicacion == ubicacion,
+            EjecucionPartida.es_ajuste.is_(es_ajuste),
+        )
+        if funding_source_id is None:
+            query = query.where(EjecucionPartida.funding_source_id.is_(None))
+        else:
+            query = query.where(EjecucionPartida.funding_source_id == funding_source_id)
+
+        row = self.db.execute(query).scalar_one_or_none()
+        if row is None:
+            row = EjecucionPartida(
+                project_id=project_id,
+                budget_line_id=budget_line_id,
+                ubicacion=ubicacion,
+                funding_source_id=funding_source_id,
+                es_ajuste=es_ajuste,
+                importe=Decimal("0"),
+                num_gastos=0,
+            )
+            self.db.add(row)
+        return row
+
+    def _sync_line(self, line: ProjectBudgetLine, ubicacion: UbicacionGasto) -> None:
+        """Recalcula la columna ejecutado_* de la partida a partir del libro."""
+        self.db.flush()
+        total = self.db.execute(
+            select(func.coalesce(func.sum(EjecucionPartida.importe), 0))
+            .where(
+                EjecucionPartida.budget_line_id == line.id,
+                EjecucionPartida.ubicacion == ubicacion,
+            )
+        ).scalar()
+        if ubicacion == UbicacionGasto.espana:
+            line.ejecutado_espana = Decimal(total)
+        else:
+            line.ejecutado_terreno = Decimal(total)
+        self.db.flush()
+
+    # ---- Lectura ----
+
+    def get_line_totals(self, project_id: int) -> dict[int, dict[UbicacionGasto, Decimal]]:
+        """Ejecutado por partida y ubicacion (incluye ajustes manuales)."""
+        rows = self.db.execute(
+            select(
+                EjecucionPartida.budget_line_id,
+                EjecucionPartida.ubicacion,
+                func.sum(EjecucionPartida.importe),
+            )
+            .where(EjecucionPartida.project_id == project_id)
+            .group_by(EjecucionPartida.budget_line_id, EjecucionPartida.ubicacion)
+        ).all()
+
+        totals: dict[int, dict[UbicacionGasto, Decimal]] = {}
+        for line_id, ubicacion, importe in rows:
+            line_totals = totals.setdefault(
+                line_id, {UbicacionGasto.espana: Decimal("0"), UbicacionGasto.terreno: Decimal("0")}
+            )
+            line_totals[ubicacion] = Decimal(importe or 0)
+        return totals
+
+    def get_location_totals(
+        self, project_id: int, include_adjustments: bool = True
+    ) -> dict[UbicacionGasto, Decimal]:
+        """Ejecutado del proyecto por ubicacion."""
+        query = (
+            select(EjecucionPartida.ubicacion, func.sum(EjecucionPartida.importe))
+            .where(EjecucionPartida.project_id == project_id)
+            .group_by(EjecucionPartida.ubicacion)
+        )
+        if not include_adjustments:
+            query = query.where(EjecucionPartida.es_ajuste.is_(False))
+
+        totals = {UbicacionGasto.espana: Decimal("0"), UbicacionGasto.terreno: Decimal("0")}
+        for ubicacion, importe in self.db.execute(query).all():
+            totals[ubicacion] = Decimal(importe or 0)
+        return totals
+
+    def get_funding_source_totals(self, project_id: int) -> dict[int, Decimal]:
+        """Ejecutado por fuente de financiacion (solo gastos con fuente asignada)."""
+        rows = self.db.execute(
+            select(EjecucionPartida.funding_source_id, func.sum(EjecucionPartida.importe))
+            .where(
+                EjecucionPartida.project_id == project_id,
+                EjecucionPartida.es_ajuste.is_(False),
+                EjecucionPartida.funding_source_id.isnot(None),
+            )
+            .group_by(EjecucionPartida.funding_source_id)
+        ).all()
+        return {source_id: Decimal(importe or 0) for source_id, importe in rows}
+
+    # ---- Conciliacion con los gastos ----
+
+    def _expense_totals(self, project_id: int | None = None) -> dict[tuple, tuple[Decimal, int]]:
+        """Totales calculados directamente sobre los gastos, con la clave del libro."""
+        query = (
+            select(
+                Expense.project_id,
+                Expense.budget_line_id,
+                Expense.ubicacion,
+                Expense.funding_source_id,
+                # Con el tipo de cantidad_euros, Numeric(12,2), la suma llegaria redondeada a centimos
+                type_coerce(func.sum(Expense.cantidad_euros * Expense.porcentaje / 100), Numeric(18, 6)),
+                func.count(Expense.id),
+            )
+            .where(Expense.estado.in_(EXECUTED_STATES))
+            .group_by(
+                Expense.project_id, Expense.budget_line_id, Expense.ubicacion, Expense.funding_source_id
+            )
+        )
+        if project_id is not None:
+            query = query.where(Expense.project_id == project_id)
+
+        return {
+            (pid, line_id, ubicacion, source_id): (Decimal(importe or 0).quantize(IMPORTE_EXP), count)
+            for pid, line_id, ubicacion, source_id, importe, count in self.db.execute(query).all()
+        }
+
+    def verify(self, project_id: int | None = None) -> list[dict]:
+        """Compara el libro con los gastos y con las columnas de las partidas.
+
+        Las filas de gastos deben coincidir con la suma exacta de
+        cantidad_imputable; las columnas ejecutado_*, redondeadas a centimos,
+        con TOLERANCE. Devuelve la lista de discrepancias (vacia si todo cuadra)."""
+        issues = []
+
+        expected = self._expense_totals(project_id)
+        query = select(EjecucionPartida).where(EjecucionPartida.es_ajuste.is_(False))
+        if project_id is not None:
+            query = query.where(EjecucionPartida.project_id == project_id)
+        ledger = {
+            (row.project_id, row.budget_line_id, row.ubicacion, row.funding_source_id): (
+                row.importe or Decimal("0"), row.num_gastos or 0
+            )
+            for row in self.db.execute(query).scalars()
+        }
+
+        for key in sorted(set(expected) | set(ledger), key=lambda k: (k[0], k[1], k[2].value, k[3] or 0)):
+            exp_importe, exp_count = expected.get(key, (Decimal("0"), 0))
+            led_importe, led_count = ledger.get(key, (Decimal("0"), 0))
+            if led_importe.quantize(IMPORTE_EXP) != exp_importe or exp_count != led_count:
+                pid, line_id, ubicacion, source_id = key
+                issues.append({
+                    "tipo": "gastos",
+                    "project_id": pid,
+                    "budget_line_id": line_id,
+                    "ubicacion": ubicacion.value,
+                    "funding_source_id": source_id,
+                    "esperado": exp_importe,
+                    "libro": led_importe,
+                    "gastos_esperados": exp_count,
+                    "gastos_libro": led_count,
+                })
+
+        # Columnas ejecutado_* frente a la suma del libro (ajustes incluidos)
+        sums = select(
+            EjecucionPartida.budget_line_id,
+            EjecucionPartida.ubicacion,
+            func.sum(EjecucionPartida.importe),
+        ).group_by(EjecucionPartida.budget_line_id, EjecucionPartida.ubicacion)
+        lines = select(ProjectBudgetLine)
+        if project_id is not None:
+            sums = sums.where(EjecucionPartida.project_id == project_id)
+            lines = lines.where(ProjectBudgetLine.project_id == project_id)
+        ledger_sums = {
+            (line_id, ubicacion): Decimal(importe or 0)
+            for line_id, ubicacion, importe in self.db.execute(sums).all()
+        }
+        for line in self.db.execute(lines).scalars():
+            for ubicacion, column in (
+                (UbicacionGasto.espana, line.ejecutado_espana),
+                (UbicacionGasto.terreno, line.ejecutado_terreno),
+            ):
+                in_ledger = ledger_sums.get((line.id, ubicacion), Decimal("0"))
+                if abs((column or Decimal("0")) - in_ledger) >= TOLERANCE:
+                    issues.append({
+                        "tipo": "partida",
+                        "project_id": line.project_id,
+                        "budget_line_id": line.id,
+                        "ubicacion": ubicacion.value,
+                        "funding_source_id": None,
+                        "esperado": in_ledger,
+                        "libro": column,
+                    })
+
+        return issues
+
+    def rebuild(self, project_id: int | None = None, reset_adjustments: bool = False) -> int:
+        """Reconstruye el libro desde los gastos y reproyecta las columnas.
+
+        Los ajustes manuales se conservan salvo reset_adjustments=True.
+        Devuelve el numero de filas de gastos generadas."""
+        stmt = delete(EjecucionPartida)
+        if not reset_adjustments:
+            stmt = stmt.where(EjecucionPartida.es_ajuste.is_(False))
+        if project_id is not None:
+            stmt = stmt.where(EjecucionPartida.project_id == project_id)
+        self.db.execute(stmt)
+
+        totals = self._expense_totals(project_id)
+        for (pid, line_id, ubicacion, source_id), (importe, count) in totals.items():
+            self.db.add(EjecucionPartida(
+                project_id=pid,
+                budget_line_id=line_id,
+                ubicacion=ubicacion,
+                funding_source_id=source_id,
+                es_ajuste=False,
+                importe=importe,
+                num_gastos=count,
+            ))
+        self.db.flush()
+
+        lines = select(ProjectBudgetLine)
+        if project_id is not None:
+            lines = lines.where(ProjectBudgetLine.project_id == project_id)
+        for line in self.db.execute(lines).scalars().all():
+            self._sync_line(line, UbicacionGasto.espana)
+            self._sync_line(line, UbicacionGasto.terreno)
+
+        self.db.commit()
+        return len(totals)
+
+    def initialize_missing(self) -> list[int]:
+        """Crea el libro de los proyectos que aun no lo tienen.
+
+        Lo que hubiera en ejecutado_* por encima de los gastos (importes
+        introducidos a mano) se conserva como fila de ajuste. Hace commit: es
+        para scripts/budget_ledger.py; la migracion 15 tiene su propia copia."""
+        with_ledger = select(EjecucionPartida.project_id).distinct()
+        project_ids = self.db.execute(
+            select(ProjectBudgetLine.project_id)
+            .where(ProjectBudgetLine.project_id.not_in(with_ledger))
+            .distinct()
+        ).scalars().all()
+
+        for pid in project_ids:
+            totals = self._expense_totals(pid)
+            from_expenses: dict[tuple[int, UbicacionGasto], Decimal] = {}
+            for (_, line_id, ubicacion, source_id), (importe, count) in totals.items():
+                self.db.add(EjecucionPartida(
+                    project_id=pid,
+                    budget_line_id=line_id,
+                    ubicacion=ubicacion,
+                    funding_source_id=source_id,
+                    es_ajuste=False,
+                    importe=importe,
+                    num_gastos=count,
+                ))
+                key = (line_id, ubicacion)
+                from_expenses[key] = from_expenses.get(key, Decimal("0")) + importe
+
+            lines = self.db.execute(
+                select(ProjectBudgetLine).where(ProjectBudgetLine.project_id == pid)
+            ).scalars().all()
+            for line in lines:
+                for ubicacion, column in (
+                    (UbicacionGasto.espana, line.ejecutado_espana),
+                    (UbicacionGasto.terreno, line.ejecutado_terreno),
+                ):
+                    diff = (column or Decimal("0")) - from_expenses.get((line.id, ubicacion), Decimal("0"))
+                    if abs(diff) >= TOLERANCE:
+                        self.db.add(EjecucionPartida(
+                            project_id=pid,
+                            budget_line_id=line.id,
+                            ubicacion=ubicacion,
+                            funding_source_id=None,
+                            es_ajuste=True,
+                            importe=diff,
+                            num_gastos=0,
+                        ))
+            self.db.flush()
+            for line in lines:
+                self._sync_line(line, UbicacionGasto.espana)
+                self._sync_line(line, UbicacionGasto.terreno)
+
+        self.db.commit()
+        return list(project_ids)
@@ -2,13 +2,14 @@ import os
 import shutil
 from datetime import datetime
 from decimal import Decimal
-from sqlalchemy import select, func
+from sqlalchemy import select, func, type_coerce, Numeric
 from sqlalchemy.orm import Session
 from fastapi import UploadFile
 
 from app.models.expense import Expense, UbicacionGasto, EstadoGasto
 from app.models.budget import ProjectBudgetLine
 from app.models.project import Project
+from app.services.execution_ledger_service import ExecutionLedgerService
 from app.schemas.expense import (
     ExpenseCreate,
     ExpenseUpdate,
@@ -18,9 +19,14 @@ from app.schemas.expense import (
 )
 
 
+# cantidad_euros (2 dec.) x porcentaje (2 dec.) / 100
+IMPORTE_IMPUTABLE_EXP = Decimal("0.0001")
+
+
 class ExpenseService:
     def __init__(self, db: Session):
         self.db = db
+        self.ledger = ExecutionLedgerService(db)
 
     # CRUD Operations
     def get_project_expenses(
@@ -112,9 +118,8 @@ class ExpenseService:
         if not expense:
             return False
 
-        # If expense was validated, revert budget
-        if expense.estado == EstadoGasto.validado:
-            self._update_budget_line_executed(expense, add=False)
+        # If expense counted as executed, take it out of the ledger
+        self.ledger.record_removal(expense)
 
         # Delete associated document if exists
         if expense.documento_path:
@@ -151,11 +156,10 @@ class ExpenseService:
         if not expense.documento_path:
             raise ValueError("Debe adjuntar un justificante (factura) para validar este gasto")
 
-        # Update budget line executed amount
-        self._update_budget_line_executed(expense, add=True)
-
+        previous = expense.estado
         expense.estado = EstadoGasto.validado
         expense.fecha_revision = datetime.utcnow()
+        self.ledger.record_state_change(expense, previous)
         self.db.commit()
         self.db.refresh(expense)
         return expense
@@ -166,14 +170,12 @@ class ExpenseService:
         if not expense:
             return None
 
-        # If was validated, revert budget
-        if expense.estado == EstadoGasto.validado:
-            self._update_budget_line_executed(expense, add=False)
-
+        previous = expense.estado
         expense.estado = EstadoGasto.rechazado
         expense.fecha_revision = datetime.utcnow()
         if reason:
             expense.observaciones = reason
+        self.ledger.record_state_change(expense, previous)
         self.db.commit()
         self.db.refresh(expense)
         return expense
@@ -188,6 +190,7 @@ class ExpenseService:
             raise ValueError("Solo se pueden justificar gastos validados")
 
         expense.estado = EstadoGasto.justificado
+        self.ledger.record_state_change(expense, EstadoGasto.validado)
         self.db.commit()
         self.db.refresh(expense)
         return expense
@@ -198,34 +201,15 @@ class ExpenseService:
         if not expense:
             return None
 
-        # If was validated, revert budget
-        if expense.estado == EstadoGasto.validado:
-            self._update_budget_line_executed(expense, add=False)
-
+        previous = expense.estado
         expense.estado = EstadoGasto.borrador
         expense.fecha_revision = None
+        self.ledger.record_state_change(expense, previous)
         self.db.commit()
         self.db.refresh(expense)
         return expense
 
     # Budget Integration
-    def _update_budget_line_executed(self, expense: Expense, add: bool = True) -> None:
-        """Update budget line executed amount based on expense location"""
-        budget_line = self.db.get(ProjectBudgetLine, expense.budget_line_id)
-        if not budget_line:
-            return
-
-        amount = expense.cantidad_imputable
-        if not add:
-            amount = -amount
-
-        if expense.ubicacion == UbicacionGasto.espana:
-            budget_line.ejecutado_espana += amount
-        else:
-            budget_line.ejecutado_terreno += amount
-
-        self.db.flush()
-
     def get_budget_lines_with_balance(self, project_id: int) -> list[BudgetLineBalance]:
         """Get budget lines with available balance for expense creation"""
         query = (
@@ -299,34 +283,43 @@ class ExpenseService:
 
     # Summary
     def get_expense_summary(self, project_id: int) -> ExpenseSummary:
-        """Get expense summary statistics for a project"""
-        expenses = self.get_project_expenses(project_id)
+        """Get expense summary statistics for a project (one grouped aggregate)"""
+        rows = self.db.execute(
+            select(
+                Expense.estado,
+                Expense.ubicacion,
+                func.count(Expense.id),
+                # Numeric(12,2) of cantidad_euros would round each sum to cents
+                type_coerce(func.sum(Expense.cantidad_euros * Expense.porcentaje / 100), Numeric(18, 6)),
+            )
+            .where(Expense.project_id == project_id)
+            .group_by(Expense.estado, Expense.ubicacion)
+        ).all()
 
         summary = ExpenseSummary()
-        summary.total_registrados = len(expenses)
-
-        for expense in expenses:
-            # Count by estado
-            if expense.estado == EstadoGasto.borrador:
-                summary.total_borradores += 1
-            elif expense.estado == EstadoGasto.pendiente_revision:
-                summary.total_pendientes += 1
-            elif expense.estado == EstadoGasto.validado:
-                summary.total_validados += 1
-            elif expense.estado == EstadoGasto.rechazado:
-                summary.total_rechazados += 1
-            elif expense.estado == EstadoGasto.justificado:
-                summary.total_justificados += 1
-
-            # Sum amounts
-            summary.importe_total += expense.cantidad_imputable
-
-            if expense.estado in (EstadoGasto.validado, EstadoGasto.justificado):
-                summary.importe_validado += expense.cantidad_imputable
-
-            if expense.ubicacion == UbicacionGasto.espana:
-                summary.importe_espana += expense.cantidad_imputable
+        count_fields = {
+            EstadoGasto.borrador: "total_borradores",
+            EstadoGasto.pendiente_revision: "total_pendientes",
+            EstadoGasto.validado: "total_validados",
+            EstadoGasto.rechazado: "total_rechazados",
+            EstadoGasto.justificado: "total_justificados",
+        }
+
+        for estado, ubicacion, count, importe in rows:
+            # Same precision as summing Expense.cantidad_imputable
+            importe = Decimal(str(importe or 0)).quantize(IMPORTE_IMPUTABLE_EXP)
+
+            summary.total_registrados += count
+            field = count_fields[estado]
+            setattr(summary, field, getattr(summary, field) + count)
+
+            summary.importe_total += importe
+            if estado in (EstadoGasto.validado, EstadoGasto.justificado):
+                summary.importe_validado += importe
+
+            if ubicacion == UbicacionGasto.espana:
+                summary.importe_espana += importe
             else:
-                summary.importe_terreno += expense.cantidad_imputable
+                summary.importe_terreno += importe
 
         return summary
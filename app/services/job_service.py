@@ -0,0 +1,354 @@
+"""Cola de trabajos de generacion (informes, packs y Anexo II A).
+
+Los endpoints crean una fila GenerationJob y devuelven su id al momento; un
+pool de hilos la ejecuta con su propia sesion de BD. El Report solo se crea
+cuando el trabajo termina bien.
+
+Cada trabajo en curso guarda el proceso que lo ejecuta (WORKER_ID) y un latido
+que ese proceso renueva. Con varios workers de uvicorn, o en un reinicio
+escalonado, solo se reencolan los trabajos cuyo proceso ha muerto o que llevan
+report_job_stale_seconds sin latido, nunca los que otro proceso sigue generando.
+"""
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, select, update
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.database import SessionLocal
+from app.models.job import GenerationJob, TipoTrabajo, EstadoTrabajo
+from app.models.report import Report, TipoInforme
+from app.models.user import User
+from app.models.audit_log import ActorType, AccionAuditoria
+from app.services.audit_service import AuditService
+from app.services.report_service import ReportService
+from app.services.aacid_service import AACIDFormService
+from app.services.worker_process import WORKER_ID, worker_dead
+
+logger = logging.getLogger(__name__)
+
+
+class JobService:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def create_job(
+        self,
+        project_id: int | None,
+        tipo: TipoTrabajo,
+        parametros: dict | None = None,
+        user: User | None = None,
+        ip_address: str | None = None,
+    ) -> GenerationJob:
+        """Registra un trabajo pendiente y lo envia al pool."""
+        job = GenerationJob(
+            project_id=project_id,
+            tipo=tipo,
+            parametros=parametros or {},
+            actor_id=str(user.id) if user else None,
+            actor_email=user.email if user else None,
+            actor_label=user.nombre_completo if user else None,
+            ip_address=ip_address,
+        )
+        self.db.add(job)
+        self.db.commit()
+        self.db.refresh(job)
+        submit_job(job.id)
+        return job
+
+    def get_job(self, job_id: str) -> GenerationJob | None:
+        return self.db.get(GenerationJob, job_id)
+
+    def get_project_jobs(self, project_id: int, limit: int = 5) -> list[GenerationJob]:
+        """Trabajos mas recientes del proyecto (activos primero)."""
+        jobs = self.db.execute(
+            select(GenerationJob)
+            .where(GenerationJob.project_id == project_id)
+            .order_by(GenerationJob.created_at.desc())
+            .limit(limit)
+        ).scalars().all()
+        return sorted(jobs, key=lambda j: not j.activo)
+
+
+# ---- Pool de workers ----
+
+_executor: ThreadPoolExecutor | None = None
+_executor_lock = threading.Lock()
+_heartbeat_thread: threading.Thread | None = None
+_stop = threading.Event()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=max(1, get_settings().report_workers),
+                thread_name_prefix="report-job",
+            )
+        return _executor
+
+
+def submit_job(job_id: str) -> None:
+    _get_executor().submit(run_job, job_id)
+
+
+def requeue_orphaned_jobs(db: Session) -> list[str]:
+    """Devuelve a pendiente los trabajos en curso de procesos muertos o sin
+    latido reciente. Los de procesos vivos no se tocan."""
+    limite = datetime.utcnow() - timedelta(seconds=get_settings().report_job_stale_seconds)
+    rows = db.execute(
+        select(
+            GenerationJob.id,
+            GenerationJob.worker_id,
+            func.coalesce(GenerationJob.heartbeat_at, GenerationJob.started_at).label("latido"),
+        )
+        .where(
+            GenerationJob.estado == EstadoTrabajo.en_proceso,
+            GenerationJob.worker_id.is_distinct_from(WORKER_ID),
+        )
+    ).all()
+    orphaned = [
+        row.id for row in rows
+        if row.latido is None or row.latido < limite or worker_dead(row.worker_id)
+    ]
+    if orphaned:
+        db.execute(
+            update(GenerationJob)
+            .where(GenerationJob.id.in_(orphaned), GenerationJob.estado == EstadoTrabajo.en_proceso)
+            .values(
+                estado=EstadoTrabajo.pendiente, progreso=0, started_at=None, worker_id=None, heartbeat_at=None
+            )
+        )
+        db.commit()
+        logger.warning("Reencolados %d trabajos de generacion sin proceso vivo", len(orphaned))
+    return orphaned
+
+
+def _heartbeat() -> None:
+    """Renueva el latido de los trabajos de este proceso y recoge los huerfanos."""
+    db = SessionLocal()
+    try:
+        db.execute(
+            update(GenerationJob)
+            .where(GenerationJob.estado == EstadoTrabajo.en_proceso, GenerationJob.worker_id == WORKER_ID)
+            .values(heartbeat_at=datetime.utcnow())
+        )
+        db.commit()
+        orphaned = requeue_orphaned_jobs(db)
+    finally:
+        db.close()
+    for job_id in orphaned:
+        submit_job(job_id)
+
+
+def _heartbeat_loop() -> None:
+    while not _stop.wait(get_settings().report_job_heartbeat_seconds):
+        try:
+            _heartbeat()
+        except Exception:
+            logger.exception("Error renovando el latido de los trabajos de generacion")
+
+
+def start_workers() -> None:
+    """Arranca el pool, reencola los trabajos huerfanos y lanza los pendientes."""
+    global _heartbeat_thread
+    db = SessionLocal()
+    try:
+        requeue_orphaned_jobs(db)
+        pending = db.execute(
+            select(GenerationJob.id)
+            .where(GenerationJob.estado == EstadoTrabajo.pendiente)
+            .order_by(GenerationJob.created_at)
+        ).scalars().all()
+    finally:
+        db.close()
+
+    # Con varios procesos todos envian los pendientes: run_job solo deja que
+    # uno lo reclame
+    for job_id in pending:
+        submit_job(job_id)
+
+    if _heartbeat_thread is None:
+        _stop.clear()
+        _heartbeat_thread = threading.Thread(target=_heartbeat_loop, name="report-job-heartbeat", daemon=True)
+        _heartbeat_thread.start()
+
+
+def shutdown_workers() -> None:
+    global _executor, _heartbeat_thread
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=True, cancel_futures=True)
+            _executor = None
+    _stop.set()
+    if _heartbeat_thread is not None:
+        _heartbeat_thread.join(timeout=10)
+        _heartbeat_thread = None
+
+
+def _set_progress(job_id: str, progreso: int, mensaje: str | None = None) -> None:
+    """Actualiza el progreso en una sesion aparte para no expirar la del trabajo."""
+    db = SessionLocal()
+    try:
+        values = {"progreso": progreso, "heartbeat_at": datetime.utcnow()}
+        if mensaje is not None:
+            values["mensaje"] = mensaje
+        db.execute(update(GenerationJob).where(GenerationJob.id == job_id).values(**values))
+        db.commit()
+    finally:
+        db.close()
+
+
+def run_job(job_id: str) -> None:
+    """Ejecuta un trabajo. Se llama desde el pool."""
+    db = SessionLocal()
+    try:
+        # Reclamar el trabajo: solo un worker puede pasarlo a en_proceso
+        claimed = db.execute(
+            update(GenerationJob)
+            .where(GenerationJob.id == job_id, GenerationJob.estado == EstadoTrabajo.pendiente)
+            .values(
+                estado=EstadoTrabajo.en_proceso,
+                started_at=datetime.utcnow(),
+                heartbeat_at=datetime.utcnow(),
+                worker_id=WORKER_ID,
+                progreso=5,
+            )
+        ).rowcount
+        db.commit()
+        if not claimed:
+            return
+
+        job = db.get(GenerationJob, job_id)
+        try:
+            # Report generado, o None si el trabajo guarda su propio fichero
+            report = _HANDLERS[job.tipo](db, job)
+        except Exception as e:
+            db.rollback()
+            logger.exception("Error en trabajo de generacion %s", job_id)
+            job = db.get(GenerationJob, job_id)
+            job.estado = EstadoTrabajo.error
+            job.mensaje = str(e) or e.__class__.__name__
+            job.finished_at = datetime.utcnow()
+            db.commit()
+            return
+
+        job = db.get(GenerationJob, job_id)
+        job.estado = EstadoTrabajo.completado
+        job.progreso = 100
+        job.mensaje = None
+        if report is not None:
+            job.report_id = report.id
+        job.finished_at = datetime.utcnow()
+        db.commit()
+
+        _audit_export(db, job, report)
+    finally:
+        db.close()
+
+
+def _audit_export(db: Session, job: GenerationJob, report: Report | None) -> None:
+    if not job.actor_id:
+        return
+    parametros = job.parametros or {}
+    recurso_id = str(report.id) if report else job.id
+    if job.tipo == TipoTrabajo.anexo_iia_lote:
+        recurso = "anexo_iia_lote"
+        detalle = {
+            "convocatoria": parametros.get("convocatoria"),
+            "proyectos": len(parametros.get("project_ids") or []),
+            "generados": (job.resultado or {}).get("generados"),
+        }
+    elif job.tipo == TipoTrabajo.pack:
+        recurso = "report_pack"
+        detalle = {"tipos": parametros.get("tipos") or "all"}
+    elif job.tipo == TipoTrabajo.anexo_iia:
+        recurso = "report"
+        detalle = {"tipo": "anexo_iia"}
+    else:
+        recurso = "report"
+        detalle = {"tipo": parametros.get("tipo"), "periodo": parametros.get("periodo")}
+
+    AuditService(db).log(
+        actor_type=ActorType.internal,
+        actor_id=job.actor_id,
+        actor_email=job.actor_email,
+        actor_label=job.actor_label or "",
+        accion=AccionAuditoria.export,
+        recurso=recurso,
+        recurso_id=recurso_id,
+        detalle=detalle,
+        ip_address=job.ip_address,
+        project_id=job.project_id,
+    )
+
+
+# ---- Handlers por tipo de trabajo ----
+
+
+def _run_informe(db: Session, job: GenerationJob) -> Report:
+    parametros = job.parametros or {}
+    _set_progress(job.id, 10, "Generando informe")
+    return ReportService(db).generate_report(
+        project_id=job.project_id,
+        tipo=TipoInforme(parametros["tipo"]),
+        periodo=parametros.get("periodo"),
+        generado_por=parametros.get("generado_por"),
+    )
+
+
+def _run_pack(db: Session, job: GenerationJob) -> Report:
+    parametros = job.parametros or {}
+    tipos = parametros.get("tipos")
+    job_id = job.id
+
+    def on_progress(done: int, total: int) -> None:
+        _set_progress(job_id, 5 + int(90 * done / total), f"{done}/{total} informes")
+
+    return ReportService(db).generate_pack(
+        project_id=job.project_id,
+        tipos=[TipoInforme(t) for t in tipos] if tipos else None,
+        generado_por=parametros.get("generado_por"),
+        on_progress=on_progress,
+    )
+
+
+def _run_anexo_iia(db: Session, job: GenerationJob) -> Report:
+    parametros = job.parametros or {}
+    _set_progress(job.id, 10, "Rellenando formulario")
+    return AACIDFormService(db).generate_pdf(
+        job.project_id, generado_por=parametros.get("generado_por")
+    )
+
+
+def _run_anexo_iia_lote(db: Session, job: GenerationJob) -> None:
+    """Anexo II A de varios proyectos en un ZIP; no crea Report."""
+    parametros = job.parametros or {}
+    job_id = job.id
+    _set_progress(job_id, 10, "Validando proyectos")
+
+    def on_progress(done: int, total: int) -> None:
+        _set_progress(job_id, 10 + int(85 * done / total), f"{done}/{total} formularios")
+
+    generated = AACIDFormService(db).generate_batch(
+        parametros["project_ids"],
+        nombre=parametros.get("convocatoria") or "lote",
+        on_progress=on_progress,
+    )
+    job = db.get(GenerationJob, job_id)
+    job.nombre_archivo = generated["nombre_archivo"]
+    job.ruta = generated["ruta"]
+    job.resultado = generated["resultado"]
+    db.commit()
+
+
+_HANDLERS = {
+    TipoTrabajo.informe: _run_informe,
+    TipoTrabajo.pack: _run_pack,
+    TipoTrabajo.anexo_iia: _run_anexo_iia,
+    TipoTrabajo.anexo_iia_lote: _run_anexo_iia_lote,
+}
@@ -0,0 +1,254 @@
+"""Cliente OpenRouter compartido por todo el proceso.
+
+Un unico httpx.AsyncClient (conexiones keep-alive reutilizadas) vive en un
+event loop propio en un hilo aparte, de modo que los llamantes sincronos
+(hilos de trabajos, BackgroundTasks) comparten el pool, el limite de
+concurrencia y el limitador de ritmo. Los reintentos por 429/5xx esperan con
+asyncio.sleep, sin bloquear hilos.
+
+Para pruebas locales basta con apuntar OPENROUTER_BASE_URL al stub de
+scripts/openrouter_stub.py.
+"""
+import asyncio
+import json
+import logging
+import threading
+import time
+from typing import Awaitable, TypeVar
+
+import httpx
+
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+LANGUAGE_NAMES = {
+    "fr": "frances",
+    "en": "ingles",
+}
+
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+
+class TokenBucket:
+    """Limitador de ritmo: `rate` peticiones por segundo con rafagas de `capacity`."""
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = max(1, capacity)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        if self.rate <= 0:
+            return
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+def pack_fields(fields: dict[str, str], max_chars: int) -> list[dict[str, str]]:
+    """Reparte los campos en grupos cuyo JSON no supere max_chars.
+    Un campo mas largo que el limite va solo en su grupo."""
+    chunks: list[dict[str, str]] = []
+    current: dict[str, str] = {}
+    size = 2  # {}
+    for key, text in fields.items():
+        item_size = len(json.dumps({key: text}, ensure_ascii=False))
+        if current and size + item_size > max_chars:
+            chunks.append(current)
+            current, size = {}, 2
+        current[key] = text
+        size += item_size
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def build_prompt(fields: dict[str, str], target_lang: str) -> str:
+    lang_name = LANGUAGE_NAMES[target_lang]
+    return (
+        f"Traduce los siguientes textos del espanol al {lang_name}. "
+        f"Responde SOLO con un JSON valido con las mismas claves. "
+        f"No agregues explicaciones.\n\n"
+        f"{json.dumps(fields, ensure_ascii=False)}"
+    )
+
+
+def parse_response(content: str) -> dict[str, str]:
+    # Extract JSON from response (handle markdown code blocks)
+    content = content.strip()
+    if content.startswith("```"):
+        lines = content.split("\n")
+        content = "\n".join(lines[1:-1]).strip()
+    data = json.loads(content)
+    if not isinstance(data, dict):
+        raise ValueError("La respuesta no es un objeto JSON")
+    return {k: v for k, v in data.items() if isinstance(v, str)}
+
+
+class OpenRouterClient:
+    def __init__(
+        self,
+        api_key: str,
+        model: str,
+        base_url: str,
+        max_concurrency: int = 4,
+        requests_per_minute: int = 60,
+        prompt_max_chars: int = 6000,
+        timeout: float = 30.0,
+        max_retries: int = 3,
+    ):
+        self.api_key = api_key
+        self.model = model
+        self.base_url = base_url.rstrip("/")
+        self.max_concurrency = max(1, max_concurrency)
+        self.requests_per_minute = requests_per_minute
+        self.prompt_max_chars = prompt_max_chars
+        self.timeout = timeout
+        self.max_retries = max(1, max_retries)
+
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="openrouter", daemon=True)
+        self._thread.start()
+        self._http: httpx.AsyncClient | None = None
+        self._semaphore: asyncio.Semaphore | None = None
+        self._bucket: TokenBucket | None = None
+
+    # ---- Puente sincrono ----
+
+    def run(self, coro: Awaitable[T]) -> T:
+        """Ejecuta una corrutina en el loop del cliente y espera el resultado."""
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+
+    def close(self) -> None:
+        if self._loop.is_closed():
+            return
+        if self._http is not None:
+            self.run(self._http.aclose())
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
+        self._loop.close()
+
+    # ---- API asincrona ----
+
+    def _ensure_started(self) -> None:
+        # Se crean dentro del loop del cliente, que es donde se usan
+        if self._http is None:
+            self._http = httpx.AsyncClient(
+                base_url=self.base_url,
+                timeout=self.timeout,
+                headers={
+                    "Authorization": f"Bearer {self.api_key}",
+                    "Content-Type": "application/json",
+                },
+                limits=httpx.Limits(
+                    max_connections=self.max_concurrency,
+                    max_keepalive_connections=self.max_concurrency,
+                ),
+            )
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._bucket = TokenBucket(self.requests_per_minute / 60, self.max_concurrency)
+
+    async def translate(self, fields: dict[str, str], target_lang: str) -> dict[str, str] | None:
+        """Una peticion (con reintentos) para un grupo de campos ya empaquetado."""
+        self._ensure_started()
+        payload = {
+            "model": self.model,
+            "messages": [{"role": "user", "content": build_prompt(fields, target_lang)}],
+            "temperature": 0.1,
+        }
+        for attempt in range(self.max_retries):
+            await self._bucket.acquire()
+            try:
+                async with self._semaphore:
+                    response = await self._http.post("/chat/completions", json=payload)
+                response.raise_for_status()
+                content = response.json()["choices"][0]["message"]["content"]
+                return parse_response(content)
+            except httpx.HTTPStatusError as e:
+                status = e.response.status_code
+                if status in RETRY_STATUS and attempt < self.max_retries - 1:
+                    wait = _retry_after(e.response) or 2 ** attempt  # 1s, 2s, 4s
+                    logger.warning(
+                        "OpenRouter %d translating to %s, retry %d/%d in %ss",
+                        status, target_lang, attempt + 1, self.max_retries, wait,
+                    )
+                    await asyncio.sleep(wait)
+                    continue
+                logger.exception("Error calling OpenRouter for translation to %s", target_lang)
+                return None
+            except (httpx.TimeoutException, httpx.TransportError):
+                if attempt < self.max_retries - 1:
+                    await asyncio.sleep(2 ** attempt)
+                    continue
+                logger.exception("Error calling OpenRouter for translation to %s", target_lang)
+                return None
+            except Exception:
+                logger.exception("Error calling OpenRouter for translation to %s", target_lang)
+                return None
+        return None
+
+    async def translate_packed(self, fields: dict[str, str], target_lang: str) -> dict[str, str]:
+        """Traduce cualquier numero de campos: los empaqueta hasta
+        prompt_max_chars por peticion y lanza las peticiones en paralelo.
+        Los grupos que fallan simplemente no aparecen en el resultado."""
+        chunks = pack_fields(fields, self.prompt_max_chars)
+        results = await asyncio.gather(*(self.translate(chunk, target_lang) for chunk in chunks))
+        merged: dict[str, str] = {}
+        for chunk, translated in zip(chunks, results):
+            if translated:
+                merged.update({k: v for k, v in translated.items() if k in chunk})
+        return merged
+
+    async def translate_languages(self, fields_by_lang: dict[str, dict[str, str]]) -> dict[str, dict[str, str]]:
+        """Todos los idiomas a la vez (fr y en en paralelo)."""
+        langs = [lang for lang, fields in fields_by_lang.items() if fields]
+        results = await asyncio.gather(*(self.translate_packed(fields_by_lang[lang], lang) for lang in langs))
+        return dict(zip(langs, results))
+
+
+def _retry_after(response: httpx.Response) -> float | None:
+    value = response.headers.get("Retry-After")
+    try:
+        return max(0.0, float(value)) if value else None
+    except ValueError:
+        return None
+
+
+_client: OpenRouterClient | None = None
+_client_lock = threading.Lock()
+
+
+def get_openrouter_client() -> OpenRouterClient:
+    global _client
+    with _client_lock:
+        if _client is None:
+            settings = get_settings()
+            _client = OpenRouterClient(
+                api_key=settings.openrouter_api_key,
+                model=settings.openrouter_model,
+                base_url=settings.openrouter_base_url,
+                max_concurrency=settings.openrouter_max_concurrency,
+                requests_per_minute=settings.openrouter_requests_per_minute,
+                prompt_max_chars=settings.openrouter_prompt_max_chars,
+                timeout=settings.openrouter_timeout_seconds,
+            )
+        return _client
+
+
+def close_openrouter_client() -> None:
+    global _client
+    with _client_lock:
+        if _client is not None:
+            _client.close()
+            _client = None
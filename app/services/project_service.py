@@ -1,9 +1,13 @@
 from decimal import Decimal
+from fastapi import BackgroundTasks
 from sqlalchemy import func, select
 from sqlalchemy.orm import Session, selectinload
 from app.models.project import Project, Plazo, ODSObjetivo, EstadoProyecto, TipoProyecto, ODS_NOMBRES
 from app.schemas.project import ProjectCreate, ProjectUpdate, ProjectStats, PlazoCreate, PlazoUpdate
 
+# Estados en los que la contraparte tiene acceso al portal
+ESTADOS_PORTAL = (EstadoProyecto.ejecucion, EstadoProyecto.justificacion)
+
 
 class ProjectService:
     def __init__(self, db: Session):
@@ -68,7 +72,7 @@ class ProjectService:
         query = select(Project).where(Project.codigo_contable == codigo)
         return self.db.execute(query).scalar_one_or_none()
 
-    def create(self, data: ProjectCreate) -> Project:
+    def create(self, data: ProjectCreate, background_tasks: BackgroundTasks | None = None) -> Project:
         project_data = data.model_dump(exclude={"plazos", "ods_ids"})
         project = Project(**project_data)
 
@@ -91,9 +95,15 @@ class ProjectService:
         # Auto-initialize budget based on financiador
         self.budget_service.initialize_budget_from_project(project)
 
+        # Creado ya en ejecucion: se abre al portal desde el principio
+        if project.estado in ESTADOS_PORTAL:
+            self._prewarm_translations(project.id, background_tasks)
+
         return project
 
-    def update(self, project_id: int, data: ProjectUpdate) -> Project | None:
+    def update(
+        self, project_id: int, data: ProjectUpdate, background_tasks: BackgroundTasks | None = None,
+    ) -> Project | None:
         project = self.get_by_id(project_id)
         if not project:
             return None
@@ -101,6 +111,7 @@ class ProjectService:
         # Track if funder or template version changed
         old_funder_id = project.funder_id
         old_template_version_id = project.template_version_id
+        old_estado = project.estado
 
         update_data = data.model_dump(exclude_unset=True, exclude={"ods_ids"})
         for field, value in update_data.items():
@@ -125,8 +136,21 @@ class ProjectService:
         if funder_changed or version_changed:
             self.budget_service.reinitialize_budget_for_new_funder(project)
 
+        # Al abrirse al portal de contrapartes se encolan todas sus traducciones
+        if project.estado in ESTADOS_PORTAL and old_estado not in ESTADOS_PORTAL:
+            self._prewarm_translations(project.id, background_tasks)
+
         return project
 
+    def _prewarm_translations(self, project_id: int, background_tasks: BackgroundTasks | None) -> None:
+        """Encola las traducciones del proyecto despues de la respuesta (recorrer
+        todos los campos de un proyecto grande no debe retrasar la peticion)."""
+        from app.services.translation_queue_service import prewarm_project_translations
+        if background_tasks is not None:
+            background_tasks.add_task(prewarm_project_translations, project_id)
+        else:
+            prewarm_project_translations(project_id)
+
     def delete(self, project_id: int) -> bool:
         project = self.get_by_id(project_id)
         if not project:
@@ -0,0 +1,327 @@
+"""Copia desconectada de los datos de un proyecto para generar informes.
+
+Los generadores de Excel trabajan sobre estas dataclasses inmutables en
+lugar de objetos del ORM: no hacen consultas, se pueden pasar a otro proceso
+(pickle) y el mismo snapshot sirve para todos los libros de un pack.
+Los importes calculados (imputable, neto, ejecutado por partida segun el
+libro de ejecucion) se guardan ya resueltos.
+"""
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import date
+from decimal import Decimal
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.models.budget import Funder, ProjectBudgetLine
+from app.models.execution_ledger import EjecucionPartida
+from app.models.expense import Expense, EstadoGasto, UbicacionGasto
+from app.models.logical_framework import (
+    LogicalFramework, SpecificObjective, Result, Activity, Indicator, IndicatorUpdate, EstadoActividad,
+)
+from app.models.project import Project, ODSObjetivo, EstadoProyecto, TipoProyecto, project_ods
+from app.models.transfer import Transfer, EstadoTransferencia
+
+# Consultas de ProjectSnapshotLoader.load: proyecto, libro de ejecucion,
+# partidas, gastos, transferencias, ODS, resultados, actividades e indicadores
+SNAPSHOT_QUERIES = 9
+
+
+@dataclass(frozen=True)
+class BudgetLineSnapshot:
+    id: int
+    name: str
+    aprobado: Decimal
+    ejecutado_espana: Decimal
+    ejecutado_terreno: Decimal
+
+    @property
+    def ejecutado(self) -> Decimal:
+        return self.ejecutado_espana + self.ejecutado_terreno
+
+
+@dataclass(frozen=True)
+class ExpenseSnapshot:
+    fecha_factura: date
+    concepto: str
+    expedidor: str
+    partida: str
+    financiado_por: str
+    cantidad_imputable: Decimal
+    ubicacion: UbicacionGasto
+    estado: EstadoGasto
+
+
+@dataclass(frozen=True)
+class TransferSnapshot:
+    numero_display: str
+    fecha_peticion: date | None
+    fecha_emision: date | None
+    fecha_recepcion: date | None
+    importe_euros: Decimal
+    gastos_transferencia: Decimal
+    importe_neto: Decimal
+    tipo_cambio: Decimal | None
+    moneda_local: str | None
+    importe_moneda_local: Decimal | None
+    cuenta_destino: str | None
+    estado: EstadoTransferencia
+
+
+@dataclass(frozen=True)
+class OdsSnapshot:
+    numero: str
+    nombre: str
+
+
+@dataclass(frozen=True)
+class ActivitySnapshot:
+    numero: str
+    descripcion: str
+    estado: EstadoActividad
+    fecha_inicio: date | None
+    fecha_fin: date | None
+
+
+@dataclass(frozen=True)
+class IndicatorSnapshot:
+    codigo: str
+    descripcion: str
+    valor_meta: str | None
+    valor_actual: str | None
+    porcentaje_cumplimiento: Decimal | None
+    fuente_verificacion: str | None
+    num_actualizaciones: int
+
+
+@dataclass(frozen=True)
+class ResultSnapshot:
+    numero: str
+    descripcion: str
+    activities: tuple[ActivitySnapshot, ...]
+    indicators: tuple[IndicatorSnapshot, ...]
+
+
+@dataclass(frozen=True)
+class ProjectSnapshot:
+    id: int
+    codigo_contable: str
+    codigo_area: str
+    titulo: str
+    pais: str
+    sector: str
+    tipo: TipoProyecto
+    estado: EstadoProyecto
+    financiador: str
+    color_financiador: str | None
+    subvencion: Decimal
+    fecha_inicio: date
+    fecha_finalizacion: date
+    fecha_justificacion: date | None
+    ampliado: bool
+
+    budget_lines: tuple[BudgetLineSnapshot, ...]
+    # Mismo orden que Project.expenses (fecha de factura descendente)
+    expenses: tuple[ExpenseSnapshot, ...]
+    transfers: tuple[TransferSnapshot, ...]
+    ods: tuple[OdsSnapshot, ...]
+    # Resultados de todos los objetivos especificos, en orden
+    results: tuple[ResultSnapshot, ...]
+
+    @property
+    def total_ejecutado_espana(self) -> Decimal:
+        return sum((line.ejecutado_espana for line in self.budget_lines), Decimal("0"))
+
+    @property
+    def total_ejecutado_terreno(self) -> Decimal:
+        return sum((line.ejecutado_terreno for line in self.budget_lines), Decimal("0"))
+
+
+class ProjectSnapshotLoader:
+    """Carga un ProjectSnapshot con un numero fijo de consultas.
+
+    Una consulta por coleccion (SNAPSHOT_QUERIES en total), sean cuales sean
+    el numero de gastos, partidas o resultados: nada de cargas perezosas
+    por relacion. Las filas se leen como tuplas, sin crear objetos del ORM.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def load(self, project_id: int) -> ProjectSnapshot:
+        project = self.db.execute(
+            select(Project.__table__, Funder.color.label("color_financiador"))
+            .outerjoin(Funder, Funder.id == Project.funder_id)
+            .where(Project.id == project_id)
+        ).one_or_none()
+        if project is None:
+            raise ValueError("Proyecto no encontrado")
+
+        return ProjectSnapshot(
+            id=project.id,
+            codigo_contable=project.codigo_contable,
+            codigo_area=project.codigo_area,
+            titulo=project.titulo,
+            pais=project.pais,
+            sector=project.sector,
+            tipo=project.tipo,
+            estado=project.estado,
+            financiador=project.financiador,
+            color_financiador=project.color_financiador,
+            subvencion=project.subvencion,
+            fecha_inicio=project.fecha_inicio,
+            fecha_finalizacion=project.fecha_finalizacion,
+            fecha_justificacion=project.fecha_justificacion,
+            ampliado=project.ampliado,
+            budget_lines=self._load_budget_lines(project_id),
+            expenses=self._load_expenses(project_id),
+            transfers=self._load_transfers(project_id),
+            ods=self._load_ods(project_id),
+            results=self._load_results(project_id),
+        )
+
+    def _load_budget_lines(self, project_id: int) -> tuple[BudgetLineSnapshot, ...]:
+        executed: dict[int, dict[UbicacionGasto, Decimal]] = {}
+        for line_id, ubicacion, importe in self.db.execute(
+            select(EjecucionPartida.budget_line_id, EjecucionPartida.ubicacion, func.sum(EjecucionPartida.importe))
+            .where(EjecucionPartida.project_id == project_id)
+            .group_by(EjecucionPartida.budget_line_id, EjecucionPartida.ubicacion)
+        ):
+            executed.setdefault(line_id, {})[ubicacion] = Decimal(importe or 0)
+
+        lines = self.db.execute(
+            select(ProjectBudgetLine.id, ProjectBudgetLine.name, ProjectBudgetLine.aprobado)
+            .where(ProjectBudgetLine.project_id == project_id)
+            .order_by(ProjectBudgetLine.order)
+        )
+        return tuple(
+            BudgetLineSnapshot(
+                id=line.id,
+                name=line.name,
+                aprobado=line.aprobado or Decimal("0"),
+                ejecutado_espana=executed.get(line.id, {}).get(UbicacionGasto.espana, Decimal("0")),
+                ejecutado_terreno=executed.get(line.id, {}).get(UbicacionGasto.terreno, Decimal("0")),
+            )
+            for line in lines
+        )
+
+    def _load_expenses(self, project_id: int) -> tuple[ExpenseSnapshot, ...]:
+        rows = self.db.execute(
+            select(
+                Expense.fecha_factura,
+                Expense.concepto,
+                Expense.expedidor,
+                func.coalesce(ProjectBudgetLine.name, "").label("partida"),
+                Expense.financiado_por,
+                Expense.cantidad_euros,
+                Expense.porcentaje,
+                Expense.ubicacion,
+                Expense.estado,
+            )
+            .outerjoin(ProjectBudgetLine, ProjectBudgetLine.id == Expense.budget_line_id)
+            .where(Expense.project_id == project_id)
+            .order_by(Expense.fecha_factura.desc(), Expense.id.desc())
+        )
+        return tuple(
+            ExpenseSnapshot(
+                fecha_factura=row.fecha_factura,
+                concepto=row.concepto,
+                expedidor=row.expedidor,
+                partida=row.partida,
+                financiado_por=row.financiado_por,
+                cantidad_imputable=row.cantidad_euros * row.porcentaje / Decimal("100"),
+                ubicacion=row.ubicacion,
+                estado=row.estado,
+            )
+            for row in rows
+        )
+
+    def _load_transfers(self, project_id: int) -> tuple[TransferSnapshot, ...]:
+        rows = self.db.execute(
+            select(Transfer.__table__).where(Transfer.project_id == project_id).order_by(Transfer.numero)
+        )
+        return tuple(
+            TransferSnapshot(
+                numero_display=f"{row.numero}/{row.total_previstas}",
+                fecha_peticion=row.fecha_peticion,
+                fecha_emision=row.fecha_emision,
+                fecha_recepcion=row.fecha_recepcion,
+                importe_euros=row.importe_euros or Decimal("0"),
+                gastos_transferencia=row.gastos_transferencia or Decimal("0"),
+                importe_neto=row.importe_euros - (row.gastos_transferencia or Decimal("0")),
+                tipo_cambio=row.tipo_cambio_local or row.tipo_cambio_intermedio,
+                moneda_local=row.moneda_local,
+                importe_moneda_local=row.importe_moneda_local,
+                cuenta_destino=row.cuenta_destino,
+                estado=row.estado,
+            )
+            for row in rows
+        )
+
+    def _load_ods(self, project_id: int) -> tuple[OdsSnapshot, ...]:
+        rows = self.db.execute(
+            select(ODSObjetivo.numero, ODSObjetivo.nombre)
+            .join(project_ods, project_ods.c.ods_id == ODSObjetivo.id)
+            .where(project_ods.c.project_id == project_id)
+            .order_by(ODSObjetivo.id)
+        )
+        return tuple(OdsSnapshot(numero=row.numero, nombre=row.nombre) for row in rows)
+
+    def _load_results(self, project_id: int) -> tuple[ResultSnapshot, ...]:
+        """Resultados con sus actividades e indicadores: tres consultas."""
+        result_rows = self.db.execute(
+            select(Result.id, Result.numero, Result.descripcion)
+            .join(SpecificObjective, SpecificObjective.id == Result.objective_id)
+            .join(LogicalFramework, LogicalFramework.id == SpecificObjective.framework_id)
+            .where(LogicalFramework.project_id == project_id)
+            .order_by(SpecificObjective.numero, Result.numero)
+        ).all()
+        if not result_rows:
+            return ()
+        result_ids = [row.id for row in result_rows]
+
+        activities: dict[int, list[ActivitySnapshot]] = defaultdict(list)
+        for row in self.db.execute(
+            select(Activity.__table__)
+            .where(Activity.result_id.in_(result_ids))
+            .order_by(Activity.result_id, Activity.numero)
+        ):
+            activities[row.result_id].append(ActivitySnapshot(
+                numero=row.numero,
+                descripcion=row.descripcion,
+                estado=row.estado,
+                fecha_inicio=row.fecha_inicio_real or row.fecha_inicio_prevista,
+                fecha_fin=row.fecha_fin_real or row.fecha_fin_prevista,
+            ))
+
+        updates = (
+            select(func.count(IndicatorUpdate.id))
+            .where(IndicatorUpdate.indicator_id == Indicator.id)
+            .scalar_subquery()
+        )
+        indicators: dict[int, list[IndicatorSnapshot]] = defaultdict(list)
+        for row in self.db.execute(
+            select(Indicator.__table__, updates.label("num_actualizaciones"))
+            .where(Indicator.result_id.in_(result_ids))
+            .order_by(Indicator.id)
+        ):
+            indicators[row.result_id].append(IndicatorSnapshot(
+                codigo=row.codigo,
+                descripcion=row.descripcion,
+                valor_meta=row.valor_meta,
+                valor_actual=row.valor_actual,
+                porcentaje_cumplimiento=row.porcentaje_cumplimiento,
+                fuente_verificacion=row.fuente_verificacion,
+                num_actualizaciones=row.num_actualizaciones,
+            ))
+
+        return tuple(
+            ResultSnapshot(
+                numero=row.numero,
+                descripcion=row.descripcion,
+                activities=tuple(activities[row.id]),
+                indicators=tuple(indicators[row.id]),
+            )
+            for row in result_rows
+        )
@@ -0,0 +1,151 @@
+"""Huella de los datos con los que se genera cada informe.
+
+La huella es un sha256 de las filas (todas sus columnas, en orden de id) de
+las tablas que lee cada tipo de informe, mas el periodo si el informe lo usa.
+Las filas se leen tal como las devuelve el driver, sin pasar por los tipos
+del ORM (Decimal, Enum, fechas), que es la mayor parte del coste.
+Si ya existe un informe del mismo tipo con la misma huella y su fichero
+sigue en disco, se devuelve ese en lugar de generar otro igual.
+
+GENERATOR_VERSION entra en la huella: hay que subirlo cuando cambie lo que
+escriben los generadores, para no servir ficheros con el formato anterior.
+"""
+import hashlib
+import os
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.models.aacid import ProjectNarrative, ProjectBeneficiary, ProjectVolunteer
+from app.models.budget import Funder, ProjectBudgetLine
+from app.models.execution_ledger import EjecucionPartida
+from app.models.expense import Expense
+from app.models.logical_framework import LogicalFramework, SpecificObjective, Result, Activity, Indicator
+from app.models.project import Project, project_ods
+from app.models.report import Report, TipoInforme
+from app.models.transfer import Transfer
+
+GENERATOR_VERSION = 2
+
+FETCH_CHUNK_ROWS = 5000
+
+# Datos que lee cada tipo de informe. Los que solo usan totales ejecutados
+# leen el libro de ejecucion (una fila por partida y ubicacion), no los gastos
+COMPONENTES_POR_TIPO = {
+    TipoInforme.cuenta_justificativa: ("proyecto", "gastos", "partidas"),
+    TipoInforme.ejecucion_presupuestaria: ("proyecto", "partidas", "libro"),
+    TipoInforme.relacion_transferencias: ("proyecto", "transferencias"),
+    TipoInforme.ficha_proyecto: ("proyecto", "partidas", "libro", "transferencias", "ods"),
+    TipoInforme.informe_tecnico_mensual: ("proyecto", "marco_logico"),
+    TipoInforme.informe_economico: ("proyecto", "partidas", "libro", "transferencias", "gastos"),
+    TipoInforme.anexo_iia: ("proyecto", "aacid", "marco_logico"),
+}
+
+# Los demas tipos ignoran el periodo: mismo fichero para cualquier periodo
+TIPOS_CON_PERIODO = {TipoInforme.informe_tecnico_mensual}
+
+
+class ReportFingerprintService:
+    def __init__(self, db: Session):
+        self.db = db
+        # Un pack calcula varias huellas sobre los mismos datos
+        self._digests: dict[tuple[str, int], str] = {}
+
+    def for_report(self, project_id: int, tipo: TipoInforme, periodo: str | None = None) -> str:
+        parts = [f"v{GENERATOR_VERSION}", tipo.value]
+        if tipo in TIPOS_CON_PERIODO:
+            parts.append(periodo or "")
+        parts += [self._digest(component, project_id) for component in COMPONENTES_POR_TIPO[tipo]]
+        return hashlib.sha256("|".join(parts).encode()).hexdigest()
+
+    def for_pack(self, project_id: int, tipos: list[TipoInforme]) -> str:
+        parts = [f"v{GENERATOR_VERSION}", "pack"]
+        parts += [self.for_report(project_id, tipo) for tipo in tipos]
+        return hashlib.sha256("|".join(parts).encode()).hexdigest()
+
+    def find_report(
+        self,
+        project_id: int,
+        tipo: TipoInforme,
+        fingerprint: str,
+        periodo: str | None = None,
+    ) -> Report | None:
+        """Informe ya generado con esa huella cuyo fichero sigue en disco;
+        primero los del mismo periodo."""
+        reports = self.db.execute(
+            select(Report)
+            .where(
+                Report.project_id == project_id,
+                Report.tipo == tipo,
+                Report.fingerprint == fingerprint,
+            )
+            .order_by(Report.periodo.is_not_distinct_from(periodo).desc(), Report.created_at.desc())
+        ).scalars()
+        for report in reports:
+            if os.path.exists(report.ruta):
+                return report
+        return None
+
+    def _digest(self, component: str, project_id: int) -> str:
+        key = (component, project_id)
+        if key not in self._digests:
+            h = hashlib.sha256()
+            conn = self.db.connection()
+            cursor = conn.connection.cursor()
+            try:
+                for query in self._queries(component, project_id):
+                    compiled = query.compile(dialect=conn.dialect)
+                    if compiled.positional:
+                        params = [compiled.params[name] for name in compiled.positiontup]
+                    else:
+                        params = compiled.params
+                    cursor.execute(str(compiled), params)
+                    h.update(b"\x1e")
+                    while rows := cursor.fetchmany(FETCH_CHUNK_ROWS):
+                        h.update(repr(rows).encode())
+            finally:
+                cursor.close()
+            self._digests[key] = h.hexdigest()
+        return self._digests[key]
+
+    def _queries(self, component: str, project_id: int) -> list:
+        if component == "proyecto":
+            return [
+                select(Project.__table__).where(Project.id == project_id),
+                select(Funder.__table__)
+                .join(Project, Project.funder_id == Funder.id)
+                .where(Project.id == project_id),
+            ]
+        if component == "ods":
+            return [
+                select(project_ods)
+                .where(project_ods.c.project_id == project_id)
+                .order_by(project_ods.c.ods_id)
+            ]
+        if component == "marco_logico":
+            framework_ids = select(LogicalFramework.id).where(LogicalFramework.project_id == project_id)
+            objective_ids = select(SpecificObjective.id).where(SpecificObjective.framework_id.in_(framework_ids))
+            result_ids = select(Result.id).where(Result.objective_id.in_(objective_ids))
+            return [
+                select(LogicalFramework.__table__).where(LogicalFramework.project_id == project_id),
+                select(SpecificObjective.__table__)
+                .where(SpecificObjective.id.in_(objective_ids))
+                .order_by(SpecificObjective.id),
+                select(Result.__table__).where(Result.id.in_(result_ids)).order_by(Result.id),
+                select(Activity.__table__).where(Activity.result_id.in_(result_ids)).order_by(Activity.id),
+                select(Indicator.__table__)
+                .where(Indicator.framework_id.in_(framework_ids))
+                .order_by(Indicator.id),
+            ]
+
+        models = {
+            "gastos": (Expense,),
+            "partidas": (ProjectBudgetLine,),
+            "libro": (EjecucionPartida,),
+            "transferencias": (Transfer,),
+            "aacid": (ProjectNarrative, ProjectBeneficiary, ProjectVolunteer),
+        }[component]
+        return [
+            select(model.__table__).where(model.project_id == project_id).order_by(model.id)
+            for model in models
+        ]
@@ -1,5 +1,6 @@
 import os
 from datetime import datetime
+from typing import Callable
 from sqlalchemy import select
 from sqlalchemy.orm import Session
 
@@ -12,7 +13,9 @@ from app.schemas.report import (
     ReportValidationResult,
     ReportValidationWarning,
 )
-from app.services.excel_generator_service import ExcelGeneratorService
+from app.services.excel_generator_service import ExcelGeneratorService, PACK_TIPOS_DEFECTO
+from app.services.project_snapshot import ProjectSnapshotLoader
+from app.services.report_fingerprint_service import ReportFingerprintService
 
 
 EXPORTS_DIR = "exports"
@@ -22,6 +25,7 @@ class ReportService:
     def __init__(self, db: Session):
         self.db = db
         self._excel_generator = None
+        self.fingerprints = ReportFingerprintService(db)
 
     @property
     def excel_generator(self) -> ExcelGeneratorService:
@@ -50,8 +54,11 @@ class ReportService:
         if not report:
             return False
 
-        # Delete file from disk
-        if os.path.exists(report.ruta):
+        # Delete file from disk, unless another report shares it
+        shared = self.db.execute(
+            select(Report.id).where(Report.ruta == report.ruta, Report.id != report.id).limit(1)
+        ).first()
+        if not shared and os.path.exists(report.ruta):
             os.remove(report.ruta)
 
         self.db.delete(report)
@@ -62,9 +69,7 @@ class ReportService:
 
     def validate_for_generation(self, project_id: int) -> ReportValidationResult:
         """Check for potential issues before generating reports."""
-        project = self.db.get(Project, project_id)
-        if not project:
-            raise ValueError("Proyecto no encontrado")
+        project = ProjectSnapshotLoader(self.db).load(project_id)
 
         result = ReportValidationResult()
 
@@ -101,21 +106,20 @@ class ReportService:
             )
 
         # Check for indicators without recent updates
-        if project.logical_framework:
-            indicators_without_update = []
-            for so in project.logical_framework.specific_objectives:
-                for result_obj in so.results:
-                    for indicator in result_obj.indicators:
-                        if not indicator.updates:
-                            indicators_without_update.append(indicator)
-            if indicators_without_update:
-                result.warnings.append(
-                    ReportValidationWarning(
-                        tipo="indicator",
-                        mensaje="Hay indicadores sin actualizaciones registradas",
-                        count=len(indicators_without_update),
-                    )
+        indicators_without_update = [
+            indicator
+            for result_obj in project.results
+            for indicator in result_obj.indicators
+            if not indicator.num_actualizaciones
+        ]
+        if indicators_without_update:
+            result.warnings.append(
+                ReportValidationWarning(
+                    tipo="indicator",
+                    mensaje="Hay indicadores sin actualizaciones registradas",
+                    count=len(indicators_without_update),
                 )
+            )
 
         return result
 
@@ -128,21 +132,26 @@ class ReportService:
         periodo: str | None = None,
         generado_por: str | None = None,
     ) -> Report:
-        """Generate a single report and save it to disk."""
+        """Generate a single report and save it to disk.
+
+        If a report of the same type was already generated from the same data,
+        its file is returned instead of writing an identical one."""
         project = self.db.get(Project, project_id)
         if not project:
             raise ValueError("Proyecto no encontrado")
 
-        # Generate the Excel file
-        buffer, filename = self.excel_generator.generate_report(project, tipo, periodo)
+        fingerprint = self.fingerprints.for_report(project_id, tipo, periodo)
+        existing = self.fingerprints.find_report(project_id, tipo, fingerprint, periodo)
+        if existing:
+            return self._reuse_report(existing, periodo, generado_por)
 
-        # Save to disk
+        # Generate the Excel file straight to disk
         project_dir = os.path.join(EXPORTS_DIR, str(project_id))
         os.makedirs(project_dir, exist_ok=True)
 
-        filepath = os.path.join(project_dir, filename)
-        with open(filepath, "wb") as f:
-            f.write(buffer.getvalue())
+        filepath, filename = self.excel_generator.generate_report(
+            project, tipo, project_dir, periodo, tag=fingerprint[:12]
+        )
 
         # Create database record
         report = Report(
@@ -153,6 +162,7 @@ class ReportService:
             nombre_archivo=filename,
             ruta=filepath,
             generado_por=generado_por,
+            fingerprint=fingerprint,
         )
         self.db.add(report)
         self.db.commit()
@@ -165,22 +175,29 @@ class ReportService:
         project_id: int,
         tipos: list[TipoInforme] | None = None,
         generado_por: str | None = None,
+        on_progress: Callable[[int, int], None] | None = None,
     ) -> Report:
-        """Generate a ZIP pack with multiple reports."""
+        """Generate a ZIP pack with multiple reports (reused if the data
+        and the list of types have not changed)."""
         project = self.db.get(Project, project_id)
         if not project:
             raise ValueError("Proyecto no encontrado")
 
-        # Generate the ZIP file
-        buffer, filename = self.excel_generator.generate_pack(project, tipos)
+        tipos = tipos or PACK_TIPOS_DEFECTO
+        fingerprint = self.fingerprints.for_pack(project_id, tipos)
+        existing = self.fingerprints.find_report(project_id, TipoInforme.ficha_proyecto, fingerprint)
+        if existing:
+            if on_progress:
+                on_progress(len(tipos), len(tipos))
+            return self._reuse_report(existing, None, generado_por)
 
-        # Save to disk
+        # Stream the ZIP file to disk, one workbook entry at a time
         project_dir = os.path.join(EXPORTS_DIR, str(project_id))
         os.makedirs(project_dir, exist_ok=True)
 
-        filepath = os.path.join(project_dir, filename)
-        with open(filepath, "wb") as f:
-            f.write(buffer.getvalue())
+        filepath, filename = self.excel_generator.generate_pack(
+            project, project_dir, tipos, on_progress=on_progress, tag=fingerprint[:12]
+        )
 
         # Create database record (using ficha_proyecto as placeholder type for pack)
         report = Report(
@@ -192,6 +209,7 @@ class ReportService:
             ruta=filepath,
             generado_por=generado_por,
             notas="Pack de justificacion (ZIP)",
+            fingerprint=fingerprint,
         )
         self.db.add(report)
         self.db.commit()
@@ -199,6 +217,30 @@ class ReportService:
 
         return report
 
+    def _reuse_report(self, existing: Report, periodo: str | None, generado_por: str | None) -> Report:
+        """Return an already generated report with the same fingerprint.
+
+        Types that ignore the period get a new record for another period,
+        pointing at the same file on disk."""
+        if existing.periodo == periodo:
+            return existing
+
+        report = Report(
+            project_id=existing.project_id,
+            tipo=existing.tipo,
+            periodo=periodo,
+            formato_financiador=existing.formato_financiador,
+            nombre_archivo=existing.nombre_archivo,
+            ruta=existing.ruta,
+            generado_por=generado_por,
+            notas=existing.notas,
+            fingerprint=existing.fingerprint,
+        )
+        self.db.add(report)
+        self.db.commit()
+        self.db.refresh(report)
+        return report
+
     def get_available_report_types(self, project_id: int) -> list[dict]:
         """Get available report types with their Spanish names."""
         return [
@@ -8,13 +8,14 @@ from fastapi import UploadFile
 
 from app.models.transfer import Transfer, EstadoTransferencia, get_moneda_for_pais
 from app.models.project import Project
-from app.models.expense import Expense, EstadoGasto, UbicacionGasto
+from app.models.expense import UbicacionGasto
 from app.schemas.transfer import (
     TransferCreate,
     TransferUpdate,
     TransferSummary,
     ConfirmReceptionData,
 )
+from app.services.execution_ledger_service import ExecutionLedgerService
 
 
 class TransferService:
@@ -257,14 +258,9 @@ class TransferService:
         summary = TransferSummary()
         summary.presupuesto_total = project.subvencion or Decimal("0")
 
-        # Calculate validated Spain expenses
-        spain_expenses_query = (
-            select(func.sum(Expense.cantidad_euros * Expense.porcentaje / 100))
-            .where(Expense.project_id == project_id)
-            .where(Expense.ubicacion == UbicacionGasto.espana)
-            .where(Expense.estado.in_([EstadoGasto.validado, EstadoGasto.justificado]))
-        )
-        spain_total = self.db.execute(spain_expenses_query).scalar() or Decimal("0")
+        # Validated Spain expenses, from the execution ledger
+        ledger = ExecutionLedgerService(self.db)
+        spain_total = ledger.get_location_totals(project_id, include_adjustments=False)[UbicacionGasto.espana]
         summary.gastos_espana_validados = spain_total
 
         # Budget available for transfers
@@ -0,0 +1,429 @@
+"""Cola persistente de traducciones.
+
+Las vistas encolan los campos a traducir (una fila por entidad, campo, idioma
+y source_hash, sin duplicados) y un pool fijo de hilos arrancado en el
+lifespan los reclama por lotes, los traduce con TranslationService y marca
+el resultado. Los fallos se reintentan con espera exponencial.
+
+Cada lote en curso guarda el proceso que lo reclamo (WORKER_ID). Con varios
+workers de uvicorn solo se reencolan, al arrancar y cada
+REQUEUE_CHECK_SECONDS, los lotes de procesos muertos o reclamados hace mas de
+translation_claim_stale_seconds, nunca los que otro proceso sigue traduciendo.
+"""
+import logging
+import threading
+from collections import defaultdict
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+from sqlalchemy import select, update, delete, func
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from app.config import get_settings
+from app.database import SessionLocal
+from app.models.translation_queue import TranslationTask, EstadoTraduccion
+from app.services.translation_service import TranslationService, TARGET_LANGUAGES, _hash
+from app.services.worker_process import WORKER_ID, worker_dead
+
+logger = logging.getLogger(__name__)
+
+ESTADOS_EN_COLA = (EstadoTraduccion.pendiente, EstadoTraduccion.en_proceso)
+MAX_RETRY_DELAY_SECONDS = 3600
+THROUGHPUT_WINDOW_MINUTES = 15
+PURGE_COMPLETED_AFTER_DAYS = 7
+REQUEUE_CHECK_SECONDS = 60
+# Filas por INSERT: un proyecto grande supera el limite de parametros de SQLite
+ENQUEUE_CHUNK_ROWS = 500
+
+
+class TranslationQueueService:
+    def __init__(self, db: Session):
+        self.db = db
+        self.settings = get_settings()
+        self._failing: set[tuple] | None = None
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.settings.openrouter_api_key)
+
+    # ---- Encolar ----
+
+    def enqueue(
+        self,
+        entity_type: str,
+        entity_id: int,
+        fields_data: dict[str, str],
+        project_id: int | None = None,
+        languages: tuple[str, ...] = TARGET_LANGUAGES,
+    ) -> int:
+        """Encola los campos no vacios de una entidad para cada idioma."""
+        items = [
+            (entity_type, entity_id, field_name, text)
+            for field_name, text in fields_data.items() if text
+        ]
+        return sum(self.enqueue_items(items, lang, project_id) for lang in languages)
+
+    def enqueue_items(self, items: list[tuple], language: str, project_id: int | None = None) -> int:
+        """Encola (entity_type, entity_id, field_name, original) para un idioma.
+
+        Si la misma traduccion ya esta en cola no se duplica; si ya se
+        completo o se dio por fallida vuelve a pendiente (el worker no llama a
+        la API si la traduccion sigue en cache).
+        """
+        if not self.enabled or not items:
+            return 0
+        now = datetime.utcnow()
+        rows = {}
+        for entity_type, entity_id, field_name, text in items:
+            source_hash = _hash(text)
+            rows[(entity_type, entity_id, field_name, source_hash)] = {
+                "project_id": project_id,
+                "entity_type": entity_type,
+                "entity_id": entity_id,
+                "field_name": field_name,
+                "language": language,
+                "source_hash": source_hash,
+                "source_text": text,
+                "estado": EstadoTraduccion.pendiente,
+                "intentos": 0,
+                "next_attempt_at": now,
+                "created_at": now,
+            }
+        values = list(rows.values())
+        for start in range(0, len(values), ENQUEUE_CHUNK_ROWS):
+            stmt = sqlite_insert(TranslationTask).values(values[start:start + ENQUEUE_CHUNK_ROWS])
+            stmt = stmt.on_conflict_do_update(
+                index_elements=["entity_type", "entity_id", "field_name", "language", "source_hash"],
+                set_={
+                    "estado": EstadoTraduccion.pendiente,
+                    "intentos": 0,
+                    "next_attempt_at": now,
+                    "last_error": None,
+                    "finished_at": None,
+                    "project_id": func.coalesce(stmt.excluded.project_id, TranslationTask.project_id),
+                },
+                where=TranslationTask.estado.in_([EstadoTraduccion.completado, EstadoTraduccion.error]),
+            )
+            self.db.execute(stmt)
+        self.db.commit()
+        notify_workers()
+        return len(rows)
+
+    def prewarm_project(
+        self, project_id: int, languages: tuple[str, ...] = TARGET_LANGUAGES,
+    ) -> dict[str, int]:
+        """Encola todos los campos traducibles del proyecto que aun no tienen
+        traduccion vigente, para que el portal los sirva desde cache desde la
+        primera visita. Devuelve cuantos campos se han encolado por idioma."""
+        languages = tuple(lang for lang in languages if lang in TARGET_LANGUAGES)
+        if not self.enabled or not languages:
+            return {}
+        _, missing = TranslationService(self.db).get_missing_fields(project_id, languages)
+        return {lang: self.enqueue_items(items, lang, project_id) for lang, items in missing.items()}
+
+    # ---- Consultas para el portal ----
+
+    def is_project_pending(self, project_id: int, language: str) -> bool:
+        """Hay campos del proyecto en su primer intento (aun no han fallado)."""
+        return self.db.execute(
+            select(TranslationTask.id).where(
+                TranslationTask.project_id == project_id,
+                TranslationTask.language == language,
+                TranslationTask.estado.in_(ESTADOS_EN_COLA),
+                TranslationTask.intentos == 0,
+            ).limit(1)
+        ).first() is not None
+
+    def is_failing(
+        self, project_id: int, entity_type: str, entity_id: int,
+        field_name: str, original: str, language: str,
+    ) -> bool:
+        """True si la traduccion de este texto ya ha fallado al menos una vez
+        (se reintenta en segundo plano, pero la pagina no debe esperarla)."""
+        if self._failing is None:
+            self._failing = {
+                tuple(row) for row in self.db.execute(
+                    select(
+                        TranslationTask.entity_type,
+                        TranslationTask.entity_id,
+                        TranslationTask.field_name,
+                        TranslationTask.source_hash,
+                    ).where(
+                        TranslationTask.project_id == project_id,
+                        TranslationTask.language == language,
+                        TranslationTask.intentos > 0,
+                        TranslationTask.estado != EstadoTraduccion.completado,
+                    )
+                ).all()
+            }
+        return (entity_type, entity_id, field_name, _hash(original)) in self._failing
+
+    def get_status(self) -> dict:
+        """Tamano de la cola y ritmo de traduccion."""
+        now = datetime.utcnow()
+        counts = dict(self.db.execute(
+            select(TranslationTask.estado, func.count(TranslationTask.id))
+            .group_by(TranslationTask.estado)
+        ).all())
+        window_start = now - timedelta(minutes=THROUGHPUT_WINDOW_MINUTES)
+        recent = self.db.execute(
+            select(func.count(TranslationTask.id)).where(
+                TranslationTask.estado == EstadoTraduccion.completado,
+                TranslationTask.finished_at >= window_start,
+            )
+        ).scalar() or 0
+        backoff = self.db.execute(
+            select(func.count(TranslationTask.id)).where(
+                TranslationTask.estado == EstadoTraduccion.pendiente,
+                TranslationTask.intentos > 0,
+            )
+        ).scalar() or 0
+        oldest = self.db.execute(
+            select(func.min(TranslationTask.created_at)).where(
+                TranslationTask.estado.in_(ESTADOS_EN_COLA)
+            )
+        ).scalar()
+        by_language = dict(self.db.execute(
+            select(TranslationTask.language, func.count(TranslationTask.id))
+            .where(TranslationTask.estado.in_(ESTADOS_EN_COLA))
+            .group_by(TranslationTask.language)
+        ).all())
+        return {
+            "pendientes": counts.get(EstadoTraduccion.pendiente, 0),
+            "en_proceso": counts.get(EstadoTraduccion.en_proceso, 0),
+            "reintentando": backoff,
+            "errores": counts.get(EstadoTraduccion.error, 0),
+            "completados": counts.get(EstadoTraduccion.completado, 0),
+            "pendientes_por_idioma": by_language,
+            "completados_ventana": recent,
+            "ventana_minutos": THROUGHPUT_WINDOW_MINUTES,
+            "por_minuto": round(recent / THROUGHPUT_WINDOW_MINUTES, 2),
+            "espera_maxima_segundos": int((now - oldest).total_seconds()) if oldest else 0,
+            "workers": len(_threads),
+        }
+
+    def get_failed_tasks(self, limit: int = 20) -> list[TranslationTask]:
+        return self.db.execute(
+            select(TranslationTask)
+            .where(TranslationTask.estado == EstadoTraduccion.error)
+            .order_by(TranslationTask.finished_at.desc())
+            .limit(limit)
+        ).scalars().all()
+
+    # ---- Worker ----
+
+    def requeue_orphaned(self) -> int:
+        """Devuelve a pendiente los lotes en curso de procesos muertos o
+        reclamados hace mas de translation_claim_stale_seconds."""
+        limite = datetime.utcnow() - timedelta(seconds=self.settings.translation_claim_stale_seconds)
+        rows = self.db.execute(
+            select(TranslationTask.id, TranslationTask.worker_id, TranslationTask.claimed_at)
+            .where(
+                TranslationTask.estado == EstadoTraduccion.en_proceso,
+                TranslationTask.worker_id.is_distinct_from(WORKER_ID),
+            )
+        ).all()
+        orphaned = [
+            row.id for row in rows
+            if row.claimed_at is None or row.claimed_at < limite or worker_dead(row.worker_id)
+        ]
+        count = 0
+        for start in range(0, len(orphaned), ENQUEUE_CHUNK_ROWS):
+            count += self.db.execute(
+                update(TranslationTask)
+                .where(
+                    TranslationTask.id.in_(orphaned[start:start + ENQUEUE_CHUNK_ROWS]),
+                    TranslationTask.estado == EstadoTraduccion.en_proceso,
+                )
+                .values(estado=EstadoTraduccion.pendiente, claim_token=None, worker_id=None, claimed_at=None)
+            ).rowcount
+        self.db.commit()
+        if count:
+            logger.warning("Reencoladas %d traducciones sin proceso vivo", count)
+        return count
+
+    def claim_batch(self, limit: int) -> list[TranslationTask]:
+        """Reclama hasta `limit` tareas vencidas. Solo un worker se queda cada una."""
+        now = datetime.utcnow()
+        ids = self.db.execute(
+            select(TranslationTask.id)
+            .where(
+                TranslationTask.estado == EstadoTraduccion.pendiente,
+                TranslationTask.next_attempt_at <= now,
+            )
+            .order_by(TranslationTask.next_attempt_at, TranslationTask.id)
+            .limit(limit)
+        ).scalars().all()
+        if not ids:
+            return []
+        token = str(uuid4())
+        self.db.execute(
+            update(TranslationTask)
+            .where(TranslationTask.id.in_(ids), TranslationTask.estado == EstadoTraduccion.pendiente)
+            .values(
+                estado=EstadoTraduccion.en_proceso, claim_token=token, worker_id=WORKER_ID, claimed_at=now
+            )
+        )
+        self.db.commit()
+        return self.db.execute(
+            select(TranslationTask).where(TranslationTask.claim_token == token)
+        ).scalars().all()
+
+    def finish_batch(self, task_ids: list[int], done: dict[str, set[tuple]], error: str | None = None) -> None:
+        """Marca las tareas traducidas y programa el reintento del resto."""
+        now = datetime.utcnow()
+        tasks = self.db.execute(
+            select(TranslationTask).where(TranslationTask.id.in_(task_ids))
+        ).scalars().all()
+        for task in tasks:
+            task.claim_token = None
+            task.worker_id = None
+            task.claimed_at = None
+            if (task.entity_type, task.entity_id, task.field_name) in done.get(task.language, set()):
+                task.estado = EstadoTraduccion.completado
+                task.finished_at = now
+                task.last_error = None
+                continue
+            task.intentos += 1
+            task.last_error = error or "Sin traduccion en la respuesta"
+            if task.intentos >= self.settings.translation_max_attempts:
+                task.estado = EstadoTraduccion.error
+                task.finished_at = now
+            else:
+                delay = min(
+                    self.settings.translation_retry_base_seconds * 2 ** (task.intentos - 1),
+                    MAX_RETRY_DELAY_SECONDS,
+                )
+                task.estado = EstadoTraduccion.pendiente
+                task.next_attempt_at = now + timedelta(seconds=delay)
+        self.db.commit()
+
+    def purge_completed(self, older_than_days: int = PURGE_COMPLETED_AFTER_DAYS) -> int:
+        count = self.db.execute(
+            delete(TranslationTask).where(
+                TranslationTask.estado == EstadoTraduccion.completado,
+                TranslationTask.finished_at < datetime.utcnow() - timedelta(days=older_than_days),
+            )
+        ).rowcount
+        self.db.commit()
+        return count
+
+
+def enqueue_translation(
+    entity_type: str, entity_id: int, fields_data: dict, project_id: int | None = None,
+) -> None:
+    """Atajo para las vistas (BackgroundTasks): encola con una sesion propia."""
+    db = SessionLocal()
+    try:
+        TranslationQueueService(db).enqueue(entity_type, entity_id, fields_data, project_id)
+    finally:
+        db.close()
+
+
+def prewarm_project_translations(
+    project_id: int, languages: tuple[str, ...] = TARGET_LANGUAGES,
+) -> None:
+    """Atajo con sesion propia para precalentar fuera de la peticion."""
+    db = SessionLocal()
+    try:
+        counts = TranslationQueueService(db).prewarm_project(project_id, languages)
+        if any(counts.values()):
+            logger.info("Precalentando traducciones del proyecto %d: %s", project_id, counts)
+    finally:
+        db.close()
+
+
+# ---- Pool de workers ----
+
+_threads: list[threading.Thread] = []
+_stop = threading.Event()
+_wake = threading.Event()
+
+
+def notify_workers() -> None:
+    _wake.set()
+
+
+def process_next_batch() -> int:
+    """Reclama y traduce un lote. Devuelve cuantas tareas ha procesado."""
+    settings = get_settings()
+    db = SessionLocal()
+    try:
+        queue = TranslationQueueService(db)
+        tasks = queue.claim_batch(settings.translation_batch_size)
+        if not tasks:
+            return 0
+        task_ids = [task.id for task in tasks]
+        items_by_lang = defaultdict(list)
+        for task in tasks:
+            items_by_lang[task.language].append(
+                (task.entity_type, task.entity_id, task.field_name, task.source_text)
+            )
+        try:
+            done = TranslationService(db).translate_pending(dict(items_by_lang))
+            error = None
+        except Exception as e:
+            logger.exception("Error traduciendo un lote de %d campos", len(task_ids))
+            db.rollback()
+            done, error = {}, str(e) or e.__class__.__name__
+        queue.finish_batch(task_ids, done, error)
+        return len(task_ids)
+    finally:
+        db.close()
+
+
+def _worker_loop() -> None:
+    settings = get_settings()
+    last_purge = datetime.min
+    last_requeue = datetime.utcnow()  # start_translation_workers ya ha reencolado
+    while not _stop.is_set():
+        try:
+            processed = process_next_batch()
+            now = datetime.utcnow()
+            if now - last_requeue > timedelta(seconds=REQUEUE_CHECK_SECONDS):
+                db = SessionLocal()
+                try:
+                    TranslationQueueService(db).requeue_orphaned()
+                finally:
+                    db.close()
+                last_requeue = now
+            if now - last_purge > timedelta(hours=1):
+                db = SessionLocal()
+                try:
+                    TranslationQueueService(db).purge_completed()
+                finally:
+                    db.close()
+                last_purge = now
+        except Exception:
+            logger.exception("Error en el worker de traducciones")
+            processed = 0
+        if not processed:
+            _wake.wait(settings.translation_poll_seconds)
+            _wake.clear()
+
+
+def start_translation_workers() -> None:
+    """Arranca el pool (si hay API configurada) y reencola los lotes huerfanos."""
+    settings = get_settings()
+    if not settings.openrouter_api_key or _threads:
+        return
+    db = SessionLocal()
+    try:
+        TranslationQueueService(db).requeue_orphaned()
+    finally:
+        db.close()
+
+    _stop.clear()
+    for i in range(max(1, settings.translation_workers)):
+        thread = threading.Thread(target=_worker_loop, name=f"translation-{i}", daemon=True)
+        thread.start()
+        _threads.append(thread)
+
+
+def stop_translation_workers() -> None:
+    _stop.set()
+    _wake.set()
+    for thread in _threads:
+        thread.join(timeout=10)
+    _threads.clear()
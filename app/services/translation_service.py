@@ -1,22 +1,25 @@
 import hashlib
-import json
 import logging
 import time
 import threading
-import httpx
+from collections import OrderedDict
+from datetime import datetime
+from sqlalchemy import select, or_, and_
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.orm import Session
-from app.models.translation_cache import TranslationCache
+from app.models.translation_cache import TranslationCache, TranslationMemory
+from app.models.logical_framework import LogicalFramework, SpecificObjective, Result, Activity, Indicator
+from app.models.document import Document
+from app.models.project import Project
 from app.config import get_settings
-from app.database import SessionLocal
+from app.services.openrouter_client import get_openrouter_client
 
 logger = logging.getLogger(__name__)
 
 TARGET_LANGUAGES = ("fr", "en")
 
-LANGUAGE_NAMES = {
-    "fr": "frances",
-    "en": "ingles",
-}
+# Hashes por consulta al buscar en la memoria (limite de variables de SQLite)
+MEMORY_LOOKUP_CHUNK = 500
 
 TRANSLATABLE_FIELDS = {
     "project": ("titulo", "sector", "pais"),
@@ -33,15 +36,99 @@ def _hash(text: str) -> str:
     return hashlib.sha256(text.encode("utf-8")).hexdigest()
 
 
-def _retry_pending_in_background(pending_items: list[dict]):
-    """Reintenta traducciones fallidas en un thread aparte."""
-    db = SessionLocal()
-    try:
-        svc = TranslationService(db)
-        for item in pending_items:
-            svc.translate_entity(item["entity_type"], item["entity_id"], item["fields"])
-    finally:
-        db.close()
+class TranslationLRU:
+    """Cache LRU por proceso de traducciones ya guardadas en BD.
+
+    Clave (entity_type, entity_id, field_name, language) -> (source_hash, texto).
+    Una entrada solo vale si su source_hash coincide con el del texto original
+    actual: si el original cambia, la traduccion cacheada se ignora.
+    Tambien recuerda que (proyecto, idioma) se precargaron hace poco para no
+    repetir la consulta masiva en cada peticion.
+    """
+
+    def __init__(self, max_entries: int, prefetch_ttl_seconds: float):
+        self.max_entries = max_entries
+        self.prefetch_ttl_seconds = prefetch_ttl_seconds
+        self._entries: OrderedDict[tuple, tuple[str, str]] = OrderedDict()
+        self._prefetched: dict[tuple[int, str], float] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple, source_hash: str) -> str | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != source_hash:
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def put(self, key: tuple, source_hash: str, text: str) -> None:
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (source_hash, text)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def is_prefetched(self, project_id: int, language: str) -> bool:
+        with self._lock:
+            loaded_at = self._prefetched.get((project_id, language))
+            return loaded_at is not None and time.monotonic() - loaded_at < self.prefetch_ttl_seconds
+
+    def mark_prefetched(self, project_id: int, language: str) -> None:
+        with self._lock:
+            self._prefetched[(project_id, language)] = time.monotonic()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._prefetched.clear()
+
+
+_settings = get_settings()
+translation_lru = TranslationLRU(
+    _settings.translation_cache_size, _settings.translation_prefetch_ttl_seconds
+)
+
+
+ENTITY_MODELS = {
+    "project": Project,
+    "logical_framework": LogicalFramework,
+    "specific_objective": SpecificObjective,
+    "result": Result,
+    "activity": Activity,
+    "indicator": Indicator,
+    "document": Document,
+}
+
+
+def project_entity_ids(project_id: int) -> dict:
+    """Subconsultas con los ids de cada tipo de entidad traducible del proyecto."""
+    framework_ids = select(LogicalFramework.id).where(LogicalFramework.project_id == project_id)
+    objective_ids = select(SpecificObjective.id).where(SpecificObjective.framework_id.in_(framework_ids))
+    result_ids = select(Result.id).where(Result.objective_id.in_(objective_ids))
+    return {
+        "project": select(Project.id).where(Project.id == project_id),
+        "logical_framework": framework_ids,
+        "specific_objective": objective_ids,
+        "result": result_ids,
+        "activity": select(Activity.id).where(Activity.result_id.in_(result_ids)),
+        "indicator": select(Indicator.id).where(Indicator.framework_id.in_(framework_ids)),
+        "document": select(Document.id).where(Document.project_id == project_id),
+    }
+
+
+def project_entity_filter(project_id: int):
+    """Condicion sobre (entity_type, entity_id) que cubre todas las entidades
+    traducibles de un proyecto. Una sola expresion, para consultas masivas."""
+    ids = project_entity_ids(project_id)
+    return or_(
+        and_(TranslationCache.entity_type == "project", TranslationCache.entity_id == project_id),
+        *(
+            and_(TranslationCache.entity_type == entity_type, TranslationCache.entity_id.in_(subquery))
+            for entity_type, subquery in ids.items() if entity_type != "project"
+        ),
+    )
 
 
 class TranslationService:
@@ -60,193 +147,276 @@ class TranslationService:
         if not fields_data:
             return
 
-        for lang in TARGET_LANGUAGES:
-            pending = {}
-            for field_name, text in fields_data.items():
-                source_hash = _hash(text)
+        items = [(entity_type, entity_id, field_name, text) for field_name, text in fields_data.items()]
+        self.translate_pending({lang: items for lang in TARGET_LANGUAGES})
 
-                # Check if cached with same hash
-                existing = (
-                    self.db.query(TranslationCache)
-                    .filter_by(
-                        entity_type=entity_type,
-                        entity_id=entity_id,
-                        field_name=field_name,
-                        language=lang,
-                    )
-                    .first()
-                )
-                if existing and existing.source_hash == source_hash:
-                    continue
+    def translate_pending(self, items_by_lang: dict[str, list[tuple]]) -> dict[str, set[tuple]]:
+        """Traduce (entity_type, entity_id, field_name, original) por idioma.
 
-                # Check if another entity has the same hash (reuse translation)
-                reusable = (
-                    self.db.query(TranslationCache)
-                    .filter_by(
-                        field_name=field_name,
-                        language=lang,
-                        source_hash=source_hash,
-                    )
-                    .first()
-                )
-                if reusable:
-                    if existing:
-                        existing.translated_text = reusable.translated_text
-                        existing.source_hash = source_hash
-                    else:
-                        self.db.add(
-                            TranslationCache(
-                                entity_type=entity_type,
-                                entity_id=entity_id,
-                                field_name=field_name,
-                                language=lang,
-                                translated_text=reusable.translated_text,
-                                source_hash=source_hash,
-                            )
-                        )
-                    self.db.commit()
+        Lo que ya esta en la memoria de traduccion (mismo texto, venga de la
+        entidad que venga) no se envia. El resto va al cliente
+        compartido, con todos los idiomas en paralelo. Devuelve, por idioma,
+        las (entity_type, entity_id, field_name) que quedan traducidas.
+        """
+        done: dict[str, set[tuple]] = {}
+        pending_by_lang: dict[str, list[tuple]] = {}
+        links: list[tuple] = []
+        for lang, items in items_by_lang.items():
+            done[lang] = set()
+            pending_by_lang[lang] = []
+            memory = self._lookup_memories({_hash(item[3]) for item in items if item[3]}, lang)
+            for item in items:
+                entity_type, entity_id, field_name, text = item
+                if not text:
+                    done[lang].add((entity_type, entity_id, field_name))
                     continue
+                source_hash = _hash(text)
+                if source_hash not in memory:
+                    pending_by_lang[lang].append(item)
+                    continue
+                # Ya en la memoria: solo se enlaza a la entidad
+                memory_id, translated_text = memory[source_hash]
+                links.append((entity_type, entity_id, field_name, lang, memory_id, source_hash, translated_text))
+                done[lang].add((entity_type, entity_id, field_name))
+        if links:
+            self._link_many(links)
+            self.db.commit()
+
+        for lang, saved in self._translate_items(pending_by_lang).items():
+            done[lang] |= saved
+        return done
 
-                pending[field_name] = text
-
-            if not pending:
-                continue
-
-            # Call OpenRouter for all pending fields at once
-            translated = self._call_openrouter(pending, lang)
-            if not translated:
-                continue
-
-            for field_name, translated_text in translated.items():
-                source_hash = _hash(fields_data[field_name])
-                existing = (
-                    self.db.query(TranslationCache)
-                    .filter_by(
-                        entity_type=entity_type,
-                        entity_id=entity_id,
-                        field_name=field_name,
-                        language=lang,
-                    )
-                    .first()
+    def _lookup_memories(self, source_hashes: set[str], language: str) -> dict[str, tuple[int, str]]:
+        """source_hash -> (id, traduccion) de los que ya estan en la memoria."""
+        hashes = list(source_hashes)
+        found = {}
+        for start in range(0, len(hashes), MEMORY_LOOKUP_CHUNK):
+            rows = self.db.execute(
+                select(TranslationMemory.source_hash, TranslationMemory.id, TranslationMemory.translated_text)
+                .where(
+                    TranslationMemory.language == language,
+                    TranslationMemory.source_hash.in_(hashes[start:start + MEMORY_LOOKUP_CHUNK]),
                 )
-                if existing:
-                    existing.translated_text = translated_text
-                    existing.source_hash = source_hash
-                else:
-                    self.db.add(
-                        TranslationCache(
-                            entity_type=entity_type,
-                            entity_id=entity_id,
-                            field_name=field_name,
-                            language=lang,
-                            translated_text=translated_text,
-                            source_hash=source_hash,
-                        )
-                    )
-            self.db.commit()
+            )
+            found.update((source_hash, (memory_id, text)) for source_hash, memory_id, text in rows)
+        return found
 
-    def translate_on_demand(
-        self, entity_type: str, entity_id: int, field_name: str,
-        original: str, language: str,
-    ) -> str | None:
-        """Intenta traducir un campo individual con timeout corto.
-        Retorna la traduccion o None si falla."""
-        if not self.settings.openrouter_api_key:
-            return None
+    def _lookup_memory(self, source_hash: str, language: str) -> tuple[int, str] | None:
+        """(id, traduccion) de la memoria: una consulta por el indice unico."""
+        row = self.db.execute(
+            select(TranslationMemory.id, TranslationMemory.translated_text).where(
+                TranslationMemory.source_hash == source_hash,
+                TranslationMemory.language == language,
+            )
+        ).first()
+        return tuple(row) if row else None
 
-        fields = {field_name: original}
-        translated = self._call_openrouter(fields, language, max_retries=1, timeout=10.0)
-        if not translated or field_name not in translated:
-            return None
+    @property
+    def enabled(self) -> bool:
+        return bool(self.settings.openrouter_api_key)
 
-        translated_text = translated[field_name]
-        source_hash = _hash(original)
+    def _translate_items(self, items_by_lang: dict[str, list[tuple]]) -> dict[str, set[tuple]]:
+        """Traduce (entity_type, entity_id, field_name, original) por idioma con
+        el cliente compartido: prompts empaquetados por tamano e idiomas en
+        paralelo. Guarda lo traducido y devuelve las claves guardadas por idioma."""
+        if not self.enabled:
+            return {}
 
-        # Guardar en cache
-        existing = (
-            self.db.query(TranslationCache)
-            .filter_by(
-                entity_type=entity_type,
-                entity_id=entity_id,
-                field_name=field_name,
-                language=language,
-            )
-            .first()
-        )
-        if existing:
-            existing.translated_text = translated_text
-            existing.source_hash = source_hash
-        else:
-            self.db.add(
-                TranslationCache(
-                    entity_type=entity_type,
-                    entity_id=entity_id,
-                    field_name=field_name,
-                    language=language,
-                    translated_text=translated_text,
-                    source_hash=source_hash,
-                )
-            )
+        originals_by_lang = {
+            lang: {
+                f"{entity_type}:{entity_id}:{field_name}": (entity_type, entity_id, field_name, original)
+                for entity_type, entity_id, field_name, original in items
+                if original
+            }
+            for lang, items in items_by_lang.items()
+        }
+        fields_by_lang = {
+            lang: {k: item[3] for k, item in originals.items()}
+            for lang, originals in originals_by_lang.items()
+        }
+        if not any(fields_by_lang.values()):
+            return {}
+
+        client = get_openrouter_client()
+        translated_by_lang = client.run(client.translate_languages(fields_by_lang))
+
+        done: dict[str, set[tuple]] = {}
+        for lang, translated in translated_by_lang.items():
+            originals = originals_by_lang[lang]
+            saved = set()
+            for k, translated_text in translated.items():
+                entity_type, entity_id, field_name, original = originals[k]
+                self._store(entity_type, entity_id, field_name, lang, translated_text, _hash(original))
+                saved.add((entity_type, entity_id, field_name))
+            done[lang] = saved
         self.db.commit()
-        return translated_text
-
-    def _call_openrouter(
-        self, fields: dict[str, str], target_lang: str,
-        max_retries: int = 3, timeout: float = 30.0,
-    ) -> dict[str, str] | None:
-        lang_name = LANGUAGE_NAMES[target_lang]
-        prompt = (
-            f"Traduce los siguientes textos del espanol al {lang_name}. "
-            f"Responde SOLO con un JSON valido con las mismas claves. "
-            f"No agregues explicaciones.\n\n"
-            f"{json.dumps(fields, ensure_ascii=False)}"
+        return done
+
+    def _store(
+        self, entity_type: str, entity_id: int, field_name: str, language: str,
+        translated_text: str, source_hash: str,
+    ) -> None:
+        """Guarda la traduccion en la memoria (una vez por texto e idioma) y
+        enlaza el campo de la entidad. Si otro worker ya guardo ese texto se
+        reutiliza su traduccion."""
+        self.db.execute(
+            sqlite_insert(TranslationMemory)
+            .values(source_hash=source_hash, language=language,
+                    translated_text=translated_text, created_at=datetime.utcnow())
+            .on_conflict_do_nothing(index_elements=["source_hash", "language"])
         )
+        memory_id, translated_text = self._lookup_memory(source_hash, language)
+        self._link(entity_type, entity_id, field_name, language, memory_id, source_hash, translated_text)
 
-        for attempt in range(max_retries):
-            try:
-                response = httpx.post(
-                    "https://openrouter.ai/api/v1/chat/completions",
-                    headers={
-                        "Authorization": f"Bearer {self.settings.openrouter_api_key}",
-                        "Content-Type": "application/json",
-                    },
-                    json={
-                        "model": self.settings.openrouter_model,
-                        "messages": [{"role": "user", "content": prompt}],
-                        "temperature": 0.1,
-                    },
-                    timeout=timeout,
-                )
-                response.raise_for_status()
-                data = response.json()
-                content = data["choices"][0]["message"]["content"]
-
-                # Extract JSON from response (handle markdown code blocks)
-                content = content.strip()
-                if content.startswith("```"):
-                    lines = content.split("\n")
-                    content = "\n".join(lines[1:-1]).strip()
-
-                return json.loads(content)
-            except httpx.HTTPStatusError as e:
-                if e.response.status_code == 429 and attempt < max_retries - 1:
-                    wait = 2 ** attempt  # 1s, 2s, 4s
-                    logger.warning(
-                        "Rate limited (429) translating to %s, retry %d/%d in %ds",
-                        target_lang, attempt + 1, max_retries, wait,
-                    )
-                    time.sleep(wait)
-                    continue
-                logger.exception(
-                    "Error calling OpenRouter for translation to %s", target_lang
-                )
-                return None
-            except Exception:
-                logger.exception(
-                    "Error calling OpenRouter for translation to %s", target_lang
+    def _link(
+        self, entity_type: str, entity_id: int, field_name: str, language: str,
+        memory_id: int, source_hash: str, translated_text: str,
+    ) -> None:
+        """Apunta el campo de la entidad a una entrada de la memoria (BD y LRU)."""
+        self._link_many([(entity_type, entity_id, field_name, language, memory_id, source_hash, translated_text)])
+
+    def _link_many(self, links: list[tuple]) -> None:
+        """Varios _link en una sola sentencia (executemany), sin commit.
+        Cada enlace: (entity_type, entity_id, field_name, language, memory_id,
+        source_hash, translated_text)."""
+        now = datetime.utcnow()
+        stmt = sqlite_insert(TranslationCache)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["entity_type", "entity_id", "field_name", "language"],
+            set_={"memory_id": stmt.excluded.memory_id, "updated_at": stmt.excluded.updated_at},
+            where=TranslationCache.memory_id != stmt.excluded.memory_id,
+        )
+        self.db.execute(stmt, [
+            {
+                "entity_type": entity_type, "entity_id": entity_id, "field_name": field_name,
+                "language": language, "memory_id": memory_id, "created_at": now, "updated_at": now,
+            }
+            for entity_type, entity_id, field_name, language, memory_id, _, _ in links
+        ])
+        for entity_type, entity_id, field_name, language, _, source_hash, translated_text in links:
+            translation_lru.put((entity_type, entity_id, field_name, language), source_hash, translated_text)
+
+    def prefetch_project(self, project_id: int, language: str, force: bool = False) -> bool:
+        """Carga en la LRU todas las traducciones del proyecto para un idioma
+        con una sola consulta. No repite la consulta si se hizo hace poco
+        (salvo force). Devuelve True si ha consultado la BD."""
+        if language == "es":
+            return False
+        if not force and translation_lru.is_prefetched(project_id, language):
+            return False
+        rows = self.db.execute(
+            select(
+                TranslationCache.entity_type,
+                TranslationCache.entity_id,
+                TranslationCache.field_name,
+                TranslationMemory.source_hash,
+                TranslationMemory.translated_text,
+            )
+            .join(TranslationMemory, TranslationCache.memory_id == TranslationMemory.id)
+            .where(
+                TranslationCache.language == language,
+                project_entity_filter(project_id),
+            )
+        ).all()
+        for entity_type, entity_id, field_name, source_hash, translated_text in rows:
+            translation_lru.put(
+                (entity_type, entity_id, field_name, language), source_hash, translated_text
+            )
+        translation_lru.mark_prefetched(project_id, language)
+        return True
+
+    def get_project_fields(self, project_id: int) -> list[tuple]:
+        """(entity_type, entity_id, field_name, original) de todos los
+        TRANSLATABLE_FIELDS no vacios del proyecto. Una consulta por tipo."""
+        items = []
+        for entity_type, ids in project_entity_ids(project_id).items():
+            model = ENTITY_MODELS[entity_type]
+            fields = TRANSLATABLE_FIELDS[entity_type]
+            rows = self.db.execute(
+                select(model.id, *(getattr(model, f) for f in fields)).where(model.id.in_(ids))
+            ).all()
+            for entity_id, *values in rows:
+                items.extend(
+                    (entity_type, entity_id, field_name, value)
+                    for field_name, value in zip(fields, values) if value
                 )
-                return None
-        return None
+        return items
+
+    def get_missing_fields(
+        self, project_id: int, languages: tuple[str, ...] = TARGET_LANGUAGES,
+    ) -> tuple[list[tuple], dict[str, list[tuple]]]:
+        """Campos del proyecto y, por idioma, los que no tienen traduccion
+        vigente (sin traducir o traducidos de un texto que ha cambiado)."""
+        fields = self.get_project_fields(project_id)
+        rows = self.db.execute(
+            select(
+                TranslationCache.entity_type,
+                TranslationCache.entity_id,
+                TranslationCache.field_name,
+                TranslationCache.language,
+                TranslationMemory.source_hash,
+            )
+            .join(TranslationMemory, TranslationCache.memory_id == TranslationMemory.id)
+            .where(
+                TranslationCache.language.in_(languages),
+                project_entity_filter(project_id),
+            )
+        ).all()
+        translated = {tuple(row[:4]): row[4] for row in rows}
+        hashes = {item: _hash(item[3]) for item in fields}
+        missing = {
+            lang: [
+                item for item in fields
+                if translated.get((item[0], item[1], item[2], lang)) != hashes[item]
+            ]
+            for lang in languages
+        }
+        return fields, missing
+
+    def get_project_coverage(
+        self, project_id: int, languages: tuple[str, ...] = TARGET_LANGUAGES,
+    ) -> dict[str, dict]:
+        """Porcentaje de campos traducibles del proyecto que el portal puede
+        servir ya desde cache, por idioma."""
+        fields, missing = self.get_missing_fields(project_id, languages)
+        total = len(fields)
+        coverage = {}
+        for lang in languages:
+            translated = total - len(missing[lang])
+            coverage[lang] = {
+                "total": total,
+                "traducidos": translated,
+                "porcentaje": round(100 * translated / total, 1) if total else 100.0,
+            }
+        return coverage
+
+    def get_portal_coverage(self, languages: tuple[str, ...] = TARGET_LANGUAGES) -> list[dict]:
+        """Cobertura de los proyectos abiertos al portal de contrapartes."""
+        from app.services.project_service import ESTADOS_PORTAL
+
+        projects = self.db.execute(
+            select(Project.id, Project.codigo_contable, Project.titulo)
+            .where(Project.estado.in_(ESTADOS_PORTAL))
+            .order_by(Project.codigo_contable)
+        ).all()
+        return [
+            {
+                "project_id": project_id,
+                "codigo_contable": codigo,
+                "titulo": titulo,
+                "idiomas": self.get_project_coverage(project_id, languages),
+            }
+            for project_id, codigo, titulo in projects
+        ]
+
+    def get_cached_translation(
+        self, entity_type: str, entity_id: int, field_name: str,
+        original: str, language: str,
+    ) -> str | None:
+        """Traduccion vigente desde la LRU (sin consultar la BD), o None."""
+        return translation_lru.get(
+            (entity_type, entity_id, field_name, language), _hash(original)
+        )
 
     def get_translated_text(
         self,
@@ -259,16 +429,16 @@ class TranslationService:
         if language == "es" or not original:
             return original or ""
 
-        cached = (
-            self.db.query(TranslationCache)
-            .filter_by(
-                entity_type=entity_type,
-                entity_id=entity_id,
-                field_name=field_name,
-                language=language,
-            )
-            .first()
-        )
-        if cached:
-            return cached.translated_text
+        key = (entity_type, entity_id, field_name, language)
+        source_hash = _hash(original)
+        hit = translation_lru.get(key, source_hash)
+        if hit is not None:
+            return hit
+
+        # La memoria va por contenido: si el original cambio, su hash ya no
+        # encuentra la traduccion antigua
+        memory = self._lookup_memory(source_hash, language)
+        if memory is not None:
+            translation_lru.put(key, source_hash, memory[1])
+            return memory[1]
         return original or ""
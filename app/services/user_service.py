@@ -2,6 +2,7 @@ from datetime import datetime
 from sqlalchemy.orm import Session
 from app.models.user import User, Rol, user_project
 from app.models.project import Project
+from app.auth.principal_cache import invalidate_user
 
 
 class UserService:
@@ -17,6 +18,7 @@ class UserService:
             user.ultimo_acceso = datetime.utcnow()
             self.db.commit()
             self.db.refresh(user)
+            invalidate_user(user.id)
             return user
 
         # Check by email
@@ -28,6 +30,7 @@ class UserService:
             user.ultimo_acceso = datetime.utcnow()
             self.db.commit()
             self.db.refresh(user)
+            invalidate_user(user.id)
             return user
 
         user = User(
@@ -78,6 +81,7 @@ class UserService:
             user.ultimo_acceso = datetime.utcnow()
             self.db.commit()
             self.db.refresh(user)
+            invalidate_user(user.id)
             return user
 
         user = User(
@@ -117,6 +121,7 @@ class UserService:
         user.rol = rol
         self.db.commit()
         self.db.refresh(user)
+        invalidate_user(user.id)
         return user
 
     def toggle_active(self, user_id: str) -> User | None:
@@ -126,6 +131,7 @@ class UserService:
         user.activo = not user.activo
         self.db.commit()
         self.db.refresh(user)
+        invalidate_user(user.id)
         return user
 
     def assign_project(self, user_id: str, project_id: int) -> bool:
@@ -139,6 +145,7 @@ class UserService:
             return False
         self.db.execute(user_project.insert().values(user_id=user_id, project_id=project_id))
         self.db.commit()
+        invalidate_user(user_id)
         return True
 
     def unassign_project(self, user_id: str, project_id: int) -> bool:
@@ -149,6 +156,7 @@ class UserService:
             )
         )
         self.db.commit()
+        invalidate_user(user_id)
         return result.rowcount > 0
 
     def get_assigned_projects(self, user_id: str) -> list[Project]:
@@ -0,0 +1,34 @@
+"""Identidad del proceso que ejecuta trabajo en segundo plano.
+
+Los trabajos de generacion y la cola de traducciones guardan WORKER_ID en lo
+que reclaman; al arrancar, o periodicamente, un proceso solo recupera lo que
+pertenece a procesos muertos (o sin actividad reciente), nunca lo que otro
+worker de uvicorn sigue procesando.
+"""
+import os
+import socket
+from uuid import uuid4
+
+
+# Identifica este proceso; el sufijo distingue un pid reutilizado tras reiniciar
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}:{uuid4().hex[:8]}"
+
+
+def worker_dead(worker_id: str | None) -> bool:
+    """Si el proceso propietario ha muerto. Solo se sabe en el mismo host;
+    para los demas decide el latido o la antiguedad del reclamo."""
+    if not worker_id:
+        return False
+    host, _, rest = worker_id.partition(":")
+    pid, _, boot = rest.partition(":")
+    if host != socket.gethostname() or not pid.isdigit():
+        return False
+    if int(pid) == os.getpid():
+        return worker_id != WORKER_ID  # arranque anterior con el mismo pid
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return True
+    except PermissionError:
+        return False
+    return False
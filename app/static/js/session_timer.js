@@ -0,0 +1,48 @@
+// CooperApp - Counterpart session countdown
+//
+// The remaining time arrives once with the page and is counted down here.
+// Changes decided by the server (activity in another tab, logout, expiry)
+// are pushed over SSE from /contraparte/session/events, so an idle tab
+// makes no requests and never touches the session.
+
+(function () {
+    const el = document.getElementById('session-timer');
+    if (!el) return;
+
+    const labels = {
+        remaining: el.dataset.labelRemaining,
+        expired: el.dataset.labelExpired,
+    };
+    let deadline = Date.now() + Number(el.dataset.remaining) * 1000;
+    let source = null;
+
+    function render() {
+        const mins = Math.max(0, Math.floor((deadline - Date.now()) / 60000));
+        const span = document.createElement('span');
+        span.className = 'session-timer' + (mins < 30 ? ' session-timer-warning' : '');
+        if (mins > 60) {
+            span.textContent = `${Math.floor(mins / 60)}h ${mins % 60}m ${labels.remaining}`;
+        } else if (mins > 0) {
+            span.textContent = `${mins}m ${labels.remaining}`;
+        } else {
+            span.textContent = labels.expired;
+        }
+        el.replaceChildren(span);
+    }
+
+    const timer = setInterval(render, 30000);
+
+    if (window.EventSource && el.dataset.events) {
+        source = new EventSource(el.dataset.events);
+        source.addEventListener('expiry', (event) => {
+            deadline = Date.now() + JSON.parse(event.data).remaining * 1000;
+            render();
+        });
+        source.addEventListener('expired', () => {
+            deadline = Date.now();
+            render();
+            clearInterval(timer);
+            source.close();
+        });
+    }
+})();
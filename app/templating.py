@@ -0,0 +1,84 @@
+"""Entorno Jinja2 unico para toda la aplicacion.
+
+Todas las vistas importan `templates` de aqui: cada plantilla se compila una
+sola vez por proceso (antes cada modulo de vistas tenia su propio entorno y
+su propia cache). El bytecode compilado se guarda en disco
+(FileSystemBytecodeCache), asi que tras un reinicio no se vuelve a compilar;
+`python -m app.templating` lo genera en la imagen al construirla.
+
+En produccion (DEBUG=false) auto_reload esta desactivado: las plantillas ya
+cargadas no comprueban la fecha del fichero en cada render.
+"""
+import os
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+from fastapi.templating import Jinja2Templates
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, pass_context
+
+from app.config import get_settings, Settings
+from app.i18n import CATALOGS, get_catalog, get_translator
+
+# Ruta absoluta: la clave del bytecode incluye la ruta del fichero, y debe
+# coincidir entre la precompilacion y el arranque
+TEMPLATES_DIR = Path(__file__).resolve().parent / "templates"
+
+
+@pass_context
+def translate_filter(context, key: str) -> str:
+    """{{ 'clave'|t }}: traduce con el catalogo del `lang` del contexto."""
+    return get_catalog(context.get("lang", "es"))[key]
+
+
+def build_environment(settings: Settings) -> Environment:
+    auto_reload = settings.templates_auto_reload
+    if auto_reload is None:
+        auto_reload = settings.debug
+
+    bytecode_cache = None
+    if settings.templates_cache_dir:
+        os.makedirs(settings.templates_cache_dir, exist_ok=True)
+        bytecode_cache = FileSystemBytecodeCache(settings.templates_cache_dir)
+
+    env = Environment(
+        loader=FileSystemLoader(TEMPLATES_DIR),
+        autoescape=True,
+        auto_reload=auto_reload,
+        bytecode_cache=bytecode_cache,
+        # Todas las plantillas caben en memoria: ninguna se expulsa
+        cache_size=-1,
+    )
+    # Globales comunes; el contexto de cada vista los puede sobrescribir
+    # (por ejemplo `t` en el portal de contrapartes, segun el idioma)
+    env.globals["now"] = datetime.now
+    env.globals["t"] = get_translator("es")
+    env.globals["catalogs"] = CATALOGS
+    env.filters["t"] = translate_filter
+    return env
+
+
+templates = Jinja2Templates(env=build_environment(get_settings()))
+
+
+def precompile(env: Environment | None = None) -> int:
+    """Compila todas las plantillas (y guarda su bytecode). Devuelve cuantas."""
+    env = env or templates.env
+    names = env.list_templates(extensions=["html"])
+    for name in names:
+        env.get_template(name)
+    return len(names)
+
+
+def main() -> int:
+    start = time.perf_counter()
+    count = precompile()
+    elapsed = (time.perf_counter() - start) * 1000
+    cache_dir = get_settings().templates_cache_dir or "(sin cache en disco)"
+    print(f"{count} plantillas compiladas en {elapsed:.0f} ms -> {cache_dir}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,5 @@
 from fastapi import APIRouter, Request, Depends
 from fastapi.responses import HTMLResponse
-from fastapi.templating import Jinja2Templates
 from sqlalchemy.orm import Session
 
 from app.database import get_db
@@ -11,10 +10,10 @@ from app.models.aacid import MARKER_NAMES
 from app.services.project_service import ProjectService
 from app.auth.dependencies import require_permission
 from app.auth.permissions import Permiso
+from app.templating import templates
 
 
 router = APIRouter()
-templates = Jinja2Templates(directory="app/templates")
 
 
 def get_aacid_service(db: Session = Depends(get_db)) -> AACIDFormService:
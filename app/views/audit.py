@@ -1,13 +1,12 @@
 from fastapi import APIRouter, Depends, Request
 from fastapi.responses import HTMLResponse
-from fastapi.templating import Jinja2Templates
 from app.models.user import User
 from app.models.audit_log import AccionAuditoria
 from app.auth.dependencies import require_permission
 from app.auth.permissions import Permiso
+from app.templating import templates
 
 router = APIRouter()
-templates = Jinja2Templates(directory="app/templates")
 
 
 @router.get("/auditoria", response_class=HTMLResponse)
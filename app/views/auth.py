@@ -1,10 +1,11 @@
-from fastapi import APIRouter, Depends, Request
+from fastapi import APIRouter, BackgroundTasks, Depends, Request
 from fastapi.responses import HTMLResponse, RedirectResponse
-from fastapi.templating import Jinja2Templates
 from sqlalchemy.orm import Session
 from app.database import get_db
 from app.config import get_settings
 from app.auth.entra import oauth
+from app.auth.principal_cache import invalidate_counterpart
+from app.auth.session_events import publish_expired
 from app.auth.session import (
     create_internal_session, destroy_internal_session,
     create_counterpart_session, validate_project_code,
@@ -15,9 +16,9 @@ from app.services.user_service import UserService
 from app.services.audit_service import AuditService
 from app.models.audit_log import ActorType, AccionAuditoria
 from app.i18n import detect_language, get_translator
+from app.templating import templates
 
 router = APIRouter()
-templates = Jinja2Templates(directory="app/templates")
 settings = get_settings()
 
 
@@ -109,7 +110,9 @@ def counterpart_login_page(request: Request):
 
 
 @router.post("/contraparte/login")
-async def counterpart_login(request: Request, db: Session = Depends(get_db)):
+async def counterpart_login(
+    request: Request, background_tasks: BackgroundTasks, db: Session = Depends(get_db),
+):
     form_data = await request.form()
     code = form_data.get("code", "").strip()
     language = form_data.get("language", "es")
@@ -135,7 +138,9 @@ async def counterpart_login(request: Request, db: Session = Depends(get_db)):
         return RedirectResponse(url=f"/contraparte/login?error=invalid&lang={language}", status_code=302)
 
     user_agent = request.headers.get("user-agent", "")
-    session = create_counterpart_session(db, project.id, ip, user_agent, language=language)
+    session = create_counterpart_session(
+        db, project.id, ip, user_agent, language=language, background_tasks=background_tasks,
+    )
 
     # Auditar login contraparte
     audit = AuditService(db)
@@ -179,6 +184,8 @@ def counterpart_logout(request: Request, db: Session = Depends(get_db)):
             )
             session.activo = False
             db.commit()
+            invalidate_counterpart(token)
+            publish_expired(session.id)
 
     response = RedirectResponse(url=f"/contraparte/login?lang={lang}", status_code=302)
     clear_counterpart_cookie(response)
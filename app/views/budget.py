@@ -1,7 +1,6 @@
 from decimal import Decimal
 from fastapi import APIRouter, Depends, Request, Form, HTTPException
 from fastapi.responses import HTMLResponse
-from fastapi.templating import Jinja2Templates
 from sqlalchemy.orm import Session
 from app.database import get_db
 from app.models.user import User
@@ -14,9 +13,9 @@ from app.auth.permissions import Permiso
 from app.services.audit_service import AuditService
 from app.models.audit_log import ActorType, AccionAuditoria
 from app.i18n import get_translator
+from app.templating import templates
 
 router = APIRouter()
-templates = Jinja2Templates(directory="app/templates")
 _t = get_translator("es")
 
 
@@ -1,7 +1,6 @@
 from decimal import Decimal
 from fastapi import APIRouter, Depends, Request, HTTPException
 from fastapi.responses import HTMLResponse
-from fastapi.templating import Jinja2Templates
 from sqlalchemy.orm import Session
 from app.database import get_db
 from app.models.budget import CategoriaPartida
@@ -10,9 +9,9 @@ from app.services.budget_service import BudgetService
 from app.auth.dependencies import get_current_user
 from app.services.audit_service import AuditService
 from app.models.audit_log import ActorType, AccionAuditoria
+from app.templating import templates
 
 router = APIRouter()
-templates = Jinja2Templates(directory="app/templates")
 
 
 def get_service(db: Session = Depends(get_db)) -> BudgetService:
@@ -1,20 +1,20 @@
 import os
-import threading
 from datetime import date
 from decimal import Decimal
 from fastapi import APIRouter, BackgroundTasks, Depends, Request, HTTPException, UploadFile, File, Form, Query
-from fastapi.responses import HTMLResponse, FileResponse
-from fastapi.templating import Jinja2Templates
+from fastapi.responses import HTMLResponse, FileResponse, StreamingResponse
 from sqlalchemy.orm import Session
-from app.database import get_db, SessionLocal
+from app.database import get_db
 from app.models.counterpart_session import CounterpartSession
-from app.auth.dependencies import get_current_counterpart
+from app.auth.dependencies import get_current_counterpart, get_counterpart_session
+from app.auth.session_events import stream_session_events
 from app.services.project_service import ProjectService
 from app.services.logical_framework_service import LogicalFrameworkService
 from app.services.document_service import DocumentService
 from app.services.expense_service import ExpenseService
 from app.services.budget_service import BudgetService
-from app.services.translation_service import TranslationService, _retry_pending_in_background
+from app.services.translation_service import TranslationService
+from app.services.translation_queue_service import TranslationQueueService, enqueue_translation
 from app.models.logical_framework import EstadoActividad, Indicator, Activity
 from app.models.expense import UbicacionGasto, EstadoGasto
 from app.models.document import CategoriaDocumento, CATEGORIA_NOMBRES, CATEGORIA_GRUPOS, TipoFuenteVerificacion, TIPO_FUENTE_NOMBRES
@@ -26,9 +26,9 @@ from app.services.verification_source_service import VerificationSourceService
 from app.services.audit_service import AuditService
 from app.models.audit_log import ActorType, AccionAuditoria
 from app.i18n import get_translator
+from app.templating import templates
 
 router = APIRouter()
-templates = Jinja2Templates(directory="app/templates")
 
 CATEGORIA_NOMBRES_I18N = {
     "fr": {
@@ -107,23 +107,30 @@ def _get_categoria_grupos_for_lang(lang: str) -> list[dict]:
     return CATEGORIA_GRUPOS
 
 
-def _build_content_translator(db: Session, language: str):
-    """Construye tc() con traduccion lazy on-demand + retry en background.
+def _build_content_translator(db: Session, language: str, project_id: int):
+    """Construye tc() para el portal. Nunca llama a la API de traduccion.
 
-    - Si hay cache: devuelve la traduccion cacheada.
-    - Si no hay cache: intenta traducir on-demand (timeout corto 10s).
-    - Si on-demand falla: devuelve el original y acumula el campo en
-      `pending_retries` para reintentarlo en un thread background.
+    - Antes de renderizar se cargan en la LRU del proceso todas las
+      traducciones del proyecto para el idioma (una sola consulta).
+    - Si hay cache vigente (mismo source_hash): devuelve la traduccion.
+    - Si no: devuelve el original y apunta el campo en `tc.pending`;
+      _flush_pending_translations() los encola y la pagina muestra un aviso
+      que se recarga cuando la cola del proyecto se vacia.
     """
     if language == "es":
         def tc(entity_type, entity_id, field_name, original_text):
             return original_text or ""
-        tc.pending_retries = []
+        tc.pending = []
+        tc.queue = None
         return tc
 
     svc = TranslationService(db)
+    queue = TranslationQueueService(db)
+    # Si la precarga viene de una peticion anterior, un fallo puede deberse a
+    # una entrada expulsada de la LRU: se recarga una vez antes de darla por pendiente
+    state = {"fresh": svc.prefetch_project(project_id, language)}
     cache = {}
-    pending_retries = []
+    pending = []
 
     def tc(entity_type, entity_id, field_name, original_text):
         if not original_text:
@@ -132,55 +139,36 @@ def _build_content_translator(db: Session, language: str):
         if key in cache:
             return cache[key]
 
-        # Buscar en DB
-        result = svc.get_translated_text(
+        result = svc.get_cached_translation(
             entity_type, entity_id, field_name, original_text, language
         )
-        if result != original_text:
-            # Hay traduccion en cache
+        if result is None and not state["fresh"]:
+            state["fresh"] = svc.prefetch_project(project_id, language, force=True)
+            result = svc.get_cached_translation(
+                entity_type, entity_id, field_name, original_text, language
+            )
+        if result is not None:
             cache[key] = result
             return result
 
-        # No hay cache: intentar on-demand
-        translated = svc.translate_on_demand(
-            entity_type, entity_id, field_name, original_text, language
-        )
-        if translated:
-            cache[key] = translated
-            return translated
-
-        # Fallo on-demand: acumular para retry background
-        pending_retries.append({
-            "entity_type": entity_type,
-            "entity_id": entity_id,
-            "fields": {field_name: original_text},
-        })
+        # Sin traduccion: original ahora, traduccion cuando la procese la cola.
+        # Los campos que ya fallaron esperan su reintento sin bloquear el aviso
+        if svc.enabled and not queue.is_failing(
+            project_id, entity_type, entity_id, field_name, original_text, language
+        ):
+            pending.append((entity_type, entity_id, field_name, original_text))
         cache[key] = original_text
         return original_text
 
-    tc.pending_retries = pending_retries
+    tc.pending = pending
+    tc.queue = queue
     return tc
 
 
-def _flush_pending_retries(tc):
-    """Lanza un thread para reintentar las traducciones que fallaron on-demand."""
-    pending = getattr(tc, "pending_retries", [])
-    if not pending:
-        return
-    # Agrupar por entidad para hacer menos llamadas API
-    grouped = {}
-    for item in pending:
-        key = (item["entity_type"], item["entity_id"])
-        if key not in grouped:
-            grouped[key] = {"entity_type": item["entity_type"], "entity_id": item["entity_id"], "fields": {}}
-        grouped[key]["fields"].update(item["fields"])
-
-    thread = threading.Thread(
-        target=_retry_pending_in_background,
-        args=(list(grouped.values()),),
-        daemon=True,
-    )
-    thread.start()
+def _flush_pending_translations(tc, project_id: int, language: str):
+    """Encola los campos que se han mostrado sin traducir."""
+    if tc.pending:
+        tc.queue.enqueue_items(tc.pending, language, project_id)
 
 
 def get_project_service(db: Session = Depends(get_db)) -> ProjectService:
@@ -207,13 +195,6 @@ def get_verification_service(db: Session = Depends(get_db)) -> VerificationSourc
     return VerificationSourceService(db)
 
 
-def _trigger_translation_bg(entity_type: str, entity_id: int, fields_data: dict):
-    db = SessionLocal()
-    try:
-        TranslationService(db).translate_entity(entity_type, entity_id, fields_data)
-    finally:
-        db.close()
-
 
 def _validate_counterpart_project(session: CounterpartSession, project_id: int, project_service: ProjectService):
     """Valida acceso de contraparte al proyecto y lo devuelve."""
@@ -238,9 +219,43 @@ def _ml_context(request, project, framework, summary, lang, t, tc):
         "lang": lang,
         "t": t,
         "tc": tc,
+        "translation_reload": f"/contraparte/{project.id}/marco-logico",
     }
 
 
+# ======================== Counterpart Session Endpoints ========================
+# Declaradas antes de /contraparte/{project_id}: si no, esa ruta las captura
+# y responde 422 al no ser un id
+
+
+@router.get("/contraparte/session-timer", response_class=HTMLResponse)
+def session_timer(
+    request: Request,
+    session: CounterpartSession = Depends(get_counterpart_session),
+):
+    lang = session.language or "es"
+    t = get_translator(lang)
+    return templates.TemplateResponse(
+        "partials/auth/session_timer.html",
+        {
+            "request": request,
+            "session": session,
+            "lang": lang,
+            "t": t,
+        },
+    )
+
+
+@router.get("/contraparte/session/events")
+def session_event_stream(session: CounterpartSession = Depends(get_counterpart_session)):
+    """Canal SSE del contador de sesion (ver app.auth.session_events)."""
+    return StreamingResponse(
+        stream_session_events(session),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.get("/contraparte/{project_id}", response_class=HTMLResponse)
 def counterpart_portal(
     request: Request,
@@ -258,7 +273,7 @@ def counterpart_portal(
 
     lang = session.language or "es"
     t = get_translator(lang)
-    tc = _build_content_translator(db, lang)
+    tc = _build_content_translator(db, lang, project_id)
     response = templates.TemplateResponse(
         "pages/counterpart/portal.html",
         {
@@ -268,9 +283,10 @@ def counterpart_portal(
             "lang": lang,
             "t": t,
             "tc": tc,
+            "translation_reload": f"/contraparte/{project_id}",
         },
     )
-    _flush_pending_retries(tc)
+    _flush_pending_translations(tc, project_id, lang)
     return response
 
 
@@ -295,12 +311,12 @@ def counterpart_marco_logico(
 
     lang = session.language or "es"
     t = get_translator(lang)
-    tc = _build_content_translator(db, lang)
+    tc = _build_content_translator(db, lang, project_id)
     ctx = _ml_context(request, project, framework, summary, lang, t, tc)
     response = templates.TemplateResponse(
         "partials/projects/marco_logico_tab.html", ctx,
     )
-    _flush_pending_retries(tc)
+    _flush_pending_translations(tc, project_id, lang)
     return response
 
 
@@ -325,7 +341,7 @@ def counterpart_documents(
 
     lang = session.language or "es"
     t = get_translator(lang)
-    tc = _build_content_translator(db, lang)
+    tc = _build_content_translator(db, lang, project_id)
     cat_nombres = CATEGORIA_NOMBRES_I18N.get(lang, CATEGORIA_NOMBRES)
     cat_grupos = _get_categoria_grupos_for_lang(lang)
     response = templates.TemplateResponse(
@@ -342,12 +358,47 @@ def counterpart_documents(
             "lang": lang,
             "t": t,
             "tc": tc,
+            "translation_reload": f"/contraparte/{project_id}/documentos",
         },
     )
-    _flush_pending_retries(tc)
+    _flush_pending_translations(tc, project_id, lang)
     return response
 
 
+@router.get("/contraparte/{project_id}/traducciones/estado", response_class=HTMLResponse)
+def counterpart_translation_status(
+    request: Request,
+    project_id: int,
+    reload: str = Query(...),
+    session: CounterpartSession = Depends(get_counterpart_session),
+    project_service: ProjectService = Depends(get_project_service),
+    db: Session = Depends(get_db),
+):
+    """Sondeo del aviso de traduccion: sigue esperando mientras la cola tenga
+    campos del proyecto y, cuando se vacia, recarga el fragmento (o la pagina
+    del portal). Como el contador de sesion, el sondeo no cuenta como
+    actividad."""
+    project = _validate_counterpart_project(session, project_id, project_service)
+    if not reload.startswith(f"/contraparte/{project_id}"):
+        raise HTTPException(status_code=400, detail="URL de recarga no valida")
+
+    lang = session.language or "es"
+    pending = TranslationQueueService(db).is_project_pending(project_id, lang)
+    if not pending and reload == f"/contraparte/{project_id}":
+        return HTMLResponse("", headers={"HX-Refresh": "true"})
+    return templates.TemplateResponse(
+        "partials/projects/translation_pending.html",
+        {
+            "request": request,
+            "project": project,
+            "t": get_translator(lang),
+            "translation_reload": reload,
+            "translation_pending": pending,
+            "translation_done": not pending,
+        },
+    )
+
+
 # ======================== Counterpart Activity Endpoints ========================
 
 
@@ -389,14 +440,14 @@ def counterpart_update_activity_status(
 
     lang = session.language or "es"
     t = get_translator(lang)
-    tc = _build_content_translator(db, lang)
+    tc = _build_content_translator(db, lang, project_id)
     framework = lf_service.get_framework_by_project(project_id)
     summary = lf_service.get_framework_summary(project_id)
     ctx = _ml_context(request, project, framework, summary, lang, t, tc)
     response = templates.TemplateResponse(
         "partials/projects/marco_logico_tab.html", ctx,
     )
-    _flush_pending_retries(tc)
+    _flush_pending_translations(tc, project_id, lang)
     return response
 
 
@@ -490,20 +541,20 @@ async def counterpart_update_activity(
 
     if data.descripcion:
         background_tasks.add_task(
-            _trigger_translation_bg, "activity", activity_id,
-            {"descripcion": data.descripcion},
+            enqueue_translation, "activity", activity_id,
+            {"descripcion": data.descripcion}, project_id=project_id,
         )
 
     lang = session.language or "es"
     t = get_translator(lang)
-    tc = _build_content_translator(db, lang)
+    tc = _build_content_translator(db, lang, project_id)
     framework = lf_service.get_framework_by_project(project_id)
     summary = lf_service.get_framework_summary(project_id)
     ctx = _ml_context(request, project, framework, summary, lang, t, tc)
     response = templates.TemplateResponse(
         "partials/projects/marco_logico_tab.html", ctx,
     )
-    _flush_pending_retries(tc)
+    _flush_pending_translations(tc, project_id, lang)
     return response
 
 
@@ -549,13 +600,13 @@ async def counterpart_upload_document(
 
     if document and descripcion:
         background_tasks.add_task(
-            _trigger_translation_bg, "document", document.id,
-            {"descripcion": descripcion},
+            enqueue_translation, "document", document.id,
+            {"descripcion": descripcion}, project_id=project_id,
         )
 
     lang = session.language or "es"
     t = get_translator(lang)
-    tc = _build_content_translator(db, lang)
+    tc = _build_content_translator(db, lang, project_id)
     cat_nombres = CATEGORIA_NOMBRES_I18N.get(lang, CATEGORIA_NOMBRES)
     cat_grupos = _get_categoria_grupos_for_lang(lang)
 
@@ -576,9 +627,10 @@ async def counterpart_upload_document(
             "lang": lang,
             "t": t,
             "tc": tc,
+            "translation_reload": f"/contraparte/{project_id}/documentos",
         },
     )
-    _flush_pending_retries(tc)
+    _flush_pending_translations(tc, project_id, lang)
     return response
 
 
@@ -607,24 +659,6 @@ def counterpart_download_document(
     )
 
 
-@router.get("/contraparte/session-timer", response_class=HTMLResponse)
-def session_timer(
-    request: Request,
-    session: CounterpartSession = Depends(get_current_counterpart),
-):
-    lang = session.language or "es"
-    t = get_translator(lang)
-    return templates.TemplateResponse(
-        "partials/auth/session_timer.html",
-        {
-            "request": request,
-            "session": session,
-            "lang": lang,
-            "t": t,
-        },
-    )
-
-
 # ======================== Counterpart Budget Endpoints ========================
 
 
@@ -1,29 +1,21 @@
 from fastapi import APIRouter, BackgroundTasks, Depends, Request, HTTPException, UploadFile, File, Form, Query
 from fastapi.responses import HTMLResponse
-from fastapi.templating import Jinja2Templates
 from sqlalchemy.orm import Session
-from app.database import get_db, SessionLocal
+from app.database import get_db
 from app.models.document import CategoriaDocumento, CATEGORIA_NOMBRES, CATEGORIA_GRUPOS
 from app.models.user import User
 from app.services.document_service import DocumentService
 from app.services.project_service import ProjectService
-from app.services.translation_service import TranslationService
+from app.services.translation_queue_service import enqueue_translation
 from app.schemas.document import DocumentCreate, DocumentFilters
 from app.auth.dependencies import get_current_user, require_permission
 from app.auth.permissions import Permiso
 from app.services.audit_service import AuditService
 from app.models.audit_log import ActorType, AccionAuditoria
+from app.templating import templates
 
 
-def _trigger_translation_bg(entity_type: str, entity_id: int, fields_data: dict):
-    db = SessionLocal()
-    try:
-        TranslationService(db).translate_entity(entity_type, entity_id, fields_data)
-    finally:
-        db.close()
-
 router = APIRouter()
-templates = Jinja2Templates(directory="app/templates")
 
 
 def get_document_service(db: Session = Depends(get_db)) -> DocumentService:
@@ -141,8 +133,8 @@ async def upload_document(
 
     if document and descripcion:
         background_tasks.add_task(
-            _trigger_translation_bg, "document", document.id,
-            {"descripcion": descripcion},
+            enqueue_translation, "document", document.id,
+            {"descripcion": descripcion}, project_id=project_id,
         )
 
     # Return updated tab content
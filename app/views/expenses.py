@@ -3,12 +3,12 @@ from decimal import Decimal
 import os
 from fastapi import APIRouter, Depends, Request, Form, HTTPException, UploadFile, File, Query
 from fastapi.responses import HTMLResponse, FileResponse
-from fastapi.templating import Jinja2Templates
 from sqlalchemy.orm import Session
 from app.database import get_db
 from app.models.expense import UbicacionGasto, EstadoGasto
 from app.models.document import CategoriaDocumento
 from app.models.user import User
+from app.models.project import Project
 from app.services.expense_service import ExpenseService
 from app.services.project_service import ProjectService
 from app.services.document_service import DocumentService
@@ -20,9 +20,9 @@ from app.auth.permissions import Permiso
 from app.services.audit_service import AuditService
 from app.models.audit_log import ActorType, AccionAuditoria
 from app.i18n import get_translator
+from app.templating import templates
 
 router = APIRouter()
-templates = Jinja2Templates(directory="app/templates")
 _t = get_translator("es")
 
 
@@ -42,6 +42,33 @@ def get_budget_service(db: Session = Depends(get_db)) -> BudgetService:
     return BudgetService(db)
 
 
+def _render_expenses_tab(
+    request: Request,
+    user: User,
+    project: Project,
+    expense_service: ExpenseService,
+    budget_service: BudgetService,
+):
+    """Render the whole expenses tab. The expense list is loaded once for the
+    tab and its included table; the summary is a single aggregate query."""
+    project_id = project.id
+    return templates.TemplateResponse(
+        "partials/projects/expenses_tab.html",
+        {
+            "request": request,
+            "user": user,
+            "project": project,
+            "expenses": expense_service.get_project_expenses(project_id),
+            "summary": expense_service.get_expense_summary(project_id),
+            "budget_lines": expense_service.get_budget_lines_with_balance(project_id),
+            "funding_sources": budget_service.get_project_funding_sources(project_id),
+            "estados": EstadoGasto,
+            "ubicaciones": UbicacionGasto,
+            "t": _t,
+        },
+    )
+
+
 @router.get("/{project_id}/expenses", response_class=HTMLResponse)
 def expenses_tab(
     request: Request,
@@ -56,26 +83,7 @@ def expenses_tab(
     if not project:
         raise HTTPException(status_code=404, detail="Proyecto no encontrado")
 
-    expenses = expense_service.get_project_expenses(project_id)
-    summary = expense_service.get_expense_summary(project_id)
-    budget_lines = expense_service.get_budget_lines_with_balance(project_id)
-    funding_sources = budget_service.get_project_funding_sources(project_id)
-
-    return templates.TemplateResponse(
-        "partials/projects/expenses_tab.html",
-        {
-            "request": request,
-            "user": user,
-            "project": project,
-            "expenses": expenses,
-            "summary": summary,
-            "budget_lines": budget_lines,
-            "funding_sources": funding_sources,
-            "estados": EstadoGasto,
-            "ubicaciones": UbicacionGasto,
-            "t": _t,
-        },
-    )
+    return _render_expenses_tab(request, user, project, expense_service, budget_service)
 
 
 @router.get("/{project_id}/expenses/table", response_class=HTMLResponse)
@@ -257,26 +265,7 @@ async def create_expense(
         raise HTTPException(status_code=400, detail=str(e))
 
     # Return updated tab content
-    expenses = expense_service.get_project_expenses(project_id)
-    summary = expense_service.get_expense_summary(project_id)
-    budget_lines = expense_service.get_budget_lines_with_balance(project_id)
-    funding_sources = budget_service.get_project_funding_sources(project_id)
-
-    return templates.TemplateResponse(
-        "partials/projects/expenses_tab.html",
-        {
-            "request": request,
-            "user": user,
-            "project": project,
-            "expenses": expenses,
-            "summary": summary,
-            "budget_lines": budget_lines,
-            "funding_sources": funding_sources,
-            "estados": EstadoGasto,
-            "ubicaciones": UbicacionGasto,
-            "t": _t,
-        },
-    )
+    return _render_expenses_tab(request, user, project, expense_service, budget_service)
 
 
 @router.put("/{project_id}/expenses/{expense_id}", response_class=HTMLResponse)
@@ -360,26 +349,7 @@ async def update_expense(
         raise HTTPException(status_code=400, detail=str(e))
 
     # Return updated tab content
-    expenses = expense_service.get_project_expenses(project_id)
-    summary = expense_service.get_expense_summary(project_id)
-    budget_lines = expense_service.get_budget_lines_with_balance(project_id)
-    funding_sources = budget_service.get_project_funding_sources(project_id)
-
-    return templates.TemplateResponse(
-        "partials/projects/expenses_tab.html",
-        {
-            "request": request,
-            "user": user,
-            "project": project,
-            "expenses": expenses,
-            "summary": summary,
-            "budget_lines": budget_lines,
-            "funding_sources": funding_sources,
-            "estados": EstadoGasto,
-            "ubicaciones": UbicacionGasto,
-            "t": _t,
-        },
-    )
+    return _render_expenses_tab(request, user, project, expense_service, budget_service)
 
 
 @router.delete("/{project_id}/expenses/{expense_id}", response_class=HTMLResponse)
@@ -416,26 +386,7 @@ def delete_expense(
     )
 
     # Return updated tab content
-    expenses = expense_service.get_project_expenses(project_id)
-    summary = expense_service.get_expense_summary(project_id)
-    budget_lines = expense_service.get_budget_lines_with_balance(project_id)
-    funding_sources = budget_service.get_project_funding_sources(project_id)
-
-    return templates.TemplateResponse(
-        "partials/projects/expenses_tab.html",
-        {
-            "request": request,
-            "user": user,
-            "project": project,
-            "expenses": expenses,
-            "summary": summary,
-            "budget_lines": budget_lines,
-            "funding_sources": funding_sources,
-            "estados": EstadoGasto,
-            "ubicaciones": UbicacionGasto,
-            "t": _t,
-        },
-    )
+    return _render_expenses_tab(request, user, project, expense_service, budget_service)
 
 
 @router.post("/{project_id}/expenses/{expense_id}/validate", response_class=HTMLResponse)
@@ -474,26 +425,7 @@ def validate_expense(
         raise HTTPException(status_code=400, detail=str(e))
 
     # Return updated tab content
-    expenses = expense_service.get_project_expenses(project_id)
-    summary = expense_service.get_expense_summary(project_id)
-    budget_lines = expense_service.get_budget_lines_with_balance(project_id)
-    funding_sources = budget_service.get_project_funding_sources(project_id)
-
-    response = templates.TemplateResponse(
-        "partials/projects/expenses_tab.html",
-        {
-            "request": request,
-            "user": user,
-            "project": project,
-            "expenses": expenses,
-            "summary": summary,
-            "budget_lines": budget_lines,
-            "funding_sources": funding_sources,
-            "estados": EstadoGasto,
-            "ubicaciones": UbicacionGasto,
-            "t": _t,
-        },
-    )
+    response = _render_expenses_tab(request, user, project, expense_service, budget_service)
     # Trigger budget tab refresh when expense validation changes budget values
     response.headers["HX-Trigger"] = "budgetUpdated"
     return response
@@ -538,26 +470,7 @@ async def reject_expense(
         raise HTTPException(status_code=400, detail=str(e))
 
     # Return updated tab content
-    expenses = expense_service.get_project_expenses(project_id)
-    summary = expense_service.get_expense_summary(project_id)
-    budget_lines = expense_service.get_budget_lines_with_balance(project_id)
-    funding_sources = budget_service.get_project_funding_sources(project_id)
-
-    response = templates.TemplateResponse(
-        "partials/projects/expenses_tab.html",
-        {
-            "request": request,
-            "user": user,
-            "project": project,
-            "expenses": expenses,
-            "summary": summary,
-            "budget_lines": budget_lines,
-            "funding_sources": funding_sources,
-            "estados": EstadoGasto,
-            "ubicaciones": UbicacionGasto,
-            "t": _t,
-        },
-    )
+    response = _render_expenses_tab(request, user, project, expense_service, budget_service)
     # Trigger budget tab refresh when expense validation changes budget values
     response.headers["HX-Trigger"] = "budgetUpdated"
     return response
@@ -599,26 +512,7 @@ def revert_expense(
         raise HTTPException(status_code=400, detail=str(e))
 
     # Return updated tab content
-    expenses = expense_service.get_project_expenses(project_id)
-    summary = expense_service.get_expense_summary(project_id)
-    budget_lines = expense_service.get_budget_lines_with_balance(project_id)
-    funding_sources = budget_service.get_project_funding_sources(project_id)
-
-    response = templates.TemplateResponse(
-        "partials/projects/expenses_tab.html",
-        {
-            "request": request,
-            "user": user,
-            "project": project,
-            "expenses": expenses,
-            "summary": summary,
-            "budget_lines": budget_lines,
-            "funding_sources": funding_sources,
-            "estados": EstadoGasto,
-            "ubicaciones": UbicacionGasto,
-            "t": _t,
-        },
-    )
+    response = _render_expenses_tab(request, user, project, expense_service, budget_service)
     # Trigger budget tab refresh when expense validation changes budget values
     response.headers["HX-Trigger"] = "budgetUpdated"
     return response
@@ -701,26 +595,7 @@ async def upload_document(
         raise HTTPException(status_code=400, detail=str(e))
 
     # Return updated tab content
-    expenses = expense_service.get_project_expenses(project_id)
-    summary = expense_service.get_expense_summary(project_id)
-    budget_lines = expense_service.get_budget_lines_with_balance(project_id)
-    funding_sources = budget_service.get_project_funding_sources(project_id)
-
-    return templates.TemplateResponse(
-        "partials/projects/expenses_tab.html",
-        {
-            "request": request,
-            "user": user,
-            "project": project,
-            "expenses": expenses,
-            "summary": summary,
-            "budget_lines": budget_lines,
-            "funding_sources": funding_sources,
-            "estados": EstadoGasto,
-            "ubicaciones": UbicacionGasto,
-            "t": _t,
-        },
-    )
+    return _render_expenses_tab(request, user, project, expense_service, budget_service)
 
 
 @router.get("/{project_id}/expenses/{expense_id}/document")
@@ -1,13 +1,12 @@
 from fastapi import APIRouter, BackgroundTasks, Depends, Request, Form, HTTPException
 from fastapi.responses import HTMLResponse
-from fastapi.templating import Jinja2Templates
 from sqlalchemy.orm import Session
 from datetime import date
-from app.database import get_db, SessionLocal
+from app.database import get_db
 from app.models.user import User
 from app.services.logical_framework_service import LogicalFrameworkService
 from app.services.project_service import ProjectService
-from app.services.translation_service import TranslationService
+from app.services.translation_queue_service import enqueue_translation
 from app.models.logical_framework import EstadoActividad
 from app.schemas.logical_framework import (
     LogicalFrameworkUpdate,
@@ -20,17 +19,10 @@ from app.auth.dependencies import get_current_user, require_permission
 from app.auth.permissions import Permiso
 from app.services.audit_service import AuditService
 from app.models.audit_log import ActorType, AccionAuditoria
+from app.templating import templates
 
 
-def _trigger_translation_bg(entity_type: str, entity_id: int, fields_data: dict):
-    db = SessionLocal()
-    try:
-        TranslationService(db).translate_entity(entity_type, entity_id, fields_data)
-    finally:
-        db.close()
-
 router = APIRouter()
-templates = Jinja2Templates(directory="app/templates")
 
 
 def get_service(db: Session = Depends(get_db)) -> LogicalFrameworkService:
@@ -111,8 +103,8 @@ def update_objetivo_general(
 
     if framework and objetivo_general:
         background_tasks.add_task(
-            _trigger_translation_bg, "logical_framework", framework.id,
-            {"objetivo_general": objetivo_general},
+            enqueue_translation, "logical_framework", framework.id,
+            {"objetivo_general": objetivo_general}, project_id=project_id,
         )
 
     return templates.TemplateResponse(
@@ -237,8 +229,8 @@ def add_objective(
 
     if objective:
         background_tasks.add_task(
-            _trigger_translation_bg, "specific_objective", objective.id,
-            {"descripcion": descripcion},
+            enqueue_translation, "specific_objective", objective.id,
+            {"descripcion": descripcion}, project_id=project_id,
         )
 
     framework = service.get_framework_by_project(project_id)
@@ -299,8 +291,8 @@ async def update_objective(
 
     if descripcion:
         background_tasks.add_task(
-            _trigger_translation_bg, "specific_objective", objective_id,
-            {"descripcion": descripcion},
+            enqueue_translation, "specific_objective", objective_id,
+            {"descripcion": descripcion}, project_id=objective.framework.project_id,
         )
 
     # Get project_id from objective's framework
@@ -446,8 +438,8 @@ def add_result(
 
     if result:
         background_tasks.add_task(
-            _trigger_translation_bg, "result", result.id,
-            {"descripcion": descripcion},
+            enqueue_translation, "result", result.id,
+            {"descripcion": descripcion}, project_id=project_id,
         )
 
     framework = service.get_framework_by_project(project_id)
@@ -504,14 +496,15 @@ async def update_result(
         ip_address=request.client.host if request.client else None,
     )
 
+    result = service.get_result(result_id)
+    project_id = result.objective.framework.project_id
+
     if data.descripcion:
         background_tasks.add_task(
-            _trigger_translation_bg, "result", result_id,
-            {"descripcion": data.descripcion},
+            enqueue_translation, "result", result_id,
+            {"descripcion": data.descripcion}, project_id=project_id,
         )
 
-    result = service.get_result(result_id)
-    project_id = result.objective.framework.project_id
     framework = service.get_framework_by_project(project_id)
     project = project_service.get_by_id(project_id)
     summary = service.get_framework_summary(project_id)
@@ -660,8 +653,8 @@ def add_activity(
 
     if activity:
         background_tasks.add_task(
-            _trigger_translation_bg, "activity", activity.id,
-            {"descripcion": descripcion},
+            enqueue_translation, "activity", activity.id,
+            {"descripcion": descripcion}, project_id=project_id,
         )
 
     framework = service.get_framework_by_project(project_id)
@@ -734,8 +727,8 @@ async def update_activity(
 
     if data.descripcion:
         background_tasks.add_task(
-            _trigger_translation_bg, "activity", activity_id,
-            {"descripcion": data.descripcion},
+            enqueue_translation, "activity", activity_id,
+            {"descripcion": data.descripcion}, project_id=project_id,
         )
 
     framework = service.get_framework_by_project(project_id)
@@ -943,7 +936,7 @@ async def create_indicator(
         if data.fuente_verificacion:
             fields["fuente_verificacion"] = data.fuente_verificacion
         background_tasks.add_task(
-            _trigger_translation_bg, "indicator", indicator.id, fields,
+            enqueue_translation, "indicator", indicator.id, fields, project_id=project_id,
         )
 
     framework = service.get_framework_by_project(project_id)
@@ -1041,7 +1034,7 @@ async def update_indicator(
         fields["fuente_verificacion"] = data.fuente_verificacion
     if fields:
         background_tasks.add_task(
-            _trigger_translation_bg, "indicator", indicator_id, fields,
+            enqueue_translation, "indicator", indicator_id, fields, project_id=project_id,
         )
 
     framework = service.get_framework_by_project(project_id)
@@ -1,35 +1,24 @@
 from fastapi import APIRouter, BackgroundTasks, Depends, Request, Form, HTTPException
 from fastapi.responses import HTMLResponse, RedirectResponse
-from fastapi.templating import Jinja2Templates
 from sqlalchemy.orm import Session
 from decimal import Decimal
-from datetime import date, datetime
+from datetime import date
 from typing import List
-from app.database import get_db, SessionLocal
+from app.database import get_db
 from app.models.project import EstadoProyecto, TipoProyecto
 from app.models.user import User, Rol
 from app.schemas.project import ProjectCreate, ProjectUpdate, PlazoCreate
 from app.services.project_service import ProjectService
-from app.services.translation_service import TranslationService
+from app.services.translation_queue_service import enqueue_translation
 from app.auth.dependencies import get_current_user, require_permission, check_project_access
 from app.auth.permissions import Permiso, user_has_permission
 from app.services.audit_service import AuditService
 from app.services.postponement_service import PostponementService
 from app.models.audit_log import ActorType, AccionAuditoria
+from app.templating import templates
 
 
-def _trigger_translation_bg(entity_type: str, entity_id: int, fields_data: dict):
-    db = SessionLocal()
-    try:
-        TranslationService(db).translate_entity(entity_type, entity_id, fields_data)
-    finally:
-        db.close()
-
 router = APIRouter()
-templates = Jinja2Templates(directory="app/templates")
-
-# Add datetime.now to Jinja2 globals
-templates.env.globals["now"] = datetime.now
 
 
 def get_service(db: Session = Depends(get_db)) -> ProjectService:
@@ -203,7 +192,7 @@ async def projects_create(
         plazos=plazos,
         ods_ids=ods_ids,
     )
-    project = service.create(data)
+    project = service.create(data, background_tasks)
 
     audit = AuditService(service.db)
     audit.log(
@@ -220,8 +209,9 @@ async def projects_create(
     )
 
     background_tasks.add_task(
-        _trigger_translation_bg, "project", project.id,
+        enqueue_translation, "project", project.id,
         {"titulo": project.titulo, "sector": project.sector or "", "pais": project.pais or ""},
+        project_id=project.id,
     )
 
     return RedirectResponse(url=f"/projects/{project.id}", status_code=303)
@@ -391,7 +381,7 @@ async def projects_update(
         ampliado=ampliado,
         ods_ids=ods_ids,
     )
-    service.update(project_id, data)
+    service.update(project_id, data, background_tasks)
 
     audit = AuditService(service.db)
     audit.log(
@@ -408,8 +398,8 @@ async def projects_update(
     )
 
     background_tasks.add_task(
-        _trigger_translation_bg, "project", project_id,
-        {"titulo": titulo, "sector": sector or "", "pais": pais or ""},
+        enqueue_translation, "project", project_id,
+        {"titulo": titulo, "sector": sector or "", "pais": pais or ""}, project_id=project_id,
     )
 
     return RedirectResponse(url=f"/projects/{project_id}", status_code=303)
@@ -1,6 +1,5 @@
 from fastapi import APIRouter, Request, Depends
 from fastapi.responses import HTMLResponse
-from fastapi.templating import Jinja2Templates
 from sqlalchemy.orm import Session
 
 from app.database import get_db
@@ -8,12 +7,13 @@ from app.models.report import TIPO_INFORME_NOMBRES
 from app.models.user import User
 from app.services.report_service import ReportService
 from app.services.project_service import ProjectService
+from app.services.job_service import JobService
 from app.auth.dependencies import require_permission
 from app.auth.permissions import Permiso
+from app.templating import templates
 
 
 router = APIRouter()
-templates = Jinja2Templates(directory="app/templates")
 
 
 def get_report_service(db: Session = Depends(get_db)) -> ReportService:
@@ -24,6 +24,10 @@ def get_project_service(db: Session = Depends(get_db)) -> ProjectService:
     return ProjectService(db)
 
 
+def get_job_service(db: Session = Depends(get_db)) -> JobService:
+    return JobService(db)
+
+
 @router.get("/{project_id}/reports", response_class=HTMLResponse)
 def reports_tab(
     request: Request,
@@ -31,6 +35,7 @@ def reports_tab(
     user: User = Depends(require_permission(Permiso.informe_generar)),
     report_service: ReportService = Depends(get_report_service),
     project_service: ProjectService = Depends(get_project_service),
+    job_service: JobService = Depends(get_job_service),
 ):
     """Render the reports tab content."""
     project = project_service.get_by_id(project_id)
@@ -40,6 +45,7 @@ def reports_tab(
     reports = report_service.get_project_reports(project_id)
     validation = report_service.validate_for_generation(project_id)
     report_types = report_service.get_available_report_types(project_id)
+    jobs = job_service.get_project_jobs(project_id)
 
     return templates.TemplateResponse(
         "partials/projects/reports_tab.html",
@@ -50,5 +56,31 @@ def reports_tab(
             "validation": validation,
             "report_types": report_types,
             "tipo_nombres": TIPO_INFORME_NOMBRES,
+            "jobs": jobs,
+            "polling": False,
+        },
+    )
+
+
+@router.get("/{project_id}/reports/jobs", response_class=HTMLResponse)
+def report_jobs(
+    request: Request,
+    project_id: int,
+    polling: bool = False,
+    user: User = Depends(require_permission(Permiso.informe_generar)),
+    job_service: JobService = Depends(get_job_service),
+):
+    """Polling partial with the generation jobs of the project.
+
+    While any job is active it keeps polling; once they all finish it reloads
+    the whole tab so the new reports show up in the list."""
+    jobs = job_service.get_project_jobs(project_id)
+    return templates.TemplateResponse(
+        "partials/projects/report_jobs.html",
+        {
+            "request": request,
+            "project_id": project_id,
+            "jobs": jobs,
+            "polling": polling,
         },
     )
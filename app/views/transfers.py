@@ -2,7 +2,6 @@ from datetime import date
 from decimal import Decimal
 from fastapi import APIRouter, Depends, Request, HTTPException, Query, UploadFile, File, Form
 from fastapi.responses import HTMLResponse, FileResponse
-from fastapi.templating import Jinja2Templates
 from sqlalchemy.orm import Session
 from app.database import get_db
 from app.models.transfer import EstadoTransferencia, EntidadBancaria, MonedaLocal
@@ -17,9 +16,9 @@ from app.auth.dependencies import get_current_user, require_permission
 from app.auth.permissions import Permiso
 from app.services.audit_service import AuditService
 from app.models.audit_log import ActorType, AccionAuditoria
+from app.templating import templates
 
 router = APIRouter()
-templates = Jinja2Templates(directory="app/templates")
 
 
 def get_transfer_service(db: Session = Depends(get_db)) -> TransferService:
@@ -0,0 +1,71 @@
+from fastapi import APIRouter, Depends, Request
+from fastapi.responses import HTMLResponse
+from sqlalchemy.orm import Session
+from app.database import get_db
+from app.models.user import User
+from app.auth.dependencies import require_permission
+from app.auth.permissions import Permiso
+from app.services.translation_queue_service import TranslationQueueService
+from app.services.translation_service import TranslationService
+from app.templating import templates
+
+router = APIRouter()
+
+
+def _queue_context(db: Session) -> dict:
+    service = TranslationQueueService(db)
+    return {
+        "status": service.get_status(),
+        "failed": service.get_failed_tasks(),
+        "enabled": service.enabled,
+    }
+
+
+@router.get("/traducciones", response_class=HTMLResponse)
+def translations_index(
+    request: Request,
+    user: User = Depends(require_permission(Permiso.auditoria_ver)),
+    db: Session = Depends(get_db),
+):
+    return templates.TemplateResponse(
+        "pages/translations/index.html",
+        {"request": request, "user": user, **_queue_context(db)},
+    )
+
+
+@router.get("/traducciones/estado", response_class=HTMLResponse)
+def translations_status(
+    request: Request,
+    user: User = Depends(require_permission(Permiso.auditoria_ver)),
+    db: Session = Depends(get_db),
+):
+    return templates.TemplateResponse(
+        "partials/translations/queue_status.html",
+        {"request": request, **_queue_context(db)},
+    )
+
+
+@router.get("/traducciones/cobertura", response_class=HTMLResponse)
+def translations_coverage(
+    request: Request,
+    user: User = Depends(require_permission(Permiso.auditoria_ver)),
+    db: Session = Depends(get_db),
+):
+    return templates.TemplateResponse(
+        "partials/translations/coverage.html",
+        {"request": request, "coverage": TranslationService(db).get_portal_coverage()},
+    )
+
+
+@router.post("/traducciones/cobertura/{project_id}/precalentar", response_class=HTMLResponse)
+def translations_prewarm(
+    request: Request,
+    project_id: int,
+    user: User = Depends(require_permission(Permiso.auditoria_ver)),
+    db: Session = Depends(get_db),
+):
+    TranslationQueueService(db).prewarm_project(project_id)
+    return templates.TemplateResponse(
+        "partials/translations/coverage.html",
+        {"request": request, "coverage": TranslationService(db).get_portal_coverage()},
+    )
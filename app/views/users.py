@@ -1,6 +1,5 @@
 from fastapi import APIRouter, Depends, Request
 from fastapi.responses import HTMLResponse
-from fastapi.templating import Jinja2Templates
 from sqlalchemy.orm import Session
 from app.database import get_db
 from app.models.user import User, Rol
@@ -8,9 +7,9 @@ from app.auth.dependencies import get_current_user, require_permission
 from app.auth.permissions import Permiso
 from app.services.user_service import UserService
 from app.services.project_service import ProjectService
+from app.templating import templates
 
 router = APIRouter()
-templates = Jinja2Templates(directory="app/templates")
 
 
 def get_user_service(db: Session = Depends(get_db)) -> UserService:
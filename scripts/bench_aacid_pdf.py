@@ -0,0 +1,124 @@
+"""Benchmark: Anexo II A generation for many projects in a row.
+
+Seeds N AACID projects (narratives, beneficiaries, volunteers, markers and a
+logical framework) and fills the PDF for each one twice:
+
+  per-call parse   the previous AACIDFormService.generate_pdf: read and clone
+                   the template, rebuild every annotation name through its
+                   /Parent chain and scan all values by substring
+  cached template  AnexoTemplate, parsed once per process with the FIELD_MAP
+                   patterns indexed to annotation positions
+
+Both fills are checked to produce the same field values. Then the full
+generate_pdf (DB reads, file and Report row) is timed for the N projects.
+
+Usage:
+    PYTHONPATH=. python scripts/bench_aacid_pdf.py [--projects 100]
+"""
+
+import argparse
+import io
+import tempfile
+import time
+
+import bench_data
+from pypdf import PdfReader, PdfWriter
+from pypdf.generic import BooleanObject, NameObject, TextStringObject
+
+from app.database import SessionLocal
+from app.models.project import Project
+from app.services import aacid_service
+from app.services.aacid_service import AACIDFormService, PDF_TEMPLATE_PATH, get_anexo_template
+
+
+def legacy_fill(values: dict[str, str]) -> bytes:
+    """Template handling of generate_pdf before the cache."""
+    reader = PdfReader(PDF_TEMPLATE_PATH)
+    writer = PdfWriter()
+    writer.append(reader)
+    if "/AcroForm" in writer._root_object:
+        writer._root_object["/AcroForm"][NameObject("/NeedAppearances")] = BooleanObject(True)
+    for page in writer.pages:
+        for annot_ref in page.get("/Annots") or []:
+            annot = annot_ref.get_object()
+            full_name = aacid_service._full_field_name(annot)
+            for pattern, value in values.items():
+                if pattern in full_name and value:
+                    annot[NameObject("/V")] = TextStringObject(str(value))
+                    if "/AP" in annot:
+                        del annot["/AP"]
+                    break
+    buffer = io.BytesIO()
+    writer.write(buffer)
+    return buffer.getvalue()
+
+
+def field_values(pdf_bytes: bytes) -> list:
+    reader = PdfReader(io.BytesIO(pdf_bytes))
+    return [
+        (aacid_service._full_field_name(a.get_object()), a.get_object().get("/V"), "/AP" in a.get_object())
+        for page in reader.pages for a in page.get("/Annots") or []
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--projects", type=int, default=100)
+    args = parser.parse_args()
+
+    bench_data.init_db()
+    aacid_service.EXPORTS_DIR = tempfile.mkdtemp(dir=bench_data.TMP_DIR)
+    try:
+        ids = []
+        for i in range(args.projects):
+            project_id = bench_data.seed_project(0, n_lines=4, n_transfers=0, n_results=3, codigo=f"AACID-{i}", seed=i)
+            bench_data.seed_aacid_data(project_id)
+            ids.append(project_id)
+
+        db = SessionLocal()
+        try:
+            service = AACIDFormService(db)
+            all_values = [service._build_field_values(db.get(Project, pid)) for pid in ids]
+        finally:
+            db.close()
+
+        start = time.perf_counter()
+        template = get_anexo_template()
+        load = time.perf_counter() - start
+
+        for values in all_values[:3]:
+            assert field_values(legacy_fill(values)) == field_values(template.fill(values)), "output differs"
+
+        start = time.perf_counter()
+        for values in all_values:
+            legacy_fill(values)
+        legacy = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for values in all_values:
+            template.fill(values)
+        cached = time.perf_counter() - start
+
+        db = SessionLocal()
+        try:
+            service = AACIDFormService(db)
+            start = time.perf_counter()
+            for pid in ids:
+                service.generate_pdf(pid)
+            full = time.perf_counter() - start
+        finally:
+            db.close()
+
+        n = len(ids)
+        print(f"{n} projects, {len(template._annots)} annotations, {len(template._positions)} indexed patterns")
+        print(f"template parse + index (once): {load * 1000:.0f} ms")
+        print(f"{'fill':<20}{'total s':>10}{'ms/project':>14}")
+        print(f"{'per-call parse':<20}{legacy:>10.2f}{legacy / n * 1000:>14.1f}")
+        print(f"{'cached template':<20}{cached:>10.2f}{cached / n * 1000:>14.1f}")
+        print(f"generate_pdf end to end: {full:.2f} s ({full / n * 1000:.1f} ms/project)")
+    finally:
+        bench_data.cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+"""Benchmark: BaseHTTPMiddleware vs pure ASGI AuthMiddleware.
+
+Drives the real application in-process (raw ASGI calls, no network) and
+reports requests/second and time-to-first-byte for the projects list partial
+and for a large expense document download.
+
+Usage:
+    PYTHONPATH=. python scripts/bench_auth_middleware.py [--requests 300] [--file-mb 50]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import statistics
+import tempfile
+import time
+from base64 import b64encode
+from datetime import date
+from decimal import Decimal
+
+_tmpdir = tempfile.mkdtemp(prefix="cooperapp-bench-")
+os.environ["DATABASE_URL"] = f"sqlite:///{_tmpdir}/bench.db"
+
+from itsdangerous import TimestampSigner  # noqa: E402
+from starlette.middleware import Middleware  # noqa: E402
+from starlette.middleware.base import BaseHTTPMiddleware  # noqa: E402
+
+from app.auth.middleware import AuthMiddleware  # noqa: E402
+from app.config import get_settings  # noqa: E402
+from app.database import SessionLocal  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models.budget import ProjectBudgetLine, CategoriaPartida  # noqa: E402
+from app.models.expense import Expense, UbicacionGasto  # noqa: E402
+from app.models.project import Project, EstadoProyecto, TipoProyecto  # noqa: E402
+from app.services.user_service import UserService  # noqa: E402
+
+
+class LegacyAuthMiddleware(BaseHTTPMiddleware):
+    """Same gate as AuthMiddleware, wrapped the old way."""
+
+    def __init__(self, app):
+        super().__init__(app)
+        self.gate = AuthMiddleware(app)
+
+    async def dispatch(self, request, call_next):
+        response = self.gate.check(request)
+        if response is not None:
+            return response
+        return await call_next(request)
+
+
+def _build_stack(middleware_cls):
+    app.user_middleware = [
+        Middleware(middleware_cls) if m.cls in (AuthMiddleware, LegacyAuthMiddleware) else m
+        for m in app.user_middleware
+    ]
+    app.middleware_stack = app.build_middleware_stack()
+    return app.middleware_stack
+
+
+def _seed(file_mb: int) -> tuple[str, int, int]:
+    db = SessionLocal()
+    try:
+        user = UserService(db).get_or_create_dev_user()
+        project = Project(
+            codigo_contable="BENCH-001", codigo_area="BENCH", titulo="Proyecto benchmark",
+            pais="Senegal", estado=EstadoProyecto.ejecucion, tipo=TipoProyecto.desarrollo,
+            financiador="AACID", sector="Agua", subvencion=Decimal("100000"),
+            fecha_inicio=date(2026, 1, 1), fecha_finalizacion=date(2026, 12, 31),
+        )
+        db.add(project)
+        db.flush()
+        line = ProjectBudgetLine(project_id=project.id, code="A.1", name="Linea", category=CategoriaPartida.servicios, order=1)
+        db.add(line)
+        db.flush()
+
+        path = os.path.join(_tmpdir, "documento.pdf")
+        with open(path, "wb") as f:
+            chunk = os.urandom(1024 * 1024)
+            for _ in range(file_mb):
+                f.write(chunk)
+
+        expense = Expense(
+            project_id=project.id, budget_line_id=line.id, fecha_factura=date(2026, 2, 1),
+            concepto="Gasto", expedidor="Proveedor", cantidad_original=Decimal("10"),
+            cantidad_euros=Decimal("10"), financiado_por="AACID",
+            ubicacion=UbicacionGasto.terreno, documento_path=path,
+        )
+        db.add(expense)
+        db.commit()
+        return user.id, project.id, expense.id
+    finally:
+        db.close()
+
+
+def _session_cookie(user_id: str) -> str:
+    signer = TimestampSigner(str(get_settings().session_secret_key))
+    data = b64encode(json.dumps({"user_id": user_id}).encode("utf-8"))
+    return "session=" + signer.sign(data).decode("utf-8")
+
+
+async def _request(asgi, path: str, cookie: str) -> tuple[float, float, int]:
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": "GET", "scheme": "http", "path": path, "raw_path": path.encode(),
+        "root_path": "", "query_string": b"", "server": ("testserver", 80),
+        "client": ("127.0.0.1", 12345),
+        "headers": [(b"host", b"testserver"), (b"cookie", cookie.encode())],
+    }
+    start = time.perf_counter()
+    first = None
+    size = 0
+    status = 0
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        nonlocal first, size, status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+        elif message["type"] == "http.response.body":
+            if first is None:
+                first = time.perf_counter()
+            size += len(message.get("body", b""))
+
+    await asgi(scope, receive, send)
+    end = time.perf_counter()
+    if status != 200:
+        raise RuntimeError(f"{path} -> {status}")
+    return (first or end) - start, end - start, size
+
+
+async def _bench(asgi, path: str, cookie: str, n: int) -> dict:
+    await _request(asgi, path, cookie)  # warm-up (templates, principal cache)
+    ttfb, total = [], []
+    start = time.perf_counter()
+    for _ in range(n):
+        a, b, _size = await _request(asgi, path, cookie)
+        ttfb.append(a * 1000)
+        total.append(b * 1000)
+    elapsed = time.perf_counter() - start
+    return {"rps": n / elapsed, "ttfb_ms": statistics.median(ttfb), "total_ms": statistics.median(total)}
+
+
+async def main_async(args):
+    async with app.router.lifespan_context(app):
+        user_id, project_id, expense_id = _seed(args.file_mb)
+        cookie = _session_cookie(user_id)
+        targets = [
+            ("partials/list", "/projects/partials/list", args.requests),
+            (f"document {args.file_mb}MB", f"/projects/{project_id}/expenses/{expense_id}/document", max(5, args.requests // 20)),
+        ]
+        print(f"{'middleware':<12}{'endpoint':<20}{'req/s':>10}{'ttfb ms':>10}{'total ms':>10}")
+        for name, cls in (("base_http", LegacyAuthMiddleware), ("pure_asgi", AuthMiddleware)):
+            asgi = _build_stack(cls)
+            for label, path, n in targets:
+                r = await _bench(asgi, path, cookie, n)
+                print(f"{name:<12}{label:<20}{r['rps']:>10.1f}{r['ttfb_ms']:>10.2f}{r['total_ms']:>10.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--file-mb", type=int, default=50)
+    args = parser.parse_args()
+    try:
+        asyncio.run(main_async(args))
+    finally:
+        shutil.rmtree(_tmpdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""Benchmark: content translator (tc) on a large counterpart marco logico.
+
+Seeds a project with a big logical framework whose translatable fields are
+all cached in French, then renders the counterpart marco logico partial with
+the previous tc (one translation_cache SELECT per field) and with the bulk
+prefetch + process LRU. Reports SELECT counts and render times (cold = empty
+LRU, warm = LRU already loaded by an earlier request).
+
+Usage:
+    PYTHONPATH=. python scripts/bench_counterpart_translations.py [--results 40] [--repeat 5]
+"""
+
+import argparse
+import time
+
+import bench_data
+from sqlalchemy import event, insert
+
+from app.database import SessionLocal, engine
+from app.i18n import get_translator
+from app.models.logical_framework import LogicalFramework, SpecificObjective, Result, Activity, Indicator
+from app.models.translation_cache import TranslationCache, TranslationMemory
+from app.services.logical_framework_service import LogicalFrameworkService
+from app.services.project_service import ProjectService
+from app.services.translation_service import translation_lru, _hash
+from app.views.counterpart import _build_content_translator, _ml_context, templates
+
+LANG = "fr"
+
+
+def seed_translations(project_id: int) -> int:
+    """Cache a French translation for every translatable field of the project."""
+    db = SessionLocal()
+    try:
+        project = ProjectService(db).get_by_id(project_id)
+        framework = db.query(LogicalFramework).filter_by(project_id=project_id).one()
+        entities = [("project", project, ("titulo", "sector", "pais")),
+                    ("logical_framework", framework, ("objetivo_general",))]
+        for o in db.query(SpecificObjective).filter_by(framework_id=framework.id):
+            entities.append(("specific_objective", o, ("descripcion",)))
+            for r in db.query(Result).filter_by(objective_id=o.id):
+                entities.append(("result", r, ("descripcion",)))
+                for a in db.query(Activity).filter_by(result_id=r.id):
+                    entities.append(("activity", a, ("descripcion",)))
+        for i in db.query(Indicator).filter_by(framework_id=framework.id):
+            entities.append(("indicator", i, ("descripcion", "unidad_medida", "fuente_verificacion")))
+
+        fields = [
+            (entity_type, obj.id, field, getattr(obj, field))
+            for entity_type, obj, names in entities
+            for field in names if getattr(obj, field)
+        ]
+        memory = {
+            _hash(text): {"source_hash": _hash(text), "language": LANG, "translated_text": f"[fr] {text}"}
+            for _, _, _, text in fields
+        }
+        db.execute(insert(TranslationMemory), list(memory.values()))
+        memory_ids = dict(db.query(TranslationMemory.source_hash, TranslationMemory.id).filter_by(language=LANG))
+        rows = [
+            {
+                "entity_type": entity_type, "entity_id": entity_id, "field_name": field,
+                "language": LANG, "memory_id": memory_ids[_hash(text)],
+            }
+            for entity_type, entity_id, field, text in fields
+        ]
+        db.execute(insert(TranslationCache), rows)
+        db.commit()
+        return len(rows)
+    finally:
+        db.close()
+
+
+def legacy_translator(db, language):
+    """tc() as it was: one translation_cache lookup per field on every render."""
+    cache = {}
+
+    def tc(entity_type, entity_id, field_name, original_text):
+        if not original_text:
+            return ""
+        key = (entity_type, entity_id, field_name)
+        if key not in cache:
+            row = db.query(TranslationMemory.translated_text).join(
+                TranslationCache, TranslationCache.memory_id == TranslationMemory.id
+            ).filter(
+                TranslationCache.entity_type == entity_type, TranslationCache.entity_id == entity_id,
+                TranslationCache.field_name == field_name, TranslationCache.language == language,
+            ).first()
+            cache[key] = row[0] if row else original_text
+        return cache[key]
+
+    tc.pending_retries = []
+    return tc
+
+
+def render(project_id: int, build_tc) -> tuple[float, int, str]:
+    """Render the counterpart marco logico; returns (seconds, translation SELECTs, html)."""
+    selects = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        if "translation_cache" in statement:
+            selects.append(statement)
+
+    db = SessionLocal()
+    event.listen(engine, "before_cursor_execute", count)
+    try:
+        lf_service = LogicalFrameworkService(db)
+        project = ProjectService(db).get_by_id(project_id)
+        framework = lf_service.get_framework_by_project(project_id)
+        summary = lf_service.get_framework_summary(project_id)
+        start = time.perf_counter()
+        tc = build_tc(db)
+        ctx = _ml_context(None, project, framework, summary, LANG, get_translator(LANG), tc)
+        html = templates.get_template("partials/projects/marco_logico_tab.html").render(ctx)
+        elapsed = time.perf_counter() - start
+    finally:
+        event.remove(engine, "before_cursor_execute", count)
+        db.close()
+    return elapsed, len(selects), html
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--results", type=int, default=40, help="Results (4 activities + 2 indicators each)")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    bench_data.init_db()
+    try:
+        project_id = bench_data.seed_project(0, n_lines=1, n_transfers=0, n_results=args.results)
+        n_rows = seed_translations(project_id)
+
+        def best(build_tc, clear_lru):
+            times, queries, html = [], 0, ""
+            for _ in range(args.repeat):
+                if clear_lru:
+                    translation_lru.clear()
+                elapsed, queries, html = render(project_id, build_tc)
+                times.append(elapsed)
+            return min(times), queries, html
+
+        legacy = best(lambda db: legacy_translator(db, LANG), clear_lru=True)
+        cold = best(lambda db: _build_content_translator(db, LANG, project_id), clear_lru=True)
+        warm = best(lambda db: _build_content_translator(db, LANG, project_id), clear_lru=False)
+
+        print(f"{args.results} results, {n_rows} cached fields ({LANG}), best of {args.repeat}")
+        print(f"{'':<30}{'SELECTs':>8}{'render ms':>11}")
+        for name, (t, q, _) in (("per-field lookups (before)", legacy),
+                                ("bulk prefetch, cold LRU", cold),
+                                ("bulk prefetch, warm LRU", warm)):
+            print(f"{name:<30}{q:>8}{t * 1000:>11.1f}")
+        print("same HTML:", legacy[2] == cold[2] == warm[2])
+    finally:
+        bench_data.cleanup()
+
+
+if __name__ == "__main__":
+    main()
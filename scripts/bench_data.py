@@ -0,0 +1,182 @@
+"""Synthetic data helpers shared by the benchmark scripts.
+
+Importing this module points DATABASE_URL at a throwaway SQLite file (unless
+BENCH_DATABASE_URL is set), so it must be imported before anything from
+``app``. Call ``cleanup()`` when done.
+"""
+
+import os
+import random
+import shutil
+import tempfile
+from datetime import date, timedelta
+from decimal import Decimal
+
+TMP_DIR = tempfile.mkdtemp(prefix="cooperapp-bench-")
+os.environ["DATABASE_URL"] = os.environ.get("BENCH_DATABASE_URL", f"sqlite:///{TMP_DIR}/bench.db")
+
+from sqlalchemy import insert  # noqa: E402
+
+from app.database import Base, engine, SessionLocal  # noqa: E402
+import app.models  # noqa: E402,F401
+from app.models.budget import ProjectBudgetLine, CategoriaPartida  # noqa: E402
+from app.models.expense import Expense, EstadoGasto, UbicacionGasto  # noqa: E402
+from app.models.logical_framework import (  # noqa: E402
+    LogicalFramework, SpecificObjective, Result, Activity, Indicator,
+)
+from app.models.project import Project, EstadoProyecto, TipoProyecto  # noqa: E402
+from app.models.transfer import Transfer, EstadoTransferencia  # noqa: E402
+from app.services.execution_ledger_service import ExecutionLedgerService  # noqa: E402
+
+
+def init_db():
+    Base.metadata.create_all(bind=engine)
+
+
+def seed_project(
+    n_expenses: int,
+    n_lines: int = 20,
+    n_transfers: int = 12,
+    n_results: int = 6,
+    codigo: str | None = None,
+    seed: int = 42,
+) -> int:
+    """Create one project with budget lines, expenses, transfers and a logical
+    framework. Expenses are bulk-inserted. Returns the project id."""
+    rnd = random.Random(seed)
+    db = SessionLocal()
+    try:
+        project = Project(
+            codigo_contable=codigo or f"BENCH-{n_expenses}-{rnd.randint(0, 10**6)}",
+            codigo_area="BENCH",
+            titulo="Proyecto sintetico de benchmark",
+            pais="Senegal",
+            estado=EstadoProyecto.ejecucion,
+            tipo=TipoProyecto.desarrollo,
+            financiador="AACID",
+            sector="Agua y saneamiento",
+            subvencion=Decimal("500000"),
+            fecha_inicio=date(2025, 1, 1),
+            fecha_finalizacion=date(2026, 12, 31),
+        )
+        db.add(project)
+        db.flush()
+
+        categories = list(CategoriaPartida)
+        lines = [
+            ProjectBudgetLine(
+                project_id=project.id,
+                code=f"A.{i + 1}",
+                name=f"Partida {i + 1}",
+                category=categories[i % len(categories)],
+                is_spain_only=(i % 7 == 0),
+                order=i,
+                aprobado=Decimal(rnd.randint(5_000, 80_000)),
+            )
+            for i in range(n_lines)
+        ]
+        db.add_all(lines)
+        db.flush()
+        line_ids = [line.id for line in lines]
+
+        estados = list(EstadoGasto)
+        start = date(2025, 1, 1)
+        rows = []
+        for i in range(n_expenses):
+            rows.append({
+                "project_id": project.id,
+                "budget_line_id": line_ids[i % len(line_ids)],
+                "fecha_factura": start + timedelta(days=rnd.randint(0, 700)),
+                "concepto": f"Factura {i} suministros y servicios para actividad de campo",
+                "expedidor": f"Proveedor {rnd.randint(1, 400)}",
+                "cantidad_original": Decimal(rnd.randint(10, 5000)),
+                "moneda_original": "EUR",
+                "cantidad_euros": Decimal(rnd.randint(1_000, 500_000)) / 100,
+                # Imputacion parcial en uno de cada cuatro: importes con 4 decimales
+                "porcentaje": Decimal(rnd.randint(1_000, 9_999)) / 100 if i % 4 == 1 else Decimal("100"),
+                "financiado_por": "AACID",
+                "ubicacion": UbicacionGasto.espana if i % 3 == 0 else UbicacionGasto.terreno,
+                "estado": estados[i % len(estados)],
+            })
+            if len(rows) >= 5000:
+                db.execute(insert(Expense), rows)
+                rows = []
+        if rows:
+            db.execute(insert(Expense), rows)
+
+        for n in range(n_transfers):
+            db.add(Transfer(
+                project_id=project.id,
+                numero=n + 1,
+                total_previstas=n_transfers,
+                fecha_peticion=start + timedelta(days=30 * n),
+                fecha_emision=start + timedelta(days=30 * n + 5),
+                importe_euros=Decimal(rnd.randint(10_000, 40_000)),
+                gastos_transferencia=Decimal(rnd.randint(5, 60)),
+                estado=EstadoTransferencia.recibida if n % 2 else EstadoTransferencia.emitida,
+            ))
+
+        framework = LogicalFramework(project_id=project.id, objetivo_general="Objetivo general")
+        db.add(framework)
+        db.flush()
+        objective = SpecificObjective(framework_id=framework.id, numero=1, descripcion="OE1")
+        db.add(objective)
+        db.flush()
+        for r in range(n_results):
+            result = Result(objective_id=objective.id, numero=f"R{r + 1}", descripcion=f"Resultado {r + 1}")
+            db.add(result)
+            db.flush()
+            for a in range(4):
+                db.add(Activity(result_id=result.id, numero=f"A{r + 1}.{a + 1}", descripcion=f"Actividad {r + 1}.{a + 1}"))
+            for k in range(2):
+                db.add(Indicator(
+                    framework_id=framework.id, result_id=result.id, codigo=f"IOV{r + 1}.{k + 1}",
+                    descripcion=f"Indicador {r + 1}.{k + 1}", valor_meta="100", valor_actual=str(rnd.randint(0, 100)),
+                ))
+
+        db.commit()
+
+        # Bulk inserts bypass ExpenseService, so build the execution ledger here
+        ExecutionLedgerService(db).rebuild(project.id)
+        return project.id
+    finally:
+        db.close()
+
+
+def seed_aacid_data(project_id: int, seed: int = 42) -> None:
+    """Fill the Anexo II A data of a project: AACID fields, every narrative
+    section, beneficiaries, volunteers and markers."""
+    from app.models.aacid import (
+        ProjectNarrative, ProjectBeneficiary, ProjectVolunteer, ProjectMarker, MARKER_NAMES,
+    )
+    from app.services.aacid_field_map import NARRATIVE_SECTIONS
+
+    rnd = random.Random(seed + project_id)
+    db = SessionLocal()
+    try:
+        project = db.get(Project, project_id)
+        project.convocatoria = "2025"
+        project.numero_aacid = f"0{project_id}/2025"
+        project.municipios = "Dakar, Thies"
+        project.duracion_meses = 24
+        project.descripcion_breve = "Descripcion breve del proyecto. " * 10
+        for code in NARRATIVE_SECTIONS:
+            db.add(ProjectNarrative(
+                project_id=project_id, section_code=code,
+                content=f"Seccion {code}. " + "Texto narrativo del proyecto. " * rnd.randint(20, 100),
+            ))
+        db.add(ProjectBeneficiary(
+            project_id=project_id, women_direct=rnd.randint(100, 900), men_direct=rnd.randint(100, 900),
+            total_direct=1000, target_groups="Mujeres rurales y jovenes",
+        ))
+        db.add(ProjectVolunteer(project_id=project_id, women=3, men=2, total=5))
+        for name in MARKER_NAMES:
+            db.add(ProjectMarker(project_id=project_id, marker_name=name, level=rnd.choice(["principal", "significant", "none"])))
+        db.commit()
+    finally:
+        db.close()
+
+
+def cleanup():
+    engine.dispose()
+    shutil.rmtree(TMP_DIR, ignore_errors=True)
@@ -0,0 +1,67 @@
+"""Benchmark: Excel report generators on large synthetic projects.
+
+Times each justification report (and peak traced memory) for projects with
+10k, 50k and 100k expenses.
+
+Usage:
+    PYTHONPATH=. python scripts/bench_excel_generators.py [--expenses 10000 50000 100000]
+"""
+
+import argparse
+import os
+import time
+import tracemalloc
+
+import bench_data
+from app.database import SessionLocal
+from app.models.project import Project
+from app.models.report import TipoInforme
+from app.services.excel_generator_service import ExcelGeneratorService
+
+TIPOS = [
+    TipoInforme.cuenta_justificativa,
+    TipoInforme.ejecucion_presupuestaria,
+    TipoInforme.informe_economico,
+    TipoInforme.ficha_proyecto,
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--expenses", type=int, nargs="+", default=[10_000, 50_000, 100_000])
+    args = parser.parse_args()
+
+    bench_data.init_db()
+    output_dir = os.path.join(bench_data.TMP_DIR, "exports")
+    os.makedirs(output_dir, exist_ok=True)
+
+    print(f"{'expenses':>10}  {'report':<26}{'seconds':>10}{'peak MB':>10}{'file KB':>10}")
+    try:
+        for n in args.expenses:
+            project_id = bench_data.seed_project(n)
+            db = SessionLocal()
+            try:
+                project = db.get(Project, project_id)
+                # Load relationships up front so the numbers cover generation only
+                for line in project.budget_lines:
+                    line.expenses
+                project.transfers
+                service = ExcelGeneratorService(db)
+                for tipo in TIPOS:
+                    tracemalloc.start()
+                    start = time.perf_counter()
+                    path, _filename = service.generate_report(project, tipo, output_dir)
+                    elapsed = time.perf_counter() - start
+                    _current, peak = tracemalloc.get_traced_memory()
+                    tracemalloc.stop()
+                    size_kb = os.path.getsize(path) / 1024
+                    os.remove(path)
+                    print(f"{n:>10}  {tipo.value:<26}{elapsed:>10.2f}{peak / 2**20:>10.1f}{size_kb:>10.0f}")
+            finally:
+                db.close()
+    finally:
+        bench_data.cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""Benchmark: ExpenseService.get_expense_summary on a large project.
+
+Compares the previous implementation (load every Expense and sum in Python)
+with the grouped SQL aggregate, checks both return the same ExpenseSummary,
+and times the expenses-tab data (list + summary) before and after. The seeded
+expenses include partial porcentaje, so the sums carry four decimals and any
+rounding in the aggregate makes the check fail.
+
+Usage:
+    PYTHONPATH=. python scripts/bench_expense_summary.py [--expenses 100000] [--repeat 5]
+"""
+
+import argparse
+import time
+
+import bench_data
+from app.database import SessionLocal
+from app.models.expense import EstadoGasto, UbicacionGasto
+from app.schemas.expense import ExpenseSummary
+from app.services.expense_service import ExpenseService
+
+
+def legacy_summary(service: ExpenseService, project_id: int) -> ExpenseSummary:
+    """get_expense_summary as it was: full ORM load + Python loop."""
+    expenses = service.get_project_expenses(project_id)
+
+    summary = ExpenseSummary()
+    summary.total_registrados = len(expenses)
+    for expense in expenses:
+        if expense.estado == EstadoGasto.borrador:
+            summary.total_borradores += 1
+        elif expense.estado == EstadoGasto.pendiente_revision:
+            summary.total_pendientes += 1
+        elif expense.estado == EstadoGasto.validado:
+            summary.total_validados += 1
+        elif expense.estado == EstadoGasto.rechazado:
+            summary.total_rechazados += 1
+        elif expense.estado == EstadoGasto.justificado:
+            summary.total_justificados += 1
+
+        summary.importe_total += expense.cantidad_imputable
+        if expense.estado in (EstadoGasto.validado, EstadoGasto.justificado):
+            summary.importe_validado += expense.cantidad_imputable
+        if expense.ubicacion == UbicacionGasto.espana:
+            summary.importe_espana += expense.cantidad_imputable
+        else:
+            summary.importe_terreno += expense.cantidad_imputable
+    return summary
+
+
+def timed(fn, repeat: int) -> tuple[float, object]:
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        db = SessionLocal()
+        try:
+            start = time.perf_counter()
+            result = fn(ExpenseService(db))
+            best = min(best, time.perf_counter() - start)
+        finally:
+            db.close()
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--expenses", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    bench_data.init_db()
+    try:
+        project_id = bench_data.seed_project(args.expenses)
+
+        legacy_t, legacy = timed(lambda s: legacy_summary(s, project_id), args.repeat)
+        new_t, new = timed(lambda s: s.get_expense_summary(project_id), args.repeat)
+        assert legacy == new, f"summaries differ:\n{legacy}\n{new}"
+
+        tab_old_t, _ = timed(
+            lambda s: (s.get_project_expenses(project_id), legacy_summary(s, project_id)), args.repeat
+        )
+        tab_new_t, _ = timed(
+            lambda s: (s.get_project_expenses(project_id), s.get_expense_summary(project_id)), args.repeat
+        )
+
+        print(f"{args.expenses} expenses, best of {args.repeat}")
+        print(f"{'':<28}{'before s':>10}{'after s':>10}{'speedup':>10}")
+        print(f"{'get_expense_summary':<28}{legacy_t:>10.3f}{new_t:>10.4f}{legacy_t / new_t:>9.0f}x")
+        print(f"{'expenses tab (list+summary)':<28}{tab_old_t:>10.3f}{tab_new_t:>10.3f}{tab_old_t / tab_new_t:>9.1f}x")
+        print("summaries identical:", legacy == new)
+    finally:
+        bench_data.cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""Micro-benchmark: counterpart portal render with the compiled i18n catalogs.
+
+Logs a French counterpart into a seeded project and requests every portal
+page once, capturing the template and context each view renders. Those
+renders are then repeated with the previous translator (closure with a
+two-level lookup and fallback chain on every call) and with the compiled
+flat catalog, so only template work is timed. Also reports t() calls per
+render and detect_language with and without memoization.
+
+Usage:
+    PYTHONPATH=. python scripts/bench_i18n_portal.py [--repeat 200]
+"""
+
+import argparse
+import time
+import timeit
+
+import bench_data
+from fastapi.testclient import TestClient
+
+from app.i18n import TRANSLATIONS, detect_language, get_translator
+from app.main import app
+from app.templating import templates
+
+LANG = "fr"
+PAGES = ["", "/marco-logico", "/gastos", "/presupuesto", "/documentos"]
+HEADERS = ["fr-FR,fr;q=0.9,en-US;q=0.8,en;q=0.7", "en-GB,en;q=0.9", "de-DE,de;q=0.9", "es-ES,es;q=0.9"]
+
+
+def legacy_translator(lang: str):
+    """get_translator as it was before the compiled catalogs."""
+    translations = TRANSLATIONS.get(lang, TRANSLATIONS["es"])
+    fallback = TRANSLATIONS["es"]
+
+    def t(key: str) -> str:
+        return translations.get(key, fallback.get(key, key))
+
+    return t
+
+
+def counting(t):
+    calls = [0]
+
+    def wrapper(key):
+        calls[0] += 1
+        return t(key)
+
+    return wrapper, calls
+
+
+def capture_renders(project_code: str, project_id: int) -> list[tuple[str, dict]]:
+    captured = []
+    original = templates.TemplateResponse
+
+    def recording(name, context, *args, **kwargs):
+        captured.append((name, dict(context)))
+        return original(name, context, *args, **kwargs)
+
+    templates.TemplateResponse = recording
+    try:
+        with TestClient(app) as client:
+            client.post("/contraparte/login", data={"code": project_code, "language": LANG})
+            for page in PAGES:
+                response = client.get(f"/contraparte/{project_id}{page}")
+                assert response.status_code == 200, (page, response.status_code)
+    finally:
+        templates.TemplateResponse = original
+    return captured
+
+
+def render_all(renders, t) -> None:
+    for name, context in renders:
+        templates.get_template(name).render({**context, "t": t})
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    bench_data.init_db()
+    try:
+        project_id = bench_data.seed_project(300, codigo="I18N-1")
+        renders = capture_renders("I18N-1", project_id)
+        translators = [("closure + fallback (before)", legacy_translator(LANG)),
+                       ("compiled catalog", get_translator(LANG))]
+
+        counter, calls = counting(get_translator(LANG))
+        render_all(renders, counter)
+        print(f"{len(renders)} portal templates, {calls[0]} t() calls per full portal render")
+
+        print(f"{'translator':<30}{'t() ns/call':>14}{'portal render ms':>18}")
+        batch = max(1, args.repeat // 5)
+        results = {label: [] for label, _ in translators}
+        for _ in range(5):  # interleaved batches, best of 5
+            for label, t in translators:
+                start = time.perf_counter()
+                for _ in range(batch):
+                    render_all(renders, t)
+                results[label].append((time.perf_counter() - start) / batch)
+        for label, t in translators:
+            per_call = min(timeit.repeat(
+                "t(key)", globals={"t": t, "key": "login.title"}, number=100000, repeat=5,
+            )) / 100000
+            print(f"{label:<30}{per_call * 1e9:>14.0f}{min(results[label]) * 1000:>18.2f}")
+
+        raw = detect_language.__wrapped__
+        n = 100000
+        plain = min(timeit.repeat(lambda: [raw(h) for h in HEADERS], number=n // len(HEADERS), repeat=5))
+        memo = min(timeit.repeat(lambda: [detect_language(h) for h in HEADERS], number=n // len(HEADERS), repeat=5))
+        print(f"detect_language: {plain / n * 1e9:.0f} ns/call parsed, {memo / n * 1e9:.0f} ns/call memoized")
+    finally:
+        bench_data.cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""Benchmark: translation throughput against a local OpenRouter stub.
+
+Translates the fields of N activities/indicators to fr and en, first the way
+TranslationService used to (one blocking httpx.post per entity and language,
+new connection each time, languages in series) and then through the shared
+OpenRouterClient (keep-alive pool, concurrency cap, token bucket, fields of
+many entities packed per prompt, fr/en in parallel). Reports translated
+fields per second, requests and TCP connections seen by the stub.
+
+Usage:
+    PYTHONPATH=. python scripts/bench_openrouter_client.py [--entities 120] [--latency 0.3]
+"""
+
+import argparse
+import time
+
+import httpx
+
+from app.services.openrouter_client import OpenRouterClient, build_prompt, parse_response
+from openrouter_stub import start_stub
+
+LANGS = ("fr", "en")
+
+
+def sample_entities(n: int) -> list[dict[str, str]]:
+    return [
+        {
+            "descripcion": f"Actividad {i}: formacion de comites de agua en la comunidad {i % 17}",
+            "unidad_medida": "Numero de personas",
+            "fuente_verificacion": f"Listados de asistencia del taller {i}",
+        }
+        for i in range(n)
+    ]
+
+
+def legacy(base_url: str, entities: list[dict[str, str]]) -> int:
+    """Previous _call_openrouter loop: serial, one request per entity and language."""
+    done = 0
+    for fields in entities:
+        for lang in LANGS:
+            response = httpx.post(
+                f"{base_url}/chat/completions",
+                headers={"Authorization": "Bearer stub", "Content-Type": "application/json"},
+                json={"model": "stub", "messages": [{"role": "user", "content": build_prompt(fields, lang)}]},
+                timeout=30.0,
+            )
+            response.raise_for_status()
+            done += len(parse_response(response.json()["choices"][0]["message"]["content"]))
+    return done
+
+
+def pooled(client: OpenRouterClient, entities: list[dict[str, str]]) -> int:
+    fields = {f"activity:{i}:{k}": v for i, e in enumerate(entities) for k, v in e.items()}
+    result = client.run(client.translate_languages({lang: fields for lang in LANGS}))
+    return sum(len(v) for v in result.values())
+
+
+def run(name: str, fn, state) -> None:
+    requests, connections = state.requests, state.connections
+    start = time.perf_counter()
+    done = fn()
+    elapsed = time.perf_counter() - start
+    print(f"{name:<36}{done:>7}{elapsed:>9.2f}{done / elapsed:>10.1f}"
+          f"{state.requests - requests:>10}{state.connections - connections:>8}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--entities", type=int, default=120)
+    parser.add_argument("--latency", type=float, default=0.3, help="Stub seconds per request")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--rpm", type=int, default=600)
+    parser.add_argument("--prompt-chars", type=int, default=6000)
+    args = parser.parse_args()
+
+    server, state, base_url = start_stub(latency=args.latency, max_concurrent=args.concurrency * 2)
+    entities = sample_entities(args.entities)
+    client = OpenRouterClient(
+        api_key="stub", model="stub", base_url=base_url,
+        max_concurrency=args.concurrency, requests_per_minute=args.rpm,
+        prompt_max_chars=args.prompt_chars,
+    )
+    try:
+        print(f"{args.entities} entities x 3 fields x {len(LANGS)} languages, stub latency {args.latency}s")
+        print(f"{'':<36}{'fields':>7}{'secs':>9}{'fields/s':>10}{'requests':>10}{'conns':>8}")
+        run("per entity, serial (before)", lambda: legacy(base_url, entities), state)
+        run("shared client, packed, parallel", lambda: pooled(client, entities), state)
+        print(f"429 answered by stub: {state.rejected}")
+    finally:
+        client.close()
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""Benchmark: peak memory of justification pack generation.
+
+Compares the previous in-memory pipeline (each workbook saved to a BytesIO,
+copied into a ZIP held in another BytesIO, then written out) against the
+streaming pipeline in ExcelGeneratorService.generate_pack, which writes each
+workbook straight into its ZIP entry on disk. Both build the workbooks
+in-process (workers=1) from the same project snapshot; see
+bench_report_pack_workers.py for the process pool.
+
+Usage:
+    PYTHONPATH=. python scripts/bench_report_pack.py [--expenses 10000 50000]
+"""
+
+import argparse
+import os
+import time
+import tracemalloc
+import zipfile
+from io import BytesIO
+
+import bench_data
+from app.database import SessionLocal
+from app.models.project import Project
+from app.models.report import TipoInforme
+from app.services.excel_generator_service import ExcelGeneratorService
+from app.services.project_snapshot import ProjectSnapshotLoader
+
+TIPOS = [
+    TipoInforme.cuenta_justificativa,
+    TipoInforme.ejecucion_presupuestaria,
+    TipoInforme.relacion_transferencias,
+]
+
+
+def _legacy_pack(service: ExcelGeneratorService, project: Project, output_dir: str) -> str:
+    snapshot = ProjectSnapshotLoader(service.db).load(project.id)
+    zip_buffer = BytesIO()
+    with zipfile.ZipFile(zip_buffer, "w", zipfile.ZIP_DEFLATED) as zip_file:
+        for tipo in TIPOS:
+            wb, filename = service._get_generator(tipo)(snapshot, None)
+            excel_buffer = BytesIO()
+            wb.save(excel_buffer)
+            zip_file.writestr(filename, excel_buffer.getvalue())
+    path = os.path.join(output_dir, "legacy_pack.zip")
+    with open(path, "wb") as f:
+        f.write(zip_buffer.getvalue())
+    return path
+
+
+def _measure(fn) -> tuple[float, float, str]:
+    tracemalloc.start()
+    start = time.perf_counter()
+    path = fn()
+    elapsed = time.perf_counter() - start
+    _current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak / (1024 * 1024), path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--expenses", type=int, nargs="+", default=[10_000, 50_000])
+    args = parser.parse_args()
+
+    bench_data.init_db()
+    output_dir = os.path.join(bench_data.TMP_DIR, "exports")
+    os.makedirs(output_dir, exist_ok=True)
+
+    print(f"{'expenses':>10}{'pipeline':>12}{'seconds':>10}{'peak MB':>10}{'pack MB':>10}")
+    try:
+        for n in args.expenses:
+            project_id = bench_data.seed_project(n)
+            for name in ("legacy", "streaming"):
+                db = SessionLocal()
+                try:
+                    project = db.get(Project, project_id)
+                    # Load relationships up front so both runs measure generation only
+                    for line in project.budget_lines:
+                        line.expenses
+                    service = ExcelGeneratorService(db)
+                    if name == "legacy":
+                        run = lambda: _legacy_pack(service, project, output_dir)  # noqa: E731
+                    else:
+                        run = lambda: service.generate_pack(project, output_dir, TIPOS, workers=1)[0]  # noqa: E731
+                    elapsed, peak_mb, path = _measure(run)
+                    size_mb = os.path.getsize(path) / (1024 * 1024)
+                    print(f"{n:>10}{name:>12}{elapsed:>10.2f}{peak_mb:>10.1f}{size_mb:>10.2f}")
+                finally:
+                    db.close()
+    finally:
+        bench_data.cleanup()
+
+
+if __name__ == "__main__":
+    main()
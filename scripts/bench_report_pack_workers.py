@@ -0,0 +1,92 @@
+"""Benchmark: justification pack built serially vs in a process pool.
+
+Seeds one large project and generates the pack with all six Excel reports
+through ExcelGeneratorService.generate_pack, once in-process (workers=1)
+and once per requested pool size. Every worker receives the same detached
+project snapshot; the ZIP entries must come out in the same order and with
+the same cell values (the "Generado" timestamp is ignored).
+
+The pool only pays off with more than one CPU: on a single core the
+workbooks still run one after another, plus the process start-up and the
+snapshot pickling.
+
+Usage:
+    PYTHONPATH=. python scripts/bench_report_pack_workers.py [--expenses 100000] [--workers 2 4]
+"""
+
+import argparse
+import os
+import re
+import time
+import zipfile
+
+import bench_data
+from openpyxl import load_workbook
+
+from app.database import SessionLocal
+from app.models.project import Project
+from app.models.report import TipoInforme
+from app.services.excel_generator_service import ExcelGeneratorService
+
+TIPOS = [tipo for tipo in TipoInforme if tipo != TipoInforme.anexo_iia]
+TIMESTAMP = re.compile(r"^\d\d/\d\d/\d{4} \d\d:\d\d$")
+FILE_TIMESTAMP = re.compile(r"_\d{8}_\d{6}")
+
+
+def pack_contents(path: str) -> list:
+    """(entry name without timestamp, cell values) for each ZIP entry, in order."""
+    contents = []
+    with zipfile.ZipFile(path) as zip_file:
+        for name in zip_file.namelist():
+            with zip_file.open(name) as entry:
+                ws = load_workbook(entry, read_only=True).active
+                rows = [
+                    tuple(None if isinstance(v, str) and TIMESTAMP.match(v) else v for v in row)
+                    for row in ws.iter_rows(values_only=True)
+                ]
+            contents.append((FILE_TIMESTAMP.sub("", name), rows))
+    return contents
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--expenses", type=int, default=100_000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[2, len(TIPOS)])
+    args = parser.parse_args()
+
+    bench_data.init_db()
+    output_dir = os.path.join(bench_data.TMP_DIR, "exports")
+    os.makedirs(output_dir, exist_ok=True)
+    try:
+        project_id = bench_data.seed_project(args.expenses, n_lines=40, n_transfers=24, n_results=8)
+        db = SessionLocal()
+        try:
+            project = db.get(Project, project_id)
+            service = ExcelGeneratorService(db)
+            print(f"{args.expenses} expenses, {len(TIPOS)} workbooks, {os.cpu_count()} CPU(s)")
+            print(f"{'workers':>8}{'seconds':>10}{'speedup':>10}{'pack MB':>10}")
+
+            reference = None
+            serial = None
+            for workers in [1, *args.workers]:
+                start = time.perf_counter()
+                path, _filename = service.generate_pack(project, output_dir, TIPOS, workers=workers)
+                elapsed = time.perf_counter() - start
+
+                contents = pack_contents(path)
+                assert len(contents) == len(TIPOS), "missing workbooks"
+                if reference is None:
+                    reference, serial = contents, elapsed
+                else:
+                    assert contents == reference, f"pack with {workers} workers differs from serial"
+                size_mb = os.path.getsize(path) / (1024 * 1024)
+                os.remove(path)
+                print(f"{workers:>8}{elapsed:>10.2f}{serial / elapsed:>9.2f}x{size_mb:>10.2f}")
+        finally:
+            db.close()
+    finally:
+        bench_data.cleanup()
+
+
+if __name__ == "__main__":
+    main()
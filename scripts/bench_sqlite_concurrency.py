@@ -0,0 +1,135 @@
+"""Benchmark: read latency on SQLite while a parallel writer commits.
+
+Compares the plain engine (rollback journal) against the production profile
+configured in Settings (WAL + pragmas from app.database).
+
+Usage:
+    PYTHONPATH=. python scripts/bench_sqlite_concurrency.py [--seconds 5] [--readers 4]
+"""
+
+import argparse
+import os
+import statistics
+import tempfile
+import threading
+import time
+
+from sqlalchemy import create_engine, event, text
+
+from app.database import _apply_sqlite_pragmas
+
+
+def _build_engine(path: str, production: bool):
+    engine = create_engine(
+        f"sqlite:///{path}",
+        connect_args={"check_same_thread": False, "timeout": 30},
+        pool_size=10,
+        max_overflow=10,
+    )
+    if production:
+        event.listen(engine, "connect", _apply_sqlite_pragmas)
+    return engine
+
+
+def _seed(engine, rows: int):
+    with engine.begin() as conn:
+        conn.execute(text(
+            "CREATE TABLE expenses (id INTEGER PRIMARY KEY, project_id INTEGER, "
+            "concepto VARCHAR(200), importe NUMERIC)"
+        ))
+        conn.execute(text("CREATE INDEX ix_bench_project ON expenses(project_id)"))
+        conn.execute(
+            text("INSERT INTO expenses (project_id, concepto, importe) VALUES (:p, :c, :i)"),
+            [{"p": i % 20, "c": f"Gasto {i}", "i": i * 1.5} for i in range(rows)],
+        )
+
+
+def _run(production: bool, seconds: float, readers: int, rows: int) -> dict:
+    fd, path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    engine = _build_engine(path, production)
+    try:
+        _seed(engine, rows)
+        stop = threading.Event()
+        latencies: list[float] = []
+        errors = [0]
+        writes = [0]
+        lock = threading.Lock()
+
+        def writer():
+            i = 0
+            while not stop.is_set():
+                try:
+                    with engine.begin() as conn:
+                        for _ in range(50):
+                            conn.execute(
+                                text("INSERT INTO expenses (project_id, concepto, importe) VALUES (:p, 'w', 1)"),
+                                {"p": i % 20},
+                            )
+                            i += 1
+                        conn.execute(text("UPDATE expenses SET importe = importe + 1 WHERE project_id = :p"), {"p": i % 20})
+                    writes[0] += 1
+                except Exception:
+                    errors[0] += 1
+
+        def reader(n: int):
+            local = []
+            while not stop.is_set():
+                start = time.perf_counter()
+                try:
+                    with engine.connect() as conn:
+                        conn.execute(
+                            text("SELECT COUNT(*), SUM(importe) FROM expenses WHERE project_id = :p"),
+                            {"p": n % 20},
+                        ).one()
+                    local.append(time.perf_counter() - start)
+                except Exception:
+                    with lock:
+                        errors[0] += 1
+            with lock:
+                latencies.extend(local)
+
+        threads = [threading.Thread(target=writer)]
+        threads += [threading.Thread(target=reader, args=(n,)) for n in range(readers)]
+        for th in threads:
+            th.start()
+        time.sleep(seconds)
+        stop.set()
+        for th in threads:
+            th.join()
+    finally:
+        engine.dispose()
+        for suffix in ("", "-wal", "-shm", "-journal"):
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+
+    latencies.sort()
+    ms = [x * 1000 for x in latencies] or [0.0]
+    return {
+        "reads": len(latencies),
+        "write_txns": writes[0],
+        "errors": errors[0],
+        "p50_ms": statistics.median(ms),
+        "p95_ms": ms[int(len(ms) * 0.95) - 1] if len(ms) > 1 else ms[0],
+        "max_ms": ms[-1],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--rows", type=int, default=50_000)
+    args = parser.parse_args()
+
+    print(f"{'profile':<12}{'reads':>8}{'writes':>8}{'errors':>8}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}")
+    for name, production in (("default", False), ("production", True)):
+        r = _run(production, args.seconds, args.readers, args.rows)
+        print(
+            f"{name:<12}{r['reads']:>8}{r['write_txns']:>8}{r['errors']:>8}"
+            f"{r['p50_ms']:>10.2f}{r['p95_ms']:>10.2f}{r['max_ms']:>10.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
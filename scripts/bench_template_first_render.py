@@ -0,0 +1,145 @@
+"""Benchmark: first-render latency of the main pages after a restart.
+
+Each scenario runs in a fresh Python process, so nothing is compiled yet and
+every template is loaded on first use, as it is right after a worker starts.
+The script times the first request to each page (the seeding and app startup
+are not included), then a second pass for the steady state. Scenarios:
+
+  per-view envs    one Jinja2Templates per view module, no bytecode cache
+                   (the previous layout)
+  shared, no cache single environment, templates compiled from source
+  shared, cold     single environment with an empty bytecode cache dir
+  shared, warm     single environment after ``python -m app.templating``
+                   (what the Docker image ships)
+
+Usage:
+    PYTHONPATH=. python scripts/bench_template_first_render.py
+"""
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+PAGES = [
+    "/contraparte/login",
+    "/projects",
+    "/projects/{id}",
+    "/projects/{id}/budget",
+    "/projects/{id}/expenses",
+    "/projects/{id}/transfers",
+    "/projects/{id}/marco-logico",
+    "/projects/{id}/documents",
+    "/projects/{id}/reports",
+]
+
+VIEW_MODULES = [
+    "aacid", "audit", "auth", "budget", "budget_templates", "counterpart", "documents",
+    "expenses", "logical_framework", "projects", "reports", "transfers", "translations",
+    "users", "verification_sources",
+]
+
+
+def child(scenario: str) -> dict:
+    import bench_data
+    from fastapi.testclient import TestClient
+
+    from app.main import app
+
+    envs = None
+    if scenario == "per-view":
+        # Previous layout: one environment (and template cache) per module
+        import importlib
+        from datetime import datetime
+        from fastapi.templating import Jinja2Templates
+        from app.i18n import get_translator
+        from app.templating import TEMPLATES_DIR
+
+        envs = []
+        for name in VIEW_MODULES:
+            module = importlib.import_module(f"app.views.{name}")
+            module.templates = Jinja2Templates(directory=str(TEMPLATES_DIR))
+            module.templates.env.globals.update(now=datetime.now, t=get_translator("es"))
+            envs.append(module.templates.env)
+
+    bench_data.init_db()
+    project_id = bench_data.seed_project(300)
+    timings = {}
+    try:
+        with TestClient(app, follow_redirects=False) as client:
+            client.get("/dev-login")
+            for attempt in ("first", "second"):
+                for page in PAGES:
+                    url = page.format(id=project_id)
+                    start = time.perf_counter()
+                    response = client.get(url)
+                    elapsed = time.perf_counter() - start
+                    assert response.status_code == 200, (url, response.status_code)
+                    timings.setdefault(page, {})[attempt] = elapsed
+    finally:
+        bench_data.cleanup()
+
+    if envs is None:
+        from app.templating import templates
+        envs = [templates.env]
+    compiled = sum(len(env.cache) for env in envs if env.cache is not None)
+    return {"timings": timings, "compiled": compiled}
+
+
+def run_scenario(scenario: str, cache_dir: str) -> dict:
+    # DEBUG stays on for /dev-login; auto-reload is off as in production
+    env = dict(os.environ, TEMPLATES_CACHE_DIR=cache_dir, TEMPLATES_AUTO_RELOAD="false")
+    out = subprocess.run(
+        [sys.executable, __file__, "--child", scenario],
+        env=env, capture_output=True, text=True, check=True,
+    ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(child(args.child)))
+        return
+
+    tmp = tempfile.mkdtemp(prefix="cooperapp-jinja-")
+    try:
+        cold_dir = os.path.join(tmp, "cold")
+        warm_dir = os.path.join(tmp, "warm")
+        subprocess.run(
+            [sys.executable, "-m", "app.templating"],
+            env=dict(os.environ, TEMPLATES_CACHE_DIR=warm_dir),
+            check=True, capture_output=True,
+        )
+        scenarios = [
+            ("per-view envs", "per-view", ""),
+            ("shared, no cache", "shared", ""),
+            ("shared, cold", "shared", cold_dir),
+            ("shared, warm", "shared", warm_dir),
+        ]
+        results = [(label, run_scenario(scenario, cache_dir)) for label, scenario, cache_dir in scenarios]
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+    header = f"{'page':<30}" + "".join(f"{label:>18}" for label, _ in results)
+    print("First request per page after a restart (ms)")
+    print(header)
+    for page in PAGES:
+        row = "".join(f"{r['timings'][page]['first'] * 1000:>18.1f}" for _, r in results)
+        print(f"{page:<30}{row}")
+    totals = [sum(t["first"] for t in r["timings"].values()) * 1000 for _, r in results]
+    steady = [sum(t["second"] for t in r["timings"].values()) * 1000 for _, r in results]
+    print(f"{'total, first pass':<30}" + "".join(f"{v:>18.1f}" for v in totals))
+    print(f"{'total, second pass':<30}" + "".join(f"{v:>18.1f}" for v in steady))
+    print(f"{'compiled templates in memory':<30}" + "".join(f"{r['compiled']:>18}" for _, r in results))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Verify or rebuild the budget execution ledger against raw expenses.
+
+Usage:
+    python -m scripts.budget_ledger verify [--project ID]
+    python -m scripts.budget_ledger rebuild [--project ID] [--reset-adjustments]
+    python -m scripts.budget_ledger initialize
+
+initialize creates the ledger only for projects that do not have one yet,
+keeping manual ejecutado_* amounts as adjustment rows.
+
+verify exits with status 1 when there are discrepancies.
+"""
+
+import argparse
+import sys
+
+from app.database import Base, SessionLocal, engine
+import app.models  # noqa: F401  (register all tables)
+from app.services.execution_ledger_service import ExecutionLedgerService
+
+
+def verify(project_id: int | None) -> int:
+    db = SessionLocal()
+    try:
+        issues = ExecutionLedgerService(db).verify(project_id)
+    finally:
+        db.close()
+
+    for issue in issues:
+        print(
+            f"[{issue['tipo']}] proyecto {issue['project_id']} partida {issue['budget_line_id']} "
+            f"{issue['ubicacion']} fuente {issue['funding_source_id']}: "
+            f"esperado {issue['esperado']} / libro {issue['libro']}"
+        )
+    print(f"{len(issues)} discrepancies found.")
+    return 1 if issues else 0
+
+
+def rebuild(project_id: int | None, reset_adjustments: bool) -> int:
+    db = SessionLocal()
+    try:
+        rows = ExecutionLedgerService(db).rebuild(project_id, reset_adjustments=reset_adjustments)
+    finally:
+        db.close()
+    print(f"Ledger rebuilt: {rows} rows from expenses.")
+    return 0
+
+
+def initialize() -> int:
+    db = SessionLocal()
+    try:
+        project_ids = ExecutionLedgerService(db).initialize_missing()
+    finally:
+        db.close()
+    print(f"Ledger initialized for {len(project_ids)} projects.")
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("command", choices=["verify", "rebuild", "initialize"])
+    parser.add_argument("--project", type=int, default=None, help="Only this project id")
+    parser.add_argument(
+        "--reset-adjustments",
+        action="store_true",
+        help="Drop manual adjustments too (rebuild only)",
+    )
+    args = parser.parse_args()
+
+    Base.metadata.create_all(bind=engine)
+    if args.command == "verify":
+        return verify(args.project)
+    if args.command == "initialize":
+        return initialize()
+    return rebuild(args.project, args.reset_adjustments)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
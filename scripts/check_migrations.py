@@ -0,0 +1,193 @@
+"""Regression check: the migrations upgrade a database created before them.
+
+Checks out the baseline revision (by default the repository's root commit,
+before schema_version existed) in a temporary git worktree, starts that
+version of the app once against a throwaway SQLite file so it creates its
+schema and reference data, and seeds a project with expenses, cached
+translations and a report. Then runs app.migrations.upgrade on that file with
+the current code and checks that:
+
+- it reaches the latest version and a second upgrade applies nothing;
+- every table, column and index of the current models exists;
+- the seeded data survived (translations moved to translation_memory,
+  default funding sources created and expenses assigned).
+
+The same schema checks run on an empty database (fresh install). A check that
+only runs create_all on the current models would not catch a step that reads
+the live model metadata. Exits with status 1 on failure.
+
+Usage:
+    PYTHONPATH=. python scripts/check_migrations.py [--baseline REV]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+
+import bench_data
+from sqlalchemy import create_engine, inspect as sa_inspect, text
+
+from app.database import Base, engine
+from app.migrations import current_version, latest_version, upgrade
+
+# Runs inside the baseline worktree: its own models and startup
+SEED_BASELINE = """
+from datetime import date
+from decimal import Decimal
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+from app.main import app
+from app.database import SessionLocal
+from app.models.budget import Funder, ProjectBudgetLine, CategoriaPartida
+from app.models.expense import Expense, UbicacionGasto
+from app.models.project import Project, EstadoProyecto, TipoProyecto
+from app.models.report import Report, TipoInforme
+from app.models.translation_cache import TranslationCache
+
+with TestClient(app):
+    pass
+
+db = SessionLocal()
+funder = db.execute(select(Funder).order_by(Funder.id)).scalars().first()
+project = Project(
+    codigo_contable="PRE-001", codigo_area="PRE", titulo="Proyecto anterior a las migraciones",
+    pais="Senegal", estado=EstadoProyecto.ejecucion, tipo=TipoProyecto.desarrollo,
+    financiador=funder.name, funder_id=funder.id, sector="Agua", subvencion=Decimal("1000"),
+    fecha_inicio=date(2024, 1, 1), fecha_finalizacion=date(2025, 12, 31),
+)
+db.add(project)
+db.flush()
+line = ProjectBudgetLine(
+    project_id=project.id, name="Personal", code="A1", category=CategoriaPartida.personal,
+    aprobado=Decimal("500"), order=1,
+)
+db.add(line)
+db.flush()
+db.add(Expense(
+    project_id=project.id, budget_line_id=line.id, fecha_factura=date(2024, 3, 1), concepto="Nomina",
+    expedidor="X", cantidad_original=Decimal("100"), moneda_original="EUR", cantidad_euros=Decimal("100"),
+    porcentaje=Decimal("100"), financiado_por=funder.name, ubicacion=UbicacionGasto.espana,
+))
+# Dos campos con el mismo texto: una sola entrada en translation_memory
+for field in ("titulo", "sector"):
+    db.add(TranslationCache(
+        entity_type="project", entity_id=project.id, field_name=field, language="fr",
+        translated_text="Projet", source_hash="a" * 64,
+    ))
+db.add(Report(
+    project_id=project.id, tipo=TipoInforme.ficha_proyecto, formato_financiador=funder.code,
+    nombre_archivo="ficha.xlsx", ruta="/nonexistent/ficha.xlsx",
+))
+db.commit()
+"""
+
+
+def git(*args: str) -> str:
+    return subprocess.run(["git", *args], check=True, capture_output=True, text=True).stdout.strip()
+
+
+def build_baseline_db(revision: str, database_url: str) -> None:
+    worktree = os.path.join(bench_data.TMP_DIR, "baseline")
+    git("worktree", "add", "--detach", worktree, revision)
+    try:
+        subprocess.run(
+            [sys.executable, "-c", SEED_BASELINE],
+            cwd=worktree,
+            env={**os.environ, "DATABASE_URL": database_url, "PYTHONPATH": worktree},
+            check=True,
+            stdout=subprocess.DEVNULL,
+        )
+    finally:
+        git("worktree", "remove", "--force", worktree)
+
+
+def schema_problems(db_engine) -> list[str]:
+    """Tables, columns and indexes of the current models missing in the DB."""
+    problems = []
+    inspector = sa_inspect(db_engine)
+    tables = set(inspector.get_table_names())
+    for table in Base.metadata.sorted_tables:
+        if table.name not in tables:
+            problems.append(f"missing table {table.name}")
+            continue
+        columns = {c["name"] for c in inspector.get_columns(table.name)}
+        problems += [f"missing column {table.name}.{c.name}" for c in table.columns if c.name not in columns]
+        indexes = {i["name"]: i for i in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            found = indexes.get(index.name)
+            expected = [c.name for c in index.columns]
+            if found is None:
+                problems.append(f"missing index {index.name}")
+            elif found["column_names"] != expected or bool(found["unique"]) != bool(index.unique):
+                problems.append(f"index {index.name} differs: {found['column_names']} != {expected}")
+    return problems
+
+
+def upgrade_problems(db_engine) -> list[str]:
+    problems = []
+    upgrade(db_engine)
+    if current_version(db_engine) != latest_version():
+        problems.append(f"version {current_version(db_engine)} after upgrade, expected {latest_version()}")
+    again = upgrade(db_engine)
+    if again:
+        problems.append(f"second upgrade applied {[m.version for m in again]}")
+    return problems + schema_problems(db_engine)
+
+
+def data_problems(db_engine) -> list[str]:
+    problems = []
+    with db_engine.connect() as conn:
+        translations = conn.execute(text(
+            "SELECT c.field_name, m.translated_text FROM translation_cache c "
+            "JOIN translation_memory m ON m.id = c.memory_id ORDER BY c.field_name"
+        )).all()
+        if [tuple(row) for row in translations] != [("sector", "Projet"), ("titulo", "Projet")]:
+            problems.append(f"translation_cache rows not migrated: {translations}")
+        if conn.execute(text("SELECT COUNT(*) FROM translation_memory")).scalar() != 1:
+            problems.append("translation_memory should hold one entry for the repeated text")
+        if conn.execute(text("SELECT COUNT(*) FROM project_funding_sources")).scalar() != 3:
+            problems.append("default funding sources not created")
+        if conn.execute(text("SELECT funding_source_id FROM expenses")).scalar() is None:
+            problems.append("expense not assigned to its funding source")
+        if conn.execute(text("SELECT COUNT(*) FROM reports WHERE fingerprint IS NULL")).scalar() != 1:
+            problems.append("report lost in the upgrade")
+    return problems
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--baseline",
+        help="Revision that creates the pre-migration database (default: root commit)",
+    )
+    args = parser.parse_args()
+    revision = args.baseline or git("rev-list", "--max-parents=0", "HEAD").splitlines()[0]
+
+    failures = 0
+    try:
+        build_baseline_db(revision, str(engine.url))
+        fresh_engine = create_engine(f"sqlite:///{bench_data.TMP_DIR}/fresh.db")
+        checks = [
+            (f"upgrade from {revision[:10]}", lambda: upgrade_problems(engine) + data_problems(engine)),
+            ("upgrade from an empty database", lambda: upgrade_problems(fresh_engine)),
+        ]
+        for name, check in checks:
+            try:
+                problems = check()
+            except Exception as exc:
+                problems = [f"{type(exc).__name__}: {str(exc).splitlines()[0]}"]
+            failures += bool(problems)
+            print(f"[{'ok' if not problems else 'FAIL':>4}] {name}")
+            for problem in problems:
+                print(f"       {problem}")
+    finally:
+        engine.dispose()
+        bench_data.cleanup()
+
+    print("All migration paths ok." if not failures else f"{failures} migration paths failed.")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
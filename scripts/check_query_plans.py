@@ -0,0 +1,185 @@
+"""Regression check: hot queries must use an index, never a table scan.
+
+Seeds a few synthetic projects (plus audit log rows), runs the real service
+calls behind the busiest tabs while capturing the SQL they emit, and asks
+SQLite for the EXPLAIN QUERY PLAN of every SELECT. A check fails when the plan
+contains ``SCAN <table>`` for one of the tables it guards (a full scan, with
+or without an index, instead of a ``SEARCH``). Exits with status 1 on failure.
+
+Usage:
+    PYTHONPATH=. python scripts/check_query_plans.py [--verbose]
+"""
+
+import argparse
+import re
+import sys
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+import bench_data
+from sqlalchemy import event, insert
+
+from app.database import SessionLocal, engine
+from app.models.budget import ProjectBudgetLine
+from app.models.audit_log import AuditLog, ActorType, AccionAuditoria
+from app.models.expense import EstadoGasto
+from app.models.project import EstadoProyecto
+from app.schemas.expense import ExpenseFilters
+from app.services.audit_service import AuditService
+from app.services.budget_service import BudgetService
+from app.services.execution_ledger_service import ExecutionLedgerService
+from app.services.expense_service import ExpenseService
+from app.services.project_service import ProjectService
+from app.services.project_snapshot import ProjectSnapshotLoader
+from app.services.report_service import ReportService
+from app.services.transfer_service import TransferService
+from app.services.translation_service import TranslationService
+
+
+SCAN_RE = re.compile(r"\bSCAN (\w+)")
+
+
+@contextmanager
+def capture_selects():
+    statements: list[tuple[str, object]] = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+def query_plan(statement: str, parameters) -> list[str]:
+    raw = engine.raw_connection()
+    try:
+        cursor = raw.cursor()
+        cursor.execute(f"EXPLAIN QUERY PLAN {statement}", parameters)
+        return [row[3] for row in cursor.fetchall()]
+    finally:
+        raw.close()
+
+
+def seed_audit_logs(project_ids: list[int], n: int = 5000):
+    acciones = list(AccionAuditoria)
+    start = datetime(2025, 1, 1)
+    rows = [
+        {
+            "id": f"bench-{i}",
+            "timestamp": start + timedelta(minutes=i),
+            "actor_type": ActorType.internal,
+            "actor_id": f"user-{i % 25}",
+            "actor_email": None,
+            "actor_label": "Bench",
+            "accion": acciones[i % len(acciones)],
+            "project_id": project_ids[i % len(project_ids)],
+        }
+        for i in range(n)
+    ]
+    with engine.begin() as conn:
+        conn.execute(insert(AuditLog), rows)
+
+
+def build_checks(project_id: int, line_id: int):
+    """(name, guarded tables, call(db)) for each hot query."""
+    return [
+        ("expenses tab list", {"expenses"},
+         lambda db: ExpenseService(db).get_project_expenses(project_id)),
+        ("expenses filtered by estado", {"expenses"},
+         lambda db: ExpenseService(db).get_project_expenses(
+             project_id, ExpenseFilters(estado=EstadoGasto.validado))),
+        ("expense summary", {"expenses"},
+         lambda db: ExpenseService(db).get_expense_summary(project_id)),
+        ("budget lines with balance", {"project_budget_lines"},
+         lambda db: ExpenseService(db).get_budget_lines_with_balance(project_id)),
+        ("budget tab lines", {"project_budget_lines"},
+         lambda db: BudgetService(db).get_project_budget(project_id)),
+        ("transfers tab", {"transfers", "expenses", "budget_execution_ledger"},
+         lambda db: (TransferService(db).get_project_transfers(project_id),
+                     TransferService(db).get_transfer_summary(project_id))),
+        ("reports tab", {"reports"},
+         lambda db: ReportService(db).get_project_reports(project_id)),
+        ("report snapshot", {"expenses", "transfers", "project_budget_lines", "budget_execution_ledger",
+                             "results", "activities", "indicators", "indicator_updates"},
+         lambda db: ProjectSnapshotLoader(db).load(project_id)),
+        ("ledger verify (project)", {"expenses", "budget_execution_ledger", "project_budget_lines"},
+         lambda db: ExecutionLedgerService(db).verify(project_id)),
+        ("expenses of a budget line", {"expenses"},
+         lambda db: db.get(ProjectBudgetLine, line_id).expenses),
+        ("audit log by project", {"audit_logs"},
+         lambda db: AuditService(db).get_logs(project_id=project_id)),
+        ("audit log by actor", {"audit_logs"},
+         lambda db: AuditService(db).get_logs(actor_id="user-3")),
+        ("audit log by accion", {"audit_logs"},
+         lambda db: AuditService(db).get_logs(accion=AccionAuditoria.export)),
+        ("projects by estado", {"projects"},
+         lambda db: ProjectService(db).get_all(estado=EstadoProyecto.ejecucion)),
+        ("projects by pais", {"projects"},
+         lambda db: ProjectService(db).get_all(pais="Senegal")),
+        ("projects by funder", {"projects"},
+         lambda db: BudgetService(db).get_funder_project_count(1)),
+        ("translation memory probe", {"translation_memory"},
+         lambda db: TranslationService(db).get_translated_text(
+             "project", project_id, "titulo", "Texto sin traducir", "fr")),
+        ("translation prefetch", {"translation_memory"},
+         lambda db: TranslationService(db).prefetch_project(project_id, "fr", force=True)),
+    ]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--verbose", action="store_true", help="Print every plan")
+    args = parser.parse_args()
+
+    bench_data.init_db()
+    failures = 0
+    try:
+        project_ids = [bench_data.seed_project(2000, seed=s) for s in range(3)]
+        seed_audit_logs(project_ids)
+
+        db = SessionLocal()
+        try:
+            line_id = db.query(ProjectBudgetLine.id).filter_by(project_id=project_ids[0]).first()[0]
+        finally:
+            db.close()
+
+        for name, guarded, call in build_checks(project_ids[0], line_id):
+            db = SessionLocal()
+            try:
+                with capture_selects() as statements:
+                    call(db)
+            finally:
+                db.close()
+
+            problems = []
+            for statement, parameters in statements:
+                plan = query_plan(statement, parameters)
+                scanned = {m.group(1) for line in plan for m in [SCAN_RE.search(line)] if m}
+                bad = scanned & guarded
+                if bad:
+                    problems.append((statement, plan, bad))
+                if args.verbose:
+                    print(f"  {' '.join(statement.split())[:110]}")
+                    for line in plan:
+                        print(f"      {line}")
+
+            status = "FAIL" if problems else "ok"
+            print(f"[{status:>4}] {name} ({len(statements)} queries)")
+            for statement, plan, bad in problems:
+                failures += 1
+                print(f"       scans {', '.join(sorted(bad))}: {' '.join(statement.split())[:160]}")
+                for line in plan:
+                    print(f"         {line}")
+    finally:
+        bench_data.cleanup()
+
+    print("All hot queries use indexes." if not failures else f"{failures} queries fall back to a scan.")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,108 @@
+"""Regression check: report generation runs a fixed, small number of queries.
+
+Seeds a small and a large synthetic project and counts the SQL statements
+emitted by each Excel report, by a full justification pack and by
+ReportService.validate_for_generation. Everything reads the project through
+ProjectSnapshotLoader, so each call must stay within SNAPSHOT_QUERIES
+statements and issue the same number for both projects: a count that grows
+with the data is a lazy load (N+1) sneaking back in. Exits with status 1 on
+failure.
+
+Usage:
+    PYTHONPATH=. python scripts/check_report_queries.py [--verbose]
+"""
+
+import argparse
+import os
+import sys
+from contextlib import contextmanager
+
+import bench_data
+from sqlalchemy import event
+
+from app.database import SessionLocal, engine
+from app.models.project import Project
+from app.models.report import TipoInforme
+from app.services.excel_generator_service import ExcelGeneratorService
+from app.services.project_snapshot import SNAPSHOT_QUERIES
+from app.services.report_service import ReportService
+
+TIPOS = [tipo for tipo in TipoInforme if tipo != TipoInforme.anexo_iia]
+
+
+@contextmanager
+def capture_statements():
+    statements: list[str] = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+def build_checks(output_dir: str):
+    """(name, call(db, project)) for each report path under budget."""
+    checks = [
+        (f"report {tipo.value}",
+         lambda db, project, tipo=tipo: ExcelGeneratorService(db).generate_report(project, tipo, output_dir, "2025-01"))
+        for tipo in TIPOS
+    ]
+    checks.append(
+        (f"pack ({len(TIPOS)} workbooks)",
+         lambda db, project: ExcelGeneratorService(db).generate_pack(project, output_dir, TIPOS, workers=1))
+    )
+    checks.append(
+        ("validate_for_generation",
+         lambda db, project: ReportService(db).validate_for_generation(project.id))
+    )
+    return checks
+
+
+def count_queries(call, project_id: int, verbose: bool) -> int:
+    db = SessionLocal()
+    try:
+        project = db.get(Project, project_id)
+        with capture_statements() as statements:
+            call(db, project)
+    finally:
+        db.close()
+    if verbose:
+        for statement in statements:
+            print(f"      {' '.join(statement.split())[:120]}")
+    return len(statements)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--verbose", action="store_true", help="Print every statement")
+    args = parser.parse_args()
+
+    bench_data.init_db()
+    output_dir = os.path.join(bench_data.TMP_DIR, "exports")
+    os.makedirs(output_dir, exist_ok=True)
+    failures = 0
+    try:
+        small = bench_data.seed_project(50, n_lines=3, n_transfers=2, n_results=1, seed=1)
+        large = bench_data.seed_project(5000, n_lines=40, n_transfers=24, n_results=12, seed=2)
+
+        print(f"budget: {SNAPSHOT_QUERIES} queries per call")
+        for name, call in build_checks(output_dir):
+            counts = [count_queries(call, project_id, args.verbose) for project_id in (small, large)]
+            ok = max(counts) <= SNAPSHOT_QUERIES and counts[0] == counts[1]
+            if not ok:
+                failures += 1
+            status = "ok" if ok else "FAIL"
+            print(f"[{status:>4}] {name}: {counts[0]} queries (small), {counts[1]} (large)")
+    finally:
+        bench_data.cleanup()
+
+    print("All report paths within budget." if not failures else f"{failures} report paths over budget.")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,102 @@
+"""Local stand-in for the OpenRouter chat completions endpoint.
+
+Answers POST /chat/completions (and /api/v1/chat/completions) by "translating"
+the JSON object at the end of the prompt: every value becomes
+"[fr] <text>" / "[en] <text>". It sleeps --latency seconds per request and
+answers 429 when more than --max-concurrent requests are in flight, so the
+client's pooling, concurrency cap and retries can be exercised offline.
+
+Usage:
+    python scripts/openrouter_stub.py [--port 8765] [--latency 0.3] [--max-concurrent 8]
+    OPENROUTER_API_KEY=stub OPENROUTER_BASE_URL=http://127.0.0.1:8765 uvicorn app.main:app
+"""
+
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class StubState:
+    def __init__(self, latency: float, max_concurrent: int):
+        self.latency = latency
+        self.max_concurrent = max_concurrent
+        self.lock = threading.Lock()
+        self.in_flight = 0
+        self.requests = 0
+        self.rejected = 0
+        self.connections = 0
+
+
+def make_handler(state: StubState):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive, so connection reuse is visible
+
+        def setup(self):
+            super().setup()
+            with state.lock:
+                state.connections += 1
+
+        def log_message(self, format, *args):
+            pass
+
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            if not self.path.endswith("/chat/completions"):
+                return self._reply(404, {"error": "not found"})
+            with state.lock:
+                state.requests += 1
+                if state.max_concurrent and state.in_flight >= state.max_concurrent:
+                    state.rejected += 1
+                    return self._reply(429, {"error": "rate limited"}, {"Retry-After": "0.2"})
+                state.in_flight += 1
+            try:
+                prompt = json.loads(body)["messages"][0]["content"]
+                lang = "fr" if "al frances" in prompt else "en"
+                fields = json.loads(prompt[prompt.index("{"):])
+                time.sleep(state.latency)
+                content = json.dumps({k: f"[{lang}] {v}" for k, v in fields.items()}, ensure_ascii=False)
+                self._reply(200, {"choices": [{"message": {"content": f"```json\n{content}\n```"}}]})
+            finally:
+                with state.lock:
+                    state.in_flight -= 1
+
+        def _reply(self, status: int, payload: dict, headers: dict | None = None):
+            data = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            for key, value in (headers or {}).items():
+                self.send_header(key, value)
+            self.end_headers()
+            self.wfile.write(data)
+
+    return Handler
+
+
+def start_stub(port: int = 0, latency: float = 0.3, max_concurrent: int = 0):
+    """Start the stub in a daemon thread. Returns (server, state, base_url)."""
+    state = StubState(latency, max_concurrent)
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(state))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, state, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.3)
+    parser.add_argument("--max-concurrent", type=int, default=8)
+    args = parser.parse_args()
+    server, _, base_url = start_stub(args.port, args.latency, args.max_concurrent)
+    print(f"OpenRouter stub on {base_url} (latency {args.latency}s)")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()